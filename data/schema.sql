@@ -104,9 +104,14 @@ CREATE TABLE assets(
   force_reindex INTEGER DEFAULT 0,
   force_rerender INTEGER DEFAULT 0,
   is_duplicate INTEGER DEFAULT 0,
-  duplicate_of_id INTEGER
+  duplicate_of_id INTEGER,
+  full_hash_mtime INTEGER, -- source mtime/size full_hash was computed from
+  full_hash_size INTEGER,
+  partial_hash_algo TEXT, -- hash algorithm tag (name:version), NULL = md5:1
+  full_hash_algo TEXT
 );
 
+-- Legacy; entries live in monthly change_journal_YYYY_MM partitions (see core/journal_partitions.py)
 CREATE TABLE change_journal(
   id INTEGER PRIMARY KEY AUTOINCREMENT,
   timestamp TEXT NOT NULL DEFAULT(datetime('now')),
@@ -114,18 +119,12 @@ CREATE TABLE change_journal(
   entity_type TEXT NOT NULL, -- 'asset' or 'model'
   entity_id INTEGER NOT NULL,
   -- Change details
-  action TEXT NOT NULL, -- 'create',
-  'update',
-  'delete',
-  'restore'
+  action TEXT NOT NULL, -- 'create', 'update', 'delete', 'restore', 'trash'
   field_name TEXT, -- Which field changed(for updates)
   old_value TEXT, -- Previous value(JSON for complex)
   new_value TEXT, -- New value
   -- Context
-  source TEXT, -- 'indexer',
-  'api',
-  'manual',
-  'cleanup'
+  source TEXT, -- 'indexer', 'api', 'manual', 'cleanup'
   user_info TEXT, -- Optional user context
   -- Indexes for efficient queries
   FOREIGN KEY(entity_id) REFERENCES assets(id) ON DELETE SET NULL
@@ -139,6 +138,33 @@ CREATE TABLE collections(
   created_at TEXT DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE TABLE data_generations(
+  name TEXT PRIMARY KEY, -- tracked table name
+  generation INTEGER NOT NULL DEFAULT 0 -- bumped by triggers on every relevant write
+);
+
+CREATE TABLE directory_manifest(
+  entity_type TEXT NOT NULL, -- 'model' or 'asset'
+  root_id TEXT NOT NULL, -- volume id (models), asset location id or '' (PDFs)
+  dir_path TEXT NOT NULL, -- absolute directory path
+  dir_mtime_ns INTEGER, -- NULL = not trusted, list again on the next scan
+  entry_count INTEGER NOT NULL DEFAULT 0, -- files + subdirectories (hidden excluded)
+  last_scan_at TEXT, -- last full listing
+  PRIMARY KEY(entity_type, root_id, dir_path)
+);
+
+CREATE TABLE folder_nodes(
+  entity_type TEXT NOT NULL, -- 'model' or 'asset'
+  volume_id TEXT NOT NULL,
+  folder_path TEXT NOT NULL, -- '' for the volume root
+  parent_path TEXT, -- NULL for the volume root
+  name TEXT NOT NULL,
+  depth INTEGER NOT NULL, -- 0 for the volume root
+  direct_count INTEGER NOT NULL DEFAULT 0,
+  total_count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY(entity_type, volume_id, folder_path)
+);
+
 CREATE TABLE job_errors(
   id INTEGER PRIMARY KEY AUTOINCREMENT,
   job_id INTEGER REFERENCES scan_jobs(id) ON DELETE CASCADE,
@@ -150,6 +176,19 @@ CREATE TABLE job_errors(
   created_at TEXT DEFAULT(datetime('now'))
 );
 
+CREATE TABLE journal_partitions(
+  month TEXT PRIMARY KEY, -- 'YYYY-MM' (UTC)
+  table_name TEXT NOT NULL,
+  entry_count INTEGER NOT NULL DEFAULT 0,
+  created_at TEXT DEFAULT(datetime('now')),
+  compacted_at TEXT -- last compaction (sealed months only)
+);
+
+CREATE TABLE journal_sequence(
+  id INTEGER PRIMARY KEY CHECK(id = 1),
+  last_id INTEGER NOT NULL DEFAULT 0
+);
+
 CREATE TABLE models(
   id INTEGER PRIMARY KEY AUTOINCREMENT,
   file_path TEXT UNIQUE NOT NULL,
@@ -196,7 +235,11 @@ CREATE TABLE models(
   force_reindex INTEGER DEFAULT 0,
   force_rerender INTEGER DEFAULT 0,
   is_duplicate INTEGER DEFAULT 0,
-  duplicate_of_id INTEGER
+  duplicate_of_id INTEGER,
+  full_hash_mtime INTEGER, -- source mtime/size full_hash was computed from
+  full_hash_size INTEGER,
+  partial_hash_algo TEXT, -- hash algorithm tag (name:version), NULL = md5:1
+  full_hash_algo TEXT
 );
 
 CREATE TABLE scan_jobs(
@@ -300,6 +343,22 @@ CREATE INDEX idx_assets_full_hash ON assets(full_hash);
 
 CREATE INDEX idx_assets_game_system ON assets(game_system);
 
+CREATE INDEX idx_assets_live_created_at ON assets(deleted_at, created_at);
+
+CREATE INDEX idx_assets_live_file_size ON assets(deleted_at, file_size);
+
+CREATE INDEX idx_assets_live_filename ON assets(deleted_at, filename);
+
+CREATE INDEX idx_assets_live_folder ON assets(deleted_at, folder_path);
+
+CREATE INDEX idx_assets_live_modified_at ON assets(deleted_at, modified_at);
+
+CREATE INDEX idx_assets_live_page_count ON assets(deleted_at, page_count);
+
+CREATE INDEX idx_assets_live_publisher ON assets(deleted_at, publisher);
+
+CREATE INDEX idx_assets_live_title ON assets(deleted_at, title);
+
 CREATE INDEX idx_assets_partial_hash ON assets(partial_hash);
 
 CREATE INDEX idx_assets_publisher ON assets(publisher);
@@ -308,8 +367,18 @@ CREATE INDEX idx_assets_status ON assets(index_status);
 
 CREATE INDEX idx_assets_volume ON assets(volume_id);
 
+CREATE INDEX idx_assets_volume_created_at ON assets(volume_id, created_at);
+
+CREATE INDEX idx_assets_volume_file_size ON assets(volume_id, file_size);
+
+CREATE INDEX idx_assets_volume_filename ON assets(volume_id, filename);
+
+CREATE INDEX idx_assets_volume_title ON assets(volume_id, title);
+
 CREATE INDEX idx_bookmarks_asset ON asset_bookmarks(asset_id);
 
+CREATE INDEX idx_folder_nodes_parent ON folder_nodes(entity_type, volume_id, parent_path);
+
 CREATE INDEX idx_job_errors_job ON job_errors(job_id);
 
 CREATE INDEX idx_jobs_status ON scan_jobs(status, priority);
@@ -326,28 +395,184 @@ CREATE INDEX idx_locations_enabled ON asset_locations(enabled);
 
 CREATE INDEX idx_locations_type ON asset_locations(asset_type);
 
-CREATE INDEX idx_models_archive ON models(archive_path);
+CREATE INDEX idx_models_archive_member ON models(archive_path, archive_member);
 
 CREATE INDEX idx_models_collection ON models(collection);
 
+CREATE INDEX idx_models_created_at ON models(created_at);
+
 CREATE INDEX idx_models_deleted ON models(deleted_at);
 
+CREATE INDEX idx_models_file_size ON models(file_size);
+
 CREATE INDEX idx_models_folder ON models(folder_path);
 
 CREATE INDEX idx_models_force ON models(force_reindex, force_rerender);
 
-CREATE INDEX idx_models_format ON models(format);
+CREATE INDEX idx_models_filename ON models(filename);
+
+CREATE INDEX idx_models_format_thumb ON models(format, thumb_storage);
 
 CREATE INDEX idx_models_full_hash ON models(full_hash);
 
-CREATE INDEX idx_models_partial_hash ON models(partial_hash);
+CREATE INDEX idx_models_hash_seen ON models(partial_hash, last_seen_at);
+
+CREATE INDEX idx_models_live_collection ON models(deleted_at, collection);
+
+CREATE INDEX idx_models_live_file_size ON models(deleted_at, file_size);
+
+CREATE INDEX idx_models_live_format ON models(deleted_at, format);
 
 CREATE INDEX idx_models_status ON models(index_status);
 
+CREATE INDEX idx_models_thumb_storage ON models(thumb_storage);
+
+CREATE INDEX idx_models_title ON models(title);
+
 CREATE INDEX idx_models_volume ON models(volume_id);
 
+CREATE INDEX idx_models_volume_collection ON models(volume_id, collection);
+
+CREATE INDEX idx_models_volume_created_at ON models(volume_id, created_at);
+
+CREATE INDEX idx_models_volume_file_size ON models(volume_id, file_size);
+
+CREATE INDEX idx_models_volume_filename ON models(volume_id, filename);
+
+CREATE INDEX idx_models_volume_format ON models(volume_id, format);
+
+CREATE INDEX idx_models_volume_status ON models(volume_id, index_status);
+
+CREATE INDEX idx_models_volume_title ON models(volume_id, title);
+
 CREATE INDEX idx_pages_asset ON asset_pages(asset_id);
 
 CREATE INDEX idx_volumes_mount ON volumes(mount_path);
 
 CREATE INDEX idx_volumes_status ON volumes(status);
+
+-- Change journal ID allocator (see core/journal_partitions.py)
+INSERT INTO journal_sequence (id, last_id) VALUES (1, 0);
+
+-- Generation counters (cache invalidation, see core/stats_cache.py)
+INSERT INTO data_generations (name, generation) VALUES ('assets', 0);
+INSERT INTO data_generations (name, generation) VALUES ('models', 0);
+INSERT INTO data_generations (name, generation) VALUES ('change_journal', 0);
+INSERT INTO data_generations (name, generation) VALUES ('asset_locations', 0);
+INSERT INTO data_generations (name, generation) VALUES ('volumes', 0);
+INSERT INTO data_generations (name, generation) VALUES ('search_index', 0);
+
+CREATE TRIGGER trg_assets_gen_insert AFTER INSERT ON assets
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'assets';
+END;
+
+CREATE TRIGGER trg_assets_gen_delete AFTER DELETE ON assets
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'assets';
+END;
+
+CREATE TRIGGER trg_assets_gen_update AFTER UPDATE OF deleted_at, file_size, publisher, volume_id, index_status ON assets
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'assets';
+END;
+
+CREATE TRIGGER trg_models_gen_insert AFTER INSERT ON models
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'models';
+END;
+
+CREATE TRIGGER trg_models_gen_delete AFTER DELETE ON models
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'models';
+END;
+
+CREATE TRIGGER trg_models_gen_update AFTER UPDATE OF deleted_at, format, collection, file_size, volume_id, index_status, partial_hash, thumb_storage ON models
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'models';
+END;
+
+CREATE TRIGGER trg_change_journal_gen_insert AFTER INSERT ON change_journal
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'change_journal';
+END;
+
+CREATE TRIGGER trg_change_journal_gen_delete AFTER DELETE ON change_journal
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'change_journal';
+END;
+
+CREATE TRIGGER trg_asset_locations_gen_insert AFTER INSERT ON asset_locations
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'asset_locations';
+END;
+
+CREATE TRIGGER trg_asset_locations_gen_delete AFTER DELETE ON asset_locations
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'asset_locations';
+END;
+
+CREATE TRIGGER trg_asset_locations_gen_update AFTER UPDATE OF path, enabled, asset_type, is_primary, name ON asset_locations
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'asset_locations';
+END;
+
+CREATE TRIGGER trg_volumes_gen_insert AFTER INSERT ON volumes
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'volumes';
+END;
+
+CREATE TRIGGER trg_volumes_gen_delete AFTER DELETE ON volumes
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'volumes';
+END;
+
+CREATE TRIGGER trg_volumes_gen_update AFTER UPDATE OF mount_path ON volumes
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'volumes';
+END;
+
+CREATE TRIGGER trg_assets_search_index_gen_insert AFTER INSERT ON assets
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'search_index';
+END;
+
+CREATE TRIGGER trg_assets_search_index_gen_update AFTER UPDATE OF deleted_at, title, author, publisher, filename, text_content, folder_path, game_system ON assets
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'search_index';
+END;
+
+CREATE TRIGGER trg_assets_search_index_gen_delete AFTER DELETE ON assets
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'search_index';
+END;
+
+CREATE TRIGGER trg_models_search_index_gen_insert AFTER INSERT ON models
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'search_index';
+END;
+
+CREATE TRIGGER trg_models_search_index_gen_update AFTER UPDATE OF deleted_at, filename, title, collection, creator, folder_path, format ON models
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'search_index';
+END;
+
+CREATE TRIGGER trg_models_search_index_gen_delete AFTER DELETE ON models
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'search_index';
+END;
+
+CREATE TRIGGER trg_asset_pages_search_index_gen_insert AFTER INSERT ON asset_pages
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'search_index';
+END;
+
+CREATE TRIGGER trg_asset_pages_search_index_gen_update AFTER UPDATE OF text_content ON asset_pages
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'search_index';
+END;
+
+CREATE TRIGGER trg_asset_pages_search_index_gen_delete AFTER DELETE ON asset_pages
+BEGIN
+  UPDATE data_generations SET generation = generation + 1 WHERE name = 'search_index';
+END;
@@ -14,6 +14,7 @@ from functools import wraps
 from flask import Blueprint, request, jsonify, redirect, url_for, make_response
 
 from fantasyfolio.services import auth as auth_service
+from fantasyfolio.services.auth_cache import get_principal_cache
 
 logger = logging.getLogger(__name__)
 
@@ -30,12 +31,13 @@ def get_current_user():
         return None
     
     token = auth_header[7:]  # Remove 'Bearer ' prefix
-    payload = auth_service.verify_access_token(token)
+    cache = get_principal_cache()
+    payload = cache.resolve_token(token, auth_service.verify_access_token)
     
     if not payload:
         return None
     
-    return auth_service.get_user_by_id(payload['sub'])
+    return cache.get_principal(payload['sub'], auth_service.get_user_by_id)
 
 
 def require_auth(f):
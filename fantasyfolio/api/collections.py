@@ -15,6 +15,8 @@ from flask import Blueprint, request, jsonify
 
 from fantasyfolio.api.auth import require_auth, get_current_user
 from fantasyfolio.core.database import get_db, get_setting
+from fantasyfolio.core import collection_tree
+from fantasyfolio.services.auth_cache import get_principal_cache, invalidate_collection
 from fantasyfolio.services.email import get_email_service
 from fantasyfolio.services.email_templates import collection_share_invite_email
 
@@ -23,6 +25,28 @@ logger = logging.getLogger(__name__)
 collections_bp = Blueprint('collections', __name__, url_prefix='/api/collections')
 
 
+def collection_access(collection_id, user_id):
+    """A user's access to a collection, cached until its shares change.
+    
+    Returns None if the collection doesn't exist, else a dict with owner_id
+    and permission: 'owner', the share permission, or None (no access).
+    """
+    def load(collection_id, user_id):
+        db = get_db()
+        collection = db.fetchone("SELECT owner_id FROM user_collections WHERE id = ?", (collection_id,))
+        if not collection:
+            return None
+        if collection['owner_id'] == user_id:
+            return {'owner_id': user_id, 'permission': 'owner'}
+        share = db.fetchone("""
+            SELECT permission FROM collection_shares 
+            WHERE collection_id = ? AND shared_with_user_id = ?
+        """, (collection_id, user_id))
+        return {'owner_id': collection['owner_id'], 'permission': share['permission'] if share else None}
+    
+    return get_principal_cache().collection_access(collection_id, user_id, load)
+
+
 # ==================== Collection CRUD ====================
 
 @collections_bp.route('', methods=['GET'])
@@ -33,6 +57,9 @@ def list_collections():
     Query params:
         include_shared: Include collections shared with me (default: true)
         owner_id: Get collections owned by specific user (admin only)
+        tree: Also return owned collections nested under 'tree' (default: false)
+    
+    Owned collections carry depth and rolled-up total_items/total_bytes.
     """
     user = request.current_user
     include_shared = request.args.get('include_shared', 'true').lower() == 'true'
@@ -46,12 +73,10 @@ def list_collections():
     
     db = get_db()
     
-    # Get owned collections (flat list with parent info)
-    owned = db.fetchall("""
-        SELECT * FROM user_collections 
-        WHERE owner_id = ? 
-        ORDER BY name
-    """, (target_user_id,))
+    # Get owned collections (flat list with parent info and rollups, one query)
+    with db.connection() as conn:
+        collection_tree.ensure_collection_tree(conn)
+        owned = collection_tree.owner_rows(conn, target_user_id)
     
     # Get shared collections (with custom names if set)
     shared = []
@@ -77,10 +102,14 @@ def list_collections():
             item['is_shared'] = True
             shared.append(item)
     
-    return jsonify({
+    result = {
         'owned': owned,
         'shared': shared
-    })
+    }
+    if request.args.get('tree', 'false').lower() == 'true':
+        result['tree'] = collection_tree.build_tree(owned)
+    
+    return jsonify(result)
 
 
 @collections_bp.route('/shared-with/<user_id>', methods=['GET'])
@@ -168,7 +197,15 @@ def create_collection():
 @collections_bp.route('/<collection_id>', methods=['GET'])
 @require_auth
 def get_collection(collection_id):
-    """Get collection details with items."""
+    """Get collection details with items.
+    
+    For the owner, also returns the ancestor chain ('ancestors', root
+    first), nested sub-collections with rollups ('subcollections') and
+    total_items/total_bytes over the whole subtree.
+    
+    Query params:
+        depth: Limit sub-collection levels returned (rollups still cover all)
+    """
     user = request.current_user
     db = get_db()
     
@@ -185,14 +222,11 @@ def get_collection(collection_id):
     
     # Check access
     if collection['owner_id'] != user['id']:
-        share = db.fetchone("""
-            SELECT * FROM collection_shares 
-            WHERE collection_id = ? AND shared_with_user_id = ?
-        """, (collection_id, user['id']))
-        if not share:
+        access = collection_access(collection_id, user['id'])
+        if not access or not access['permission']:
             return jsonify({'error': 'Access denied'}), 403
         collection = dict(collection)
-        collection['permission'] = share['permission']
+        collection['permission'] = access['permission']
     
     # Get items with asset details
     items = db.fetchall("""
@@ -219,6 +253,18 @@ def get_collection(collection_id):
     result = dict(collection)
     result['items'] = items
     
+    if collection['owner_id'] == user['id']:
+        max_depth = request.args.get('depth', type=int)
+        with db.connection() as conn:
+            collection_tree.ensure_collection_tree(conn)
+            result['ancestors'] = collection_tree.ancestors(conn, collection_id)
+            rows = collection_tree.subtree_rows(conn, collection_id, max_depth=max_depth)
+        root = collection_tree.build_tree(rows, root_id=collection_id)
+        if root:
+            result['subcollections'] = root[0]['children']
+            result['total_items'] = root[0]['total_items']
+            result['total_bytes'] = root[0]['total_bytes']
+    
     return jsonify(result)
 
 
@@ -277,6 +323,10 @@ def update_collection(collection_id):
             # Prevent circular nesting
             if parent_id == collection_id:
                 return jsonify({'error': 'Cannot nest collection into itself'}), 400
+            with db.connection() as conn:
+                collection_tree.ensure_collection_tree(conn)
+                if collection_tree.is_descendant(conn, parent_id, collection_id):
+                    return jsonify({'error': 'Cannot nest collection into its own sub-collection'}), 400
     
     # Build update
     updates = {}
@@ -307,7 +357,7 @@ def update_collection(collection_id):
 @collections_bp.route('/<collection_id>', methods=['DELETE'])
 @require_auth
 def delete_collection(collection_id):
-    """Delete a collection."""
+    """Delete a collection and its sub-collections."""
     user = request.current_user
     db = get_db()
     
@@ -318,9 +368,17 @@ def delete_collection(collection_id):
         return jsonify({'error': 'Collection not found or access denied'}), 404
     
     with db.connection() as conn:
-        # Items and shares cascade delete
-        conn.execute("DELETE FROM user_collections WHERE id = ?", (collection_id,))
+        # Sub-collections go with it (foreign keys aren't enforced, so
+        # cascade by hand: items and shares too)
+        collection_tree.ensure_collection_tree(conn)
+        subtree = collection_tree.subtree_ids(conn, collection_id) or [collection_id]
+        for sub_id in subtree:
+            conn.execute("DELETE FROM collection_items WHERE collection_id = ?", (sub_id,))
+            conn.execute("DELETE FROM collection_shares WHERE collection_id = ?", (sub_id,))
+            conn.execute("DELETE FROM user_collections WHERE id = ?", (sub_id,))
         conn.commit()
+    for sub_id in subtree:
+        invalidate_collection(sub_id)
     
     logger.info(f"Collection deleted: {collection['name']} by {user['email']}")
     return jsonify({'message': 'Collection deleted'})
@@ -345,19 +403,11 @@ def add_items(collection_id):
     db = get_db()
     
     # Check ownership or edit permission
-    collection = db.fetchone("SELECT * FROM user_collections WHERE id = ?", (collection_id,))
-    if not collection:
+    access = collection_access(collection_id, user['id'])
+    if not access:
         return jsonify({'error': 'Collection not found'}), 404
     
-    can_edit = collection['owner_id'] == user['id']
-    if not can_edit:
-        share = db.fetchone("""
-            SELECT * FROM collection_shares 
-            WHERE collection_id = ? AND shared_with_user_id = ? AND permission = 'edit'
-        """, (collection_id, user['id']))
-        can_edit = share is not None
-    
-    if not can_edit:
+    if access['permission'] not in ('owner', 'edit'):
         return jsonify({'error': 'Access denied'}), 403
     
     # Handle single item or array
@@ -410,19 +460,11 @@ def remove_item(collection_id, item_id):
     db = get_db()
     
     # Check ownership or edit permission
-    collection = db.fetchone("SELECT * FROM user_collections WHERE id = ?", (collection_id,))
-    if not collection:
+    access = collection_access(collection_id, user['id'])
+    if not access:
         return jsonify({'error': 'Collection not found'}), 404
     
-    can_edit = collection['owner_id'] == user['id']
-    if not can_edit:
-        share = db.fetchone("""
-            SELECT * FROM collection_shares 
-            WHERE collection_id = ? AND shared_with_user_id = ? AND permission = 'edit'
-        """, (collection_id, user['id']))
-        can_edit = share is not None
-    
-    if not can_edit:
+    if access['permission'] not in ('owner', 'edit'):
         return jsonify({'error': 'Access denied'}), 403
     
     now = datetime.utcnow().isoformat()
@@ -746,6 +788,7 @@ def create_share(collection_id):
             VALUES (?, ?, ?, ?, ?, ?)
         """, (share_id, collection_id, target_user['id'], permission, now, user['id']))
         conn.commit()  # CRITICAL: Must commit transaction!
+    invalidate_collection(collection_id)
     
     # Send email notification
     send_email = data.get('send_email', True)
@@ -825,6 +868,7 @@ def revoke_share(collection_id, share_id):
             return jsonify({'error': 'Share not found'}), 404
         
         conn.commit()  # CRITICAL: Must commit transaction!
+    invalidate_collection(collection_id)
     
     logger.info(f"Share {share_id} revoked for collection {collection_id}")
     return jsonify({'success': True})
@@ -890,6 +934,7 @@ def update_share(collection_id, share_id):
             WHERE id = ? AND collection_id = ?
         """, params)
         conn.commit()  # CRITICAL: Must commit transaction!
+    invalidate_collection(collection_id)
     
     # Get updated share
     updated_share = db.fetchone(
@@ -7,6 +7,7 @@ Handles triggering and monitoring indexing operations.
 import os
 import subprocess
 import logging
+import threading
 from datetime import datetime
 from pathlib import Path
 from flask import Blueprint, jsonify, request
@@ -31,7 +32,7 @@ def api_trigger_index():
     - status: "started" if indexing began, "suspended" if volume unavailable
     - message: Human-readable status message
     """
-    from fantasyfolio.services.volume_monitor import check_volumes_for_index, check_volume_available
+    from fantasyfolio.services.volume_monitor import check_volumes_for_index, probe_volume
     
     config = get_config()
     data = request.get_json(silent=True)
@@ -73,7 +74,7 @@ def api_trigger_index():
         p_stripped = p.strip()
         if not os.path.isdir(p_stripped):
             # Path doesn't exist - check if it's a volume issue
-            vol_status = check_volume_available(p_stripped)
+            vol_status = probe_volume(p_stripped)
             if not vol_status['available']:
                 return jsonify({
                     'status': 'suspended',
@@ -84,31 +85,49 @@ def api_trigger_index():
                 return jsonify({'error': f'Path not found: {p}'}), 400
     
     # === AUTO-SNAPSHOT BEFORE INDEXING ===
-    # Create a snapshot before potentially modifying the database
+    # Create a snapshot before potentially modifying the database. The copy
+    # runs in the background; the indexer is only started once it has
+    # finished, so the snapshot never contains a half-written index.
+    snapshot_job = None
     try:
         from fantasyfolio.core.database import get_setting
         auto_snapshot = get_setting('auto_snapshot_before_index')
         if auto_snapshot != 'false':  # Default to enabled
             from fantasyfolio.services.snapshot import create_snapshot, list_snapshots
+            from fantasyfolio.services.db_backup import get_backup_job, list_backup_jobs
             
             # Only create if no snapshot in last hour (avoid spam)
             from datetime import timedelta
             snapshots = list_snapshots()
-            recent_snapshot = False
+            pending = [
+                job for job in list_backup_jobs()
+                if job['kind'] == 'snapshot' and job['status'] in ('pending', 'running')
+            ]
+            recent_snapshot = bool(pending)
             if snapshots:
                 latest = datetime.fromisoformat(snapshots[0]['timestamp'])
                 if datetime.now() - latest < timedelta(hours=1):
                     recent_snapshot = True
             
-            if not recent_snapshot:
+            if pending:
+                # A snapshot still being copied: wait for it as well
+                snapshot_job = get_backup_job(pending[0]['job_id'])
+            elif not recent_snapshot:
                 logger.info("Creating auto-snapshot before indexing")
-                snapshot_result = create_snapshot(note=f"Auto: before {content_type} index")
-                if snapshot_result['status'] == 'completed':
-                    logger.info(f"Auto-snapshot created: {snapshot_result['filename']}")
+                snapshot_result = create_snapshot(note=f"Auto: before {content_type} index", background=True)
+                snapshot_job = get_backup_job(snapshot_result['job_id'])
+                logger.info(f"Auto-snapshot started: {snapshot_result['filename']} (job {snapshot_result['job_id']})")
     except Exception as e:
         # Don't fail indexing if snapshot fails
         logger.warning(f"Auto-snapshot failed (continuing with index): {e}")
     
+    def wait_for_snapshot():
+        if snapshot_job is None:
+            return
+        snapshot_job.wait()
+        if snapshot_job.status != 'completed':
+            logger.warning(f"Auto-snapshot {snapshot_job.id} {snapshot_job.status} (continuing with index)")
+    
     # Determine indexer script
     scripts_dir = Path(__file__).parent.parent / "indexer"
     
@@ -126,35 +145,46 @@ def api_trigger_index():
     try:
         if background:
             # Run in background - return immediately
-            with open(log_file, 'a') as log:
-                log.write(f"\n\n=== Indexing started at {datetime.now()} ===\n")
-                log.write(f"Type: {content_type}, Paths: {paths}\n\n")
-                log.flush()
-                
-                # Pass database path to subprocess
-                env = os.environ.copy()
-                env['FANTASYFOLIO_DATABASE_PATH'] = str(config.DATABASE_PATH)
-                
-                for p in paths:
-                    p = p.strip()
-                    subprocess.Popen(
-                        ['python', '-u', '-m', indexer_module, p],
-                        stdout=log,
-                        stderr=subprocess.STDOUT,
-                        start_new_session=True,
-                        cwd=str(config.BASE_DIR),
-                        env=env
-                    )
+            # Pass database path to subprocess
+            env = os.environ.copy()
+            env['FANTASYFOLIO_DATABASE_PATH'] = str(config.DATABASE_PATH)
+            
+            def launch():
+                wait_for_snapshot()
+                with open(log_file, 'a') as log:
+                    log.write(f"\n\n=== Indexing started at {datetime.now()} ===\n")
+                    log.write(f"Type: {content_type}, Paths: {paths}\n\n")
+                    log.flush()
+                    
+                    for p in paths:
+                        p = p.strip()
+                        subprocess.Popen(
+                            ['python', '-u', '-m', indexer_module, p],
+                            stdout=log,
+                            stderr=subprocess.STDOUT,
+                            start_new_session=True,
+                            cwd=str(config.BASE_DIR),
+                            env=env
+                        )
+            
+            if snapshot_job is None or snapshot_job.done.is_set():
+                launch()
+                message = f'Indexing started in background for {len(paths)} path(s)'
+            else:
+                threading.Thread(target=launch, name="index-after-snapshot", daemon=True).start()
+                message = f'Indexing of {len(paths)} path(s) starts when snapshot {snapshot_job.id} finishes'
             
             return jsonify({
                 'status': 'started',
                 'success': True,
-                'message': f'Indexing started in background for {len(paths)} path(s)',
+                'message': message,
+                'snapshot_job_id': snapshot_job.id if snapshot_job else None,
                 'log_file': str(log_file),
                 'paths': paths
             })
         else:
             # Run synchronously (blocking)
+            wait_for_snapshot()
             env = os.environ.copy()
             env['FANTASYFOLIO_DATABASE_PATH'] = str(config.DATABASE_PATH)
             
@@ -240,5 +270,11 @@ def api_clear_index():
             logger.warning("Cleared 3D models index")
         
         conn.commit()
+        
+        from fantasyfolio.core.folder_tree import refresh_folder_nodes
+        if content_type in ('pdf', 'all'):
+            refresh_folder_nodes(conn, 'asset')
+        if content_type in ('3d', 'all'):
+            refresh_folder_nodes(conn, 'model')
     
     return jsonify({'success': True, 'message': f'Index cleared for type: {content_type}'})
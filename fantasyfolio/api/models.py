@@ -7,14 +7,19 @@ thumbnails, preview rendering, and file serving.
 
 import io
 import os
-import tempfile
 import zipfile
 import logging
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
 from flask import Blueprint, jsonify, request, send_file
 
-from fantasyfolio.core.database import get_connection, get_models_stats, get_model_by_id
+from fantasyfolio.core.database import get_connection, get_models_stats, get_model_by_id, folder_prefix_filter
+from fantasyfolio.core.pagination import fetch_page, CursorError
+from fantasyfolio.core.stats_cache import cached_stats
+from fantasyfolio.core.path_index import lookup_volume
+from fantasyfolio.core.folder_tree import (
+    build_folder_tree, list_folder_children, adjust_folder_counts, refresh_folder_nodes
+)
 from fantasyfolio.config import get_config
 
 logger = logging.getLogger(__name__)
@@ -26,13 +31,20 @@ _render_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="thumb_r
 
 @models_bp.route('/models')
 def api_models():
-    """List 3D models with optional filters and sorting."""
+    """
+    List 3D models with optional filters and sorting.
+    
+    Pagination: pass `cursor` (from the X-Next-Cursor response header of the
+    previous page) to fetch the next page. `offset` is still accepted for
+    older clients but gets slower the deeper it goes.
+    """
     folder = request.args.get('folder')
     volume_id = request.args.get('volume_id')
     collection = request.args.get('collection')
     format_filter = request.args.get('format')
     limit = int(request.args.get('limit', 100))
     offset = int(request.args.get('offset', 0))
+    cursor = request.args.get('cursor')
     sort = request.args.get('sort', 'filename')
     order = request.args.get('order', 'asc')
     
@@ -41,9 +53,6 @@ def api_models():
     if sort not in valid_sorts:
         sort = 'filename'
     
-    # Validate order
-    order = 'DESC' if order.lower() == 'desc' else 'ASC'
-    
     with get_connection() as conn:
         query = "SELECT * FROM models WHERE format != 'unsupported'"
         params = []
@@ -52,8 +61,9 @@ def api_models():
             query += " AND volume_id = ?"
             params.append(volume_id)
         if folder:
-            query += " AND folder_path LIKE ?"
-            params.append(folder + '%')
+            folder_sql, folder_params = folder_prefix_filter('folder_path', folder)
+            query += f" AND {folder_sql}"
+            params.extend(folder_params)
         if collection:
             query += " AND collection = ?"
             params.append(collection)
@@ -61,11 +71,18 @@ def api_models():
             query += " AND format = ?"
             params.append(format_filter)
         
-        query += f" ORDER BY {sort} {order} LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
+        try:
+            rows, next_cursor = fetch_page(
+                conn, query, params, [(sort, sort), ('id', 'id')],
+                descending=order.lower() == 'desc', limit=limit, cursor=cursor, offset=offset
+            )
+        except CursorError as e:
+            return jsonify({'error': str(e)}), 400
         
-        rows = conn.execute(query, params).fetchall()
-        return jsonify([dict(row) for row in rows])
+        response = jsonify(rows)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
 
 
 @models_bp.route('/models/stats')
@@ -113,122 +130,25 @@ def api_models_collections():
 
 @models_bp.route('/models/folder-tree')
 def api_models_folder_tree():
-    """Get hierarchical folder tree grouped by volume labels."""
+    """
+    Get hierarchical folder tree grouped by volume labels.
+
+    Served from the materialized folder_nodes table.
+
+    Query params:
+    - max_depth: Only return folders up to this depth (0 = volumes only)
+    - volume_id + parent: Return just the children of one folder (lazy loading);
+      parent='' lists top-level folders of the volume
+    """
+    volume_id = request.args.get('volume_id')
+    parent = request.args.get('parent')
+    max_depth = request.args.get('max_depth', type=int)
+
     with get_connection() as conn:
-        # Get volumes with model counts
-        volumes = conn.execute("""
-            SELECT v.id, v.label, COUNT(m.id) as count
-            FROM volumes v
-            LEFT JOIN models m ON m.volume_id = v.id AND m.format != 'unsupported'
-            GROUP BY v.id, v.label
-            ORDER BY v.label
-        """).fetchall()
-        
-        # Get folder paths grouped by volume
-        rows = conn.execute("""
-            SELECT m.volume_id, v.label as volume_label, m.folder_path, COUNT(*) as count
-            FROM models m
-            LEFT JOIN volumes v ON m.volume_id = v.id
-            WHERE m.folder_path IS NOT NULL AND m.folder_path != '' AND m.format != 'unsupported'
-            GROUP BY m.volume_id, v.label, m.folder_path
-            ORDER BY v.label, m.folder_path
-        """).fetchall()
-        
-        # Build tree structure grouped by volume
-        tree = {}
-        flat = []
-        
-        # Group folders by volume
-        volume_folders = {}  # {volume_label: {path: count}}
-        
-        for row in rows:
-            volume_label = row['volume_label']
-            if not volume_label:
-                continue
-            
-            folder_path = row['folder_path']
-            count = row['count']
-            
-            if volume_label not in volume_folders:
-                volume_folders[volume_label] = {}
-            
-            volume_folders[volume_label][folder_path] = count
-        
-        # Process each volume and its folders
-        for vol in volumes:
-            volume_id = vol['id']
-            volume_label = vol['label']
-            volume_count = vol['count']
-            
-            if volume_count == 0:
-                continue
-            
-            # Add volume root to flat array
-            has_folders = volume_label in volume_folders and len(volume_folders[volume_label]) > 0
-            flat.append({
-                'volume_id': volume_id,
-                'volume_label': volume_label,
-                'folder_path': None,
-                'path': volume_label,
-                'name': volume_label,
-                'count': volume_count,
-                'depth': 0,
-                'hasChildren': has_folders,
-                'query_param': 'volume_id',
-                'query_value': volume_id
-            })
-            
-            # Initialize tree for this volume
-            tree[volume_label] = {
-                '_volume_id': volume_id,
-                '_count': volume_count,
-                '_children': {}
-            }
-            
-            # Process folders for this volume
-            if volume_label in volume_folders:
-                folders = volume_folders[volume_label]
-                all_paths = {}
-                parents_with_children = set()
-                
-                for folder_path, count in folders.items():
-                    all_paths[folder_path] = count
-                    
-                    # Add parent paths
-                    parts = folder_path.split('/')
-                    for i in range(1, len(parts)):
-                        parent_path = '/'.join(parts[:i])
-                        if parent_path not in all_paths:
-                            all_paths[parent_path] = 0
-                        all_paths[parent_path] += count
-                        parents_with_children.add(parent_path)
-                    
-                    # Build nested tree
-                    current = tree[volume_label]['_children']
-                    for i, part in enumerate(parts):
-                        if part not in current:
-                            current[part] = {'_count': 0, '_children': {}}
-                        current[part]['_count'] += count
-                        current = current[part]['_children']
-                
-                # Add folder entries to flat array (depth starts at 1 under volume)
-                for folder_path in sorted(all_paths.keys()):
-                    depth = folder_path.count('/') + 1  # +1 because volume is depth 0
-                    name = folder_path.split('/')[-1]
-                    flat.append({
-                        'volume_id': volume_id,
-                        'volume_label': volume_label,
-                        'folder_path': folder_path,
-                        'path': f"{volume_label}/{folder_path}",
-                        'name': name,
-                        'count': all_paths[folder_path],
-                        'depth': depth,
-                        'hasChildren': folder_path in parents_with_children,
-                        'query_param': 'folder',
-                        'query_value': folder_path
-            })
-        
-        return jsonify({'tree': tree, 'flat': flat})
+        if volume_id and parent is not None:
+            return jsonify({'flat': list_folder_children(conn, 'model', volume_id, parent)})
+
+        return jsonify(build_folder_tree(conn, 'model', max_depth=max_depth))
 
 
 @models_bp.route('/models/search')
@@ -241,8 +161,14 @@ def api_models_search():
     if not query:
         return jsonify([])
     
-    from fantasyfolio.core.database import search_models
-    return jsonify(search_models(query, limit=limit, folder=folder))
+    from fantasyfolio.core.search_engine import unified_search
+    from fantasyfolio.core.search_cache import cache_key, cached_search
+    with get_connection() as conn:
+        # Unified engine so filenames also match on substrings ("dragon" -> "RedDragon")
+        key = cache_key('models/search', query, limit=limit, folder=folder)
+        return jsonify(cached_search(conn, key, lambda c: unified_search(
+            c, query, types=('model',), limit=limit, folder=folder
+        )['results']))
 
 
 @models_bp.route('/models/<int:model_id>/preview')
@@ -505,203 +431,91 @@ def api_model_download(model_id: int):
 
 @models_bp.route('/models/thumbnail-stats')
 def api_thumbnail_stats():
-    """Get thumbnail cache statistics for current models."""
-    config = get_config()
-    thumbnail_dir = Path(config.THUMBNAIL_DIR) / "3d"
+    """Get thumbnail coverage statistics for current models."""
+    from fantasyfolio.core.thumbnails import get_thumbnail_coverage
     
     with get_connection() as conn:
-        # Get all model IDs (for 3D formats)
-        model_rows = conn.execute("""
-            SELECT id FROM models 
-            WHERE format IN ('stl', 'obj', '3mf', 'glb', 'gltf', 'dae', '3ds', 'ply', 'x3d')
-        """).fetchall()
-    
-    total = len(model_rows)
-    model_ids = set(row['id'] for row in model_rows)
-    
-    # Count which models have cached thumbnails
-    cached = 0
-    if thumbnail_dir.exists():
-        for png in thumbnail_dir.glob("*.png"):
-            try:
-                model_id = int(png.stem)
-                if model_id in model_ids:
-                    cached += 1
-            except ValueError:
-                pass
-    
-    return jsonify({
-        'total': total,
-        'cached': cached,
-        'missing': total - cached,
-        'percent': round((cached / total * 100) if total > 0 else 0, 1)
-    })
-
-
-# Global render status tracking
-_render_status = {
-    'active': False,
-    'total': 0,
-    'completed': 0,
-    'errors': 0,
-    'current_model': None,
-    'started_at': None,
-    'last_update': None
-}
+        return jsonify(cached_stats(conn, 'models:thumbnails', ('models',), get_thumbnail_coverage))
 
 
 @models_bp.route('/models/render-thumbnails/status')
 def api_render_thumbnails_status():
     """Get current thumbnail rendering status."""
-    return jsonify(_render_status)
+    from fantasyfolio.core.bulk_render import get_render_engine
+    return jsonify(get_render_engine().status())
+
+
+@models_bp.route('/models/render-thumbnails/stream')
+def api_render_thumbnails_stream():
+    """Stream rendering progress as server-sent events until the job finishes."""
+    import json
+    import time
+    from flask import Response, stream_with_context
+    from fantasyfolio.core.bulk_render import get_render_engine
+    
+    engine = get_render_engine()
+    
+    def events():
+        last = None
+        while True:
+            status = engine.status()
+            if status != last:
+                yield f"data: {json.dumps(status)}\n\n"
+                last = status
+            if not status['active']:
+                break
+            time.sleep(1)
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@models_bp.route('/models/render-thumbnails/cancel', methods=['POST'])
+def api_render_thumbnails_cancel():
+    """Cancel the running bulk render (groups already started still finish)."""
+    from fantasyfolio.core.bulk_render import get_render_engine
+    
+    if not get_render_engine().cancel():
+        return jsonify({'error': 'No render in progress'}), 409
+    return jsonify({'message': 'Cancelling thumbnail render'})
 
 
 @models_bp.route('/models/render-thumbnails', methods=['POST'])
 def api_render_thumbnails():
     """Queue all missing 3D model thumbnails for rendering."""
-    import threading
-    from fantasyfolio.indexer.thumbnails import render_3d_thumbnail
-    from datetime import datetime
-    global _render_status
+    from fantasyfolio.core.bulk_render import get_render_engine
+    from fantasyfolio.core.thumbnails import THUMB_3D_FORMATS
     
-    config = get_config()
-    thumbnail_dir = Path(config.THUMBNAIL_DIR) / "3d"
-    thumbnail_dir.mkdir(parents=True, exist_ok=True)
+    engine = get_render_engine()
+    if engine.is_running():
+        return jsonify({'error': 'Thumbnail render already in progress', 'status': engine.status()}), 409
     
+    # Missing thumbnails come from the indexed thumb_storage column
+    # (backfilled by migration 013, kept accurate by /thumbnails/reconcile),
+    # not a per-model file probe
+    placeholders = ','.join('?' * len(THUMB_3D_FORMATS))
     with get_connection() as conn:
-        models = conn.execute("SELECT id, format, file_path, archive_path, archive_member FROM models ORDER BY id").fetchall()
-    
-    # Separate cached vs missing
-    models_to_render = []
-    cached_count = 0
-    
-    for model in models:
-        cached_thumb = thumbnail_dir / f"{model['id']}.png"
-        if cached_thumb.exists():
-            cached_count += 1
-        else:
-            models_to_render.append(model)
-    
-    # Initialize render status
-    _render_status['active'] = True
-    _render_status['total'] = len(models_to_render)
-    _render_status['completed'] = 0
-    _render_status['errors'] = 0
-    _render_status['current_model'] = None
-    _render_status['started_at'] = datetime.now().isoformat()
-    _render_status['last_update'] = datetime.now().isoformat()
-    
-    # Start background rendering
-    def render_batch():
-        global _render_status
-        
-        for i, model in enumerate(models_to_render):
-            _render_status['current_model'] = model['id']
-            _render_status['last_update'] = datetime.now().isoformat()
-            
-            try:
-                model_format = (model['format'] or 'stl').lower()
-                if model_format not in ('stl', 'obj', '3mf', 'glb', 'gltf', 'dae', '3ds', 'ply', 'x3d'):
-                    _render_status['completed'] += 1
-                    continue
-                
-                # Get model data
-                model_data = None
-                try:
-                    if model['archive_path'] and model['archive_member']:
-                        if os.path.exists(model['archive_path']):
-                            with zipfile.ZipFile(model['archive_path'], 'r') as zf:
-                                model_data = zf.read(model['archive_member'])
-                    elif model['file_path'] and os.path.exists(model['file_path']):
-                        with open(model['file_path'], 'rb') as f:
-                            model_data = f.read()
-                except Exception as read_err:
-                    logger.debug(f"Could not read model {model['id']}: {read_err}")
-                    _render_status['errors'] += 1
-                    _render_status['completed'] += 1
-                    continue
-                
-                if not model_data:
-                    _render_status['errors'] += 1
-                    _render_status['completed'] += 1
-                    continue
-                
-                # Render thumbnail using new system (updates all columns)
-                from fantasyfolio.core.thumbnails import render_thumbnail
-                
-                # Write to temp file for rendering
-                with tempfile.NamedTemporaryFile(suffix=f".{model_format}", delete=False) as tmp:
-                    tmp.write(model_data)
-                    tmp_path = tmp.name
-                
-                # Prepare model dict with temp path
-                model_dict = dict(model)
-                model_dict['file_path'] = tmp_path
-                model_dict['archive_path'] = None  # Using temp file, not archive
-                
-                # Get volume info if available
-                volume = None
-                if model_dict.get('volume_id'):
-                    with get_connection() as vol_conn:
-                        vol_row = vol_conn.execute("SELECT * FROM volumes WHERE id = ?", (model_dict['volume_id'],)).fetchone()
-                        if vol_row:
-                            volume = dict(vol_row)
-                
-                # Render with full metadata tracking
-                central_dir = Path(config.DATA_DIR) / 'thumbnails'
-                result = render_thumbnail(model_dict, volume, central_dir, force=True)
-                os.unlink(tmp_path)
-                
-                if not result:
-                    _render_status['errors'] += 1
-                    _render_status['completed'] += 1
-                    continue
-                
-                # Update all thumbnail columns
-                with get_connection() as conn:
-                    conn.execute("""
-                        UPDATE models SET
-                            has_thumbnail = 1,
-                            thumb_storage = ?,
-                            thumb_path = ?,
-                            thumb_rendered_at = ?,
-                            thumb_source_mtime = ?
-                        WHERE id = ?
-                    """, (
-                        result['thumb_storage'],
-                        result['thumb_path'],
-                        result['thumb_rendered_at'],
-                        result['thumb_source_mtime'],
-                        model['id']
-                    ))
-                    conn.commit()
-                
-                _render_status['completed'] += 1
-                
-                if (i + 1) % 100 == 0:
-                    pct = round((_render_status['completed'] / _render_status['total']) * 100, 1)
-                    logger.info(f"Thumbnail render: {_render_status['completed']}/{_render_status['total']} ({pct}%) - {_render_status['errors']} errors")
-                    
-            except Exception as e:
-                logger.debug(f"Thumbnail render error for model {model['id']}: {e}")
-                _render_status['errors'] += 1
-                _render_status['completed'] += 1
-        
-        # Mark as complete
-        _render_status['active'] = False
-        _render_status['current_model'] = None
-        _render_status['last_update'] = datetime.now().isoformat()
-        logger.info(f"Background render complete: {_render_status['completed']} processed, {_render_status['errors']} errors")
+        total_models = conn.execute("SELECT COUNT(*) FROM models").fetchone()[0]
+        cached_count = conn.execute(
+            "SELECT COUNT(*) FROM models WHERE thumb_storage IS NOT NULL"
+        ).fetchone()[0]
+        models_to_render = [dict(row) for row in conn.execute(f"""
+            SELECT m.id, m.format, m.file_path, m.archive_path, m.archive_member,
+                   m.partial_hash, m.volume_id, v.mount_path, v.is_readonly
+            FROM models m
+            LEFT JOIN volumes v ON m.volume_id = v.id
+            WHERE m.thumb_storage IS NULL AND m.format IN ({placeholders})
+            ORDER BY m.id
+        """, THUMB_3D_FORMATS)]
     
-    # Start in background thread
-    thread = threading.Thread(target=render_batch, daemon=True)
-    thread.start()
+    engine.start(models_to_render)
     
     return jsonify({
         'message': f'Rendering {len(models_to_render)} thumbnails in background',
         'models_queued': len(models_to_render),
         'already_cached': cached_count,
-        'total_models': len(models)
+        'total_models': total_models,
+        'workers': engine.workers
     }), 200
 
 
@@ -837,8 +651,17 @@ def api_purge_missing_models():
         if count == 0:
             return jsonify({'purged': 0, 'message': 'No matching assets to purge'})
         
+        # Folder counts to take off the tree (one entry per affected folder)
+        tree_groups = conn.execute(f"""
+            SELECT volume_id, folder_path, COUNT(*) as count FROM models
+            WHERE {where_clause} AND deleted_at IS NULL AND format != 'unsupported'
+            GROUP BY volume_id, folder_path
+        """, params).fetchall()
+        
         # Delete
         conn.execute(f"DELETE FROM models WHERE {where_clause}", params)
+        for group in tree_groups:
+            adjust_folder_counts(conn, 'model', group['volume_id'], group['folder_path'], -group['count'])
         conn.commit()
         
         return jsonify({'purged': count})
@@ -848,40 +671,44 @@ def api_purge_missing_models():
 def api_index_stats():
     """Get indexing statistics."""
     with get_connection() as conn:
-        stats = {}
-        
-        # Total counts
-        stats['total'] = conn.execute("SELECT COUNT(*) FROM models").fetchone()[0]
-        
-        # By status
-        rows = conn.execute("""
-            SELECT index_status, COUNT(*) as count 
-            FROM models 
-            GROUP BY index_status
-        """).fetchall()
-        stats['by_status'] = {row['index_status'] or 'null': row['count'] for row in rows}
-        
-        # Hash coverage
-        stats['with_hash'] = conn.execute(
-            "SELECT COUNT(*) FROM models WHERE partial_hash IS NOT NULL"
-        ).fetchone()[0]
-        
-        # Thumbnail stats
-        stats['with_thumbnail'] = conn.execute(
-            "SELECT COUNT(*) FROM models WHERE thumb_storage IS NOT NULL"
-        ).fetchone()[0]
-        
-        # Missing count
-        stats['missing_count'] = conn.execute(
-            "SELECT COUNT(*) FROM models WHERE index_status = 'missing'"
-        ).fetchone()[0]
-        
-        # Offline count
-        stats['offline_count'] = conn.execute(
-            "SELECT COUNT(*) FROM models WHERE index_status = 'offline'"
-        ).fetchone()[0]
-        
-        return jsonify(stats)
+        return jsonify(cached_stats(conn, 'models:index', ('models',), _compute_index_stats))
+
+
+def _compute_index_stats(conn) -> dict:
+    stats = {}
+    
+    # Total counts
+    stats['total'] = conn.execute("SELECT COUNT(*) FROM models").fetchone()[0]
+    
+    # By status
+    rows = conn.execute("""
+        SELECT index_status, COUNT(*) as count 
+        FROM models 
+        GROUP BY index_status
+    """).fetchall()
+    stats['by_status'] = {row['index_status'] or 'null': row['count'] for row in rows}
+    
+    # Hash coverage
+    stats['with_hash'] = conn.execute(
+        "SELECT COUNT(*) FROM models WHERE partial_hash IS NOT NULL"
+    ).fetchone()[0]
+    
+    # Thumbnail stats
+    stats['with_thumbnail'] = conn.execute(
+        "SELECT COUNT(*) FROM models WHERE thumb_storage IS NOT NULL"
+    ).fetchone()[0]
+    
+    # Missing count
+    stats['missing_count'] = conn.execute(
+        "SELECT COUNT(*) FROM models WHERE index_status = 'missing'"
+    ).fetchone()[0]
+    
+    # Offline count
+    stats['offline_count'] = conn.execute(
+        "SELECT COUNT(*) FROM models WHERE index_status = 'offline'"
+    ).fetchone()[0]
+    
+    return stats
 
 
 @models_bp.route('/volumes')
@@ -903,8 +730,7 @@ def api_list_volumes():
 @models_bp.route('/volumes/<volume_id>/check', methods=['POST'])
 def api_check_volume(volume_id):
     """Check if a volume is online and update status."""
-    from pathlib import Path
-    from datetime import datetime
+    from fantasyfolio.services.volume_monitor import probe_volume, record_volume_status
     
     with get_connection() as conn:
         volume = conn.execute(
@@ -916,45 +742,14 @@ def api_check_volume(volume_id):
             return jsonify({'error': 'Volume not found'}), 404
         
         volume = dict(volume)
-        mount_path = Path(volume['mount_path'])
-        
-        was_online = volume['status'] == 'online'
-        is_online = mount_path.exists() and mount_path.is_dir()
-        
-        # Update status
-        new_status = 'online' if is_online else 'offline'
-        conn.execute("""
-            UPDATE volumes SET 
-                status = ?,
-                last_seen_at = CASE WHEN ? THEN ? ELSE last_seen_at END
-            WHERE id = ?
-        """, (
-            new_status,
-            is_online,
-            datetime.now().isoformat(),
-            volume_id
-        ))
-        
-        # If status changed, update assets
-        if was_online and not is_online:
-            # Volume went offline
-            affected = conn.execute("""
-                UPDATE models SET index_status = 'offline'
-                WHERE volume_id = ? AND index_status = 'indexed'
-            """, (volume_id,)).rowcount
-        elif not was_online and is_online:
-            # Volume came online - queue verification
-            affected = conn.execute("""
-                SELECT COUNT(*) FROM models 
-                WHERE volume_id = ? AND index_status IN ('offline', 'missing')
-            """, (volume_id,)).fetchone()[0]
-        else:
-            affected = 0
         
+        # Probe with a timeout so a hung mount can't block the worker
+        is_online = probe_volume(volume['mount_path'])['available']
+        was_online, affected = record_volume_status(conn, volume_id, is_online)
         conn.commit()
         
         return jsonify({
-            'status': new_status,
+            'status': 'online' if is_online else 'offline',
             'was_online': was_online,
             'is_online': is_online,
             'assets_affected': affected
@@ -993,6 +788,7 @@ def api_index_directory():
         path: Required - directory path to scan
         recursive: bool - include subdirectories (default true)
         force: bool - force re-index (default false)
+        deep: bool - list every directory, even unchanged ones (default false)
         duplicate_policy: str - 'reject', 'warn', or 'merge' (default 'merge')
             - reject: Skip duplicate files (same content, different path)
             - warn: Create records but flag as duplicates
@@ -1007,6 +803,7 @@ def api_index_directory():
     path = data.get('path')
     recursive = data.get('recursive', True)
     force = data.get('force', False)
+    deep = data.get('deep', False)
     duplicate_policy = data.get('duplicate_policy', 'merge')
     
     if not path:
@@ -1041,7 +838,7 @@ def api_index_directory():
             
             logger.info(f"Using PDF indexer for {scan_path} (root: {root_path})")
             indexer = PDFIndexer(root_path=root_path, scan_path=str(scan_path))
-            result = indexer.run(extract_text=True, generate_thumbnails=False)
+            result = indexer.run(extract_text=True, generate_thumbnails=False, deep=deep)
             return jsonify({
                 'new': result.get('indexed', 0),
                 'update': result.get('updated', 0),
@@ -1057,16 +854,11 @@ def api_index_directory():
     
     # 3D content - Try new efficient scanner first (v0.4.9+ with volumes table)
     try:
-        from fantasyfolio.core.scanner import scan_directory, ScanAction
+        from fantasyfolio.core.scanner import scan_directory, apply_scan_result
         
         with get_connection() as conn:
             # Auto-detect volume
-            volume = conn.execute("""
-                SELECT * FROM volumes 
-                WHERE ? LIKE mount_path || '%'
-                ORDER BY length(mount_path) DESC
-                LIMIT 1
-            """, (str(scan_path),)).fetchone()
+            volume = lookup_volume(conn, str(scan_path))
             
             if not volume:
                 raise Exception('No volume found - falling back to legacy indexer')
@@ -1078,30 +870,15 @@ def api_index_directory():
                 'moved': 0, 'missing': 0, 'error': 0, 'duplicate': 0
             }
             
-            for result in scan_directory(conn, scan_path, volume, force=force, recursive=recursive, duplicate_policy=duplicate_policy):
+            for result in scan_directory(conn, scan_path, volume, force=force, recursive=recursive,
+                                         duplicate_policy=duplicate_policy, deep=deep):
                 stats[result.action.value] += 1
                 
                 # Apply changes (skip DUPLICATE action if policy is 'reject')
-                if result.action in (ScanAction.NEW, ScanAction.UPDATE, ScanAction.MOVED):
-                    model = result.model
-                    
-                    if result.action == ScanAction.NEW:
-                        columns = ', '.join(model.keys())
-                        placeholders = ', '.join(['?' for _ in model])
-                        conn.execute(
-                            f"INSERT INTO models ({columns}) VALUES ({placeholders})",
-                            list(model.values())
-                        )
-                    else:
-                        model_id = model.pop('id', None)
-                        if model_id:
-                            sets = ', '.join([f"{k} = ?" for k in model.keys()])
-                            conn.execute(
-                                f"UPDATE models SET {sets} WHERE id = ?",
-                                list(model.values()) + [model_id]
-                            )
+                apply_scan_result(conn, result)
             
             conn.commit()
+            refresh_folder_nodes(conn, 'model', volume['id'])
             
             stats['total'] = sum(stats.values())
             stats['volume_id'] = volume['id']
@@ -1250,6 +1027,31 @@ def api_render_pending_thumbnails():
     return jsonify(stats)
 
 
+@models_bp.route('/thumbnails/reconcile', methods=['POST'])
+def api_reconcile_thumbnails():
+    """
+    Sync thumb_storage/has_thumbnail with the thumbnails on disk.
+    
+    POST body:
+        limit: int - Max models to check (default all)
+        after_id: int - Resume after this model id (from a previous last_id)
+    """
+    from pathlib import Path
+    from fantasyfolio.core.thumbnails import reconcile_thumbnails
+    
+    data = request.get_json(silent=True) or {}
+    limit = data.get('limit')
+    after_id = data.get('after_id', 0)
+    
+    config = get_config()
+    central_dir = Path(config.DATA_DIR) / 'thumbnails'
+    
+    with get_connection() as conn:
+        stats = reconcile_thumbnails(conn, central_dir, after_id=after_id, limit=limit)
+    
+    return jsonify(stats)
+
+
 @models_bp.route('/thumbnails/migrate', methods=['POST'])
 def api_migrate_thumbnails():
     """
@@ -1276,17 +1078,12 @@ def api_migrate_thumbnails():
 def api_index_directory_internal(path: str, force: bool = False):
     """Internal helper for indexing."""
     from pathlib import Path
-    from fantasyfolio.core.scanner import scan_directory, ScanAction
+    from fantasyfolio.core.scanner import scan_directory, apply_scan_result
     
     scan_path = Path(path).resolve()
     
     with get_connection() as conn:
-        volume = conn.execute("""
-            SELECT * FROM volumes 
-            WHERE ? LIKE mount_path || '%'
-            ORDER BY length(mount_path) DESC
-            LIMIT 1
-        """, (str(scan_path),)).fetchone()
+        volume = lookup_volume(conn, str(scan_path))
         
         if not volume:
             return jsonify({'error': 'No volume found'}), 400
@@ -1301,26 +1098,10 @@ def api_index_directory_internal(path: str, force: bool = False):
         for result in scan_directory(conn, scan_path, volume, force=force, recursive=True):
             stats[result.action.value] += 1
             
-            if result.action in (ScanAction.NEW, ScanAction.UPDATE, ScanAction.MOVED):
-                model = result.model
-                
-                if result.action == ScanAction.NEW:
-                    columns = ', '.join(model.keys())
-                    placeholders = ', '.join(['?' for _ in model])
-                    conn.execute(
-                        f"INSERT INTO models ({columns}) VALUES ({placeholders})",
-                        list(model.values())
-                    )
-                else:
-                    model_id = model.pop('id', None)
-                    if model_id:
-                        sets = ', '.join([f"{k} = ?" for k in model.keys()])
-                        conn.execute(
-                            f"UPDATE models SET {sets} WHERE id = ?",
-                            list(model.values()) + [model_id]
-                        )
+            apply_scan_result(conn, result)
         
         conn.commit()
+        refresh_folder_nodes(conn, 'model', volume['id'])
         
         stats['total'] = sum(stats.values())
         return jsonify(stats)
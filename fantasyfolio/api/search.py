@@ -7,32 +7,29 @@ Handles full-text search across assets and 3D models.
 import logging
 from flask import Blueprint, jsonify, request
 
-from fantasyfolio.core.database import get_connection, search_assets, search_models
+from fantasyfolio.core.database import get_connection, folder_prefix_filter
+from fantasyfolio.core.pagination import fetch_page, CursorError
+from fantasyfolio.core.search_engine import fts_query, unified_search, split_results
+from fantasyfolio.core.search_cache import cache_key, cached_search, search_cache_stats
 
 logger = logging.getLogger(__name__)
 search_bp = Blueprint('search', __name__)
 
 
-def fts_query(query: str) -> str:
-    """Convert search query to FTS5 format with prefix matching.
-    
-    Adds wildcard (*) to each term for prefix matching.
-    E.g., 'robo drag' becomes 'robo* drag*'
-    """
-    terms = query.strip().split()
-    return ' '.join(f'{term}*' for term in terms if term)
-
-
 @search_bp.route('/search')
 def api_search():
     """
-    Unified search across all asset types.
+    Unified search across all asset types, in one relevance order.
     
     Query params:
     - q: Search query
     - type: Asset type filter (pdf, 3d, all)
     - limit: Max results (default 50)
-    - offset: Pagination offset
+    - offset: Pagination offset across all types
+    - cursor: next_cursor from the previous page
+    
+    'results' holds the merged list; 'assets' and 'models' are the same
+    page split by type.
     """
     query = request.args.get('q', '').strip()
     asset_type = request.args.get('type', 'all')
@@ -42,22 +39,30 @@ def api_search():
     if not query:
         return jsonify({'error': 'Search query required'}), 400
     
-    results = {
-        'query': query,
-        'assets': [],
-        'models': [],
-        'total': 0
-    }
-    
-    if asset_type in ('pdf', 'all'):
-        results['assets'] = search_assets(query, limit=limit, offset=offset)
+    types = {'pdf': ('pdf',), '3d': ('model',)}.get(asset_type, ('pdf', 'model'))
     
-    if asset_type in ('3d', 'all'):
-        results['models'] = search_models(query, limit=limit)
+    cursor = request.args.get('cursor')
+    key = cache_key('search', query, types=types, limit=limit, offset=offset, cursor=cursor)
     
-    results['total'] = len(results['assets']) + len(results['models'])
+    try:
+        with get_connection() as conn:
+            found = cached_search(conn, key, lambda c: unified_search(
+                c, query, types=types, limit=limit, offset=offset,
+                cursor=cursor, include_pages=False
+            ))
+    except CursorError as e:
+        return jsonify({'error': str(e)}), 400
     
-    return jsonify(results)
+    split = split_results(found['results'])
+    return jsonify({
+        'query': query,
+        'results': found['results'],
+        'assets': split['assets'],
+        'models': split['models'],
+        'total': len(found['results']),
+        'offset': found['offset'],
+        'next_cursor': found['next_cursor']
+    })
 
 
 @search_bp.route('/search/assets')
@@ -69,6 +74,7 @@ def api_search_assets():
     game_system = request.args.get('game_system')
     limit = int(request.args.get('limit', 50))
     offset = int(request.args.get('offset', 0))
+    cursor = request.args.get('cursor')
     
     assets = []
     with get_connection() as conn:
@@ -82,30 +88,36 @@ def api_search_assets():
             """
             params = [fts_query(query)]
         else:
-            sql = "SELECT * FROM assets WHERE 1=1"
+            sql = "SELECT a.* FROM assets a WHERE 1=1"
             params = []
         
         if folder:
-            sql += " AND folder_path LIKE ?"
-            params.append(folder + '%')
+            folder_sql, folder_params = folder_prefix_filter('a.folder_path', folder)
+            sql += f" AND {folder_sql}"
+            params.extend(folder_params)
         if publisher:
-            sql += " AND publisher = ?"
+            sql += " AND a.publisher = ?"
             params.append(publisher)
         if game_system:
-            sql += " AND game_system = ?"
+            sql += " AND a.game_system = ?"
             params.append(game_system)
         
-        sql += " ORDER BY filename LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
-        
-        rows = conn.execute(sql, params).fetchall()
-        assets = [dict(row) for row in rows]
+        key = cache_key('search/assets', query, folder=folder, publisher=publisher,
+                        game_system=game_system, limit=limit, offset=offset, cursor=cursor)
+        try:
+            assets, next_cursor = cached_search(conn, key, lambda c: fetch_page(
+                c, sql, params, [('a.filename', 'filename'), ('a.id', 'id')],
+                limit=limit, cursor=cursor, offset=offset
+            ))
+        except CursorError as e:
+            return jsonify({'error': str(e)}), 400
     
     # Return structured response to match template expectations
     return jsonify({
         'assets': assets,
         'pages': [],
-        'query': query
+        'query': query,
+        'next_cursor': next_cursor
     })
 
 
@@ -118,6 +130,7 @@ def api_search_models():
     creator = request.args.get('creator')
     format_filter = request.args.get('format')
     limit = int(request.args.get('limit', 50))
+    cursor = request.args.get('cursor')
     
     models = []
     with get_connection() as conn:
@@ -129,32 +142,39 @@ def api_search_models():
             """
             params = [fts_query(query)]
         else:
-            sql = "SELECT * FROM models WHERE 1=1"
+            sql = "SELECT m.* FROM models m WHERE 1=1"
             params = []
         
         if folder:
-            sql += " AND folder_path LIKE ?"
-            params.append(folder + '%')
+            folder_sql, folder_params = folder_prefix_filter('m.folder_path', folder)
+            sql += f" AND {folder_sql}"
+            params.extend(folder_params)
         if collection:
-            sql += " AND collection = ?"
+            sql += " AND m.collection = ?"
             params.append(collection)
         if creator:
-            sql += " AND creator = ?"
+            sql += " AND m.creator = ?"
             params.append(creator)
         if format_filter:
-            sql += " AND format = ?"
+            sql += " AND m.format = ?"
             params.append(format_filter)
         
-        sql += " ORDER BY collection, filename LIMIT ?"
-        params.append(limit)
-        
-        rows = conn.execute(sql, params).fetchall()
-        models = [dict(row) for row in rows]
+        key = cache_key('search/models', query, folder=folder, collection=collection,
+                        creator=creator, format=format_filter, limit=limit, cursor=cursor)
+        try:
+            models, next_cursor = cached_search(conn, key, lambda c: fetch_page(
+                c, sql, params,
+                [('m.collection', 'collection'), ('m.filename', 'filename'), ('m.id', 'id')],
+                limit=limit, cursor=cursor
+            ))
+        except CursorError as e:
+            return jsonify({'error': str(e)}), 400
     
     # Return structured response to match template expectations
     return jsonify({
         'models': models,
-        'query': query
+        'query': query,
+        'next_cursor': next_cursor
     })
 
 
@@ -167,6 +187,7 @@ def api_search_pages():
     query = request.args.get('q', '').strip()
     asset_id = request.args.get('asset_id')
     limit = int(request.args.get('limit', 50))
+    cursor = request.args.get('cursor')
     
     if not query:
         return jsonify({'error': 'Search query required'}), 400
@@ -179,7 +200,8 @@ def api_search_pages():
                 p.page_num,
                 a.filename,
                 a.title,
-                snippet(pages_fts, 0, '<mark>', '</mark>', '...', 32) as snippet
+                snippet(pages_fts, 0, '<mark>', '</mark>', '...', 32) as snippet,
+                pages_fts.rank as rank
             FROM asset_pages p
             JOIN pages_fts ON p.id = pages_fts.rowid
             JOIN assets a ON p.asset_id = a.id
@@ -191,74 +213,62 @@ def api_search_pages():
             sql += " AND p.asset_id = ?"
             params.append(asset_id)
         
-        sql += " ORDER BY rank LIMIT ?"
-        params.append(limit)
+        key = cache_key('search/pages', query, asset_id=asset_id, limit=limit, cursor=cursor)
+        try:
+            pages, next_cursor = cached_search(conn, key, lambda c: fetch_page(
+                c, sql, params, [('pages_fts.rank', 'rank'), ('p.id', 'id')],
+                limit=limit, cursor=cursor
+            ))
+        except CursorError as e:
+            return jsonify({'error': str(e)}), 400
         
-        rows = conn.execute(sql, params).fetchall()
-        return jsonify([dict(row) for row in rows])
+        response = jsonify(pages)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
 
 
 @search_bp.route('/search/all')
 def api_search_all():
     """
-    Search across both PDFs and 3D models.
-    Returns combined results grouped by type.
+    Search across PDFs, PDF pages and 3D models.
+    
+    Returns one relevance-ordered list ('results'; each PDF carries its
+    best-matching pages), plus the same page split by type ('assets',
+    'pages', 'models').
+    
+    Query params:
+    - q: Search query
+    - limit: Results per page (default 25)
+    - offset / cursor: Pagination across all types
+    - folder, publisher, system: Filters
     """
     query = request.args.get('q', '').strip()
     limit = int(request.args.get('limit', 25))
+    offset = int(request.args.get('offset', 0))
     
     if not query:
         return jsonify({'error': 'Search query required'}), 400
     
-    results = {
-        'query': query,
-        'assets': [],
-        'models': [],
-        'pages': []
+    cursor = request.args.get('cursor')
+    filters = {
+        'folder': request.args.get('folder'),
+        'publisher': request.args.get('publisher'),
+        'game_system': request.args.get('system')
     }
+    key = cache_key('search/all', query, limit=limit, offset=offset, cursor=cursor, **filters)
     
-    fts_q = fts_query(query)
+    try:
+        with get_connection() as conn:
+            found = cached_search(conn, key, lambda c: unified_search(
+                c, query, limit=limit, offset=offset, cursor=cursor, **filters
+            ))
+    except CursorError as e:
+        return jsonify({'error': str(e)}), 400
     
-    with get_connection() as conn:
-        # Search PDF assets
-        try:
-            asset_rows = conn.execute("""
-                SELECT a.*, snippet(assets_fts, 0, '<mark>', '</mark>', '...', 32) as snippet
-                FROM assets a
-                JOIN assets_fts ON a.id = assets_fts.rowid
-                WHERE assets_fts MATCH ?
-                LIMIT ?
-            """, (fts_q, limit)).fetchall()
-            results['assets'] = [dict(row) for row in asset_rows]
-        except Exception:
-            pass
-        
-        # Search 3D models
-        try:
-            model_rows = conn.execute("""
-                SELECT m.* FROM models m
-                JOIN models_fts ON m.id = models_fts.rowid
-                WHERE models_fts MATCH ?
-                LIMIT ?
-            """, (fts_q, limit)).fetchall()
-            results['models'] = [dict(row) for row in model_rows]
-        except Exception:
-            pass
-        
-        # Search page content
-        try:
-            page_rows = conn.execute("""
-                SELECT p.asset_id, p.page_num, a.filename, a.title,
-                       snippet(pages_fts, 0, '<mark>', '</mark>', '...', 32) as snippet
-                FROM asset_pages p
-                JOIN pages_fts ON p.id = pages_fts.rowid
-                JOIN assets a ON p.asset_id = a.id
-                WHERE pages_fts MATCH ?
-                LIMIT ?
-            """, (fts_q, limit)).fetchall()
-            results['pages'] = [dict(row) for row in page_rows]
-        except Exception:
-            pass
+    results = {'query': query, 'results': found['results']}
+    results.update(split_results(found['results']))
+    results['next_cursor'] = found['next_cursor']
     
     return jsonify(results)
 
@@ -309,29 +319,37 @@ def api_search_advanced():
     limit = int(data.get('limit', 50))
     
     results = {'assets': [], 'pages': [], 'models': []}
-    fts_terms = fts_query(terms) if terms else ''
     
     # Determine if searching 3D models or PDFs
     # Use content_type from UI if provided, otherwise infer from format
     is_3d_search = (content_type == '3d') or (format_filter in ('stl', 'obj', '3mf', 'glb', 'gltf', 'dae', '3ds', 'ply', 'x3d'))
     
     with get_connection() as conn:
-        if is_3d_search:
-            # Search 3D models
-            if terms:
-                sql = """
-                    SELECT m.* FROM models m
-                    JOIN models_fts ON m.id = models_fts.rowid
-                    WHERE models_fts MATCH ?
-                """
-                params = [fts_terms]
-            else:
-                sql = "SELECT * FROM models WHERE 1=1"
-                params = []
+        if terms:
+            # Ranked across titles/metadata and page content in one list
+            options = {
+                'types': ('model',) if is_3d_search else ('pdf',),
+                'limit': limit,
+                'include_metadata': bool(search_titles),
+                'include_pages': bool(search_content),
+                'folder': folder,
+                'publisher': publisher,
+                'game_system': game_system,
+                'format': format_filter
+            }
+            key = cache_key('search/advanced', terms, **options)
+            found = cached_search(conn, key, lambda c: unified_search(c, terms, **options))
+            results.update(split_results(found['results']))
+            results['results'] = found['results']
+        elif is_3d_search:
+            # Browse 3D models by filter
+            sql = "SELECT * FROM models WHERE 1=1"
+            params = []
             
             if folder:
-                sql += " AND folder_path LIKE ?"
-                params.append(folder + '%')
+                folder_sql, folder_params = folder_prefix_filter('folder_path', folder)
+                sql += f" AND {folder_sql}"
+                params.extend(folder_params)
             if format_filter:
                 sql += " AND format = ?"
                 params.append(format_filter)
@@ -344,65 +362,11 @@ def api_search_advanced():
                 results['models'] = [dict(row) for row in rows]
             except Exception as e:
                 logger.error(f"Advanced search models error: {e}")
-        else:
-            # Search PDFs (assets/pages)
-            if search_titles and terms:
-                sql = """
-                    SELECT a.*, snippet(assets_fts, 0, '<mark>', '</mark>', '...', 32) as snippet
-                    FROM assets a
-                    JOIN assets_fts ON a.id = assets_fts.rowid
-                    WHERE assets_fts MATCH ?
-                """
-                params = [fts_terms]
-                
-                if folder:
-                    sql += " AND a.folder_path LIKE ?"
-                    params.append(folder + '%')
-                if publisher:
-                    sql += " AND a.publisher = ?"
-                    params.append(publisher)
-                if game_system:
-                    sql += " AND a.game_system = ?"
-                    params.append(game_system)
-                
-                sql += " ORDER BY rank LIMIT ?"
-                params.append(limit)
-                
-                try:
-                    rows = conn.execute(sql, params).fetchall()
-                    results['assets'] = [dict(row) for row in rows]
-                except Exception as e:
-                    logger.error(f"Advanced search assets error: {e}")
-            
-            # Search page content
-            if search_content and terms:
-                sql = """
-                    SELECT p.asset_id, p.page_num, a.filename, a.title, a.folder_path,
-                           snippet(pages_fts, 0, '<mark>', '</mark>', '...', 32) as snippet
-                    FROM asset_pages p
-                    JOIN pages_fts ON p.id = pages_fts.rowid
-                    JOIN assets a ON p.asset_id = a.id
-                    WHERE pages_fts MATCH ?
-                """
-                params = [fts_terms]
-                
-                if folder:
-                    sql += " AND a.folder_path LIKE ?"
-                    params.append(folder + '%')
-                if publisher:
-                    sql += " AND a.publisher = ?"
-                    params.append(publisher)
-                if game_system:
-                    sql += " AND a.game_system = ?"
-                    params.append(game_system)
-                
-                sql += " ORDER BY rank LIMIT ?"
-                params.append(limit)
-                
-                try:
-                    rows = conn.execute(sql, params).fetchall()
-                    results['pages'] = [dict(row) for row in rows]
-                except Exception as e:
-                    logger.error(f"Advanced search pages error: {e}")
     
     return jsonify(results)
+
+
+@search_bp.route('/search/cache')
+def api_search_cache():
+    """Search result cache counters (hits, misses, stale, hit_rate)."""
+    return jsonify(search_cache_stats())
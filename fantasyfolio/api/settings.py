@@ -12,7 +12,7 @@ from datetime import datetime
 from pathlib import Path
 from flask import Blueprint, jsonify, request
 
-from fantasyfolio.core.database import get_setting, set_setting, get_all_settings, get_connection
+from fantasyfolio.core.database import get_setting, set_setting, get_all_settings, get_connection, reset_database_caches
 
 logger = logging.getLogger(__name__)
 settings_bp = Blueprint('settings', __name__)
@@ -121,11 +121,17 @@ def api_browse_directory():
 
 @settings_bp.route('/backup', methods=['POST'])
 def api_create_backup():
-    """Create a backup of the database."""
+    """
+    Start a backup of the database.
+    
+    The copy runs as a background job (online backup engine); poll
+    /api/backup/jobs/<job_id> for progress.
+    """
     from fantasyfolio.config import get_config
+    from fantasyfolio.services.db_backup import submit_backup
     
     config = get_config()
-    db_path = config.DATABASE_FILE
+    db_path = config.DATABASE_PATH
     backup_dir = config.DATA_DIR / 'backups'
     backup_dir.mkdir(exist_ok=True)
     
@@ -137,28 +143,50 @@ def api_create_backup():
     backup_name = f"dam_backup_{timestamp}.db"
     backup_path = backup_dir / backup_name
     
-    try:
-        shutil.copy2(db_path, backup_path)
-        
-        # Get backup size
-        size_mb = backup_path.stat().st_size / (1024 * 1024)
-        
+    def cleanup_old_backups(job):
         # Clean up old backups (keep last 5)
-        backups = sorted(backup_dir.glob("dam_backup_*.db"), reverse=True)
-        for old_backup in backups[5:]:
-            old_backup.unlink()
+        if job.status == 'completed':
+            backups = sorted(backup_dir.glob("dam_backup_*.db"), reverse=True)
+            for old_backup in backups[5:]:
+                old_backup.unlink()
+    
+    try:
+        job = submit_backup(backup_path, kind='backup', on_complete=cleanup_old_backups)
         
         return jsonify({
             'success': True,
+            'job_id': job.id,
             'backup_file': backup_name,
-            'size_mb': round(size_mb, 2),
-            'message': f'Backup created: {backup_name}'
-        })
+            'status': job.status,
+            'message': f'Backup started: {backup_name}'
+        }), 202
     except Exception as e:
         logger.error(f"Backup creation error: {e}")
         return jsonify({'error': str(e)}), 500
 
 
+@settings_bp.route('/backup/jobs', methods=['GET'])
+def api_list_backup_jobs():
+    """List recent backup jobs (running and finished)."""
+    from fantasyfolio.services.db_backup import list_backup_jobs
+    return jsonify({'jobs': list_backup_jobs()})
+
+
+@settings_bp.route('/backup/jobs/<job_id>', methods=['GET'])
+def api_backup_job_status(job_id):
+    """Get progress of a backup job."""
+    from fantasyfolio.services.db_backup import get_backup_job
+    
+    job = get_backup_job(job_id)
+    if not job:
+        return jsonify({'error': 'Backup job not found'}), 404
+    
+    status = job.to_dict()
+    if job.size_bytes is not None:
+        status['size_mb'] = round(job.size_bytes / (1024 * 1024), 2)
+    return jsonify(status)
+
+
 @settings_bp.route('/backups', methods=['GET'])
 def api_list_backups():
     """List available database backups."""
@@ -195,7 +223,7 @@ def api_restore_backup():
     
     backup_dir = config.DATA_DIR / 'backups'
     backup_path = backup_dir / backup_name
-    db_path = config.DATABASE_FILE
+    db_path = config.DATABASE_PATH
     
     if not backup_path.exists():
         return jsonify({'error': 'Backup not found'}), 404
@@ -207,12 +235,17 @@ def api_restore_backup():
     try:
         # Create a backup of current db before restoring
         if db_path.exists():
+            from fantasyfolio.services.db_backup import run_backup
+            
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             pre_restore = backup_dir / f"dam_pre_restore_{timestamp}.db"
-            shutil.copy2(db_path, pre_restore)
+            job = run_backup(pre_restore)
+            if job.status != 'completed':
+                return jsonify({'error': f'Pre-restore backup failed: {job.error}'}), 500
         
         # Restore the backup
         shutil.copy2(backup_path, db_path)
+        reset_database_caches()
         
         return jsonify({
             'success': True,
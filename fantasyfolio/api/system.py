@@ -45,6 +45,26 @@ def api_volume_status():
         }), 500
 
 
+@system_bp.route('/system/watcher-status')
+def api_watcher_status():
+    """
+    Get the status of the live filesystem watcher (FS_WATCH).
+    
+    Returns JSON:
+    {
+        "running": true,
+        "backend": "inotify",
+        "roots": [{"path": "...", "kind": "models", "mode": "inotify"}],
+        "pending": 0,
+        "events": 12,
+        "batches": 3,
+        ...
+    }
+    """
+    from fantasyfolio.services.fs_watcher import get_watcher_status
+    return jsonify(get_watcher_status())
+
+
 @system_bp.route('/system/volume-status/<volume_name>')
 def api_single_volume_status(volume_name: str):
     """
@@ -116,13 +136,13 @@ def api_system_state():
     
     Returns all relevant status information in one call.
     """
-    from fantasyfolio.services.volume_monitor import get_all_volume_status
-    from fantasyfolio.services.snapshot import get_latest_snapshot, list_snapshots
-    from fantasyfolio.services.change_journal import get_journal_stats
-    from fantasyfolio.services.backup_policy import get_policy_status
-    from fantasyfolio.core.database import get_stats, get_models_stats
-    
     try:
+        from fantasyfolio.services.volume_monitor import get_all_volume_status
+        from fantasyfolio.services.snapshot import list_snapshots
+        from fantasyfolio.services.change_journal import get_journal_stats
+        from fantasyfolio.services.backup_policy import get_policy_status
+        from fantasyfolio.core.database import get_stats, get_models_stats
+        
         # Volume status
         volumes = get_all_volume_status()
         
@@ -239,26 +259,38 @@ def api_trash_list():
     """
     Get contents of the Trash (soft-deleted items).
     
+    Query params:
+    - limit: Page size per type (default 200)
+    - assets_cursor / models_cursor: next_cursor values from the previous page
+    
     Returns JSON:
     {
         "assets": [...],
         "models": [...],
         "total_assets": 5,
-        "total_models": 2
+        "total_models": 2,
+        "next_cursor": {"assets": null, "models": "..."}
     }
     """
-    from fantasyfolio.core.database import get_deleted_assets, get_deleted_models
+    from flask import request
+    from fantasyfolio.core.database import get_deleted_page
+    from fantasyfolio.core.pagination import CursorError
+    
+    limit = request.args.get('limit', 200, type=int)
     
     try:
-        assets = get_deleted_assets(limit=200)
-        models = get_deleted_models(limit=200)
+        assets, assets_next = get_deleted_page('assets', limit=limit, cursor=request.args.get('assets_cursor'))
+        models, models_next = get_deleted_page('models', limit=limit, cursor=request.args.get('models_cursor'))
         
         return jsonify({
             'assets': assets,
             'models': models,
             'total_assets': len(assets),
-            'total_models': len(models)
+            'total_models': len(models),
+            'next_cursor': {'assets': assets_next, 'models': models_next}
         })
+    except CursorError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching trash: {e}", exc_info=True)
         return jsonify({'error': 'Failed to fetch trash', 'message': str(e)}), 500
@@ -543,6 +575,24 @@ def api_journal_cleanup():
         return jsonify({'error': 'Cleanup failed', 'message': str(e)}), 500
 
 
+@system_bp.route('/journal/compact', methods=['POST'])
+def api_journal_compact():
+    """Collapse repeated field updates in past (sealed) journal months."""
+    from fantasyfolio.services.change_journal import compact_journal
+    
+    try:
+        removed = compact_journal()
+        
+        return jsonify({
+            'success': True,
+            'compacted_months': removed,
+            'removed_count': sum(removed.values())
+        })
+    except Exception as e:
+        logger.error(f"Error compacting journal: {e}", exc_info=True)
+        return jsonify({'error': 'Compaction failed', 'message': str(e)}), 500
+
+
 @system_bp.route('/journal/entity/<entity_type>/<int:entity_id>')
 def api_journal_entity_history(entity_type: str, entity_id: int):
     """Get complete history for a specific entity."""
@@ -586,17 +636,20 @@ def api_snapshots_list():
 
 @system_bp.route('/snapshots', methods=['POST'])
 def api_snapshots_create():
-    """Create a new database snapshot."""
+    """Create a new database snapshot (body: note, background)."""
     from flask import request
     from fantasyfolio.services.snapshot import create_snapshot
     
     try:
         data = request.get_json() or {}
         note = data.get('note')
+        background = bool(data.get('background', False))
         
-        result = create_snapshot(note=note)
+        result = create_snapshot(note=note, background=background)
         
-        if result['status'] == 'completed':
+        if result['status'] == 'running':
+            return jsonify(result), 202
+        elif result['status'] == 'completed':
             return jsonify(result), 201
         else:
             return jsonify(result), 500
@@ -1285,8 +1338,7 @@ def api_restic_backup():
         tags: Optional list of tags
     """
     from flask import request
-    from fantasyfolio.services.restic_backup import run_backup
-    from fantasyfolio.services.snapshot import get_latest_snapshot
+    from fantasyfolio.services.restic_backup import backup_latest_snapshot, run_backup
     
     data = request.get_json() or {}
     repo_path = data.get('repo_path', '').strip()
@@ -1299,14 +1351,11 @@ def api_restic_backup():
     if not password:
         return jsonify({'error': 'Password is required'}), 400
     
-    # Default to latest snapshot if no source specified
-    if not source_path:
-        snapshot = get_latest_snapshot()
-        if not snapshot:
-            return jsonify({'error': 'No snapshots available. Create a snapshot first.'}), 400
-        source_path = snapshot['path']
-    
-    result = run_backup(repo_path, password, source_path, tags)
+    # Default to latest snapshot (as a plain database file) if no source specified
+    if source_path:
+        result = run_backup(repo_path, password, source_path, tags)
+    else:
+        result = backup_latest_snapshot(repo_path, password, tags)
     return jsonify(result), 200 if result.get('success') else 400
 
 
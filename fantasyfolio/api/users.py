@@ -12,6 +12,7 @@ from argon2 import PasswordHasher
 
 from fantasyfolio.api.auth import require_auth
 from fantasyfolio.core.database import get_db
+from fantasyfolio.services.auth_cache import invalidate_user
 
 logger = logging.getLogger(__name__)
 
@@ -169,6 +170,7 @@ def update_user(user_id):
             WHERE id = ?
         """, params)
         conn.commit()
+    invalidate_user(user_id)
     
     # Get updated user
     updated_user = db.fetchone("SELECT id, email, display_name, role, is_active FROM users WHERE id = ?", (user_id,))
@@ -201,6 +203,7 @@ def delete_user(user_id):
     with db.connection() as conn:
         conn.execute("UPDATE users SET is_active = 0 WHERE id = ?", (user_id,))
         conn.commit()
+    invalidate_user(user_id)
     
     logger.info(f"User deactivated: {target_user['email']} by {current_user['email']}")
     return jsonify({'success': True})
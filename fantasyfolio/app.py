@@ -50,6 +50,20 @@ def create_app(config: Config = None) -> Flask:
     # Register CLI commands
     register_cli_commands(app)
     
+    # Write change-journal entries buffered during the request in one batch
+    @app.teardown_request
+    def flush_change_journal(exc):
+        from fantasyfolio.services.change_journal import flush_journal
+        flush_journal()
+    
+    # Background volume health checks (request handlers read cached status)
+    # and the optional filesystem watcher
+    if not config.TESTING:
+        from fantasyfolio.services.volume_monitor import start_volume_monitor
+        start_volume_monitor()
+        from fantasyfolio.services.fs_watcher import start_fs_watcher
+        start_fs_watcher()
+    
     # Health check endpoint
     @app.route('/health')
     def health_check():
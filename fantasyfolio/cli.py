@@ -114,9 +114,16 @@ def stats(ctx):
 @click.option('--type', 'content_type', type=click.Choice(['models', 'assets', 'all']), default='all')
 @click.option('--limit', default=None, type=int, help='Max assets to process')
 @click.option('--batch-size', default=100, type=int, help='Batch size for commits')
+@click.option('--workers', default=None, type=int, help='Hashing threads (default: HASH_WORKERS)')
+@click.option('--after-id', default=0, type=int, help='Resume after this id (printed as "Last id")')
+@click.option('--throttle', default=0.0, type=float, help='Seconds to pause between batches (background rehash)')
 @click.pass_context
-def compute_hashes(ctx, content_type, limit, batch_size):
-    """Compute partial hashes for assets missing them."""
+def compute_hashes(ctx, content_type, limit, batch_size, workers, after_id, throttle):
+    """Compute partial hashes for assets missing them.
+    
+    Also rehashes rows hashed with an algorithm other than
+    PARTIAL_HASH_ALGORITHM, so it doubles as the migration after changing it.
+    """
     from fantasyfolio.core.hashing import batch_compute_hashes
     from fantasyfolio.core.database import init_db
     
@@ -137,19 +144,23 @@ def compute_hashes(ctx, content_type, limit, batch_size):
         tables.append('assets')
     
     for table in tables:
-        click.echo(f"\n🔐 Computing hashes for {table}...")
+        click.echo(f"\n🔐 Computing hashes for {table} ({config.PARTIAL_HASH_ALGORITHM})...")
         results = batch_compute_hashes(
             db_path=db_path,
             table=table,
             batch_size=batch_size,
             limit=limit,
-            callback=progress_callback
+            callback=progress_callback,
+            workers=workers,
+            after_id=after_id,
+            throttle=throttle
         )
         
         click.echo(f"\n  ✓ Processed: {results['processed']}")
         click.echo(f"  ○ Skipped: {results['skipped']}")
         click.echo(f"  ✗ Errors: {results['errors']}")
-        click.echo(f"  ⏱ Time: {results['elapsed_seconds']}s")
+        click.echo(f"  ⏱ Time: {results['elapsed_seconds']}s ({results['files_per_second']} files/s)")
+        click.echo(f"  Last id: {results['last_id']}")
         
         if results['error_details']:
             click.echo("  Errors:")
@@ -158,11 +169,13 @@ def compute_hashes(ctx, content_type, limit, batch_size):
         
         # Auto-trigger deduplication when hashing completes
         import sqlite3
+        from fantasyfolio.core.hashing import get_algorithm, hash_tag_sql
         conn = sqlite3.connect(db_path)
         remaining = conn.execute(f"""
             SELECT COUNT(*) FROM {table} 
-            WHERE partial_hash IS NULL AND volume_id IS NOT NULL
-        """).fetchone()[0]
+            WHERE (partial_hash IS NULL OR {hash_tag_sql('partial_hash_algo')} != ?)
+            AND volume_id IS NOT NULL
+        """, (get_algorithm().tag,)).fetchone()[0]
         conn.close()
         
         if remaining == 0:
@@ -172,7 +185,7 @@ def compute_hashes(ctx, content_type, limit, batch_size):
             dedup_results = process_duplicates(db_path=db_path, table=table)
             
             click.echo(f"\n📊 Deduplication Results:")
-            click.echo(f"  Collision pairs checked: {dedup_results['candidates_found']}")
+            click.echo(f"  Collision candidates checked: {dedup_results['candidates_found']}")
             click.echo(f"  True duplicates found: {dedup_results['duplicates_found']}")
             click.echo(f"  Full hashes computed: {dedup_results['full_hashes_computed']}")
             click.echo(f"  Time: {dedup_results['elapsed_seconds']:.1f}s")
@@ -190,12 +203,14 @@ def compute_hashes(ctx, content_type, limit, batch_size):
 @click.option('--force', is_flag=True, help='Force re-index (ignore cache)')
 @click.option('--no-recursive', is_flag=True, help='Do not recurse into subdirectories')
 @click.option('--volume-id', default=None, help='Volume ID (auto-detected if not provided)')
+@click.option('--deep', is_flag=True, help='List every directory, even ones unchanged since the last scan')
 @click.pass_context
-def scan_directory(ctx, path, force, no_recursive, volume_id):
+def scan_directory(ctx, path, force, no_recursive, volume_id, deep):
     """Scan a directory using the efficient indexer."""
     from pathlib import Path
     from fantasyfolio.core.database import get_connection, init_db
-    from fantasyfolio.core.scanner import scan_directory as do_scan, ScanAction
+    from fantasyfolio.core.scanner import scan_directory as do_scan, apply_scan_result, UNCHANGED_DIRECTORY
+    from fantasyfolio.core.path_index import lookup_volume
     
     logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
     
@@ -215,12 +230,7 @@ def scan_directory(ctx, path, force, no_recursive, volume_id):
             ).fetchone()
         else:
             # Auto-detect from path
-            volume = conn.execute("""
-                SELECT * FROM volumes 
-                WHERE ? LIKE mount_path || '%'
-                ORDER BY length(mount_path) DESC
-                LIMIT 1
-            """, (str(scan_path),)).fetchone()
+            volume = lookup_volume(conn, str(scan_path))
         
         if not volume:
             click.echo(f"Error: No volume found for path: {scan_path}")
@@ -230,40 +240,25 @@ def scan_directory(ctx, path, force, no_recursive, volume_id):
         volume = dict(volume)
         click.echo(f"Scanning: {scan_path}")
         click.echo(f"Volume: {volume['label']} ({volume['id']})")
-        click.echo(f"Mode: {'Forced' if force else 'Standard'}")
+        click.echo(f"Mode: {'Forced' if force else 'Deep' if deep else 'Standard'}")
         click.echo("")
         
         stats = {
             'new': 0, 'update': 0, 'skip': 0, 
-            'moved': 0, 'missing': 0, 'error': 0
+            'moved': 0, 'missing': 0, 'error': 0, 'duplicate': 0
         }
         
         count = 0
-        for result in do_scan(conn, scan_path, volume, force=force, recursive=not no_recursive):
+        unchanged_dirs = 0
+        for result in do_scan(conn, scan_path, volume, force=force, recursive=not no_recursive, deep=deep):
+            if result.reason == UNCHANGED_DIRECTORY:
+                unchanged_dirs += 1
+                continue
             stats[result.action.value] += 1
             count += 1
             
             # Apply changes for new/update/moved
-            if result.action in (ScanAction.NEW, ScanAction.UPDATE, ScanAction.MOVED):
-                model = result.model
-                
-                if result.action == ScanAction.NEW:
-                    # Insert new record
-                    columns = ', '.join(model.keys())
-                    placeholders = ', '.join(['?' for _ in model])
-                    conn.execute(
-                        f"INSERT INTO models ({columns}) VALUES ({placeholders})",
-                        list(model.values())
-                    )
-                else:
-                    # Update existing record
-                    model_id = model.pop('id', None)
-                    if model_id:
-                        sets = ', '.join([f"{k} = ?" for k in model.keys()])
-                        conn.execute(
-                            f"UPDATE models SET {sets} WHERE id = ?",
-                            list(model.values()) + [model_id]
-                        )
+            apply_scan_result(conn, result)
             
             # Progress update
             if count % 100 == 0:
@@ -272,6 +267,9 @@ def scan_directory(ctx, path, force, no_recursive, volume_id):
         
         conn.commit()
         
+        from fantasyfolio.core.folder_tree import refresh_folder_nodes
+        refresh_folder_nodes(conn, 'model', volume['id'])
+        
         click.echo("")
         click.echo("=" * 50)
         click.echo("SCAN COMPLETE")
@@ -283,6 +281,40 @@ def scan_directory(ctx, path, force, no_recursive, volume_id):
         click.echo(f"  Missing: {stats['missing']}")
         click.echo(f"  Errors:  {stats['error']}")
         click.echo(f"  Total:   {count}")
+        click.echo(f"  Unchanged directories skipped: {unchanged_dirs}")
+
+
+@cli.command()
+@click.option('--debounce', default=None, type=float, help='Seconds a path must be quiet before indexing')
+@click.option('--poll-interval', default=None, type=int, help='Polling interval for network mounts (seconds)')
+@click.pass_context
+def watch(ctx, debounce, poll_interval):
+    """Watch volumes and document locations and index changes as they happen."""
+    import threading
+    from fantasyfolio.core.database import init_db
+    from fantasyfolio.services.fs_watcher import FilesystemWatcher
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    
+    init_db()
+    watcher = FilesystemWatcher(debounce=debounce, poll_interval=poll_interval)
+    watcher.refresh_roots()
+    
+    status = watcher.status()
+    if not status['roots']:
+        click.echo("Nothing to watch: no online volumes or local document locations")
+        return
+    
+    click.echo(f"Watching {len(status['roots'])} root(s) with {status['backend']} (Ctrl+C to stop):")
+    for root in status['roots']:
+        click.echo(f"  {root['path']} ({root['kind']}, {root['mode']})")
+    
+    try:
+        watcher.run(threading.Event())
+    except KeyboardInterrupt:
+        click.echo("\nStopped")
+    finally:
+        watcher.close()
 
 
 @cli.command()
@@ -353,6 +385,42 @@ def migrate_thumbnails(ctx, limit):
     click.echo(f"  Failed:          {stats['failed']}")
 
 
+@cli.command()
+@click.option('--limit', default=None, type=int, help='Max models to check')
+@click.option('--after-id', default=0, type=int, help='Resume after this model id')
+@click.pass_context
+def reconcile_thumbnails(ctx, limit, after_id):
+    """Sync recorded thumbnail columns with the thumbnails on disk."""
+    from pathlib import Path
+    from fantasyfolio.core.database import get_connection, init_db
+    from fantasyfolio.core.thumbnails import reconcile_thumbnails as do_reconcile
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    
+    init_db()
+    config = ctx.obj['config']
+    central_dir = Path(config.DATA_DIR) / 'thumbnails'
+    
+    def progress(current, total, filename):
+        if current % 1000 == 0:
+            click.echo(f"  {current} checked")
+    
+    click.echo("Reconciling thumbnails...")
+    click.echo(f"Central cache: {central_dir}")
+    
+    with get_connection() as conn:
+        stats = do_reconcile(conn, central_dir, after_id=after_id, limit=limit, callback=progress)
+    
+    click.echo("")
+    click.echo("=" * 50)
+    click.echo(f"  Checked:   {stats['checked']}")
+    click.echo(f"  Recorded:  {stats['recorded']}")
+    click.echo(f"  Cleared:   {stats['cleared']}")
+    click.echo(f"  Unchanged: {stats['unchanged']}")
+    if not stats['done']:
+        click.echo(f"  Resume with --after-id {stats['last_id']}")
+
+
 @cli.command()
 @click.argument('volume_id', required=True)
 @click.option('--force', is_flag=True, help='Force re-index all assets')
@@ -383,7 +451,7 @@ def scan_volume(ctx, volume_id, force):
         click.echo(f"Path: {volume['mount_path']}")
         
     # Call scan_directory with the volume's mount path
-    ctx.invoke(scan_directory, path=volume['mount_path'], force=force, no_recursive=False, volume_id=volume_id)
+    ctx.invoke(scan_directory, path=volume['mount_path'], force=force, no_recursive=False, volume_id=volume_id, deep=False)
 
 
 @cli.command()
@@ -409,6 +477,12 @@ def clear(ctx, content_type, yes):
             click.echo("Cleared 3D models")
         
         conn.commit()
+        
+        from fantasyfolio.core.folder_tree import refresh_folder_nodes
+        if content_type in ('pdf', 'all'):
+            refresh_folder_nodes(conn, 'asset')
+        if content_type in ('3d', 'all'):
+            refresh_folder_nodes(conn, 'model')
 
 
 @cli.command()
@@ -446,11 +520,14 @@ def detect_duplicates(ctx, content_type):
         )
         
         click.echo(f"\n📊 Results for {table}:")
-        click.echo(f"  Partial hash collisions: {results['candidates_found']}")
-        click.echo(f"  Collisions verified: {results['candidates_verified']}")
+        click.echo(f"  Partial hash collisions: {results['groups_found']} groups, {results['candidates_found']} files")
+        click.echo(f"  Files verified: {results['candidates_verified']}")
         click.echo(f"  True duplicates found: {results['duplicates_found']}")
-        click.echo(f"  Full hashes computed: {results['full_hashes_computed']}")
+        click.echo(f"  Full hashes computed: {results['full_hashes_computed']} (reused: {results['full_hashes_reused']})")
         click.echo(f"  Database entries updated: {results['full_hashes_updated']}")
+        for volume_id, stats in results['throughput'].items():
+            click.echo(f"  Hash throughput ({volume_id}): {stats['mb_per_second']} MB/s per worker, "
+                       f"{stats['bytes'] / (1024*1024):.1f}MB in {stats['files']} files")
         click.echo(f"  Errors: {results['errors']}")
         click.echo(f"  Time elapsed: {results['elapsed_seconds']:.1f}s")
         
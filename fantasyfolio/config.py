@@ -52,6 +52,42 @@ class Config:
     # Indexing
     INDEX_BATCH_SIZE = int(get_env("FANTASYFOLIO_INDEX_BATCH_SIZE", "DAM_INDEX_BATCH_SIZE", "100"))
     THUMBNAIL_SIZE = (200, 280)  # Width, Height
+    THUMBNAIL_RENDER_WORKERS = int(get_env("FANTASYFOLIO_RENDER_WORKERS", "DAM_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+    HASH_WORKERS = int(get_env("FANTASYFOLIO_HASH_WORKERS", "DAM_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PARTIAL_HASH_ALGORITHM = get_env("FANTASYFOLIO_PARTIAL_HASH_ALGORITHM", "DAM_PARTIAL_HASH_ALGORITHM", "md5")  # md5, sha256, blake2b, xxh3, blake3
+    FULL_HASH_ALGORITHM = get_env("FANTASYFOLIO_FULL_HASH_ALGORITHM", "DAM_FULL_HASH_ALGORITHM", "md5")
+    RENDER_STAGING_MAX_MB = int(get_env("FANTASYFOLIO_RENDER_STAGING_MAX_MB", "DAM_RENDER_STAGING_MAX_MB", "256"))  # Larger files stage on disk
+    DIR_MANIFEST_DEEP_SCAN_DAYS = float(get_env("FANTASYFOLIO_DEEP_SCAN_DAYS", "DAM_DEEP_SCAN_DAYS", "7"))  # Re-list unchanged dirs after this, 0 = always
+    
+    # Volume monitoring
+    VOLUME_CHECK_INTERVAL = int(get_env("FANTASYFOLIO_VOLUME_CHECK_INTERVAL", "DAM_VOLUME_CHECK_INTERVAL", "30"))  # Seconds, 0 disables
+    VOLUME_CHECK_TIMEOUT = float(get_env("FANTASYFOLIO_VOLUME_CHECK_TIMEOUT", "DAM_VOLUME_CHECK_TIMEOUT", "5"))  # Seconds
+    VOLUME_OFFLINE_AFTER = int(get_env("FANTASYFOLIO_VOLUME_OFFLINE_AFTER", "DAM_VOLUME_OFFLINE_AFTER", "3"))  # Consecutive failed checks
+    
+    # Live filesystem watcher (incremental indexing of changed files)
+    FS_WATCH_ENABLED = get_env("FANTASYFOLIO_FS_WATCH", "DAM_FS_WATCH", "false").lower() in ("1", "true", "yes")
+    FS_WATCH_DEBOUNCE = float(get_env("FANTASYFOLIO_FS_WATCH_DEBOUNCE", "DAM_FS_WATCH_DEBOUNCE", "2"))  # Seconds a path must be quiet
+    FS_WATCH_POLL_INTERVAL = int(get_env("FANTASYFOLIO_FS_WATCH_POLL_INTERVAL", "DAM_FS_WATCH_POLL_INTERVAL", "60"))  # Seconds, network mounts
+    
+    # Change journal (entries are buffered and written in batches)
+    JOURNAL_BATCH_SIZE = int(get_env("FANTASYFOLIO_JOURNAL_BATCH_SIZE", "DAM_JOURNAL_BATCH_SIZE", "200"))  # 1 = write every entry immediately
+    JOURNAL_FLUSH_INTERVAL = float(get_env("FANTASYFOLIO_JOURNAL_FLUSH_INTERVAL", "DAM_JOURNAL_FLUSH_INTERVAL", "1"))  # Seconds
+    
+    # Online database backups (snapshots, /api/backup)
+    BACKUP_METHOD = get_env("FANTASYFOLIO_BACKUP_METHOD", "DAM_BACKUP_METHOD", "step")  # step or vacuum
+    BACKUP_PAGES_PER_STEP = int(get_env("FANTASYFOLIO_BACKUP_PAGES_PER_STEP", "DAM_BACKUP_PAGES_PER_STEP", "1024"))
+    BACKUP_STEP_SLEEP = float(get_env("FANTASYFOLIO_BACKUP_STEP_SLEEP", "DAM_BACKUP_STEP_SLEEP", "0.01"))  # Seconds between steps
+    BACKUP_MAX_RESTARTS = int(get_env("FANTASYFOLIO_BACKUP_MAX_RESTARTS", "DAM_BACKUP_MAX_RESTARTS", "3"))  # Then VACUUM INTO
+    
+    # Snapshots: 'chunked' stores deduplicated compressed chunks, 'full' plain copies
+    SNAPSHOT_FORMAT = get_env("FANTASYFOLIO_SNAPSHOT_FORMAT", "DAM_SNAPSHOT_FORMAT", "chunked")
+    SNAPSHOT_CHUNK_KB = int(get_env("FANTASYFOLIO_SNAPSHOT_CHUNK_KB", "DAM_SNAPSHOT_CHUNK_KB", "256"))
+    SNAPSHOT_COMPRESSION = get_env("FANTASYFOLIO_SNAPSHOT_COMPRESSION", "DAM_SNAPSHOT_COMPRESSION", "auto")  # auto, zstd, zlib
+    
+    # Caching
+    STATS_CACHE_TTL = int(get_env("FANTASYFOLIO_STATS_CACHE_TTL", "DAM_STATS_CACHE_TTL", "300"))  # Seconds
+    SEARCH_CACHE_SIZE = int(get_env("FANTASYFOLIO_SEARCH_CACHE_SIZE", "DAM_SEARCH_CACHE_SIZE", "256"))  # Entries, 0 = off
+    AUTH_CACHE_TTL = float(get_env("FANTASYFOLIO_AUTH_CACHE_TTL", "DAM_AUTH_CACHE_TTL", "30"))  # Seconds, 0 = off
     
     # Logging
     LOG_LEVEL = get_env("FANTASYFOLIO_LOG_LEVEL", "DAM_LOG_LEVEL", "INFO")
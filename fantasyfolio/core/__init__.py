@@ -6,6 +6,7 @@ from fantasyfolio.core.database import (
     
     # Asset operations
     get_stats, search_assets, get_asset_by_id, list_assets,
+    search_assets_page, list_assets_page, get_deleted_page,
     get_folder_tree, insert_asset, get_asset_by_path,
     needs_reindex, delete_missing_assets, get_assets_without_text,
     
@@ -18,6 +19,7 @@ from fantasyfolio.core.database import (
     
     # 3D model operations
     get_models_stats, search_models, get_model_by_id, insert_model,
+    search_models_page,
     
     # Settings
     get_setting, set_setting, get_all_settings, set_multiple_settings,
@@ -29,12 +31,14 @@ from fantasyfolio.core.database import (
 __all__ = [
     'get_db', 'init_db', 'get_connection',
     'get_stats', 'search_assets', 'get_asset_by_id', 'list_assets',
+    'search_assets_page', 'list_assets_page', 'get_deleted_page',
     'get_folder_tree', 'insert_asset', 'get_asset_by_path',
     'needs_reindex', 'delete_missing_assets', 'get_assets_without_text',
     'insert_page_text', 'get_pages_for_asset', 'search_pages',
     'get_text_extraction_stats',
     'insert_bookmarks', 'get_bookmarks', 'has_bookmarks',
     'get_models_stats', 'search_models', 'get_model_by_id', 'insert_model',
+    'search_models_page',
     'get_setting', 'set_setting', 'get_all_settings', 'set_multiple_settings',
     'get_publishers'
 ]
@@ -0,0 +1,283 @@
+"""
+Bulk thumbnail render engine.
+
+Renders thumbnails for many models at once (the "Render Thumbnails"
+button) using a process pool:
+- jobs are grouped by source archive, so each ZIP is opened once per
+  group instead of once per member; members are staged on tmpfs
+  (see core/staging.py)
+- groups run in THUMBNAIL_RENDER_WORKERS worker processes
+- results are written back in batched UPDATEs on a single connection
+- progress is tracked under a lock and can be read (or streamed) while
+  the job runs; a job can be cancelled between groups
+"""
+
+import os
+import zipfile
+import logging
+import threading
+import multiprocessing
+from pathlib import Path
+from datetime import datetime
+from itertools import groupby
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fantasyfolio.core.database import get_connection
+
+logger = logging.getLogger(__name__)
+
+# Max models per worker task (large archives are split across tasks)
+GROUP_SIZE = 50
+
+# Rendered results buffered before an UPDATE batch is written
+DB_BATCH_SIZE = 50
+
+UPDATE_THUMB_SQL = """
+    UPDATE models SET
+        has_thumbnail = 1,
+        thumb_storage = :thumb_storage,
+        thumb_path = :thumb_path,
+        thumb_rendered_at = :thumb_rendered_at,
+        thumb_source_mtime = :thumb_source_mtime
+    WHERE id = :id
+"""
+
+# (model id, render result or None, error message or None)
+RenderResult = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def group_render_jobs(models: Sequence[Dict[str, Any]], group_size: int = GROUP_SIZE) -> List[List[Dict[str, Any]]]:
+    """Split models into worker tasks, keeping members of one archive together."""
+    ordered = sorted(models, key=lambda m: (m.get('archive_path') or '', m['id']))
+    groups = []
+    for _, members in groupby(ordered, key=lambda m: m.get('archive_path') or ''):
+        members = list(members)
+        for start in range(0, len(members), group_size):
+            groups.append(members[start:start + group_size])
+    return groups
+
+
+def render_group(jobs: List[Dict[str, Any]], central_dir: str, size: int = 512) -> List[RenderResult]:
+    """
+    Render one group of models (runs in a worker process).
+
+    All jobs in a group share the same archive_path (or none).
+    """
+    from fantasyfolio.core.staging import stage_member
+    from fantasyfolio.core.thumbnails import render_thumbnail_from_source
+
+    central = Path(central_dir)
+    results = []
+    archive = None
+    archive_mtime = None
+
+    try:
+        first = jobs[0]
+        if first.get('archive_path') and first.get('archive_member'):
+            try:
+                archive_mtime = int(os.stat(first['archive_path']).st_mtime)
+                archive = zipfile.ZipFile(first['archive_path'], 'r')
+            except (OSError, zipfile.BadZipFile) as e:
+                return [(job['id'], None, f"Cannot open archive: {e}") for job in jobs]
+
+        for job in jobs:
+            # No volume row (LEFT JOIN gives NULL) counts as read-only: write
+            # to central storage, never into an unregistered library folder
+            volume = {
+                'id': job.get('volume_id'),
+                'mount_path': job.get('mount_path'),
+                'is_readonly': 1 if job.get('is_readonly') is None else job['is_readonly']
+            }
+            try:
+                if archive is not None:
+                    suffix = f".{job.get('format') or 'stl'}"
+                    with stage_member(archive, job['archive_member'], suffix) as staged:
+                        result = render_thumbnail_from_source(job, volume, central, staged, archive_mtime, size)
+                else:
+                    source = job['file_path']
+                    mtime = int(os.stat(source).st_mtime)
+                    result = render_thumbnail_from_source(job, volume, central, source, mtime, size)
+
+                results.append((job['id'], result, None if result else "Render failed"))
+            except Exception as e:
+                results.append((job['id'], None, str(e)))
+    finally:
+        if archive is not None:
+            archive.close()
+
+    return results
+
+
+class BulkRenderEngine:
+    """Runs one bulk render job at a time in the background."""
+
+    def __init__(self, central_dir: Path, workers: int = 4, size: int = 512):
+        self.central_dir = Path(central_dir)
+        self.workers = max(1, workers)
+        self.size = size
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._status = self._empty_status()
+
+    def _empty_status(self) -> Dict[str, Any]:
+        return {
+            'active': False,
+            'cancelled': False,
+            'total': 0,
+            'completed': 0,
+            'rendered': 0,
+            'errors': 0,
+            'current_model': None,
+            'workers': self.workers,
+            'started_at': None,
+            'finished_at': None,
+            'last_update': None
+        }
+
+    def status(self) -> Dict[str, Any]:
+        """Snapshot of the current (or last) job's progress."""
+        with self._lock:
+            return dict(self._status)
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, models: Sequence[Dict[str, Any]]) -> bool:
+        """Start rendering `models` in the background. False if a job is already running."""
+        with self._lock:
+            if self.is_running():
+                return False
+            self._cancel.clear()
+            now = datetime.now().isoformat()
+            self._status = self._empty_status()
+            self._status.update(active=True, total=len(models), started_at=now, last_update=now)
+            self._thread = threading.Thread(
+                target=self._run, args=(group_render_jobs(models),),
+                name="bulk-render", daemon=True
+            )
+            self._thread.start()
+        return True
+
+    def cancel(self) -> bool:
+        """Stop after the groups already running. False if nothing is running."""
+        if not self.is_running():
+            return False
+        self._cancel.set()
+        return True
+
+    def wait(self, timeout: Optional[float] = None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _update(self, **changes):
+        with self._lock:
+            self._status.update(changes, last_update=datetime.now().isoformat())
+
+    def _record(self, results: List[RenderResult], pending: List[Dict[str, Any]]):
+        rendered = errors = 0
+        for model_id, result, error in results:
+            if result:
+                pending.append({**result, 'id': model_id})
+                rendered += 1
+            else:
+                errors += 1
+                logger.debug(f"Thumbnail render error for model {model_id}: {error}")
+
+        with self._lock:
+            self._status['completed'] += len(results)
+            self._status['rendered'] += rendered
+            self._status['errors'] += errors
+            if results:
+                self._status['current_model'] = results[-1][0]
+            self._status['last_update'] = datetime.now().isoformat()
+
+    def _flush(self, conn, pending: List[Dict[str, Any]]):
+        if pending:
+            conn.executemany(UPDATE_THUMB_SQL, pending)
+            conn.commit()
+            pending.clear()
+
+    def _fail(self, groups: Sequence[List[Dict[str, Any]]], error: str, pending: List[Dict[str, Any]]):
+        """Count every job in `groups` as an error (worker crash or broken pool)."""
+        self._record([(job['id'], None, error) for group in groups for job in group], pending)
+
+    def _render(self, pool: ProcessPoolExecutor, conn, groups: List[List[Dict[str, Any]]],
+                pending: List[Dict[str, Any]]):
+        """Feed groups to the pool and record results; every group ends up rendered or in errors."""
+        central_dir = str(self.central_dir)
+        queue = iter(groups)
+        running: Dict[Future, List[Dict[str, Any]]] = {}
+        broken = False
+
+        while True:
+            # Keep a bounded number of groups in flight so cancel takes effect quickly
+            while not self._cancel.is_set() and not broken and len(running) < self.workers * 2:
+                group = next(queue, None)
+                if group is None:
+                    break
+                try:
+                    running[pool.submit(render_group, group, central_dir, self.size)] = group
+                except BrokenProcessPool as e:
+                    # Groups in flight still report; the rest can't run
+                    logger.error(f"Render pool failed: {e}")
+                    self._fail([group, *queue], f"Render pool failed: {e}", pending)
+                    broken = True
+
+            if not running:
+                break
+
+            done, _ = wait(running, timeout=1.0, return_when=FIRST_COMPLETED)
+            for future in done:
+                group = running.pop(future)
+                try:
+                    self._record(future.result(), pending)
+                except Exception as e:
+                    logger.error(f"Render worker failed: {e}")
+                    self._fail([group], f"Render worker failed: {e}", pending)
+
+            if len(pending) >= DB_BATCH_SIZE:
+                self._flush(conn, pending)
+
+    def _run(self, groups: List[List[Dict[str, Any]]]):
+        pending: List[Dict[str, Any]] = []
+
+        try:
+            ctx = multiprocessing.get_context('spawn')
+            with get_connection() as conn:
+                try:
+                    with ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx) as pool:
+                        self._render(pool, conn, groups, pending)
+                finally:
+                    # Thumbnails already on disk always get their DB rows
+                    self._flush(conn, pending)
+        except Exception as e:
+            logger.error(f"Bulk render failed: {e}", exc_info=True)
+        finally:
+            cancelled = self._cancel.is_set()
+            self._update(active=False, cancelled=cancelled, current_model=None,
+                         finished_at=datetime.now().isoformat())
+            status = self.status()
+            logger.info(f"Bulk render {'cancelled' if cancelled else 'complete'}: "
+                        f"{status['completed']}/{status['total']} processed, "
+                        f"{status['rendered']} rendered, {status['errors']} errors")
+
+
+_engine: Optional[BulkRenderEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_render_engine() -> BulkRenderEngine:
+    """Process-wide bulk render engine."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            from fantasyfolio.config import get_config
+            config = get_config()
+            _engine = BulkRenderEngine(
+                Path(config.DATA_DIR) / 'thumbnails',
+                workers=config.THUMBNAIL_RENDER_WORKERS
+            )
+        return _engine
@@ -0,0 +1,230 @@
+"""
+Closure-table hierarchy index for nested collections.
+
+Collections nest through user_collections.parent_collection_id, but the
+API returned flat lists and left assembling the hierarchy (and summing
+items over sub-collections) to callers, one level at a time. The
+`collection_tree` table holds one row per (ancestor, descendant) pair,
+including each collection paired with itself at depth 0, so that:
+
+- a whole subtree, with per-collection and rolled-up item counts and
+  sizes, is one query (subtree_rows / owner_rows)
+- the ancestor chain (breadcrumb) is one indexed lookup (ancestors)
+- cycle checks on a move are a single primary-key probe (is_descendant)
+
+The table is kept up to date by triggers on user_collections (insert,
+parent change, delete), so every writer maintains it. Rolled-up counts
+are memberships summed over the subtree: an asset in two sub-collections
+counts twice.
+"""
+
+import sqlite3
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_TREE_SQL = """
+CREATE TABLE IF NOT EXISTS collection_tree(
+  ancestor_id TEXT NOT NULL,
+  descendant_id TEXT NOT NULL,
+  depth INTEGER NOT NULL, -- 0 = the collection itself
+  PRIMARY KEY(ancestor_id, descendant_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_collection_tree_descendant ON collection_tree(descendant_id, depth);
+
+CREATE TRIGGER IF NOT EXISTS trg_collection_tree_insert AFTER INSERT ON user_collections
+BEGIN
+  INSERT OR IGNORE INTO collection_tree (ancestor_id, descendant_id, depth) VALUES (NEW.id, NEW.id, 0);
+  INSERT OR IGNORE INTO collection_tree (ancestor_id, descendant_id, depth)
+    SELECT ancestor_id, NEW.id, depth + 1 FROM collection_tree WHERE descendant_id = NEW.parent_collection_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_collection_tree_move AFTER UPDATE OF parent_collection_id ON user_collections
+WHEN NEW.parent_collection_id IS NOT OLD.parent_collection_id
+BEGIN
+  -- Detach the subtree from its old ancestors
+  DELETE FROM collection_tree
+  WHERE descendant_id IN (SELECT descendant_id FROM collection_tree WHERE ancestor_id = NEW.id)
+    AND ancestor_id NOT IN (SELECT descendant_id FROM collection_tree WHERE ancestor_id = NEW.id);
+  -- Attach it under the new parent's ancestors
+  INSERT OR IGNORE INTO collection_tree (ancestor_id, descendant_id, depth)
+    SELECT a.ancestor_id, d.descendant_id, a.depth + d.depth + 1
+    FROM collection_tree a, collection_tree d
+    WHERE a.descendant_id = NEW.parent_collection_id AND d.ancestor_id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_collection_tree_delete AFTER DELETE ON user_collections
+BEGIN
+  DELETE FROM collection_tree WHERE descendant_id = OLD.id;
+  DELETE FROM collection_tree WHERE ancestor_id = OLD.id;
+END;
+"""
+
+# Per-collection direct item count and size, for the collections in a scope CTE
+_ITEM_TOTALS = """
+item_totals AS (
+    SELECT ci.collection_id,
+        COUNT(*) AS items,
+        COALESCE(SUM(CASE ci.asset_type WHEN 'model' THEN m.file_size ELSE a.file_size END), 0) AS bytes
+    FROM collection_items ci
+    JOIN {scope} ON {scope}.id = ci.collection_id
+    LEFT JOIN models m ON ci.asset_type = 'model' AND m.id = ci.asset_id
+    LEFT JOIN assets a ON ci.asset_type = 'pdf' AND a.id = ci.asset_id
+    GROUP BY ci.collection_id
+)"""
+
+_TREE_SELECT = """
+SELECT c.*, scope.depth,
+    COALESCE(direct.items, 0) AS direct_items,
+    COALESCE(direct.bytes, 0) AS direct_bytes,
+    (SELECT COALESCE(SUM(it.items), 0) FROM collection_tree t
+     JOIN item_totals it ON it.collection_id = t.descendant_id
+     WHERE t.ancestor_id = c.id) AS total_items,
+    (SELECT COALESCE(SUM(it.bytes), 0) FROM collection_tree t
+     JOIN item_totals it ON it.collection_id = t.descendant_id
+     WHERE t.ancestor_id = c.id) AS total_bytes
+FROM scope
+JOIN user_collections c ON c.id = scope.id
+LEFT JOIN item_totals direct ON direct.collection_id = c.id
+ORDER BY scope.depth, c.name
+"""
+
+# Database files whose schema has been checked (in-memory databases are always checked)
+_schema_ready = set()
+
+
+def _database_file(conn: sqlite3.Connection) -> str:
+    """Path of the connection's main database ('' for in-memory/temporary)."""
+    for row in conn.execute("PRAGMA database_list").fetchall():
+        if row[1] == 'main':
+            return row[2] or ''
+    return ''
+
+
+def ensure_collection_tree(conn: sqlite3.Connection):
+    """Create the closure table and its triggers on databases that predate it, and backfill it."""
+    db_file = _database_file(conn)
+    if db_file and db_file in _schema_ready:
+        return
+
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='collection_tree'"
+    ).fetchone()
+    if not exists:
+        logger.info("Creating collection_tree table (nested collection hierarchy)")
+        conn.executescript(COLLECTION_TREE_SQL)
+        rebuild_collection_tree(conn)
+        conn.commit()
+    if db_file:
+        _schema_ready.add(db_file)
+
+
+def rebuild_collection_tree(conn: sqlite3.Connection) -> int:
+    """Recompute every closure row from parent_collection_id; returns rows written. Does not commit."""
+    conn.execute("DELETE FROM collection_tree")
+    # Depth guard stops a corrupt parent cycle from recursing forever
+    return conn.execute("""
+        INSERT OR IGNORE INTO collection_tree (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE walk(ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM user_collections
+            UNION ALL
+            SELECT walk.ancestor_id, c.id, walk.depth + 1
+            FROM walk JOIN user_collections c ON c.parent_collection_id = walk.descendant_id
+            WHERE walk.depth < 100
+        )
+        SELECT ancestor_id, descendant_id, MIN(depth) FROM walk GROUP BY ancestor_id, descendant_id
+    """).rowcount
+
+
+def is_descendant(conn: sqlite3.Connection, collection_id: str, ancestor_id: str) -> bool:
+    """Whether `collection_id` is `ancestor_id` or lies below it."""
+    return conn.execute(
+        "SELECT 1 FROM collection_tree WHERE ancestor_id = ? AND descendant_id = ?",
+        (ancestor_id, collection_id)
+    ).fetchone() is not None
+
+
+def subtree_ids(conn: sqlite3.Connection, collection_id: str) -> List[str]:
+    """A collection and all its descendants, deepest first (safe deletion order)."""
+    return [row[0] for row in conn.execute(
+        "SELECT descendant_id FROM collection_tree WHERE ancestor_id = ? ORDER BY depth DESC",
+        (collection_id,)
+    ).fetchall()]
+
+
+def ancestors(conn: sqlite3.Connection, collection_id: str) -> List[Dict[str, Any]]:
+    """Ancestors of a collection (id, name, depth below the root), root first."""
+    rows = conn.execute("""
+        SELECT c.id, c.name, c.parent_collection_id, t.depth AS distance
+        FROM collection_tree t
+        JOIN user_collections c ON c.id = t.ancestor_id
+        WHERE t.descendant_id = ? AND t.depth > 0
+        ORDER BY t.depth DESC
+    """, (collection_id,)).fetchall()
+    return [
+        {'id': row[0], 'name': row[1], 'parent_collection_id': row[2], 'depth': i}
+        for i, row in enumerate(rows)
+    ]
+
+
+def subtree_rows(
+    conn: sqlite3.Connection,
+    collection_id: str,
+    max_depth: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    A collection and its descendants with item rollups, in one query.
+
+    Each row is the user_collections row plus depth (relative to
+    `collection_id`), direct_items/direct_bytes and total_items/total_bytes
+    over its whole subtree. Ordered by depth, then name.
+    """
+    scope = "SELECT descendant_id AS id, depth FROM collection_tree WHERE ancestor_id = ?"
+    params: list = [collection_id]
+    if max_depth is not None:
+        scope += " AND depth <= ?"
+        params.append(max_depth)
+    # Rollups always cover the full subtree, even when the listing is cut at max_depth
+    query = f"""
+        WITH scope AS ({scope}),
+        full_scope AS (SELECT descendant_id AS id FROM collection_tree WHERE ancestor_id = ?),
+        {_ITEM_TOTALS.format(scope='full_scope')}
+        {_TREE_SELECT}
+    """
+    params.append(collection_id)
+    return [dict(row) for row in conn.execute(query, params).fetchall()]
+
+
+def owner_rows(conn: sqlite3.Connection, owner_id: str) -> List[Dict[str, Any]]:
+    """Every collection of an owner with absolute depth and item rollups, in one query."""
+    query = f"""
+        WITH scope AS (
+            SELECT c.id, (SELECT MAX(t.depth) FROM collection_tree t WHERE t.descendant_id = c.id) AS depth
+            FROM user_collections c WHERE c.owner_id = ?
+        ),
+        {_ITEM_TOTALS.format(scope='scope')}
+        {_TREE_SELECT}
+    """
+    return [dict(row) for row in conn.execute(query, (owner_id,)).fetchall()]
+
+
+def build_tree(rows: List[Dict[str, Any]], root_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Nest flat rows (from subtree_rows / owner_rows) under 'children'.
+
+    Returns the rows whose parent is not in the set (or just `root_id`'s
+    node when given), each with its descendants attached.
+    """
+    nodes = {row['id']: dict(row, children=[]) for row in rows}
+    roots = []
+    for node in nodes.values():
+        parent = nodes.get(node.get('parent_collection_id'))
+        if parent is not None and node['id'] != root_id:
+            parent['children'].append(node)
+        else:
+            roots.append(node)
+    if root_id is not None:
+        return [nodes[root_id]] if root_id in nodes else []
+    return roots
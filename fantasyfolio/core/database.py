@@ -8,10 +8,14 @@ Uses SQLite with WAL mode for better concurrency.
 import sqlite3
 import logging
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Generator
+from typing import Optional, List, Dict, Any, Generator, Tuple
 from contextlib import contextmanager
 
 from fantasyfolio.config import get_config
+from fantasyfolio.core.folder_tree import ensure_folder_nodes, adjust_for_row, refresh_folder_nodes
+from fantasyfolio.core.pagination import fetch_page
+from fantasyfolio.core.stats_cache import cached_stats
+from fantasyfolio.core.trigram_index import ensure_trigram_index
 
 logger = logging.getLogger(__name__)
 
@@ -64,6 +68,14 @@ class Database:
                 conn.executescript(schema)
                 conn.commit()
         
+        # Substring search indexes (migration 020); built here rather than on
+        # the first search, since the backfill reads every asset and model
+        try:
+            with self.connection() as conn:
+                ensure_trigram_index(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Trigram index setup failed (prefix search only): {e}")
+        
         logger.info(f"Database ready at {self.db_path}")
     
     def execute(self, query: str, params: tuple = ()) -> sqlite3.Cursor:
@@ -103,6 +115,21 @@ def init_db():
     get_db().init_db()
 
 
+def reset_database_caches():
+    """
+    Forget per-database schema checks and cached stats.
+    
+    Call after the database file was replaced in place (snapshot/backup
+    restore): the schema checks are keyed by file path, so an older
+    database copied over the same path would otherwise be taken as ready.
+    """
+    from fantasyfolio.core import collection_tree, dir_manifest, folder_tree, journal_partitions, stats_cache
+    
+    for module in (folder_tree, stats_cache, dir_manifest, journal_partitions, collection_tree):
+        module._schema_ready.clear()
+    stats_cache.invalidate_stats()
+
+
 @contextmanager
 def get_connection():
     """Convenience function for getting a database connection."""
@@ -110,30 +137,56 @@ def get_connection():
         yield conn
 
 
+# ==================== Query Helpers ====================
+
+def folder_prefix_filter(column: str, folder: str) -> Tuple[str, list]:
+    """Build a `column starts with folder` condition that can use an index.
+    
+    Equivalent to `column LIKE folder || '%'` for exact-case folder paths,
+    but written as a range so SQLite can seek the folder_path indexes
+    (LIKE is case-insensitive and can't use a BINARY index). Unlike LIKE,
+    '_' and '%' in folder names are matched literally.
+    
+    Returns:
+        (sql, params) to AND into a WHERE clause
+    """
+    last = ord(folder[-1])
+    if last >= 0x10FFFF:
+        return f"{column} LIKE ?", [folder + '%']
+    return f"{column} >= ? AND {column} < ?", [folder, folder[:-1] + chr(last + 1)]
+
+
 # ==================== Asset Operations ====================
 
 def get_stats(include_deleted: bool = False) -> Dict[str, Any]:
     """Get overall database statistics.
     
+    Cached until the assets table changes (see core/stats_cache.py).
+    
     Args:
         include_deleted: If True, include soft-deleted records in counts
     """
-    db = get_db()
+    with get_db().connection() as conn:
+        return cached_stats(conn, f"assets:{include_deleted}", ('assets',),
+                            lambda c: _compute_stats(c, include_deleted))
+
+
+def _compute_stats(conn: sqlite3.Connection, include_deleted: bool) -> Dict[str, Any]:
+    """Run the asset statistics aggregates (uncached)."""
     deleted_filter = "" if include_deleted else "WHERE deleted_at IS NULL"
-    with db.connection() as conn:
-        total = conn.execute(f"SELECT COUNT(*) FROM assets {deleted_filter}").fetchone()[0]
-        total_size = conn.execute(f"SELECT SUM(file_size) FROM assets {deleted_filter}").fetchone()[0] or 0
-        publishers = conn.execute(f"SELECT COUNT(DISTINCT publisher) FROM assets {deleted_filter}").fetchone()[0]
-        
-        # Count deleted (for trash indicator)
-        deleted_count = conn.execute("SELECT COUNT(*) FROM assets WHERE deleted_at IS NOT NULL").fetchone()[0]
-        
-        return {
-            "total_assets": total,
-            "total_size_bytes": total_size,
-            "unique_publishers": publishers,
-            "deleted_count": deleted_count
-        }
+    total = conn.execute(f"SELECT COUNT(*) FROM assets {deleted_filter}").fetchone()[0]
+    total_size = conn.execute(f"SELECT SUM(file_size) FROM assets {deleted_filter}").fetchone()[0] or 0
+    publishers = conn.execute(f"SELECT COUNT(DISTINCT publisher) FROM assets {deleted_filter}").fetchone()[0]
+    
+    # Count deleted (for trash indicator)
+    deleted_count = conn.execute("SELECT COUNT(*) FROM assets WHERE deleted_at IS NOT NULL").fetchone()[0]
+    
+    return {
+        "total_assets": total,
+        "total_size_bytes": total_size,
+        "unique_publishers": publishers,
+        "deleted_count": deleted_count
+    }
 
 
 def search_assets(query: str, limit: int = 50, offset: int = 0, include_deleted: bool = False) -> List[Dict[str, Any]]:
@@ -145,6 +198,24 @@ def search_assets(query: str, limit: int = 50, offset: int = 0, include_deleted:
         offset: Pagination offset
         include_deleted: If True, include soft-deleted records
     """
+    rows, _ = search_assets_page(query, limit=limit, offset=offset, include_deleted=include_deleted)
+    return rows
+
+
+def search_assets_page(query: str, limit: int = 50, cursor: Optional[str] = None, offset: int = 0,
+                       include_deleted: bool = False) -> tuple:
+    """Search assets one page at a time, ordered by relevance.
+    
+    Args:
+        query: Search query
+        limit: Maximum results
+        cursor: next_cursor from the previous page (keyset pagination)
+        offset: Legacy pagination offset, ignored when cursor is given
+        include_deleted: If True, include soft-deleted records
+    
+    Returns:
+        (results, next_cursor) - next_cursor is None on the last page
+    """
     db = get_db()
     # Add wildcard for prefix matching (e.g., "drag" matches "dragon")
     # Split into terms and add * to each for prefix matching
@@ -154,16 +225,15 @@ def search_assets(query: str, limit: int = 50, offset: int = 0, include_deleted:
     deleted_filter = "" if include_deleted else "AND a.deleted_at IS NULL"
     
     with db.connection() as conn:
-        rows = conn.execute(f"""
-            SELECT a.*, highlight(assets_fts, 0, '<mark>', '</mark>') as highlight
+        return fetch_page(conn, f"""
+            SELECT a.*, highlight(assets_fts, 0, '<mark>', '</mark>') as highlight,
+                   assets_fts.rank as rank
             FROM assets a
             JOIN assets_fts ON a.id = assets_fts.rowid
             WHERE assets_fts MATCH ?
             {deleted_filter}
-            ORDER BY rank
-            LIMIT ? OFFSET ?
-        """, (fts_query, limit, offset)).fetchall()
-        return [dict(row) for row in rows]
+        """, [fts_query], [('assets_fts.rank', 'rank'), ('a.id', 'id')],
+            limit=limit, cursor=cursor, offset=offset)
 
 
 def get_asset_by_id(asset_id: int) -> Optional[Dict[str, Any]]:
@@ -182,28 +252,42 @@ def list_assets(folder: Optional[str] = None, limit: int = 100, offset: int = 0,
         sort: Column to sort by
         order: Sort order (asc or desc)
     """
+    rows, _ = list_assets_page(folder=folder, limit=limit, offset=offset, include_deleted=include_deleted,
+                               sort=sort, order=order)
+    return rows
+
+
+def list_assets_page(folder: Optional[str] = None, limit: int = 100, cursor: Optional[str] = None,
+                     offset: int = 0, include_deleted: bool = False, sort: str = 'filename',
+                     order: str = 'asc') -> tuple:
+    """List one page of assets using keyset pagination.
+    
+    Pages are ordered by (sort, id); pass the returned next_cursor to get
+    the following page. Backed by the assets(deleted_at, <sort>) indexes.
+    
+    Returns:
+        (assets, next_cursor) - next_cursor is None on the last page
+    
+    Raises:
+        CursorError: If the cursor is invalid for this sort
+    """
     # Validate sort column to prevent SQL injection
     valid_sorts = {'filename', 'title', 'file_size', 'page_count', 'publisher', 'created_at', 'modified_at'}
     if sort not in valid_sorts:
         sort = 'filename'
     
-    # Validate order
-    order_sql = 'DESC' if order.lower() == 'desc' else 'ASC'
-    
     db = get_db()
     deleted_filter = "deleted_at IS NULL" if not include_deleted else "1=1"
+    query = f"SELECT * FROM assets WHERE {deleted_filter}"
+    params = []
+    if folder:
+        folder_sql, folder_params = folder_prefix_filter('folder_path', folder)
+        query += f" AND {folder_sql}"
+        params.extend(folder_params)
+    
     with db.connection() as conn:
-        if folder:
-            rows = conn.execute(
-                f"SELECT * FROM assets WHERE folder_path LIKE ? AND {deleted_filter} ORDER BY {sort} {order_sql} LIMIT ? OFFSET ?",
-                (folder + '%', limit, offset)
-            ).fetchall()
-        else:
-            rows = conn.execute(
-                f"SELECT * FROM assets WHERE {deleted_filter} ORDER BY {sort} {order_sql} LIMIT ? OFFSET ?",
-                (limit, offset)
-            ).fetchall()
-        return [dict(row) for row in rows]
+        return fetch_page(conn, query, params, [(sort, sort), ('id', 'id')],
+                          descending=order.lower() == 'desc', limit=limit, cursor=cursor, offset=offset)
 
 
 def get_folder_tree(include_deleted: bool = False) -> List[Dict[str, Any]]:
@@ -254,34 +338,40 @@ def insert_asset(asset: Dict[str, Any]) -> int:
 def get_models_stats(include_deleted: bool = False) -> Dict[str, Any]:
     """Get 3D model statistics.
     
+    Cached until the models table changes (see core/stats_cache.py).
+    
     Args:
         include_deleted: If True, include soft-deleted records in counts
     """
-    db = get_db()
+    with get_db().connection() as conn:
+        return cached_stats(conn, f"models:{include_deleted}", ('models',),
+                            lambda c: _compute_models_stats(c, include_deleted))
+
+
+def _compute_models_stats(conn: sqlite3.Connection, include_deleted: bool) -> Dict[str, Any]:
+    """Run the 3D model statistics aggregates (uncached)."""
     deleted_filter = "WHERE deleted_at IS NULL" if not include_deleted else ""
-    deleted_filter_and = "AND deleted_at IS NULL" if not include_deleted else ""
-    with db.connection() as conn:
-        total = conn.execute(f"SELECT COUNT(*) FROM models {deleted_filter}").fetchone()[0]
-        by_format = conn.execute(
-            f"SELECT format, COUNT(*) as count FROM models {deleted_filter} GROUP BY format"
-        ).fetchall()
-        collections = conn.execute(
-            f"SELECT COUNT(DISTINCT collection) FROM models {deleted_filter}"
-        ).fetchone()[0]
-        total_size = conn.execute(
-            f"SELECT SUM(file_size) FROM models {deleted_filter}"
-        ).fetchone()[0] or 0
-        
-        # Count deleted (for trash indicator)
-        deleted_count = conn.execute("SELECT COUNT(*) FROM models WHERE deleted_at IS NOT NULL").fetchone()[0]
-        
-        return {
-            'total_models': total,
-            'by_format': {row['format']: row['count'] for row in by_format},
-            'collections': collections,
-            'total_size_mb': round(total_size / (1024*1024), 2),
-            'deleted_count': deleted_count
-        }
+    total = conn.execute(f"SELECT COUNT(*) FROM models {deleted_filter}").fetchone()[0]
+    by_format = conn.execute(
+        f"SELECT format, COUNT(*) as count FROM models {deleted_filter} GROUP BY format"
+    ).fetchall()
+    collections = conn.execute(
+        f"SELECT COUNT(DISTINCT collection) FROM models {deleted_filter}"
+    ).fetchone()[0]
+    total_size = conn.execute(
+        f"SELECT SUM(file_size) FROM models {deleted_filter}"
+    ).fetchone()[0] or 0
+    
+    # Count deleted (for trash indicator)
+    deleted_count = conn.execute("SELECT COUNT(*) FROM models WHERE deleted_at IS NOT NULL").fetchone()[0]
+    
+    return {
+        'total_models': total,
+        'by_format': {row['format']: row['count'] for row in by_format},
+        'collections': collections,
+        'total_size_mb': round(total_size / (1024*1024), 2),
+        'deleted_count': deleted_count
+    }
 
 
 def search_models(query: str, limit: int = 50, include_deleted: bool = False, folder: str = None) -> List[Dict[str, Any]]:
@@ -293,29 +383,39 @@ def search_models(query: str, limit: int = 50, include_deleted: bool = False, fo
         include_deleted: If True, include soft-deleted records
         folder: Optional folder path to restrict search (with LIKE matching for subfolders)
     """
+    rows, _ = search_models_page(query, limit=limit, include_deleted=include_deleted, folder=folder)
+    return rows
+
+
+def search_models_page(query: str, limit: int = 50, cursor: Optional[str] = None,
+                       include_deleted: bool = False, folder: str = None) -> tuple:
+    """Search 3D models one page at a time, ordered by relevance.
+    
+    Returns:
+        (results, next_cursor) - next_cursor is None on the last page
+    """
     db = get_db()
     # Add wildcard for prefix matching (e.g., "robo" matches "robot")
     terms = query.strip().split()
     fts_query = ' '.join(f'{term}*' for term in terms if term)
     
     deleted_filter = "AND m.deleted_at IS NULL" if not include_deleted else ""
-    folder_filter = "AND m.folder_path LIKE ?" if folder else ""
+    folder_filter = ""
     
     params = [fts_query]
     if folder:
-        params.append(folder + '%')
-    params.append(limit)
+        folder_sql, folder_params = folder_prefix_filter('m.folder_path', folder)
+        folder_filter = f"AND {folder_sql}"
+        params.extend(folder_params)
     
     with db.connection() as conn:
-        rows = conn.execute(f"""
-            SELECT m.* FROM models m
+        return fetch_page(conn, f"""
+            SELECT m.*, models_fts.rank as rank FROM models m
             JOIN models_fts ON m.id = models_fts.rowid
             WHERE models_fts MATCH ?
             {deleted_filter}
             {folder_filter}
-            LIMIT ?
-        """, params).fetchall()
-        return [dict(row) for row in rows]
+        """, params, [('models_fts.rank', 'rank'), ('m.id', 'id')], limit=limit, cursor=cursor)
 
 
 def get_model_by_id(model_id: int) -> Optional[Dict[str, Any]]:
@@ -524,9 +624,26 @@ def delete_missing_assets(existing_paths: set, soft_delete: bool = True) -> int:
                     conn.execute("DELETE FROM assets WHERE id = ?", (row['id'],))
                 deleted += 1
         conn.commit()
+        if deleted:
+            refresh_folder_nodes(conn, 'asset')
     return deleted
 
 
+def _get_tree_row(conn: sqlite3.Connection, table: str, row_id: int) -> Optional[Dict[str, Any]]:
+    """Fetch a row for folder tree bookkeeping (None if it doesn't exist)."""
+    row = conn.execute(f"SELECT * FROM {table} WHERE id = ?", (row_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def _adjust_folder_tree(conn: sqlite3.Connection, entity_type: str, row: Optional[Dict[str, Any]], delta: int):
+    """Apply a single-row change to folder_nodes. Never fails the caller."""
+    try:
+        ensure_folder_nodes(conn)
+        adjust_for_row(conn, entity_type, row, delta)
+    except sqlite3.Error as e:
+        logger.warning(f"Folder tree update failed for {entity_type} {row and row.get('id')}: {e}")
+
+
 def soft_delete_asset(asset_id: int, source: str = 'api') -> bool:
     """Soft-delete an asset by setting deleted_at timestamp.
     
@@ -542,10 +659,13 @@ def soft_delete_asset(asset_id: int, source: str = 'api') -> bool:
     now = datetime.now().isoformat()
     
     with db.connection() as conn:
+        row = _get_tree_row(conn, 'assets', asset_id)
         cursor = conn.execute(
             "UPDATE assets SET deleted_at = ? WHERE id = ? AND deleted_at IS NULL",
             (now, asset_id)
         )
+        if cursor.rowcount > 0:
+            _adjust_folder_tree(conn, 'asset', row, -1)
         conn.commit()
         
         if cursor.rowcount > 0:
@@ -571,6 +691,8 @@ def restore_asset(asset_id: int, source: str = 'api') -> bool:
             "UPDATE assets SET deleted_at = NULL WHERE id = ? AND deleted_at IS NOT NULL",
             (asset_id,)
         )
+        if cursor.rowcount > 0:
+            _adjust_folder_tree(conn, 'asset', _get_tree_row(conn, 'assets', asset_id), 1)
         conn.commit()
         
         if cursor.rowcount > 0:
@@ -590,12 +712,23 @@ def get_deleted_assets(limit: int = 100) -> List[Dict[str, Any]]:
     Returns:
         List of deleted assets ordered by deletion time (newest first)
     """
-    return get_db().fetchall("""
-        SELECT * FROM assets 
-        WHERE deleted_at IS NOT NULL 
-        ORDER BY deleted_at DESC 
-        LIMIT ?
-    """, (limit,))
+    rows, _ = get_deleted_page('assets', limit=limit)
+    return rows
+
+
+def get_deleted_page(table: str, limit: int = 100, cursor: Optional[str] = None) -> tuple:
+    """Get one page of Trash contents for 'assets' or 'models', newest deletions first.
+    
+    Returns:
+        (items, next_cursor) - next_cursor is None on the last page
+    """
+    if table not in ('assets', 'models'):
+        raise ValueError(f"Unknown table: {table}")
+    
+    with get_db().connection() as conn:
+        return fetch_page(conn, f"SELECT * FROM {table} WHERE deleted_at IS NOT NULL", [],
+                          [('deleted_at', 'deleted_at'), ('id', 'id')],
+                          descending=True, limit=limit, cursor=cursor)
 
 
 def permanently_delete_asset(asset_id: int) -> bool:
@@ -606,11 +739,14 @@ def permanently_delete_asset(asset_id: int) -> bool:
     """
     db = get_db()
     with db.connection() as conn:
+        row = _get_tree_row(conn, 'assets', asset_id)
         # Delete related records first
         conn.execute("DELETE FROM asset_pages WHERE asset_id = ?", (asset_id,))
         conn.execute("DELETE FROM asset_bookmarks WHERE asset_id = ?", (asset_id,))
         # Delete the asset
         cursor = conn.execute("DELETE FROM assets WHERE id = ?", (asset_id,))
+        if cursor.rowcount > 0:
+            _adjust_folder_tree(conn, 'asset', row, -1)
         conn.commit()
         return cursor.rowcount > 0
 
@@ -649,10 +785,13 @@ def soft_delete_model(model_id: int, source: str = 'api') -> bool:
     now = datetime.now().isoformat()
     
     with db.connection() as conn:
+        row = _get_tree_row(conn, 'models', model_id)
         cursor = conn.execute(
             "UPDATE models SET deleted_at = ? WHERE id = ? AND deleted_at IS NULL",
             (now, model_id)
         )
+        if cursor.rowcount > 0:
+            _adjust_folder_tree(conn, 'model', row, -1)
         conn.commit()
         
         if cursor.rowcount > 0:
@@ -673,6 +812,8 @@ def restore_model(model_id: int, source: str = 'api') -> bool:
             "UPDATE models SET deleted_at = NULL WHERE id = ? AND deleted_at IS NOT NULL",
             (model_id,)
         )
+        if cursor.rowcount > 0:
+            _adjust_folder_tree(conn, 'model', _get_tree_row(conn, 'models', model_id), 1)
         conn.commit()
         
         if cursor.rowcount > 0:
@@ -687,12 +828,8 @@ def restore_model(model_id: int, source: str = 'api') -> bool:
 
 def get_deleted_models(limit: int = 100) -> List[Dict[str, Any]]:
     """Get list of soft-deleted models (Trash contents)."""
-    return get_db().fetchall("""
-        SELECT * FROM models 
-        WHERE deleted_at IS NOT NULL 
-        ORDER BY deleted_at DESC 
-        LIMIT ?
-    """, (limit,))
+    rows, _ = get_deleted_page('models', limit=limit)
+    return rows
 
 
 def get_assets_without_text(limit: int = 100) -> List[Dict[str, Any]]:
@@ -2,32 +2,54 @@
 Deduplication system for FantasyFolio assets.
 
 Two-tier approach:
-1. Partial hash collisions → candidates for full hash
+1. Partial hash collisions → groups of candidate files
 2. Full hash verification → true duplicates
 3. Mark as duplicates in database
+
+Verification works per collision group: every file in a group is read
+once with a streaming hash (in a thread pool) and the group is bucketed
+by full hash, instead of re-reading both files of every pair. Full
+hashes are persisted with the mtime/size they were computed from
+(full_hash_mtime/full_hash_size), so later runs only re-read files that
+changed.
+
+Files that do need hashing go through hashing.FullHashEngine (large
+sequential reads, archive members streamed, one ZIP open per archive) and
+the run reports hashing throughput per volume.
+
+Full hashes are computed with FULL_HASH_ALGORITHM; stored hashes with a
+different algorithm tag are recomputed rather than compared. Collision
+groups only contain partial hashes of the same algorithm tag.
 """
 
+import os
 import sqlite3
 import time
-from pathlib import Path
+import zipfile
 from typing import Optional, Dict, List, Tuple
 from dataclasses import dataclass
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
-from fantasyfolio.core.hashing import compute_full_hash, compute_full_hash_from_bytes
-import zipfile
+from fantasyfolio.core.hashing import (
+    FullHashEngine, HashAlgorithm, HashJob,
+    ensure_hash_columns, get_algorithm, hash_tag_sql
+)
 
 
 @dataclass
-class DuplicateCandidate:
-    """Two files with matching partial hash."""
-    file1_id: int
-    file2_id: int
-    file1_name: str
-    file2_name: str
+class CollisionFile:
+    """A file sharing its partial hash with at least one other file."""
+    id: int
+    filename: str
     partial_hash: str
-    file1_path: str
-    file2_path: str
+    file_path: Optional[str]
+    archive_path: Optional[str]
+    archive_member: Optional[str]
+    volume_id: Optional[str] = None
+    full_hash: Optional[str] = None
+    full_hash_mtime: Optional[int] = None
+    full_hash_size: Optional[int] = None
+    full_hash_algo: Optional[str] = None
 
 
 @dataclass
@@ -42,200 +64,165 @@ class DuplicateVerified:
     file_size: int
 
 
-def find_partial_hash_collisions(
+def find_collision_groups(
     db_path: str,
     table: str = 'models'
-) -> List[DuplicateCandidate]:
+) -> List[List[CollisionFile]]:
     """
-    Find all partial hash collisions (candidates for full hash verification).
+    Find all partial hash collisions, grouped by partial hash.
     
     Args:
         db_path: Path to database
         table: 'models' or 'assets'
     
     Returns:
-        List of DuplicateCandidate objects
+        List of groups (2+ files each), largest groups first
     """
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
+    ensure_hash_columns(conn, table)
     
-    candidates = []
+    # assets table doesn't have archive columns
+    archive_cols = (
+        "archive_path, archive_member" if table == 'models'
+        else "NULL AS archive_path, NULL AS archive_member"
+    )
     
-    # Find partial hashes with multiple files
-    collisions = conn.execute(f"""
-        SELECT partial_hash, COUNT(*) as count
+    # Partial hashes only collide within the same algorithm tag
+    partial_tag = hash_tag_sql('partial_hash_algo')
+    rows = conn.execute(f"""
+        SELECT id, filename, partial_hash, {partial_tag} AS partial_tag, file_path, {archive_cols}, volume_id,
+               full_hash, full_hash_mtime, full_hash_size, {hash_tag_sql('full_hash_algo')} AS full_hash_algo
         FROM {table}
-        WHERE partial_hash IS NOT NULL
-        GROUP BY partial_hash
-        HAVING COUNT(*) > 1
-        ORDER BY count DESC, file_size DESC
+        WHERE partial_hash IN (
+            SELECT partial_hash FROM {table}
+            WHERE partial_hash IS NOT NULL
+            GROUP BY partial_hash, {partial_tag}
+            HAVING COUNT(*) > 1
+        )
+        ORDER BY partial_hash, id
     """).fetchall()
+    conn.close()
     
-    print(f"Found {len(collisions)} partial hash collisions")
+    groups: Dict[Tuple[str, str], List[CollisionFile]] = {}
+    for row in rows:
+        row = dict(row)
+        key = (row.pop('partial_tag'), row['partial_hash'])
+        groups.setdefault(key, []).append(CollisionFile(**row))
     
-    for collision in collisions:
-        partial_hash = collision['partial_hash']
-        count = collision['count']
-        
-        # Get all files with this partial hash
-        files = conn.execute(f"""
-            SELECT id, filename, file_path, archive_path, archive_member, file_size
-            FROM {table}
-            WHERE partial_hash = ?
-            ORDER BY file_size DESC, id ASC
-        """, (partial_hash,)).fetchall()
-        
-        # Create pairs for full hash verification
-        for i in range(len(files) - 1):
-            for j in range(i + 1, len(files)):
-                file1 = files[i]
-                file2 = files[j]
-                
-                path1 = file1['archive_path'] if file1['archive_path'] else file1['file_path']
-                path2 = file2['archive_path'] if file2['archive_path'] else file2['file_path']
-                
-                candidates.append(DuplicateCandidate(
-                    file1_id=file1['id'],
-                    file2_id=file2['id'],
-                    file1_name=file1['filename'],
-                    file2_name=file2['filename'],
-                    partial_hash=partial_hash,
-                    file1_path=str(path1),
-                    file2_path=str(path2)
-                ))
+    # Drop groups that only shared a digest across algorithms
+    groups = {key: files for key, files in groups.items() if len(files) > 1}
     
-    conn.close()
-    return candidates
+    print(f"Found {len(groups)} partial hash collisions")
+    return sorted(groups.values(), key=len, reverse=True)
 
 
-def get_file_content(db_path: str, model_id: int, table: str = 'models') -> Optional[bytes]:
+def source_signature(file: CollisionFile) -> Optional[Tuple[int, int]]:
     """
-    Get file content from disk or archive.
-    
-    Args:
-        db_path: Path to database
-        model_id: Model ID
-        table: Table name
+    Current (mtime, size) of a file's content, or None if it can't be read.
     
-    Returns:
-        File content as bytes, or None if file not found
+    Archive members use the archive's mtime and the member's size.
     """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    
-    model = conn.execute(
-        f"SELECT * FROM {table} WHERE id = ?",
-        (model_id,)
-    ).fetchone()
-    conn.close()
-    
-    if not model:
-        return None
-    
     try:
-        # Try archive member first
-        if model['archive_path'] and model['archive_member']:
-            archive_path = Path(model['archive_path'])
-            if archive_path.exists():
-                try:
-                    with zipfile.ZipFile(archive_path, 'r') as zf:
-                        return zf.read(model['archive_member'])
-                except Exception as e:
-                    print(f"  ✗ Failed to read {model_id} from archive: {e}")
-                    return None
+        if file.archive_path and file.archive_member:
+            mtime = int(os.stat(file.archive_path).st_mtime)
+            with zipfile.ZipFile(file.archive_path, 'r') as zf:
+                size = zf.getinfo(file.archive_member).file_size
+            return mtime, size
         
-        # Try direct file
-        if model['file_path']:
-            file_path = Path(model['file_path'])
-            if file_path.exists():
-                return file_path.read_bytes()
-        
-        return None
-    
-    except Exception as e:
-        print(f"  ✗ Error reading file {model_id}: {e}")
-        return None
+        if file.file_path:
+            stat = os.stat(file.file_path)
+            return int(stat.st_mtime), stat.st_size
+    except (OSError, KeyError, zipfile.BadZipFile):
+        pass
+    return None
 
 
-def verify_collision(
-    db_path: str,
-    candidate: DuplicateCandidate,
-    table: str = 'models'
-) -> Optional[DuplicateVerified]:
+def is_reusable(file: CollisionFile, signature: Tuple[int, int], algorithm: HashAlgorithm) -> bool:
+    """True if the stored full hash was computed from this exact content with this algorithm."""
+    return bool(file.full_hash and file.full_hash_algo == algorithm.tag
+                and (file.full_hash_mtime, file.full_hash_size) == signature)
+
+
+def bucket_group(
+    group: List[CollisionFile],
+    hashes: Dict[int, Tuple[str, int]]
+) -> List[DuplicateVerified]:
     """
-    Verify if two files with matching partial hash have same full hash.
+    Split one collision group by full hash into verified duplicates.
     
-    Args:
-        db_path: Path to database
-        candidate: DuplicateCandidate to verify
-        table: Table name
+    In each bucket the lowest ID (first indexed) is kept as primary.
     
-    Returns:
-        DuplicateVerified if files match, None if different
+    Args:
+        group: Files sharing a partial hash
+        hashes: file id → (full_hash, size) for files that could be read
     """
-    # Get content for both files
-    content1 = get_file_content(db_path, candidate.file1_id, table)
-    content2 = get_file_content(db_path, candidate.file2_id, table)
-    
-    if not content1 or not content2:
-        # Can't verify if we can't read files
-        return None
+    buckets: Dict[str, List[CollisionFile]] = {}
+    for file in group:
+        if file.id in hashes:
+            buckets.setdefault(hashes[file.id][0], []).append(file)
     
-    # Compute full hashes
-    full_hash1 = compute_full_hash_from_bytes(content1)
-    full_hash2 = compute_full_hash_from_bytes(content2)
-    
-    # If hashes match, it's a true duplicate
-    if full_hash1 == full_hash2:
-        # Primary is the one that appeared first (lower ID)
-        primary_id = min(candidate.file1_id, candidate.file2_id)
-        duplicate_id = max(candidate.file1_id, candidate.file2_id)
-        
-        primary_name = candidate.file1_name if candidate.file1_id == primary_id else candidate.file2_name
-        duplicate_name = candidate.file2_name if candidate.file1_id == primary_id else candidate.file1_name
-        
-        return DuplicateVerified(
-            primary_id=primary_id,
-            duplicate_id=duplicate_id,
-            primary_name=primary_name,
-            duplicate_name=duplicate_name,
-            partial_hash=candidate.partial_hash,
-            full_hash=full_hash1,
-            file_size=len(content1)
-        )
-    
-    return None
+    duplicates = []
+    for full_hash, files in buckets.items():
+        if len(files) < 2:
+            continue
+        files.sort(key=lambda f: f.id)
+        primary = files[0]
+        for duplicate in files[1:]:
+            duplicates.append(DuplicateVerified(
+                primary_id=primary.id,
+                duplicate_id=duplicate.id,
+                primary_name=primary.filename,
+                duplicate_name=duplicate.filename,
+                partial_hash=primary.partial_hash,
+                full_hash=full_hash,
+                file_size=hashes[duplicate.id][1]
+            ))
+    return duplicates
 
 
 def process_duplicates(
     db_path: str,
     table: str = 'models',
-    callback=None
+    callback=None,
+    workers: Optional[int] = None
 ) -> Dict:
     """
     Find and verify all duplicates.
     
     Process:
-    1. Find partial hash collisions
-    2. Compute full hashes for collisions
+    1. Find partial hash collision groups
+    2. Full-hash each file in the groups once (stored hashes are reused
+       when the file's mtime/size are unchanged)
     3. Mark verified duplicates in database
-    4. Update full_hash column for all checked files
+    4. Persist full_hash (with its algorithm tag and mtime/size) for every
+       hashed file
     
     Args:
         db_path: Path to database
         table: Table name ('models' or 'assets')
         callback: Optional function(checked, total, duplicate) for progress
+        workers: Files read in parallel (default HASH_WORKERS)
     
     Returns:
         Results dict with statistics
     """
+    if workers is None:
+        from fantasyfolio.config import get_config
+        workers = get_config().HASH_WORKERS
+    algorithm = get_algorithm(None, 'full')
+    
     results = {
+        'algorithm': algorithm.tag,
+        'groups_found': 0,
         'candidates_found': 0,
         'candidates_verified': 0,
         'duplicates_found': 0,
         'full_hashes_computed': 0,
+        'full_hashes_reused': 0,
         'full_hashes_updated': 0,
         'errors': 0,
+        'throughput': {},
         'elapsed_seconds': 0,
         'duplicates': []
     }
@@ -244,80 +231,111 @@ def process_duplicates(
     
     # Step 1: Find candidates
     print("\n🔍 Step 1: Finding partial hash collisions...")
-    candidates = find_partial_hash_collisions(db_path, table)
-    results['candidates_found'] = len(candidates)
-    print(f"  Found {len(candidates)} collision pairs to verify\n")
+    groups = find_collision_groups(db_path, table)
+    files = [file for group in groups for file in group]
+    results['groups_found'] = len(groups)
+    results['candidates_found'] = len(files)
+    print(f"  Found {len(files)} files in {len(groups)} collision groups to verify\n")
     
-    if len(candidates) == 0:
+    if not files:
         results['elapsed_seconds'] = time.time() - start_time
         print("  ✓ No collisions found - no duplicates detected")
         return results
     
-    # Step 2: Verify collisions
-    print(f"🔐 Step 2: Computing full hashes for collision verification...")
-    verified_duplicates = []
+    # Step 2: Hash every candidate once
+    print(f"🔐 Step 2: Computing full hashes for collision verification ({algorithm.tag}, {workers} workers)...")
+    hashes: Dict[int, Tuple[str, int]] = {}
+    computed: List[Tuple[str, str, int, int, int]] = []  # (full_hash, tag, mtime, size, id)
+    
+    engine = FullHashEngine(workers, algorithm)
+    jobs = []
+    
+    # Stat everything first (cheap); only changed or unhashed files are read
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        signatures = list(pool.map(_safe_signature, files))
     
-    for i, candidate in enumerate(candidates):
+    for file, signature in zip(files, signatures):
+        if signature is None:
+            results['errors'] += 1
+            print(f"  ✗ Cannot read {file.filename} (ID: {file.id})")
+        elif is_reusable(file, signature, algorithm):
+            results['candidates_verified'] += 1
+            results['full_hashes_reused'] += 1
+            hashes[file.id] = (file.full_hash, signature[1])
+        else:
+            jobs.append(HashJob(
+                key=(file, signature),
+                file_path=file.file_path,
+                archive_path=file.archive_path,
+                archive_member=file.archive_member,
+                volume_id=file.volume_id
+            ))
+    
+    for i, (job, full_hash, error) in enumerate(engine.run(jobs)):
         if callback:
-            callback(i, len(candidates), None)
+            callback(i, len(jobs), None)
         
-        try:
-            verified = verify_collision(db_path, candidate, table)
-            results['full_hashes_computed'] += 2  # Both files hashed
-            
-            if verified:
-                verified_duplicates.append(verified)
-                results['duplicates_found'] += 1
-                print(f"  ✓ [{i+1}/{len(candidates)}] Duplicate found:")
-                print(f"    Keep: {verified.primary_name} (ID: {verified.primary_id})")
-                print(f"    Mark: {verified.duplicate_name} (ID: {verified.duplicate_id})")
-                print(f"    Hash: {verified.full_hash[:16]}... ({verified.file_size / (1024*1024):.1f}MB)")
-        
-        except Exception as e:
+        file, signature = job.key
+        if full_hash is None:
             results['errors'] += 1
-            print(f"  ✗ Error verifying candidate {i+1}: {e}")
+            print(f"  ✗ Cannot read {file.filename} (ID: {file.id}){f': {error}' if error else ''}")
+            continue
+        
+        results['candidates_verified'] += 1
+        results['full_hashes_computed'] += 1
+        hashes[file.id] = (full_hash, signature[1])
+        computed.append((full_hash, algorithm.tag, signature[0], signature[1], file.id))
+    
+    results['throughput'] = engine.volume_stats()
+    for volume_id, stats in results['throughput'].items():
+        print(f"  📊 Volume {volume_id}: {stats['files']} files, "
+              f"{stats['bytes'] / (1024*1024):.1f}MB at {stats['mb_per_second']} MB/s per worker")
     
-    print(f"\n  ✓ Full hash verification complete")
+    verified_duplicates = []
+    for group in groups:
+        verified_duplicates.extend(bucket_group(group, hashes))
+    results['duplicates_found'] = len(verified_duplicates)
+    
+    for verified in verified_duplicates:
+        print(f"  ✓ Duplicate found:")
+        print(f"    Keep: {verified.primary_name} (ID: {verified.primary_id})")
+        print(f"    Mark: {verified.duplicate_name} (ID: {verified.duplicate_id})")
+        print(f"    Hash: {verified.full_hash[:16]}... ({verified.file_size / (1024*1024):.1f}MB)")
+    
+    print(f"\n  ✓ Full hash verification complete "
+          f"({results['full_hashes_computed']} computed, {results['full_hashes_reused']} reused)")
     print(f"  Found {results['duplicates_found']} true duplicates\n")
     
     # Step 3: Update database with results
-    if verified_duplicates:
+    if computed or verified_duplicates:
         print(f"💾 Step 3: Updating database...")
         conn = sqlite3.connect(db_path)
         
-        for duplicate in verified_duplicates:
-            try:
-                conn.execute(f"""
-                    UPDATE {table}
-                    SET full_hash = ?,
-                        is_duplicate = 1,
-                        duplicate_of_id = ?
-                    WHERE id = ?
-                """, (
-                    duplicate.full_hash,
-                    duplicate.primary_id,
-                    duplicate.duplicate_id
-                ))
-                
-                # Also update primary with full_hash
-                conn.execute(f"""
-                    UPDATE {table}
-                    SET full_hash = ?
-                    WHERE id = ? AND full_hash IS NULL
-                """, (
-                    duplicate.full_hash,
-                    duplicate.primary_id
-                ))
-                
-                results['full_hashes_updated'] += 2
+        try:
+            conn.executemany(f"""
+                UPDATE {table}
+                SET full_hash = ?,
+                    full_hash_algo = ?,
+                    full_hash_mtime = ?,
+                    full_hash_size = ?
+                WHERE id = ?
+            """, computed)
+            results['full_hashes_updated'] = len(computed)
             
-            except Exception as e:
-                results['errors'] += 1
-                print(f"  ✗ Error updating {duplicate.duplicate_id}: {e}")
-        
-        conn.commit()
-        conn.close()
-        print(f"  ✓ Database updated\n")
+            conn.executemany(f"""
+                UPDATE {table}
+                SET is_duplicate = 1,
+                    duplicate_of_id = ?
+                WHERE id = ?
+            """, [(d.primary_id, d.duplicate_id) for d in verified_duplicates])
+            
+            conn.commit()
+            print(f"  ✓ Database updated\n")
+        except Exception as e:
+            results['errors'] += 1
+            print(f"  ✗ Error updating database: {e}")
+        finally:
+            conn.close()
     
     results['elapsed_seconds'] = time.time() - start_time
     results['duplicates'] = [
@@ -333,3 +351,11 @@ def process_duplicates(
     ]
     
     return results
+
+
+def _safe_signature(file: CollisionFile) -> Optional[Tuple[int, int]]:
+    """source_signature() for the worker pool; errors count as unreadable."""
+    try:
+        return source_signature(file)
+    except Exception:
+        return None
@@ -0,0 +1,229 @@
+"""
+Directory manifest for incremental rescans.
+
+A rescan used to list and stat every file under the scanned path, even
+when almost nothing had changed. The `directory_manifest` table records,
+per scanned directory, its mtime, entry count and when it was last
+listed. A directory's mtime changes whenever an entry is added, removed
+or renamed in it, so on the next scan a directory whose mtime still
+matches is not listed at all: its files are skipped with the one stat()
+of the directory, and the walk continues into the subdirectories known
+from the manifest (each again a single stat()).
+
+Changes the mtime can't show are caught by:
+- a deep verification pass: a directory not fully listed for
+  DIR_MANIFEST_DEEP_SCAN_DAYS is listed again (0 disables pruning)
+- force scans, which list everything and refresh the manifest
+- "racy" mtimes: a directory modified within RACY_SECONDS of being
+  listed is stored without an mtime and listed again next time, as
+  coarse NAS timestamps could otherwise hide a change made mid-scan
+"""
+
+import os
+import time
+import logging
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Set
+
+from fantasyfolio.config import get_config
+
+logger = logging.getLogger(__name__)
+
+DIR_MANIFEST_SQL = """
+CREATE TABLE IF NOT EXISTS directory_manifest(
+  entity_type TEXT NOT NULL, -- 'model' or 'asset'
+  root_id TEXT NOT NULL, -- volume id (models), asset location id or '' (PDFs)
+  dir_path TEXT NOT NULL, -- absolute directory path
+  dir_mtime_ns INTEGER, -- NULL = not trusted, list again on the next scan
+  entry_count INTEGER NOT NULL DEFAULT 0, -- files + subdirectories (hidden excluded)
+  last_scan_at TEXT, -- last full listing
+  PRIMARY KEY(entity_type, root_id, dir_path)
+);
+"""
+
+# Directories modified this close to a listing keep no mtime (see module doc)
+RACY_SECONDS = 2.0
+
+# Database files whose schema has been checked (in-memory databases are always checked)
+_schema_ready = set()
+
+
+def _database_file(conn: sqlite3.Connection) -> str:
+    """Path of the connection's main database ('' for in-memory/temporary)."""
+    for row in conn.execute("PRAGMA database_list").fetchall():
+        if row[1] == 'main':
+            return row[2] or ''
+    return ''
+
+
+def ensure_dir_manifest(conn: sqlite3.Connection):
+    """Create the directory_manifest table on databases that predate it."""
+    db_file = _database_file(conn)
+    if db_file and db_file in _schema_ready:
+        return
+
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='directory_manifest'"
+    ).fetchone()
+    if not exists:
+        logger.info("Creating directory_manifest table (incremental rescans)")
+        conn.executescript(DIR_MANIFEST_SQL)
+    if db_file:
+        _schema_ready.add(db_file)
+
+
+@dataclass
+class ManifestEntry:
+    dir_mtime_ns: Optional[int]
+    entry_count: int
+    last_scan_at: Optional[str]
+
+
+@dataclass
+class DirVisit:
+    """One directory reached by DirectoryManifest.walk()."""
+    path: str
+    files: Optional[List[str]]  # None = unchanged, not listed
+    entry_count: int
+
+
+class DirectoryManifest:
+    """
+    Walk a directory tree, skipping directories unchanged since the last scan.
+
+    Manifest rows are written on the caller's connection as directories
+    are listed; the caller commits.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        entity_type: str,
+        root_id: Optional[str],
+        root: str,
+        force: bool = False,
+        deep_scan_days: Optional[float] = None
+    ):
+        ensure_dir_manifest(conn)
+        self.conn = conn
+        self.entity_type = entity_type
+        self.root_id = root_id or ''
+        self.root = os.path.normpath(str(root))
+        self.force = force
+
+        if deep_scan_days is None:
+            deep_scan_days = get_config().DIR_MANIFEST_DEEP_SCAN_DAYS
+        if deep_scan_days <= 0:
+            self.force = True
+        self.deep_cutoff = (datetime.now() - timedelta(days=deep_scan_days)).isoformat() if deep_scan_days > 0 else None
+
+        self.stats = {'dirs_listed': 0, 'dirs_pruned': 0, 'entries_pruned': 0}
+        self._entries: Dict[str, ManifestEntry] = {}
+        self._children: Dict[str, Set[str]] = {}
+        self._load()
+
+    def _load(self):
+        rows = self.conn.execute("""
+            SELECT dir_path, dir_mtime_ns, entry_count, last_scan_at FROM directory_manifest
+            WHERE entity_type = ? AND root_id = ? AND (dir_path = ? OR dir_path LIKE ?)
+        """, (self.entity_type, self.root_id, self.root, self.root.rstrip('/') + '/%')).fetchall()
+        for dir_path, mtime, count, last_scan in rows:
+            self._entries[dir_path] = ManifestEntry(mtime, count, last_scan)
+            if dir_path != self.root:
+                self._children.setdefault(os.path.dirname(dir_path), set()).add(dir_path)
+
+    def _unchanged(self, entry: Optional[ManifestEntry], stat: os.stat_result) -> bool:
+        if self.force or entry is None or entry.dir_mtime_ns is None:
+            return False
+        if self.deep_cutoff and (entry.last_scan_at or '') < self.deep_cutoff:
+            return False  # Due for deep verification
+        return entry.dir_mtime_ns == stat.st_mtime_ns
+
+    def _record(self, dir_path: str, stat: os.stat_result, entry_count: int, subdirs: List[str], listed_at: float):
+        trusted = listed_at - stat.st_mtime_ns / 1e9 > RACY_SECONDS
+        self.conn.execute("""
+            INSERT INTO directory_manifest (entity_type, root_id, dir_path, dir_mtime_ns, entry_count, last_scan_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(entity_type, root_id, dir_path) DO UPDATE SET
+                dir_mtime_ns = excluded.dir_mtime_ns,
+                entry_count = excluded.entry_count,
+                last_scan_at = excluded.last_scan_at
+        """, (self.entity_type, self.root_id, dir_path, stat.st_mtime_ns if trusted else None,
+              entry_count, datetime.now().isoformat()))
+
+        # Subdirectories that disappeared since the last listing
+        known = self._children.get(dir_path, set())
+        for gone in known - set(subdirs):
+            self.forget(gone)
+
+        # New subdirectories get a placeholder (no mtime) so they are listed
+        # even if this scan stops before reaching them
+        self.conn.executemany("""
+            INSERT OR IGNORE INTO directory_manifest (entity_type, root_id, dir_path, entry_count)
+            VALUES (?, ?, ?, 0)
+        """, [(self.entity_type, self.root_id, subdir) for subdir in subdirs if subdir not in known])
+        self._children[dir_path] = set(subdirs)
+
+    def forget(self, dir_path: str):
+        """Drop a directory (and everything below it) from the manifest."""
+        self.conn.execute("""
+            DELETE FROM directory_manifest
+            WHERE entity_type = ? AND root_id = ? AND (dir_path = ? OR dir_path LIKE ?)
+        """, (self.entity_type, self.root_id, dir_path, dir_path.rstrip('/') + '/%'))
+
+    def walk(self, recursive: bool = True) -> Iterator[DirVisit]:
+        """
+        Yield every directory under the root, depth first.
+
+        Listed directories carry their (non-hidden) files; unchanged ones
+        have files=None. A directory is recorded in the manifest once the
+        caller has consumed its visit, so an interrupted scan re-lists it.
+        """
+        stack = [self.root]
+        seen = set()
+
+        while stack:
+            dir_path = stack.pop()
+            try:
+                stat = os.stat(dir_path)
+            except OSError:
+                self.forget(dir_path)
+                continue
+            if (stat.st_dev, stat.st_ino) in seen:
+                continue  # Symlink loop
+            seen.add((stat.st_dev, stat.st_ino))
+
+            entry = self._entries.get(dir_path)
+            if self._unchanged(entry, stat):
+                self.stats['dirs_pruned'] += 1
+                self.stats['entries_pruned'] += entry.entry_count
+                yield DirVisit(dir_path, None, entry.entry_count)
+                subdirs = list(self._children.get(dir_path, ()))
+            else:
+                listed_at = time.time()
+                files, subdirs = [], []
+                try:
+                    with os.scandir(dir_path) as it:
+                        for item in it:
+                            if item.name.startswith('.'):
+                                continue
+                            try:
+                                if item.is_dir():
+                                    subdirs.append(item.path)
+                                elif item.is_file():
+                                    files.append(item.path)
+                            except OSError:
+                                continue
+                except OSError as e:
+                    logger.warning(f"Cannot list {dir_path}: {e}")
+                    continue
+
+                self.stats['dirs_listed'] += 1
+                files.sort()
+                yield DirVisit(dir_path, files, len(files) + len(subdirs))
+                self._record(dir_path, stat, len(files) + len(subdirs), subdirs, listed_at)
+
+            if recursive:
+                stack.extend(sorted(subdirs, reverse=True))
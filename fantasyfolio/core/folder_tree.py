@@ -0,0 +1,353 @@
+"""
+Materialized folder tree for FantasyFolio.
+
+The sidebar folder trees used to be rebuilt on every request from a
+GROUP BY over every model/asset row. This module keeps a `folder_nodes`
+table instead: one row per (entity type, volume, folder) holding the
+direct count and the rolled-up subtree count. The volume root is stored
+as the node with folder_path = ''.
+
+Maintenance:
+- adjust_folder_counts(): O(depth) incremental update for single-row
+  changes (trash, restore, permanent delete, purge)
+- rebuild_folder_nodes(): full recompute for one entity type / volume,
+  called at the end of bulk indexing runs
+"""
+
+import sqlite3
+import logging
+from typing import Optional, List, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# entity_type -> (table, extra predicate for rows that appear in the tree)
+ENTITY_TABLES = {
+    'model': ('models', "format != 'unsupported'"),
+    'asset': ('assets', "1=1"),
+}
+
+FOLDER_NODES_SQL = """
+CREATE TABLE IF NOT EXISTS folder_nodes(
+  entity_type TEXT NOT NULL, -- 'model' or 'asset'
+  volume_id TEXT NOT NULL,
+  folder_path TEXT NOT NULL, -- '' for the volume root
+  parent_path TEXT, -- NULL for the volume root
+  name TEXT NOT NULL,
+  depth INTEGER NOT NULL, -- 0 for the volume root
+  direct_count INTEGER NOT NULL DEFAULT 0,
+  total_count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY(entity_type, volume_id, folder_path)
+);
+
+CREATE INDEX IF NOT EXISTS idx_folder_nodes_parent ON folder_nodes(entity_type, volume_id, parent_path);
+"""
+
+# Database files whose schema has been checked (in-memory databases are always checked)
+_schema_ready = set()
+
+
+def _database_file(conn: sqlite3.Connection) -> str:
+    """Path of the connection's main database ('' for in-memory/temporary)."""
+    for row in conn.execute("PRAGMA database_list").fetchall():
+        if row[1] == 'main':
+            return row[2] or ''
+    return ''
+
+
+def ensure_folder_nodes(conn: sqlite3.Connection):
+    """
+    Create the folder_nodes table on databases that predate it, and backfill it.
+
+    Runs inside the caller's transaction if one is open (executescript()
+    would commit it); commits only when called outside a transaction.
+    """
+    db_file = _database_file(conn)
+    if db_file and db_file in _schema_ready:
+        return
+
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='folder_nodes'"
+    ).fetchone()
+    if not exists:
+        logger.info("Creating folder_nodes table (materialized folder tree)")
+        owns_transaction = not conn.in_transaction
+        for statement in FOLDER_NODES_SQL.split(';'):
+            if statement.strip():
+                conn.execute(statement)
+        for entity_type in ENTITY_TABLES:
+            rebuild_folder_nodes(conn, entity_type)
+        if owns_transaction:
+            conn.commit()
+    if db_file:
+        _schema_ready.add(db_file)
+
+
+def _node_chain(folder_path: Optional[str]) -> List[str]:
+    """Return the folder itself plus all its ancestors, root ('') first."""
+    chain = ['']
+    if not folder_path:
+        return chain
+    parts = folder_path.split('/')
+    for i in range(1, len(parts) + 1):
+        path = '/'.join(parts[:i])
+        if path and path not in chain:
+            chain.append(path)
+    return chain
+
+
+def _parent_of(folder_path: str) -> Optional[str]:
+    if folder_path == '':
+        return None
+    return folder_path.rsplit('/', 1)[0] if '/' in folder_path else ''
+
+
+def _node_values(entity_type: str, volume_id: str, folder_path: str) -> tuple:
+    """(entity_type, volume_id, folder_path, parent_path, name, depth)."""
+    if folder_path == '':
+        return (entity_type, volume_id, '', None, '', 0)
+    return (
+        entity_type, volume_id, folder_path, _parent_of(folder_path),
+        folder_path.split('/')[-1], folder_path.count('/') + 1
+    )
+
+
+def counts_toward_tree(entity_type: str, row: Dict[str, Any]) -> bool:
+    """Whether a model/asset row is counted in the folder tree."""
+    if not row or not row.get('volume_id') or row.get('deleted_at'):
+        return False
+    if entity_type == 'model':
+        return row.get('format') is not None and row.get('format') != 'unsupported'
+    return True
+
+
+def adjust_folder_counts(
+    conn: sqlite3.Connection,
+    entity_type: str,
+    volume_id: Optional[str],
+    folder_path: Optional[str],
+    delta: int
+):
+    """
+    Add `delta` items to a folder and all of its ancestors.
+
+    Nodes whose subtree count drops to zero are removed. Does not commit.
+    """
+    if not volume_id or not delta:
+        return
+
+    chain = _node_chain(folder_path)
+    leaf = chain[-1]
+
+    conn.executemany("""
+        INSERT INTO folder_nodes (
+            entity_type, volume_id, folder_path, parent_path, name, depth,
+            direct_count, total_count
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(entity_type, volume_id, folder_path) DO UPDATE SET
+            direct_count = direct_count + excluded.direct_count,
+            total_count = total_count + excluded.total_count
+    """, [
+        _node_values(entity_type, volume_id, path) + (delta if path == leaf else 0, delta)
+        for path in chain
+    ])
+
+    if delta < 0:
+        placeholders = ','.join('?' * len(chain))
+        conn.execute(f"""
+            DELETE FROM folder_nodes
+            WHERE entity_type = ? AND volume_id = ? AND total_count <= 0
+            AND folder_path IN ({placeholders})
+        """, [entity_type, volume_id] + chain)
+
+
+def adjust_for_row(conn: sqlite3.Connection, entity_type: str, row: Dict[str, Any], delta: int):
+    """Apply adjust_folder_counts() for a model/asset row, if it is counted in the tree."""
+    if counts_toward_tree(entity_type, row):
+        adjust_folder_counts(conn, entity_type, row['volume_id'], row.get('folder_path'), delta)
+
+
+def rebuild_folder_nodes(conn: sqlite3.Connection, entity_type: str, volume_id: Optional[str] = None) -> int:
+    """
+    Recompute folder nodes from the base table.
+
+    One GROUP BY over the table (or a single volume), rolled up in Python.
+    Does not commit.
+
+    Returns:
+        Number of nodes written
+    """
+    table, predicate = ENTITY_TABLES[entity_type]
+
+    query = f"""
+        SELECT volume_id, COALESCE(folder_path, '') as folder_path, COUNT(*) as count
+        FROM {table}
+        WHERE volume_id IS NOT NULL AND deleted_at IS NULL AND {predicate}
+    """
+    params = []
+    if volume_id:
+        query += " AND volume_id = ?"
+        params.append(volume_id)
+    query += " GROUP BY volume_id, COALESCE(folder_path, '')"
+
+    nodes = {}  # (volume_id, folder_path) -> [direct, total]
+    for row in conn.execute(query, params):
+        vol, folder, count = row[0], row[1], row[2]
+        chain = _node_chain(folder)
+        for path in chain:
+            node = nodes.setdefault((vol, path), [0, 0])
+            node[1] += count
+        nodes[(vol, chain[-1])][0] += count
+
+    if volume_id:
+        conn.execute(
+            "DELETE FROM folder_nodes WHERE entity_type = ? AND volume_id = ?",
+            (entity_type, volume_id)
+        )
+    else:
+        conn.execute("DELETE FROM folder_nodes WHERE entity_type = ?", (entity_type,))
+
+    conn.executemany("""
+        INSERT INTO folder_nodes (
+            entity_type, volume_id, folder_path, parent_path, name, depth,
+            direct_count, total_count
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        _node_values(entity_type, vol, path) + (direct, total)
+        for (vol, path), (direct, total) in nodes.items()
+    ])
+
+    logger.debug(f"Rebuilt {len(nodes)} folder nodes for {entity_type}s" + (f" on volume {volume_id}" if volume_id else ""))
+    return len(nodes)
+
+
+def refresh_folder_nodes(conn: sqlite3.Connection, entity_type: str, volume_id: Optional[str] = None):
+    """Rebuild folder nodes after a bulk write and commit. Never raises."""
+    try:
+        ensure_folder_nodes(conn)
+        rebuild_folder_nodes(conn, entity_type, volume_id)
+        conn.commit()
+    except sqlite3.Error as e:
+        logger.warning(f"Folder tree refresh failed for {entity_type}s: {e}")
+
+
+def _flat_entry(node: Dict[str, Any], has_children: bool) -> Dict[str, Any]:
+    """Shape a node the way the sidebar expects it."""
+    volume_label = node['volume_label']
+    if node['folder_path'] == '':
+        return {
+            'volume_id': node['volume_id'],
+            'volume_label': volume_label,
+            'folder_path': None,
+            'path': volume_label,
+            'name': volume_label,
+            'count': node['total_count'],
+            'depth': 0,
+            'hasChildren': has_children,
+            'query_param': 'volume_id',
+            'query_value': node['volume_id']
+        }
+    return {
+        'volume_id': node['volume_id'],
+        'volume_label': volume_label,
+        'folder_path': node['folder_path'],
+        'path': f"{volume_label}/{node['folder_path']}",
+        'name': node['name'],
+        'count': node['total_count'],
+        'depth': node['depth'],
+        'hasChildren': has_children,
+        'query_param': 'folder',
+        'query_value': node['folder_path']
+    }
+
+
+def build_folder_tree(conn: sqlite3.Connection, entity_type: str, max_depth: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Build the sidebar tree ({'tree': nested, 'flat': list}) from folder_nodes.
+
+    Args:
+        entity_type: 'model' or 'asset'
+        max_depth: Only return nodes up to this depth (0 = volumes only);
+                   deeper levels can be fetched with list_folder_children()
+    """
+    ensure_folder_nodes(conn)
+
+    query = """
+        SELECT n.*, v.label as volume_label
+        FROM folder_nodes n
+        JOIN volumes v ON v.id = n.volume_id
+        WHERE n.entity_type = ? AND n.total_count > 0
+    """
+    params = [entity_type]
+    if max_depth is not None:
+        query += " AND n.depth <= ?"
+        params.append(max_depth)
+    query += " ORDER BY v.label, n.volume_id, n.folder_path"
+
+    nodes = [dict(row) for row in conn.execute(query, params).fetchall()]
+
+    # A node has children if any node names it as parent (or, at the
+    # depth cutoff, if the stored tree says so)
+    parents = {(n['volume_id'], n['parent_path']) for n in nodes if n['parent_path'] is not None}
+    if max_depth is not None:
+        cutoff = [n for n in nodes if n['depth'] == max_depth]
+        for n in cutoff:
+            if _has_children(conn, entity_type, n['volume_id'], n['folder_path']):
+                parents.add((n['volume_id'], n['folder_path']))
+
+    tree = {}
+    flat = []
+    for node in nodes:
+        key = (node['volume_id'], node['folder_path'])
+        flat.append(_flat_entry(node, key in parents))
+
+        if node['folder_path'] == '':
+            tree[node['volume_label']] = {
+                '_volume_id': node['volume_id'],
+                '_count': node['total_count'],
+                '_children': {}
+            }
+            continue
+
+        volume_tree = tree.get(node['volume_label'])
+        if volume_tree is None:
+            continue
+        current = volume_tree['_children']
+        parts = node['folder_path'].split('/')
+        for part in parts[:-1]:
+            current = current.setdefault(part, {'_count': 0, '_children': {}})['_children']
+        current.setdefault(parts[-1], {'_count': 0, '_children': {}})['_count'] = node['total_count']
+
+    return {'tree': tree, 'flat': flat}
+
+
+def _has_children(conn: sqlite3.Connection, entity_type: str, volume_id: str, folder_path: str) -> bool:
+    return conn.execute("""
+        SELECT 1 FROM folder_nodes
+        WHERE entity_type = ? AND volume_id = ? AND parent_path = ? AND total_count > 0
+        LIMIT 1
+    """, (entity_type, volume_id, folder_path)).fetchone() is not None
+
+
+def list_folder_children(
+    conn: sqlite3.Connection,
+    entity_type: str,
+    volume_id: str,
+    parent_path: str = ''
+) -> List[Dict[str, Any]]:
+    """Return one level of the tree (children of `parent_path` on a volume), for lazy loading."""
+    ensure_folder_nodes(conn)
+
+    rows = conn.execute("""
+        SELECT n.*, v.label as volume_label,
+               EXISTS(
+                   SELECT 1 FROM folder_nodes c
+                   WHERE c.entity_type = n.entity_type AND c.volume_id = n.volume_id
+                   AND c.parent_path = n.folder_path AND c.total_count > 0
+               ) as has_children
+        FROM folder_nodes n
+        JOIN volumes v ON v.id = n.volume_id
+        WHERE n.entity_type = ? AND n.volume_id = ? AND n.parent_path = ? AND n.total_count > 0
+        ORDER BY n.folder_path
+    """, (entity_type, volume_id, parent_path)).fetchall()
+
+    return [_flat_entry(dict(row), bool(row['has_children'])) for row in rows]
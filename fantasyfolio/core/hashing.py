@@ -3,31 +3,132 @@ Partial hash computation for asset identity.
 
 Uses first 64KB + last 64KB + file size to create a fast content fingerprint.
 ~99.9% reliable for identifying unique files. Fast enough for real-time scanning.
+
+The digest algorithm is pluggable (see HASH ALGORITHMS below). Each stored
+hash is tagged with the algorithm that produced it ("name:version" in
+partial_hash_algo / full_hash_algo; NULL means the original md5:1), so
+hashes are only ever compared with hashes of the same tag and rows with
+an outdated tag are rehashed lazily by batch_compute_hashes.
 """
 
+import os
+import time
 import hashlib
+import logging
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 import zipfile
 import io
 
+logger = logging.getLogger(__name__)
+
 CHUNK_SIZE = 64 * 1024  # 64KB
 
 
-def compute_partial_hash(file_path: Path) -> str:
+# ═══════════════════════════════════════════════════════════════════════════
+# HASH ALGORITHMS
+# ═══════════════════════════════════════════════════════════════════════════
+
+@dataclass(frozen=True)
+class HashAlgorithm:
+    """A digest algorithm hashes can be computed with."""
+    name: str
+    version: int
+    new: Callable[[], object]  # Returns a hashlib-style object (update/hexdigest)
+    
+    @property
+    def tag(self) -> str:
+        """Value stored in partial_hash_algo / full_hash_algo."""
+        return f"{self.name}:{self.version}"
+
+
+# Tag of hashes stored before algorithms were tagged (NULL in the database)
+LEGACY_HASH_TAG = 'md5:1'
+
+_algorithms: Dict[str, HashAlgorithm] = {}
+
+
+def register_algorithm(algorithm: HashAlgorithm):
+    """Make an algorithm selectable by name (replaces any with the same name)."""
+    _algorithms[algorithm.name] = algorithm
+
+
+def available_algorithms() -> List[str]:
+    """Names of the registered algorithms."""
+    return sorted(_algorithms)
+
+
+def get_algorithm(algorithm: Union[str, HashAlgorithm, None] = None, kind: str = 'partial') -> HashAlgorithm:
+    """
+    Resolve an algorithm name or tag.
+    
+    Args:
+        algorithm: Name ("blake2b"), tag ("blake2b:1"), an algorithm, or
+            None for the configured PARTIAL_/FULL_HASH_ALGORITHM
+        kind: 'partial' or 'full' (which setting None refers to)
+    
+    Raises:
+        ValueError: Unknown algorithm, or its optional package isn't installed
+    """
+    if isinstance(algorithm, HashAlgorithm):
+        return algorithm
+    
+    if algorithm is None:
+        from fantasyfolio.config import get_config
+        config = get_config()
+        algorithm = config.FULL_HASH_ALGORITHM if kind == 'full' else config.PARTIAL_HASH_ALGORITHM
+    
+    name = algorithm.split(':', 1)[0].lower()
+    if name not in _algorithms:
+        raise ValueError(f"Unknown hash algorithm '{algorithm}' "
+                         f"(available: {', '.join(available_algorithms())})")
+    return _algorithms[name]
+
+
+def hash_tag_sql(column: str) -> str:
+    """SQL expression for a row's hash tag, treating NULL as the legacy tag."""
+    return f"COALESCE({column}, '{LEGACY_HASH_TAG}')"
+
+
+register_algorithm(HashAlgorithm('md5', 1, hashlib.md5))
+register_algorithm(HashAlgorithm('sha256', 1, hashlib.sha256))
+register_algorithm(HashAlgorithm('blake2b', 1, lambda: hashlib.blake2b(digest_size=32)))
+
+# Optional faster algorithms
+try:
+    import xxhash
+    register_algorithm(HashAlgorithm('xxh3', 1, xxhash.xxh3_128))
+except ImportError:
+    pass
+
+try:
+    import blake3
+    register_algorithm(HashAlgorithm('blake3', 1, blake3.blake3))
+except ImportError:
+    pass
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PARTIAL HASHES
+# ═══════════════════════════════════════════════════════════════════════════
+
+def compute_partial_hash(file_path: Path, algorithm=None) -> str:
     """
     Compute partial hash for a standalone file.
     
-    Algorithm: MD5(first_64KB + last_64KB + str(size))
+    Algorithm: H(first_64KB + last_64KB + str(size))
     
     Args:
         file_path: Path to file
+        algorithm: Algorithm name/tag (default PARTIAL_HASH_ALGORITHM)
     
     Returns:
         Hex digest string
     """
     size = file_path.stat().st_size
-    hasher = hashlib.md5()
+    hasher = get_algorithm(algorithm).new()
     
     with open(file_path, 'rb') as f:
         # First chunk
@@ -47,18 +148,19 @@ def compute_partial_hash(file_path: Path) -> str:
     return hasher.hexdigest()
 
 
-def compute_partial_hash_from_bytes(data: bytes) -> str:
+def compute_partial_hash_from_bytes(data: bytes, algorithm=None) -> str:
     """
     Compute partial hash from bytes (for archive members).
     
     Args:
         data: File content as bytes
+        algorithm: Algorithm name/tag (default PARTIAL_HASH_ALGORITHM)
     
     Returns:
         Hex digest string
     """
     size = len(data)
-    hasher = hashlib.md5()
+    hasher = get_algorithm(algorithm).new()
     
     # First chunk
     hasher.update(data[:CHUNK_SIZE])
@@ -75,9 +177,45 @@ def compute_partial_hash_from_bytes(data: bytes) -> str:
     return hasher.hexdigest()
 
 
+def compute_partial_hash_from_member(zf: zipfile.ZipFile, member_name: str, algorithm=None) -> Tuple[str, int]:
+    """
+    Compute partial hash for a member of an open ZIP archive.
+    
+    Streams only the chunks the hash needs (same result as
+    compute_partial_hash_from_bytes on the whole member).
+    
+    Args:
+        zf: Open archive
+        member_name: Name of member within archive
+        algorithm: Algorithm name/tag (default PARTIAL_HASH_ALGORITHM)
+    
+    Returns:
+        (hex digest, member size)
+    """
+    size = zf.getinfo(member_name).file_size
+    hasher = get_algorithm(algorithm).new()
+    
+    with zf.open(member_name) as f:
+        # First chunk
+        hasher.update(f.read(CHUNK_SIZE))
+        
+        # Last chunk
+        if size > CHUNK_SIZE * 2:
+            f.seek(size - CHUNK_SIZE)
+            hasher.update(f.read(CHUNK_SIZE))
+        elif size > CHUNK_SIZE:
+            hasher.update(f.read())
+    
+    # Include size
+    hasher.update(str(size).encode())
+    
+    return hasher.hexdigest(), size
+
+
 def compute_partial_hash_from_archive(
     archive_path: Path,
-    member_name: str
+    member_name: str,
+    algorithm=None
 ) -> Optional[str]:
     """
     Compute partial hash for a file inside a ZIP archive.
@@ -85,218 +223,484 @@ def compute_partial_hash_from_archive(
     Args:
         archive_path: Path to ZIP file
         member_name: Name of member within archive
+        algorithm: Algorithm name/tag (default PARTIAL_HASH_ALGORITHM)
     
     Returns:
         Hex digest string, or None if member not found
     """
     try:
         with zipfile.ZipFile(archive_path, 'r') as zf:
-            data = zf.read(member_name)
-            return compute_partial_hash_from_bytes(data)
+            return compute_partial_hash_from_member(zf, member_name, algorithm)[0]
     except (KeyError, zipfile.BadZipFile):
         return None
 
 
-def compute_full_hash(file_path: Path, chunk_size: int = 8192) -> str:
+# ═══════════════════════════════════════════════════════════════════════════
+# FULL HASHES
+# ═══════════════════════════════════════════════════════════════════════════
+
+# Read size for full hashes (large sequential reads, see _hash_file)
+FULL_HASH_READ_SIZE = 4 * 1024 * 1024
+
+
+def _fadvise(fd: int, advice_name: str):
+    """posix_fadvise over the whole file, where the platform supports it."""
+    advice = getattr(os, advice_name, None)
+    if advice is not None and hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fd, 0, 0, advice)
+        except OSError:
+            pass
+
+
+def _hash_file(file_path: Path, hasher, read_size: int = FULL_HASH_READ_SIZE) -> int:
+    """
+    Feed a whole file into `hasher`; returns the number of bytes read.
+    
+    Reads go straight into one reusable buffer (no per-chunk allocations),
+    the kernel is told the access is sequential so it reads ahead, and the
+    pages are dropped afterwards so a library-wide hash doesn't evict the
+    rest of the page cache. hashlib releases the GIL on large updates, so
+    several files hash in parallel across threads.
+    """
+    buffer = bytearray(read_size)
+    view = memoryview(buffer)
+    total = 0
+    
+    with open(file_path, 'rb', buffering=0) as f:
+        fd = f.fileno()
+        _fadvise(fd, 'POSIX_FADV_SEQUENTIAL')
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            hasher.update(view[:n])
+            total += n
+        _fadvise(fd, 'POSIX_FADV_DONTNEED')
+    
+    return total
+
+
+def _hash_member(zf: zipfile.ZipFile, member_name: str, hasher, read_size: int = FULL_HASH_READ_SIZE) -> int:
+    """Stream a ZIP member into `hasher` without materialising it; returns bytes hashed."""
+    total = 0
+    with zf.open(member_name) as f:
+        while chunk := f.read(read_size):
+            hasher.update(chunk)
+            total += len(chunk)
+    return total
+
+
+def compute_full_hash(file_path: Path, chunk_size: int = FULL_HASH_READ_SIZE, algorithm=None) -> str:
     """
-    Compute full MD5 hash of a file.
+    Compute full hash of a file.
     Use sparingly - slow for large files.
     
     Args:
         file_path: Path to file
-        chunk_size: Read chunk size
+        chunk_size: Read size
+        algorithm: Algorithm name/tag (default FULL_HASH_ALGORITHM)
     
     Returns:
         Hex digest string
     """
-    hasher = hashlib.md5()
+    hasher = get_algorithm(algorithm, 'full').new()
+    _hash_file(file_path, hasher, chunk_size)
+    return hasher.hexdigest()
+
+
+def compute_full_hash_from_archive(
+    archive_path: Path,
+    member_name: str,
+    chunk_size: int = FULL_HASH_READ_SIZE,
+    algorithm=None
+) -> Optional[str]:
+    """
+    Compute full hash of a ZIP member, streaming it from the archive.
     
-    with open(file_path, 'rb') as f:
-        while chunk := f.read(chunk_size):
-            hasher.update(chunk)
+    Args:
+        archive_path: Path to ZIP file
+        member_name: Name of member within archive
+        chunk_size: Read size
+        algorithm: Algorithm name/tag (default FULL_HASH_ALGORITHM)
+    
+    Returns:
+        Hex digest string, or None if member not found
+    """
+    hasher = get_algorithm(algorithm, 'full').new()
+    try:
+        with zipfile.ZipFile(archive_path, 'r') as zf:
+            _hash_member(zf, member_name, hasher, chunk_size)
+    except (KeyError, zipfile.BadZipFile):
+        return None
     
     return hasher.hexdigest()
 
 
-def compute_full_hash_from_bytes(data: bytes) -> str:
+def compute_full_hash_from_bytes(data: bytes, algorithm=None) -> str:
     """
-    Compute full MD5 hash from bytes.
+    Compute full hash from bytes.
     
     Args:
         data: File content as bytes
+        algorithm: Algorithm name/tag (default FULL_HASH_ALGORITHM)
     
     Returns:
         Hex digest string
     """
-    return hashlib.md5(data).hexdigest()
+    hasher = get_algorithm(algorithm, 'full').new()
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+# Columns added to models/assets after the original schema (migrations 014/015)
+HASH_COLUMNS = (
+    ('full_hash_mtime', 'INTEGER'),
+    ('full_hash_size', 'INTEGER'),
+    ('partial_hash_algo', 'TEXT'),
+    ('full_hash_algo', 'TEXT'),
+)
+
+
+def ensure_hash_columns(conn, table: str):
+    """Add the hash bookkeeping columns on databases predating their migrations."""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    missing = [(column, col_type) for column, col_type in HASH_COLUMNS if column not in existing]
+    for column, col_type in missing:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
+    if missing:
+        conn.commit()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# FULL HASH ENGINE (many files, concurrently)
+# ═══════════════════════════════════════════════════════════════════════════
+
+# volume_stats() key for files without a volume
+UNASSIGNED_VOLUME = 'unassigned'
+
+
+@dataclass
+class HashJob:
+    """One file to full-hash: a standalone file or a ZIP member."""
+    key: Any  # Caller's identifier (e.g. row id), returned with the result
+    file_path: Optional[str] = None
+    archive_path: Optional[str] = None
+    archive_member: Optional[str] = None
+    volume_id: Optional[str] = None
+
+
+@dataclass
+class VolumeThroughput:
+    """Bytes hashed on one volume and the time spent reading/hashing them."""
+    files: int = 0
+    bytes: int = 0
+    seconds: float = 0.0  # Summed across threads
+    
+    @property
+    def mb_per_second(self) -> float:
+        return round(self.bytes / (1024 * 1024) / self.seconds, 1) if self.seconds > 0 else 0.0
+    
+    def to_dict(self) -> dict:
+        return {'files': self.files, 'bytes': self.bytes,
+                'seconds': round(self.seconds, 2), 'mb_per_second': self.mb_per_second}
+
+
+class FullHashEngine:
+    """
+    Full-hash many files concurrently.
+    
+    Jobs run in a thread pool (reads and hashlib both release the GIL).
+    Members of the same archive are hashed in one task so the ZIP is opened
+    once. Throughput is tracked per volume (see volume_stats()).
+    """
+    
+    def __init__(self, workers: Optional[int] = None, algorithm=None,
+                 read_size: int = FULL_HASH_READ_SIZE):
+        if workers is None:
+            from fantasyfolio.config import get_config
+            workers = get_config().HASH_WORKERS
+        self.workers = max(1, workers)
+        self.algorithm = get_algorithm(algorithm, 'full')
+        self.read_size = read_size
+        self._stats: Dict[str, VolumeThroughput] = {}
+        self._lock = threading.Lock()
+    
+    def _record(self, volume_id: Optional[str], nbytes: int, seconds: float):
+        with self._lock:
+            stats = self._stats.setdefault(volume_id or UNASSIGNED_VOLUME, VolumeThroughput())
+            stats.files += 1
+            stats.bytes += nbytes
+            stats.seconds += seconds
+    
+    def _hash_standalone(self, job: HashJob) -> list:
+        start = time.perf_counter()
+        try:
+            hasher = self.algorithm.new()
+            nbytes = _hash_file(Path(job.file_path), hasher, self.read_size)
+        except Exception as e:
+            return [(job, None, str(e))]
+        self._record(job.volume_id, nbytes, time.perf_counter() - start)
+        return [(job, hasher.hexdigest(), None)]
+    
+    def _hash_archive(self, archive_path: str, jobs: List[HashJob]) -> list:
+        try:
+            zf = zipfile.ZipFile(archive_path, 'r')
+        except Exception as e:
+            return [(job, None, f"Cannot open archive: {e}") for job in jobs]
+        
+        outcomes = []
+        with zf:
+            for job in jobs:
+                start = time.perf_counter()
+                try:
+                    hasher = self.algorithm.new()
+                    nbytes = _hash_member(zf, job.archive_member, hasher, self.read_size)
+                except Exception as e:
+                    outcomes.append((job, None, str(e)))
+                    continue
+                self._record(job.volume_id, nbytes, time.perf_counter() - start)
+                outcomes.append((job, hasher.hexdigest(), None))
+        return outcomes
+    
+    def run(self, jobs: Iterable[HashJob]) -> Iterator[Tuple[HashJob, Optional[str], Optional[str]]]:
+        """
+        Hash all jobs, yielding (job, hex digest or None, error or None)
+        as they complete (not in input order).
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        
+        standalone = []
+        by_archive: Dict[str, List[HashJob]] = {}
+        for job in jobs:
+            if job.archive_path and job.archive_member:
+                by_archive.setdefault(job.archive_path, []).append(job)
+            else:
+                standalone.append(job)
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._hash_standalone, job) for job in standalone]
+            futures += [pool.submit(self._hash_archive, path, members)
+                        for path, members in by_archive.items()]
+            for future in as_completed(futures):
+                yield from future.result()
+    
+    def volume_stats(self) -> Dict[str, dict]:
+        """Per-volume files/bytes/seconds/MB/s so far (keyed by volume id)."""
+        with self._lock:
+            return {volume_id: stats.to_dict() for volume_id, stats in self._stats.items()}
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # BATCH HASHING (for existing assets)
 # ═══════════════════════════════════════════════════════════════════════════
 
+def _hash_standalone(row: dict, algorithm: HashAlgorithm) -> list:
+    """Work unit: partial hash of one standalone file."""
+    file_path = Path(row['file_path'])
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        return [(row, 'skip', None)]
+    
+    partial = compute_partial_hash(file_path, algorithm)
+    return [(row, 'ok', (partial, stat.st_size, int(stat.st_mtime)))]
+
+
+def _hash_archive_members(archive_path: str, rows: List[dict], algorithm: HashAlgorithm) -> list:
+    """Work unit: partial hashes of several members, opening the ZIP once."""
+    archive = Path(archive_path)
+    try:
+        archive_mtime = int(archive.stat().st_mtime)
+        zf = zipfile.ZipFile(archive, 'r')
+    except FileNotFoundError:
+        return [(row, 'skip', None) for row in rows]
+    except (OSError, zipfile.BadZipFile) as e:
+        return [(row, 'error', str(e)) for row in rows]
+    
+    outcomes = []
+    with zf:
+        for row in rows:
+            try:
+                partial, size = compute_partial_hash_from_member(zf, row['archive_member'], algorithm)
+                outcomes.append((row, 'ok', (partial, size, archive_mtime)))
+            except KeyError:
+                outcomes.append((row, 'skip', None))
+            except Exception as e:
+                outcomes.append((row, 'error', str(e)))
+    return outcomes
+
+
+def _run_unit(unit) -> list:
+    """Run a work unit, turning unexpected errors into per-row errors."""
+    func, args, rows = unit
+    try:
+        return func(*args)
+    except Exception as e:
+        return [(row, 'error', str(e)) for row in rows]
+
+
+def _work_units(rows: List[dict], algorithm: HashAlgorithm) -> list:
+    """Split a batch into work units: one per standalone file, one per archive."""
+    units = []
+    by_archive: Dict[str, List[dict]] = {}
+    for row in rows:
+        if row.get('archive_path') and row.get('archive_member'):
+            by_archive.setdefault(row['archive_path'], []).append(row)
+        else:
+            units.append((_hash_standalone, (row, algorithm), [row]))
+    for archive_path, members in by_archive.items():
+        units.append((_hash_archive_members, (archive_path, members, algorithm), members))
+    return units
+
+
 def batch_compute_hashes(
     db_path: str,
     table: str = 'models',
     batch_size: int = 100,
     limit: int = None,
-    callback=None
+    callback=None,
+    workers: Optional[int] = None,
+    after_id: int = 0,
+    algorithm=None,
+    throttle: float = 0
 ) -> dict:
     """
     Compute partial hashes for assets missing them.
     
+    Rows whose partial hash was computed with a different algorithm tag
+    than the configured one are rehashed too, so running this (again)
+    after changing PARTIAL_HASH_ALGORITHM is the rehash migration; use
+    `throttle` to run it gently in the background.
+    
+    Rows are walked in id order (keyset, so rows that get hashed don't
+    shift the window), hashed in a thread pool and committed per batch.
+    Members of the same ZIP are hashed together with one open of the
+    archive. Rows that can't be hashed keep partial_hash NULL; pass the
+    returned last_id as after_id to resume after an interrupted run.
+    
     Args:
         db_path: Path to database
         table: 'models' or 'assets'
         batch_size: Number of assets per batch
         limit: Maximum total to process (None = all)
         callback: Optional function(processed, total, current_file) for progress
+        workers: Hashing threads (default HASH_WORKERS)
+        after_id: Only consider rows with a greater id
+        algorithm: Algorithm name/tag (default PARTIAL_HASH_ALGORITHM)
+        throttle: Seconds to sleep between batches
     
     Returns:
-        Dict with results: {processed, skipped, errors, elapsed_seconds}
+        Dict with results: {processed, skipped, errors, last_id, files_per_second, elapsed_seconds}
     """
     import sqlite3
-    import time
     from datetime import datetime
+    from concurrent.futures import ThreadPoolExecutor
+    
+    if workers is None:
+        from fantasyfolio.config import get_config
+        workers = get_config().HASH_WORKERS
+    
+    algorithm = get_algorithm(algorithm)
     
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
+    ensure_hash_columns(conn, table)
     
     results = {
+        'algorithm': algorithm.tag,
         'processed': 0,
         'skipped': 0,
         'errors': 0,
         'error_details': [],
+        'last_id': after_id,
+        'files_per_second': 0,
         'elapsed_seconds': 0
     }
     
     start_time = time.time()
     
+    # assets table doesn't have archive columns
+    columns = (
+        "id, file_path, archive_path, archive_member, volume_id" if table == 'models'
+        else "id, file_path, volume_id"
+    )
+    # Missing, or computed with another algorithm
+    needs_hash = f"(partial_hash IS NULL OR {hash_tag_sql('partial_hash_algo')} != ?) AND volume_id IS NOT NULL"
+    query = f"""
+        SELECT {columns}
+        FROM {table}
+        WHERE {needs_hash} AND id > ?
+        ORDER BY id
+        LIMIT ?
+    """
+    update = f"""
+        UPDATE {table} SET 
+            partial_hash = ?,
+            partial_hash_algo = ?,
+            file_size_bytes = ?,
+            file_mtime = ?,
+            last_verified_at = ?
+        WHERE id = ?
+    """
+    
     try:
         # Count total needing hashes
         total = conn.execute(f"""
             SELECT COUNT(*) FROM {table} 
-            WHERE partial_hash IS NULL AND volume_id IS NOT NULL
-        """).fetchone()[0]
+            WHERE {needs_hash} AND id > ?
+        """, (algorithm.tag, after_id)).fetchone()[0]
         
         if limit:
             total = min(total, limit)
         
-        print(f"Found {total} {table} needing hash computation")
+        print(f"Found {total} {table} needing hash computation ({algorithm.tag}, {workers} workers)")
         
-        offset = 0
-        while True:
-            # Get batch - different columns for models vs assets
-            if table == 'models':
-                query = f"""
-                    SELECT id, file_path, archive_path, archive_member, volume_id
-                    FROM {table}
-                    WHERE partial_hash IS NULL AND volume_id IS NOT NULL
-                    LIMIT ? OFFSET ?
-                """
-            else:
-                # assets table doesn't have archive columns
-                query = f"""
-                    SELECT id, file_path, volume_id
-                    FROM {table}
-                    WHERE partial_hash IS NULL AND volume_id IS NOT NULL
-                    LIMIT ? OFFSET ?
-                """
-            
-            if limit and offset + batch_size > limit:
-                batch_size = limit - offset
-            
-            rows = conn.execute(query, (batch_size, offset)).fetchall()
-            
-            if not rows:
-                break
-            
-            for row in rows:
-                row = dict(row)
+        seen = 0
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            while not limit or seen < limit:
+                fetch = batch_size if not limit else min(batch_size, limit - seen)
+                rows = [dict(row) for row in conn.execute(query, (algorithm.tag, results['last_id'], fetch)).fetchall()]
                 
-                if callback:
-                    callback(results['processed'], total, row.get('file_path', row.get('archive_path', '')))
+                if not rows:
+                    break
                 
-                try:
-                    # Compute hash based on type
-                    is_archive_member = (
-                        table == 'models' and 
-                        row.get('archive_path') and 
-                        row.get('archive_member')
-                    )
-                    
-                    if is_archive_member:
-                        # Archive member (3D models in ZIPs)
-                        archive = Path(row['archive_path'])
-                        if not archive.exists():
+                updates = []
+                now = datetime.now().isoformat()
+                for outcomes in pool.map(_run_unit, _work_units(rows, algorithm)):
+                    for row, status, value in outcomes:
+                        if status == 'ok':
+                            partial, file_size, file_mtime = value
+                            updates.append((partial, algorithm.tag, file_size, file_mtime, now, row['id']))
+                            results['processed'] += 1
+                        elif status == 'skip':
                             results['skipped'] += 1
-                            continue
-                        
-                        partial = compute_partial_hash_from_archive(
-                            archive, row['archive_member']
-                        )
-                    else:
-                        # Standalone file (PDFs or standalone 3D models)
-                        file_path = Path(row['file_path'])
-                        if not file_path.exists():
-                            results['skipped'] += 1
-                            continue
-                        
-                        partial = compute_partial_hash(file_path)
-                    
-                    if partial:
-                        # Get file size and mtime
-                        if is_archive_member:
-                            archive = Path(row['archive_path'])
-                            stat = archive.stat()
-                            file_mtime = int(stat.st_mtime)
-                            
-                            # Get member size from archive
-                            with zipfile.ZipFile(archive, 'r') as zf:
-                                info = zf.getinfo(row['archive_member'])
-                                file_size = info.file_size
                         else:
-                            file_path = Path(row['file_path'])
-                            stat = file_path.stat()
-                            file_size = stat.st_size
-                            file_mtime = int(stat.st_mtime)
+                            results['errors'] += 1
+                            if len(results['error_details']) < 10:
+                                results['error_details'].append({
+                                    'id': row['id'],
+                                    'path': row.get('file_path') or row.get('archive_path'),
+                                    'error': value
+                                })
                         
-                        # Update database
-                        conn.execute(f"""
-                            UPDATE {table} SET 
-                                partial_hash = ?,
-                                file_size_bytes = ?,
-                                file_mtime = ?,
-                                last_verified_at = ?
-                            WHERE id = ?
-                        """, (
-                            partial,
-                            file_size,
-                            file_mtime,
-                            datetime.now().isoformat(),
-                            row['id']
-                        ))
-                        
-                        results['processed'] += 1
-                    else:
-                        results['skipped'] += 1
+                        if callback:
+                            callback(results['processed'], total, row.get('file_path') or row.get('archive_path') or '')
                 
-                except Exception as e:
-                    results['errors'] += 1
-                    if len(results['error_details']) < 10:
-                        results['error_details'].append({
-                            'id': row['id'],
-                            'path': row.get('file_path') or row.get('archive_path'),
-                            'error': str(e)
-                        })
-            
-            # Commit batch
-            conn.commit()
-            
-            offset += len(rows)
-            
-            if limit and offset >= limit:
-                break
+                # Commit batch
+                conn.executemany(update, updates)
+                conn.commit()
+                
+                seen += len(rows)
+                results['last_id'] = rows[-1]['id']
+                
+                elapsed = time.time() - start_time
+                results['files_per_second'] = round(seen / elapsed, 1) if elapsed > 0 else 0
+                logger.info(f"Hashed {seen}/{total} {table} ({results['files_per_second']} files/s, "
+                            f"last id {results['last_id']})")
+                
+                if throttle:
+                    time.sleep(throttle)
         
     finally:
         conn.close()
@@ -0,0 +1,326 @@
+"""
+Monthly partitioned storage for the change journal.
+
+The journal used to be one `change_journal` table that every indexing run
+appended to: retention was a single unbounded DELETE and listings scanned
+the whole history. Entries now live in one table per calendar month
+(`change_journal_YYYY_MM`, by UTC timestamp), registered in
+`journal_partitions`:
+
+- retention drops whole partitions (DROP TABLE) and trims only the one
+  month that straddles the cutoff, in bounded chunks
+- listings walk partitions newest first and stop once they have enough
+  rows; each partition is indexed by entity and by time
+- sealed (past) months can be compacted: repeated updates of the same
+  field on the same entity collapse into one entry spanning the first
+  old value to the last new value
+
+IDs stay unique across partitions: they are allocated from
+`journal_sequence` inside the write transaction. Rows already in the
+legacy `change_journal` table are moved into partitions (keeping their
+IDs) the first time the partitions are set up; that table stays empty.
+"""
+
+import time
+import logging
+import sqlite3
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_PARTITIONS_SQL = """
+CREATE TABLE IF NOT EXISTS journal_partitions(
+  month TEXT PRIMARY KEY, -- 'YYYY-MM' (UTC)
+  table_name TEXT NOT NULL,
+  entry_count INTEGER NOT NULL DEFAULT 0,
+  created_at TEXT DEFAULT(datetime('now')),
+  compacted_at TEXT -- last compaction (sealed months only)
+);
+CREATE TABLE IF NOT EXISTS journal_sequence(
+  id INTEGER PRIMARY KEY CHECK(id = 1),
+  last_id INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO journal_sequence (id, last_id) VALUES (1, 0);
+"""
+
+PARTITION_SQL = """
+CREATE TABLE IF NOT EXISTS {table}(
+  id INTEGER PRIMARY KEY,
+  timestamp TEXT NOT NULL,
+  entity_type TEXT NOT NULL,
+  entity_id INTEGER NOT NULL,
+  action TEXT NOT NULL,
+  field_name TEXT,
+  old_value TEXT,
+  new_value TEXT,
+  source TEXT,
+  user_info TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_{table}_entity ON {table}(entity_type, entity_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_{table}_timestamp ON {table}(timestamp);
+"""
+
+COLUMNS = ('timestamp', 'entity_type', 'entity_id', 'action', 'field_name',
+           'old_value', 'new_value', 'source', 'user_info')
+
+# Rows deleted per statement when trimming the month at the retention cutoff
+TRIM_CHUNK_SIZE = 5000
+
+# Database files whose schema has been checked (in-memory databases are always checked)
+_schema_ready = set()
+
+
+def _database_file(conn: sqlite3.Connection) -> str:
+    """Path of the connection's main database ('' for in-memory/temporary)."""
+    for row in conn.execute("PRAGMA database_list").fetchall():
+        if row[1] == 'main':
+            return row[2] or ''
+    return ''
+
+
+def partition_table(month: str) -> str:
+    """Table name for a 'YYYY-MM' month."""
+    return f"change_journal_{month.replace('-', '_')}"
+
+
+def month_of(timestamp: str) -> str:
+    """'YYYY-MM' month of a journal timestamp ('YYYY-MM-DD HH:MM:SS')."""
+    return timestamp[:7]
+
+
+def current_month() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m')
+
+
+def _bump_generation(conn: sqlite3.Connection):
+    """Invalidate cached journal stats (partitions have no triggers)."""
+    conn.execute("UPDATE data_generations SET generation = generation + 1 WHERE name = 'change_journal'")
+
+
+def ensure_journal_partitions(conn: sqlite3.Connection):
+    """Create the partition registry and move legacy change_journal rows into partitions."""
+    db_file = _database_file(conn)
+    if db_file and db_file in _schema_ready:
+        return
+
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='journal_partitions'"
+    ).fetchone()
+    if not exists:
+        logger.info("Creating journal_partitions table (partitioned change journal)")
+        conn.executescript(JOURNAL_PARTITIONS_SQL)
+
+    legacy = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='change_journal'"
+    ).fetchone()
+    if legacy and conn.execute("SELECT 1 FROM change_journal LIMIT 1").fetchone():
+        _move_legacy_rows(conn)
+    if db_file:
+        _schema_ready.add(db_file)
+
+
+def _move_legacy_rows(conn: sqlite3.Connection):
+    months = [row[0] for row in conn.execute(
+        "SELECT DISTINCT substr(timestamp, 1, 7) FROM change_journal ORDER BY 1"
+    ).fetchall()]
+    columns = ', '.join(COLUMNS)
+
+    for month in months:
+        table = get_partition(conn, month)
+        moved = conn.execute(f"""
+            INSERT INTO {table} (id, {columns})
+            SELECT id, {columns} FROM change_journal WHERE substr(timestamp, 1, 7) = ?
+        """, (month,)).rowcount
+        conn.execute("DELETE FROM change_journal WHERE substr(timestamp, 1, 7) = ?", (month,))
+        conn.execute(
+            "UPDATE journal_partitions SET entry_count = entry_count + ? WHERE month = ?",
+            (moved, month)
+        )
+        conn.commit()
+        logger.info(f"Moved {moved} journal entries into {table}")
+
+    conn.execute("""
+        UPDATE journal_sequence SET last_id = MAX(last_id, (
+            SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'change_journal'
+        )) WHERE id = 1
+    """)
+    conn.commit()
+
+
+def get_partition(conn: sqlite3.Connection, month: str) -> str:
+    """Table for a month, creating (and registering) it if needed."""
+    table = partition_table(month)
+    if not conn.execute("SELECT 1 FROM journal_partitions WHERE month = ?", (month,)).fetchone():
+        # Statement by statement: executescript() would commit the caller's transaction
+        for statement in PARTITION_SQL.format(table=table).split(';'):
+            if statement.strip():
+                conn.execute(statement)
+        conn.execute(
+            "INSERT OR IGNORE INTO journal_partitions (month, table_name) VALUES (?, ?)",
+            (month, table)
+        )
+    return table
+
+
+def list_partitions(
+    conn: sqlite3.Connection,
+    newest_first: bool = True,
+    since: Optional[str] = None
+) -> List[Tuple[str, str]]:
+    """(month, table) pairs, optionally only months that can hold entries >= since."""
+    query = "SELECT month, table_name FROM journal_partitions"
+    params = []
+    if since:
+        query += " WHERE month >= ?"
+        params.append(month_of(since))
+    query += " ORDER BY month DESC" if newest_first else " ORDER BY month ASC"
+    return [(row[0], row[1]) for row in conn.execute(query, params).fetchall()]
+
+
+def append_entries(conn: sqlite3.Connection, entries: Sequence[Tuple]) -> List[int]:
+    """
+    Insert entries (tuples in COLUMNS order) into their month partitions.
+
+    Runs in one transaction, which the caller commits; returns the IDs
+    allocated, in input order.
+    """
+    ensure_journal_partitions(conn)
+    if not entries:
+        return []
+
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    last_id = conn.execute("SELECT last_id FROM journal_sequence WHERE id = 1").fetchone()[0]
+    ids = list(range(last_id + 1, last_id + 1 + len(entries)))
+
+    by_month: Dict[str, List[Tuple]] = {}
+    for entry_id, entry in zip(ids, entries):
+        by_month.setdefault(month_of(entry[0]), []).append((entry_id,) + tuple(entry))
+
+    placeholders = ', '.join('?' * (len(COLUMNS) + 1))
+    for month, rows in by_month.items():
+        table = get_partition(conn, month)
+        conn.executemany(f"INSERT INTO {table} (id, {', '.join(COLUMNS)}) VALUES ({placeholders})", rows)
+        conn.execute(
+            "UPDATE journal_partitions SET entry_count = entry_count + ? WHERE month = ?",
+            (len(rows), month)
+        )
+
+    conn.execute("UPDATE journal_sequence SET last_id = ? WHERE id = 1", (ids[-1],))
+    _bump_generation(conn)
+    return ids
+
+
+def drop_before(conn: sqlite3.Connection, cutoff: str) -> int:
+    """
+    Remove entries older than `cutoff` (a journal timestamp); returns how many.
+
+    Months entirely before the cutoff are dropped; the month containing it
+    is trimmed in chunks of TRIM_CHUNK_SIZE, committing between chunks.
+    """
+    ensure_journal_partitions(conn)
+    cutoff_month = month_of(cutoff)
+    removed = 0
+
+    for month, table in list_partitions(conn, newest_first=False):
+        if month > cutoff_month:
+            break
+
+        if month < cutoff_month:
+            count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute("DELETE FROM journal_partitions WHERE month = ?", (month,))
+            _bump_generation(conn)
+            conn.commit()
+            logger.info(f"Dropped journal partition {table} ({count} entries)")
+            removed += count
+            continue
+
+        while True:
+            deleted = conn.execute(f"""
+                DELETE FROM {table} WHERE id IN (
+                    SELECT id FROM {table} WHERE timestamp < ? LIMIT ?
+                )
+            """, (cutoff, TRIM_CHUNK_SIZE)).rowcount
+            if deleted <= 0:
+                break
+            conn.execute(
+                "UPDATE journal_partitions SET entry_count = MAX(entry_count - ?, 0) WHERE month = ?",
+                (deleted, month)
+            )
+            _bump_generation(conn)
+            conn.commit()
+            removed += deleted
+            if deleted < TRIM_CHUNK_SIZE:
+                break
+
+    return removed
+
+
+def compact_partition(conn: sqlite3.Connection, month: str) -> int:
+    """
+    Collapse repeated field updates within one month; returns entries removed.
+
+    For each (entity, field) updated more than once, the latest update is
+    kept with the old value of the earliest; the rest are deleted. Other
+    actions are left alone. The caller commits.
+    """
+    table = partition_table(month)
+    conn.execute(f"""
+        UPDATE {table} SET old_value = (
+            SELECT first.old_value FROM {table} AS first
+            WHERE first.entity_type = {table}.entity_type
+              AND first.entity_id = {table}.entity_id
+              AND first.field_name = {table}.field_name
+              AND first.action = 'update'
+            ORDER BY first.id LIMIT 1
+        )
+        WHERE action = 'update' AND field_name IS NOT NULL
+          AND id = (
+            SELECT MAX(last.id) FROM {table} AS last
+            WHERE last.entity_type = {table}.entity_type
+              AND last.entity_id = {table}.entity_id
+              AND last.field_name = {table}.field_name
+              AND last.action = 'update'
+          )
+    """)
+    removed = conn.execute(f"""
+        DELETE FROM {table}
+        WHERE action = 'update' AND field_name IS NOT NULL
+          AND EXISTS (
+            SELECT 1 FROM {table} AS later
+            WHERE later.entity_type = {table}.entity_type
+              AND later.entity_id = {table}.entity_id
+              AND later.field_name = {table}.field_name
+              AND later.action = 'update'
+              AND later.id > {table}.id
+          )
+    """).rowcount
+
+    conn.execute("""
+        UPDATE journal_partitions
+        SET entry_count = MAX(entry_count - ?, 0), compacted_at = datetime('now')
+        WHERE month = ?
+    """, (removed, month))
+    if removed:
+        _bump_generation(conn)
+    return removed
+
+
+def compact_sealed(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Compact every past month not compacted since it was sealed; returns removed per month."""
+    ensure_journal_partitions(conn)
+    results = {}
+    rows = conn.execute("""
+        SELECT month FROM journal_partitions
+        WHERE month < ? AND compacted_at IS NULL
+        ORDER BY month
+    """, (current_month(),)).fetchall()
+
+    for (month,) in rows:
+        start = time.time()
+        results[month] = compact_partition(conn, month)
+        conn.commit()
+        logger.info(f"Compacted journal {month}: {results[month]} entries removed in {time.time() - start:.1f}s")
+    return results
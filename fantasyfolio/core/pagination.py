@@ -0,0 +1,186 @@
+"""
+Keyset (cursor) pagination helpers.
+
+LIMIT/OFFSET makes SQLite walk and discard every skipped row, so deep
+pages get slower the further the user scrolls. Keyset pagination instead
+remembers the sort key of the last row returned and asks for rows that
+sort after it, which an index on the sort column can seek to directly.
+
+Cursors are opaque to clients: base64-encoded JSON holding the sort
+signature and the last row's key values. A cursor is only valid for the
+sort it was issued with.
+
+NULL ordering follows SQLite: NULLs sort first ascending, last descending.
+"""
+
+import json
+import base64
+import sqlite3
+from typing import Optional, List, Dict, Any, Tuple, Sequence
+
+# A sort column: (SQL expression, key of that value in the result row)
+SortColumn = Tuple[str, str]
+
+
+class CursorError(ValueError):
+    """Raised when a pagination cursor is malformed or issued for a different sort."""
+
+
+def encode_cursor(signature: str, values: Sequence[Any]) -> str:
+    """Encode the last row's sort key into an opaque cursor string."""
+    payload = json.dumps({'s': signature, 'k': list(values)}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, signature: str) -> List[Any]:
+    """Decode a cursor, checking it belongs to the same sort signature."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        values = payload['k']
+        cursor_signature = payload['s']
+    except (ValueError, KeyError, TypeError) as e:
+        raise CursorError(f"Invalid cursor: {e}")
+
+    if cursor_signature != signature or not isinstance(values, list):
+        raise CursorError("Cursor does not match the requested sort")
+    return values
+
+
+def _after(expr: str, value: Any, descending: bool, include_nulls: bool = True) -> Tuple[str, list]:
+    """SQL for 'expr sorts strictly after value' (NULLs optionally left out when descending)."""
+    if descending:
+        if value is None:
+            return "0", []  # NULLs sort last descending; nothing comes after them
+        if not include_nulls:
+            return f"{expr} < ?", [value]
+        return f"({expr} < ? OR {expr} IS NULL)", [value]
+    if value is None:
+        return f"{expr} IS NOT NULL", []
+    return f"{expr} > ?", [value]
+
+
+def _equal(expr: str, value: Any) -> Tuple[str, list]:
+    if value is None:
+        return f"{expr} IS NULL", []
+    return f"{expr} = ?", [value]
+
+
+def keyset_condition(columns: Sequence[SortColumn], descending: bool, values: Sequence[Any]) -> Tuple[str, list]:
+    """
+    Build the WHERE fragment selecting rows after the cursor position.
+
+    Expands (c1, c2, ..., id) > (v1, v2, ..., vid) lexicographically with
+    NULL-aware comparisons. For a non-NULL leading key a redundant
+    `c1 >= v1` (ascending) or `c1 <= v1` (descending) bound is added so
+    the planner can seek the index.
+
+    Descending, NULL leading keys sort after every non-NULL one, and
+    `c1 <= v1` would need an `OR c1 IS NULL` that defeats the seek. So for
+    a descending, non-NULL leading key the fragment covers only non-NULL
+    leading keys; the rows with c1 IS NULL follow them and are read
+    separately (see null_tail_condition and fetch_page).
+    """
+    if len(values) != len(columns):
+        raise CursorError("Cursor does not match the requested sort")
+
+    sql, params = None, []
+    # Build from the last column outwards: after_n OR (equal_n AND <rest>)
+    for position, ((expr, _), value) in reversed(list(enumerate(zip(columns, values)))):
+        after_sql, after_params = _after(expr, value, descending, include_nulls=position > 0)
+        if sql is None:
+            sql, params = after_sql, after_params
+        else:
+            eq_sql, eq_params = _equal(expr, value)
+            sql = f"{after_sql} OR ({eq_sql} AND ({sql}))"
+            params = after_params + eq_params + params
+
+    lead_expr, lead_value = columns[0][0], values[0]
+    if lead_value is not None:
+        bound = '<=' if descending else '>='
+        return f"{lead_expr} {bound} ? AND ({sql})", [lead_value] + params
+    return f"({sql})", params
+
+
+def null_tail_condition(columns: Sequence[SortColumn], descending: bool, values: Sequence[Any]) -> Optional[str]:
+    """
+    WHERE fragment for rows after the cursor that keyset_condition() leaves out.
+
+    Only a descending sort with a non-NULL leading cursor key has such rows:
+    every row whose leading key is NULL. None otherwise.
+    """
+    if descending and values and values[0] is not None:
+        return f"{columns[0][0]} IS NULL"
+    return None
+
+
+def order_clause(columns: Sequence[SortColumn], descending: bool) -> str:
+    direction = 'DESC' if descending else 'ASC'
+    return ', '.join(f"{expr} {direction}" for expr, _ in columns)
+
+
+def sort_signature(columns: Sequence[SortColumn], descending: bool) -> str:
+    return ','.join(key for _, key in columns) + (':desc' if descending else ':asc')
+
+
+def fetch_page(
+    conn: sqlite3.Connection,
+    query: str,
+    params: Sequence[Any],
+    columns: Sequence[SortColumn],
+    descending: bool = False,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    offset: int = 0
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Run a filtered SELECT one page at a time.
+
+    Args:
+        query: SELECT ... FROM ... WHERE ... (must already contain a WHERE clause)
+        params: Parameters for `query`
+        columns: Sort columns, ending with a unique tiebreaker (usually the id)
+        descending: Sort direction for all columns
+        limit: Page size
+        cursor: Cursor from a previous page's next_cursor
+        offset: Legacy OFFSET paging, used only when no cursor is given
+
+    Returns:
+        (rows, next_cursor) - next_cursor is None on the last page
+
+    Raises:
+        CursorError: If the cursor is invalid for this sort
+    """
+    signature = sort_signature(columns, descending)
+    params = list(params)
+    ordering = f" ORDER BY {order_clause(columns, descending)} LIMIT ?"
+    tail_query = None
+
+    if cursor:
+        values = decode_cursor(cursor, signature)
+        condition, condition_params = keyset_condition(columns, descending, values)
+        tail = null_tail_condition(columns, descending, values)
+        if tail:
+            tail_query, tail_params = f"{query} AND {tail}{ordering}", list(params)
+        query += f" AND {condition}"
+        params.extend(condition_params)
+
+    # Fetch one extra row to know whether another page exists
+    query += ordering
+    params.append(limit + 1)
+    if offset and not cursor:
+        query += " OFFSET ?"
+        params.append(offset)
+
+    rows = [dict(row) for row in conn.execute(query, params).fetchall()]
+    if tail_query and len(rows) <= limit:
+        # NULL leading keys sort last descending: continue into them
+        rows += [dict(row) for row in conn.execute(tail_query, tail_params + [limit + 1 - len(rows)]).fetchall()]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(signature, [last[key] for _, key in columns])
+
+    return rows, next_cursor
@@ -0,0 +1,181 @@
+"""
+In-memory path-prefix index for asset locations and volumes.
+
+Indexers resolve the location (volume_id) of every file they add, which
+used to mean one list_locations() query plus a linear prefix comparison
+per file. Enabled locations and registered volumes are now loaded once
+into a trie keyed by path component, so resolving a path is a walk of at
+most its depth.
+
+The trie is rebuilt when:
+- asset_locations/volumes are changed through this process (the writers
+  call invalidate_path_index())
+- another process changed them, detected via the data_generations
+  counters (see core/stats_cache.py), checked at most every
+  PATH_INDEX_RECHECK seconds
+"""
+
+import os
+import copy
+import time
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from fantasyfolio.core.stats_cache import get_generations
+
+logger = logging.getLogger(__name__)
+
+# Seconds between data_generations checks for changes made by other processes
+PATH_INDEX_RECHECK = 5.0
+
+TRACKED = ('asset_locations', 'volumes')
+
+_VALUE = object()  # Trie node key holding the entry stored at that path
+
+
+def _path_parts(path: str) -> List[str]:
+    return [part for part in os.path.normpath(path).split(os.sep) if part]
+
+
+class PathPrefixIndex:
+    """Trie of path components mapping a path to its longest registered prefix."""
+
+    def __init__(self):
+        self._root: Dict[Any, Any] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, path: str, value: Any):
+        """Register `value` at `path`. The first value added for a path wins."""
+        node = self._root
+        for part in _path_parts(path):
+            node = node.setdefault(part, {})
+        if _VALUE not in node:
+            node[_VALUE] = value
+            self._size += 1
+
+    def longest_prefix(self, path: str) -> Optional[Any]:
+        """Value of the deepest registered path that is `path` or one of its parents."""
+        node = self._root
+        match = node.get(_VALUE)
+        for part in _path_parts(path):
+            node = node.get(part)
+            if node is None:
+                break
+            match = node.get(_VALUE, match)
+        return match
+
+
+_lock = threading.Lock()
+_indexes: Dict[Tuple[str, Optional[str]], PathPrefixIndex] = {}
+_generations: Optional[Tuple[int, ...]] = None
+_checked_at = 0.0
+
+
+def invalidate_path_index():
+    """Drop the cached indexes so the next lookup reloads them."""
+    global _generations
+    with _lock:
+        _indexes.clear()
+        _generations = None
+
+
+def _needs_check() -> bool:
+    return not _indexes or time.monotonic() - _checked_at >= PATH_INDEX_RECHECK
+
+
+def _check_generations(conn: sqlite3.Connection):
+    """Invalidate if another process changed locations or volumes."""
+    global _generations, _checked_at
+    _checked_at = time.monotonic()
+
+    generations = get_generations(conn, TRACKED)
+    if generations is None or generations != _generations:
+        _indexes.clear()
+        _generations = generations
+
+
+def _build_location_index(conn: sqlite3.Connection, asset_type: Optional[str]) -> PathPrefixIndex:
+    query = "SELECT * FROM asset_locations WHERE enabled = 1"
+    params = []
+    if asset_type:
+        query += " AND asset_type = ?"
+        params.append(asset_type)
+    # Same preference order as list_locations(): the first location added wins a tie
+    query += " ORDER BY is_primary DESC, name ASC"
+
+    index = PathPrefixIndex()
+    for row in conn.execute(query, params).fetchall():
+        index.add(row['path'], dict(row))
+    return index
+
+
+def _build_volume_index(conn: sqlite3.Connection) -> PathPrefixIndex:
+    index = PathPrefixIndex()
+    for row in conn.execute("SELECT id, mount_path FROM volumes ORDER BY id").fetchall():
+        index.add(row['mount_path'], row['id'])
+    return index
+
+
+def _get_index(conn: sqlite3.Connection, key: Tuple[str, Optional[str]]) -> PathPrefixIndex:
+    if _needs_check():
+        _check_generations(conn)
+    index = _indexes.get(key)
+    if index is None:
+        if key[0] == 'location':
+            index = _build_location_index(conn, key[1])
+        else:
+            index = _build_volume_index(conn)
+        _indexes[key] = index
+        logger.debug(f"Built path index {key} ({len(index)} entries)")
+    return index
+
+
+def _lookup(key: Tuple[str, Optional[str]], path: str, conn: Optional[sqlite3.Connection] = None) -> Optional[Any]:
+    with _lock:
+        index = _indexes.get(key)
+        if index is None or _needs_check():
+            if conn is not None:
+                index = _get_index(conn, key)
+            else:
+                # Only open a connection when the index must be checked or built
+                from fantasyfolio.core.database import get_db
+                with get_db().connection() as own_conn:
+                    index = _get_index(own_conn, key)
+    return index.longest_prefix(path)
+
+
+def lookup_location(file_path: str, asset_type: Optional[str] = None,
+                    conn: Optional[sqlite3.Connection] = None) -> Optional[Dict[str, Any]]:
+    """
+    Find the enabled asset location containing `file_path`.
+
+    The most specific (deepest) location wins. `conn` is only used when
+    the index has to be checked or rebuilt; without it a connection is
+    opened on demand.
+
+    Returns:
+        A copy of the location row, or None
+    """
+    location = _lookup(('location', asset_type), file_path, conn)
+    return copy.copy(location) if location else None
+
+
+def lookup_volume(conn: sqlite3.Connection, path: str) -> Optional[Dict[str, Any]]:
+    """
+    Find the registered volume whose mount path contains `path`.
+
+    The most specific (deepest) mount path wins.
+
+    Returns:
+        The current volumes row as a dict, or None
+    """
+    volume_id = _lookup(('volume', None), path, conn)
+    if volume_id is None:
+        return None
+    row = conn.execute("SELECT * FROM volumes WHERE id = ?", (volume_id,)).fetchone()
+    return dict(row) if row else None
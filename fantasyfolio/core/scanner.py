@@ -2,20 +2,28 @@
 Efficient scanning logic for FantasyFolio assets.
 
 Implements the scan algorithms from the Efficient Indexing Architecture v1.2:
-- Standard mode: Skip unchanged files (mtime/size match)
+- Standard mode: Skip unchanged directories (directory manifest) and
+  unchanged files (mtime/size match)
 - Forced mode: Reprocess everything
 - Missing detection: Mark files as missing, never auto-delete
 """
 
+import logging
 import sqlite3
 import zipfile
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass
-from typing import Generator, Optional, Literal, Dict, Any
+from typing import Callable, Generator, Optional, Literal, Dict, Any, List, Sequence
 from enum import Enum
 
-from fantasyfolio.core.hashing import compute_partial_hash, compute_partial_hash_from_bytes
+from fantasyfolio.core.dir_manifest import DirectoryManifest
+from fantasyfolio.core.hashing import (
+    LEGACY_HASH_TAG, compute_partial_hash, compute_partial_hash_from_bytes, ensure_hash_columns,
+    get_algorithm, hash_tag_sql
+)
+
+logger = logging.getLogger(__name__)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -85,6 +93,10 @@ class ScanAction(Enum):
     DUPLICATE = 'duplicate'  # Same hash as existing file at different path
 
 
+# ScanResult.reason of the one SKIP result yielded per unchanged directory
+UNCHANGED_DIRECTORY = 'directory unchanged'
+
+
 @dataclass
 class ScanResult:
     """Result of scanning a single asset."""
@@ -97,6 +109,65 @@ class ScanResult:
 # IDENTITY RESOLUTION
 # ═══════════════════════════════════════════════════════════════════════════════
 
+def stored_hash_tags(conn: sqlite3.Connection, table: str = 'models') -> List[str]:
+    """Partial-hash algorithm tags present in `table` (NULL counts as the legacy tag)."""
+    return [row[0] for row in conn.execute(f"""
+        SELECT DISTINCT {hash_tag_sql('partial_hash_algo')} FROM {table} WHERE partial_hash IS NOT NULL
+    """).fetchall()]
+
+
+class ContentHash:
+    """
+    A file's partial hash under each algorithm tag, computed on demand.
+    
+    Rows keep the hash (and tag) they were indexed with until rehashed, so
+    after PARTIAL_HASH_ALGORITHM changes a stored hash is only comparable
+    with this file's hash under the row's own tag. `value`/`tag` are for
+    the configured algorithm; other tags are hashed only when a comparison
+    needs them.
+    """
+    
+    def __init__(self, compute: Callable[[Any], str], other_tags: Sequence[str] = ()):
+        algorithm = get_algorithm()
+        self.tag = algorithm.tag
+        self._compute = compute
+        self._hashes: Dict[str, Optional[str]] = {self.tag: compute(algorithm)}
+        self.tags = [self.tag] + [tag for tag in other_tags if tag != self.tag]
+    
+    @property
+    def value(self) -> str:
+        return self._hashes[self.tag]
+    
+    def get(self, tag: str) -> Optional[str]:
+        """Hash under `tag` (None if that algorithm isn't available here)."""
+        if tag not in self._hashes:
+            try:
+                self._hashes[tag] = self._compute(get_algorithm(tag))
+            except ValueError:
+                self._hashes[tag] = None
+        return self._hashes[tag]
+    
+    def matches(self, row: Dict[str, Any]) -> bool:
+        """Whether a row's stored partial hash is this content's."""
+        stored = row.get('partial_hash')
+        return bool(stored) and stored == self.get(row.get('partial_hash_algo') or LEGACY_HASH_TAG)
+    
+    def find(self, conn: sqlite3.Connection, table: str, where: str = '1=1', params: Sequence = ()) -> Optional[dict]:
+        """Most recently seen row with this content, comparing each row under its own tag."""
+        for tag in self.tags:
+            value = self.get(tag)
+            if value is None:
+                continue
+            row = conn.execute(f"""
+                SELECT * FROM {table}
+                WHERE partial_hash = ? AND {hash_tag_sql('partial_hash_algo')} = ? AND {where}
+                ORDER BY last_seen_at DESC
+                LIMIT 1
+            """, [value, tag, *params]).fetchone()
+            if row:
+                return dict(row)
+        return None
+
 def find_existing_asset(
     conn: sqlite3.Connection,
     table: str,
@@ -105,11 +176,16 @@ def find_existing_asset(
     archive_member: str = None,
     partial_hash: str = None,
     file_size: int = None,
-    file_mtime: int = None
+    file_mtime: int = None,
+    partial_hash_algo: str = None
 ) -> tuple[str, Optional[dict]]:
     """
     Find existing asset by identity.
     
+    Hashes are only compared with rows stored under the same algorithm
+    tag (`partial_hash_algo`, default the configured algorithm); use
+    ContentHash to also match rows hashed with another algorithm.
+    
     Returns: (match_type, existing_record)
     
     match_type values:
@@ -120,6 +196,7 @@ def find_existing_asset(
     - 'new':       No match found
     """
     conn.row_factory = sqlite3.Row
+    tag = partial_hash_algo or (get_algorithm().tag if partial_hash else None)
     
     # Check 1: Exact path match
     if archive_path and archive_member:
@@ -143,19 +220,18 @@ def find_existing_asset(
             return ('unchanged', existing)
         
         # Path exists but may have changed - check hash if available
-        if partial_hash and existing.get('partial_hash') == partial_hash:
+        same_tag = (existing.get('partial_hash_algo') or LEGACY_HASH_TAG) == tag
+        if partial_hash and same_tag and existing.get('partial_hash') == partial_hash:
             return ('touched', existing)  # mtime changed, content same
-        elif partial_hash and existing.get('partial_hash'):
-            return ('modified', existing)  # Content changed
         else:
-            # No hash to compare, assume modified if mtime changed
+            # Content changed, or no comparable hash: assume modified if mtime changed
             return ('modified', existing)
     
     # Check 2: Content match by hash (file may have moved)
     if partial_hash:
         moved = conn.execute(f"""
-            SELECT * FROM {table} WHERE partial_hash = ?
-        """, (partial_hash,)).fetchone()
+            SELECT * FROM {table} WHERE partial_hash = ? AND {hash_tag_sql('partial_hash_algo')} = ?
+        """, (partial_hash, tag)).fetchone()
         
         if moved:
             return ('moved', dict(moved))
@@ -172,7 +248,8 @@ def scan_file(
     file_path: Path,
     volume: dict,
     force: bool = False,
-    duplicate_policy: Literal['reject', 'warn', 'merge'] = 'merge'
+    duplicate_policy: Literal['reject', 'warn', 'merge'] = 'merge',
+    hash_tags: Optional[Sequence[str]] = None
 ) -> ScanResult:
     """
     Scan a single standalone file.
@@ -186,6 +263,8 @@ def scan_file(
             - 'reject': Skip duplicate, don't create new record
             - 'warn': Create record but flag as duplicate
             - 'merge': Update existing record to point to new location (default)
+        hash_tags: Partial-hash tags in the models table (stored_hash_tags();
+            looked up when not given)
     
     Returns:
         ScanResult with action and model data
@@ -233,20 +312,16 @@ def scan_file(
         )
     
     # Need hash for further checks
-    partial_hash = compute_partial_hash(file_path)
+    if hash_tags is None:
+        hash_tags = stored_hash_tags(conn)
+    content = ContentHash(lambda algorithm: compute_partial_hash(file_path, algorithm), hash_tags)
+    partial_hash = content.value
     
     # Check for duplicate (same hash at different path) - ALWAYS CHECK
-    hash_match = conn.execute("""
-        SELECT * FROM models 
-        WHERE partial_hash = ? AND file_path != ?
-        ORDER BY last_seen_at DESC
-        LIMIT 1
-    """, (partial_hash, str(file_path))).fetchone()
+    hash_match = content.find(conn, 'models', "file_path != ?", [str(file_path)])
     
     if hash_match and not existing:
         # Same content, different path - handle based on policy
-        hash_match = dict(hash_match)
-        
         if duplicate_policy == 'reject':
             # Don't create duplicate - skip this file
             return ScanResult(
@@ -268,6 +343,7 @@ def scan_file(
                     'file_size_bytes': file_size,
                     'file_mtime': file_mtime,
                     'partial_hash': partial_hash,
+                    'partial_hash_algo': content.tag,
                     'index_status': 'indexed',
                     'last_indexed_at': now,
                     'last_seen_at': now,
@@ -293,6 +369,8 @@ def scan_file(
                     'folder_path': folder_path,
                     'file_mtime': file_mtime,
                     'file_size_bytes': file_size,
+                    'partial_hash': partial_hash,
+                    'partial_hash_algo': content.tag,
                     'index_status': 'indexed',
                     'missing_since': None,
                     'last_verified_at': now,
@@ -303,12 +381,14 @@ def scan_file(
     
     # Re-check with hash (existing file at this path)
     if existing and not force:
-        if existing.get('partial_hash') == partial_hash:
-            # mtime changed but content same
+        if content.matches(existing):
+            # mtime changed but content same (stored hash upgraded to the current algorithm)
             return ScanResult(
                 ScanAction.UPDATE,
                 {
                     **existing,
+                    'partial_hash': partial_hash,
+                    'partial_hash_algo': content.tag,
                     'file_mtime': file_mtime,
                     'last_verified_at': now,
                     'last_seen_at': now,
@@ -320,10 +400,7 @@ def scan_file(
     
     # Check for moved file (same hash, different path) - Legacy path
     if not existing and not hash_match:
-        _, moved = find_existing_asset(
-            conn, 'models',
-            partial_hash=partial_hash
-        )
+        moved = content.find(conn, 'models')
         
         if moved:
             return ScanResult(
@@ -334,6 +411,8 @@ def scan_file(
                     'relative_path': str(file_path.relative_to(volume['mount_path'])),
                     'file_mtime': file_mtime,
                     'file_size_bytes': file_size,
+                    'partial_hash': partial_hash,
+                    'partial_hash_algo': content.tag,
                     'index_status': 'indexed',
                     'missing_since': None,
                     'last_verified_at': now,
@@ -357,6 +436,7 @@ def scan_file(
                 'file_mtime': file_mtime,
                 'file_size_bytes': file_size,
                 'partial_hash': partial_hash,
+                'partial_hash_algo': content.tag,
                 'last_indexed_at': now,
                 'last_seen_at': now,
                 'index_status': 'indexed',
@@ -399,6 +479,7 @@ def scan_file(
             'file_size_bytes': file_size,
             'file_mtime': file_mtime,
             'partial_hash': partial_hash,
+            'partial_hash_algo': content.tag,
             'index_status': 'indexed',
             'last_indexed_at': now,
             'last_seen_at': now,
@@ -416,13 +497,15 @@ def scan_archive(
     archive_path: Path,
     volume: dict,
     force: bool = False,
-    duplicate_policy: Literal['reject', 'warn', 'merge'] = 'merge'
+    duplicate_policy: Literal['reject', 'warn', 'merge'] = 'merge',
+    hash_tags: Optional[Sequence[str]] = None
 ) -> Generator[ScanResult, None, None]:
     """
     Scan models inside a ZIP archive.
     
     Args:
         duplicate_policy: How to handle duplicate files (same hash, different archive member)
+        hash_tags: Partial-hash tags in the models table (see scan_file)
     
     Yields ScanResult for each model found.
     """
@@ -463,7 +546,7 @@ def scan_archive(
                         continue
                     
                     yield scan_archive_member(
-                        conn, archive_path, member, archive_mtime, volume, rf, force
+                        conn, archive_path, member, archive_mtime, volume, rf, force, hash_tags
                     )
         else:
             # Handle ZIP archives
@@ -483,7 +566,7 @@ def scan_archive(
                         continue
                     
                     yield scan_archive_member(
-                        conn, archive_path, member, archive_mtime, volume, zf, force
+                        conn, archive_path, member, archive_mtime, volume, zf, force, hash_tags
                     )
                 
     except (zipfile.BadZipFile, Exception) as e:
@@ -501,7 +584,8 @@ def scan_archive_member(
     archive_mtime: int,
     volume: dict,
     zf,  # zipfile.ZipFile or rarfile.RarFile
-    force: bool
+    force: bool,
+    hash_tags: Optional[Sequence[str]] = None
 ) -> ScanResult:
     """Scan a single member inside an archive (ZIP or RAR)."""
     now = datetime.now().isoformat()
@@ -531,7 +615,10 @@ def scan_archive_member(
     try:
         data = zf.read(member)
         file_size = len(data)
-        partial_hash = compute_partial_hash_from_bytes(data)
+        if hash_tags is None:
+            hash_tags = stored_hash_tags(conn)
+        content = ContentHash(lambda algorithm: compute_partial_hash_from_bytes(data, algorithm), hash_tags)
+        partial_hash = content.value
     except Exception as e:
         return ScanResult(
             ScanAction.ERROR,
@@ -543,18 +630,12 @@ def scan_archive_member(
         )
     
     # Check for duplicate (same hash, different archive member) - ALWAYS CHECK
-    hash_match = conn.execute("""
-        SELECT * FROM models 
-        WHERE partial_hash = ? 
-        AND NOT (archive_path = ? AND archive_member = ?)
-        ORDER BY last_seen_at DESC
-        LIMIT 1
-    """, (partial_hash, str(archive_path), member)).fetchone()
+    hash_match = content.find(
+        conn, 'models', "NOT (archive_path = ? AND archive_member = ?)", [str(archive_path), member]
+    )
     
     if hash_match and not existing:
         # Same content, different location - handle based on policy
-        hash_match = dict(hash_match)
-        
         if duplicate_policy == 'reject':
             return ScanResult(
                 ScanAction.DUPLICATE,
@@ -574,6 +655,7 @@ def scan_archive_member(
                     'file_size_bytes': file_size,
                     'file_mtime': archive_mtime,
                     'partial_hash': partial_hash,
+                    'partial_hash_algo': content.tag,
                     'index_status': 'indexed',
                     'last_indexed_at': now,
                     'last_seen_at': now,
@@ -592,6 +674,8 @@ def scan_archive_member(
                     'archive_member': member,
                     'file_mtime': archive_mtime,
                     'file_size_bytes': file_size,
+                    'partial_hash': partial_hash,
+                    'partial_hash_algo': content.tag,
                     'last_verified_at': now,
                     'last_seen_at': now,
                     'index_status': 'indexed',
@@ -602,7 +686,7 @@ def scan_archive_member(
     
     # Re-check with hash
     if existing and not force:
-        if existing.get('partial_hash') == partial_hash:
+        if content.matches(existing):
             return ScanResult(
                 ScanAction.SKIP,
                 {
@@ -614,10 +698,7 @@ def scan_archive_member(
     
     # Check for moved (same hash elsewhere)
     if not existing:
-        _, moved = find_existing_asset(
-            conn, 'models',
-            partial_hash=partial_hash
-        )
+        moved = content.find(conn, 'models')
         
         if moved:
             return ScanResult(
@@ -628,6 +709,8 @@ def scan_archive_member(
                     'archive_member': member,
                     'file_mtime': archive_mtime,
                     'file_size_bytes': file_size,
+                    'partial_hash': partial_hash,
+                    'partial_hash_algo': content.tag,
                     'last_verified_at': now,
                     'last_seen_at': now,
                     'index_status': 'indexed',
@@ -645,6 +728,7 @@ def scan_archive_member(
                 'file_size_bytes': file_size,
                 'file_mtime': archive_mtime,
                 'partial_hash': partial_hash,
+                'partial_hash_algo': content.tag,
                 'last_indexed_at': now,
                 'last_seen_at': now,
                 'index_status': 'indexed',
@@ -673,6 +757,7 @@ def scan_archive_member(
             'file_size_bytes': file_size,
             'file_mtime': archive_mtime,
             'partial_hash': partial_hash,
+            'partial_hash_algo': content.tag,
             'index_status': 'indexed',
             'last_indexed_at': now,
             'last_seen_at': now,
@@ -691,12 +776,19 @@ def scan_directory(
     volume: dict,
     force: bool = False,
     recursive: bool = True,
-    duplicate_policy: Literal['reject', 'warn', 'merge'] = 'merge'
+    duplicate_policy: Literal['reject', 'warn', 'merge'] = 'merge',
+    deep: bool = False
 ) -> Generator[ScanResult, None, None]:
     """
     Scan directory for assets.
     
+    Directories unchanged since the last scan (per the directory manifest,
+    see core/dir_manifest.py) are not listed; their models get a bulk
+    last_seen_at update and one SKIP result per directory.
+    
     Args:
+        force: Reprocess every file (implies deep)
+        deep: List every directory, ignoring the manifest
         duplicate_policy: How to handle duplicate files (same hash, different path)
             - 'reject': Skip duplicates
             - 'warn': Create records but flag as duplicates
@@ -707,24 +799,87 @@ def scan_directory(
     MODEL_EXTENSIONS = {'.stl', '.obj', '.3mf', '.glb', '.gltf', '.svg', '.dae', '.3ds', '.ply', '.x3d'}
     ARCHIVE_EXTENSIONS = {'.zip', '.rar'}
     
-    pattern = '**/*' if recursive else '*'
+    # Results carry partial_hash_algo (added by migration 015)
+    ensure_hash_columns(conn, 'models')
+    # Tags of stored hashes, so rows hashed before an algorithm change still match
+    hash_tags = stored_hash_tags(conn)
     
-    for file_path in path.glob(pattern):
-        if file_path.is_dir():
-            continue
-        
-        # Skip hidden files
-        if file_path.name.startswith('.'):
+    manifest = DirectoryManifest(conn, 'model', volume['id'], str(path), force=force or deep)
+    
+    for visit in manifest.walk(recursive):
+        if visit.files is None:
+            yield _skip_unchanged_directory(conn, Path(visit.path), volume, visit.entry_count)
             continue
         
-        ext = file_path.suffix.lower()
-        
-        if ext in ARCHIVE_EXTENSIONS:
-            # Scan inside archive
-            yield from scan_archive(conn, file_path, volume, force, duplicate_policy)
-        elif ext in MODEL_EXTENSIONS:
-            # Standalone file
-            yield scan_file(conn, file_path, volume, force, duplicate_policy)
+        for file_path in map(Path, visit.files):
+            ext = file_path.suffix.lower()
+            
+            if ext in ARCHIVE_EXTENSIONS:
+                # Scan inside archive
+                yield from scan_archive(conn, file_path, volume, force, duplicate_policy, hash_tags)
+            elif ext in MODEL_EXTENSIONS:
+                # Standalone file
+                yield scan_file(conn, file_path, volume, force, duplicate_policy, hash_tags)
+    
+    logger.info(f"Directory scan of {path}: {manifest.stats['dirs_listed']} directories listed, "
+                f"{manifest.stats['dirs_pruned']} unchanged")
+
+
+def _skip_unchanged_directory(
+    conn: sqlite3.Connection,
+    dir_path: Path,
+    volume: dict,
+    entry_count: int
+) -> ScanResult:
+    """Mark the models directly in an unchanged directory as seen, in one UPDATE."""
+    try:
+        folder_path = str(dir_path.relative_to(volume['mount_path']))
+    except ValueError:
+        folder_path = None
+    if folder_path == '.':
+        folder_path = ''
+    
+    if folder_path is not None:
+        conn.execute("""
+            UPDATE models SET last_seen_at = ?
+            WHERE volume_id = ? AND folder_path = ? AND index_status = 'indexed'
+        """, (datetime.now().isoformat(), volume['id'], folder_path))
+    
+    return ScanResult(
+        ScanAction.SKIP,
+        {'folder_path': folder_path, 'entry_count': entry_count},
+        UNCHANGED_DIRECTORY
+    )
+
+
+def apply_scan_result(conn: sqlite3.Connection, result: ScanResult) -> bool:
+    """
+    Write a NEW/UPDATE/MOVED scan result to the models table.
+    
+    Returns True if a row was inserted or updated. Caller commits.
+    """
+    if result.action not in (ScanAction.NEW, ScanAction.UPDATE, ScanAction.MOVED):
+        return False
+    
+    model = dict(result.model)
+    if result.action == ScanAction.NEW:
+        columns = ', '.join(model.keys())
+        placeholders = ', '.join(['?' for _ in model])
+        conn.execute(
+            f"INSERT INTO models ({columns}) VALUES ({placeholders})",
+            list(model.values())
+        )
+        return True
+    
+    model_id = model.pop('id', None)
+    if not model_id:
+        return False
+    sets = ', '.join([f"{k} = ?" for k in model.keys()])
+    conn.execute(
+        f"UPDATE models SET {sets} WHERE id = ?",
+        list(model.values()) + [model_id]
+    )
+    return True
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -902,6 +1057,7 @@ def reindex_single_asset(
         return {'status': status, 'message': 'File not found'}
     
     # Perform scan
+    ensure_hash_columns(conn, 'models')
     if is_archive_member:
         try:
             with zipfile.ZipFile(file_path, 'r') as zf:
@@ -0,0 +1,106 @@
+"""
+Search result cache.
+
+Users repeat searches, and the UI re-issues them on back-navigation and
+when toggling filters; each one re-ran the FTS MATCH plus snippet() and
+highlight() over page text. Results are now kept in an in-process LRU
+(SEARCH_CACHE_SIZE entries) keyed by endpoint, normalised query, filters
+and page.
+
+Every entry records the `search_index` generation it was computed at.
+That counter (see core/stats_cache.py) is bumped by triggers on INSERT
+or DELETE of assets, models or asset_pages and on UPDATEs of the columns
+search matches or filters on, by any process, so a cached page is only
+served while the indexed data is unchanged. Other row fields in a cached
+page (thumbnail state, hashes, sizes) may lag until the next such
+change or eviction. Reading the generation is a primary-key lookup.
+
+Hit/miss/stale counts are exposed through search_cache_stats().
+"""
+
+import copy
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fantasyfolio.config import get_config
+from fantasyfolio.core.stats_cache import get_generations
+
+logger = logging.getLogger(__name__)
+
+GENERATION = 'search_index'
+
+_lock = threading.Lock()
+_cache: 'OrderedDict[Tuple[str, str], Tuple[int, Any]]' = OrderedDict()
+_stats = {'hits': 0, 'misses': 0, 'stale': 0, 'evictions': 0}
+
+
+def normalize_query(query: Optional[str]) -> str:
+    """Case- and whitespace-insensitive form of a search query (FTS ignores both)."""
+    return ' '.join((query or '').lower().split())
+
+
+def cache_key(endpoint: str, query: Optional[str], **params) -> Tuple[str, str]:
+    """Key for a search: endpoint plus normalised query and non-empty parameters."""
+    params = {k: v for k, v in params.items() if v not in (None, '', [], ())}
+    return endpoint, json.dumps([normalize_query(query), params], sort_keys=True, default=str)
+
+
+def cached_search(
+    conn: sqlite3.Connection,
+    key: Tuple[str, str],
+    compute: Callable[[sqlite3.Connection], Any]
+) -> Any:
+    """
+    Return compute(conn), reusing a cached result while the search index is unchanged.
+
+    Args:
+        key: From cache_key()
+        compute: Function running the real search on `conn`
+
+    Returns:
+        A copy of the (possibly cached) result
+    """
+    size = get_config().SEARCH_CACHE_SIZE
+    generations = get_generations(conn, (GENERATION,)) if size > 0 else None
+    if generations is None:
+        return compute(conn)
+    generation = generations[0]
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry and entry[0] == generation:
+            _cache.move_to_end(key)
+            _stats['hits'] += 1
+            return copy.deepcopy(entry[1])
+        _stats['stale' if entry else 'misses'] += 1
+
+    value = compute(conn)
+
+    with _lock:
+        _cache[key] = (generation, value)
+        _cache.move_to_end(key)
+        while len(_cache) > size:
+            _cache.popitem(last=False)
+            _stats['evictions'] += 1
+    return copy.deepcopy(value)
+
+
+def search_cache_stats() -> Dict[str, Any]:
+    """Counters since start (or the last clear), with the hit rate."""
+    with _lock:
+        stats = dict(_stats, entries=len(_cache), max_entries=get_config().SEARCH_CACHE_SIZE)
+    lookups = stats['hits'] + stats['misses'] + stats['stale']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+    return stats
+
+
+def clear_search_cache():
+    """Drop all cached results and reset the counters in this process."""
+    with _lock:
+        _cache.clear()
+        for name in _stats:
+            _stats[name] = 0
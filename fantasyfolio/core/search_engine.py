@@ -0,0 +1,462 @@
+"""
+Unified ranked search across PDFs, PDF pages and 3D models.
+
+The search endpoints used to run one FTS query per index, each with its
+own LIMIT, and concatenate the results: there was no common ordering and
+paging only worked per type. Here one search returns a single list:
+
+1. Each index yields its top K = offset + limit + 1 candidates by bm25
+   (pages are grouped per asset first, scored by their best page).
+2. bm25 scales differ between indexes (short filenames vs. page text),
+   so each score is divided by the best score in its index for this
+   query, giving (0, 1], and multiplied by a per-index weight.
+3. A PDF that matches on metadata and on pages becomes one result scored
+   by its better match. A top-k heap picks the global top K. This is
+   exact: every global top-K result is within its own index's top K.
+4. Only the returned slice is hydrated: full rows, highlights, and the
+   best pages (with snippets) of each PDF. A PDF's match kind (metadata,
+   content or both) is checked against each index for the slice, since
+   whether it made the other index's top K depends on the offset.
+
+Normalising by the per-query best score keeps scores stable from page
+to page, so offsets (or the opaque next_cursor) page consistently across
+types. Deep pages cost O(offset) per index.
+
+Asset and model names are also matched as substrings through the trigram
+indexes (core/trigram_index.py); plan_query() decides per query whether
+the word index, the trigram index or both are searched. Ranking is
+tiered: every word match (name, metadata or page text) sorts before
+every infix-only match, which is reported with match='substring'. The
+top K stays exact: infix-only hits only reach the page when the word
+indexes returned fewer than K hits, i.e. all of them, and the trigram
+indexes aren't queried at all otherwise. When neither finds
+anything, a fuzzy trigram pass catches near-misses such as typos.
+"""
+
+import heapq
+import sqlite3
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fantasyfolio.core.database import folder_prefix_filter
+from fantasyfolio.core.pagination import encode_cursor, decode_cursor, CursorError
+from fantasyfolio.core.trigram_index import (
+    TRIGRAM_TABLES, has_trigram_index, plan_query, trigram_query, fuzzy_query, fuzzy_filter
+)
+
+logger = logging.getLogger(__name__)
+
+# Relative weight of a best-in-index match from each index
+INDEX_WEIGHTS = {
+    'asset': 1.0,
+    'page': 0.8,
+    'model': 1.0,
+    # Substring (trigram) matches on names; these sort after all word matches
+    'asset_trigram': 0.6,
+    'model_trigram': 0.6,
+}
+
+# Trigram candidates examined per result slot by the fuzzy fallback
+FUZZY_POOL = 5
+
+# Ranking tiers: word/prefix matches, then infix-only name matches
+WORD_TIER, SUBSTRING_TIER = 0, 1
+
+# Result types, in tie-break order
+RESULT_TYPES = ('pdf', 'model')
+
+# Best-matching pages attached to each PDF result
+PAGES_PER_ASSET = 3
+
+MARK_OPEN, MARK_CLOSE = '<mark>', '</mark>'
+
+CURSOR_SIGNATURE = 'search:unified'
+
+
+def fts_query(query: str) -> str:
+    """Convert search query to FTS5 format with prefix matching.
+
+    Adds wildcard (*) to each term for prefix matching.
+    E.g., 'robo drag' becomes 'robo* drag*'
+    """
+    terms = query.strip().split()
+    return ' '.join(f'{term}*' for term in terms if term)
+
+
+def _placeholders(values: Sequence) -> str:
+    return ', '.join('?' * len(values))
+
+
+def _filters(alias: str, filters: Dict[str, Any], columns: Iterable[str]) -> Tuple[str, list]:
+    """AND-clauses for the filters that apply to a table."""
+    sql, params = [], []
+    if not filters.get('include_deleted'):
+        sql.append(f"{alias}.deleted_at IS NULL")
+    if filters.get('folder'):
+        folder_sql, folder_params = folder_prefix_filter(f'{alias}.folder_path', filters['folder'])
+        sql.append(folder_sql)
+        params.extend(folder_params)
+    for column in columns:
+        if filters.get(column):
+            sql.append(f"{alias}.{column} = ?")
+            params.append(filters[column])
+    return ''.join(f" AND {clause}" for clause in sql), params
+
+
+def _candidates(conn: sqlite3.Connection, sql: str, params: list, index: str) -> List[Tuple[int, float]]:
+    """(id, bm25) pairs, best first; an FTS syntax error yields no candidates."""
+    try:
+        return [(row[0], row[1]) for row in conn.execute(sql, params).fetchall()]
+    except sqlite3.OperationalError as e:
+        logger.debug(f"Search of {index} index failed: {e}")
+        return []
+
+
+def _normalised(candidates: List[Tuple[int, float]], index: str) -> Dict[int, float]:
+    """id -> weighted score in (0, weight]; bm25 is negative, lower is better."""
+    if not candidates:
+        return {}
+    best = candidates[0][1] or -1e-9
+    weight = INDEX_WEIGHTS[index]
+    return {row_id: weight * (score / best if score else 0.0) for row_id, score in candidates}
+
+
+def _asset_candidates(conn, fts_q, filters, k):
+    where, params = _filters('a', filters, ('publisher', 'game_system'))
+    return _candidates(conn, f"""
+        SELECT a.id, assets_fts.rank AS score
+        FROM assets_fts
+        JOIN assets a ON a.id = assets_fts.rowid
+        WHERE assets_fts MATCH ?{where}
+        ORDER BY score LIMIT ?
+    """, [fts_q] + params + [k], 'asset')
+
+
+def _page_candidates(conn, fts_q, filters, k):
+    where, params = _filters('a', filters, ('publisher', 'game_system'))
+    return _candidates(conn, f"""
+        SELECT p.asset_id, MIN(pages_fts.rank) AS score
+        FROM pages_fts
+        JOIN asset_pages p ON p.id = pages_fts.rowid
+        JOIN assets a ON a.id = p.asset_id
+        WHERE pages_fts MATCH ?{where}
+        GROUP BY p.asset_id
+        ORDER BY score LIMIT ?
+    """, [fts_q] + params + [k], 'page')
+
+
+def _model_candidates(conn, fts_q, filters, k):
+    where, params = _filters('m', filters, ('format', 'collection', 'creator'))
+    return _candidates(conn, f"""
+        SELECT m.id, models_fts.rank AS score
+        FROM models_fts
+        JOIN models m ON m.id = models_fts.rowid
+        WHERE models_fts MATCH ?{where}
+        ORDER BY score LIMIT ?
+    """, [fts_q] + params + [k], 'model')
+
+
+def _trigram_candidates(conn, table, alias, tri_q, filters, columns, k):
+    index = f"{table}_trigram"
+    where, params = _filters(alias, filters, columns)
+    # Shorter names containing the substring rank first. bm25 over trigram
+    # tokens adds little for single-substring matches and is several times
+    # slower when a common substring matches a large share of the library.
+    return _candidates(conn, f"""
+        SELECT {alias}.id, -1.0 / MAX(LENGTH({alias}.filename), 1) AS score
+        FROM {index}
+        JOIN {table} {alias} ON {alias}.id = {index}.rowid
+        WHERE {index} MATCH ?{where}
+        ORDER BY score LIMIT ?
+    """, [tri_q] + params + [k], index)
+
+
+def _fuzzy_candidates(conn, table, alias, query, filters, columns, k, weight) -> Dict[int, float]:
+    """id -> weighted trigram similarity, for rows sharing enough trigrams with the query."""
+    fuzzy_q = fuzzy_query(query)
+    if not fuzzy_q:
+        return {}
+    index = f"{table}_trigram"
+    names = ', '.join(f"{alias}.{column}" for column in TRIGRAM_TABLES[table])
+    where, params = _filters(alias, filters, columns)
+    try:
+        rows = conn.execute(f"""
+            SELECT {alias}.id, {names}
+            FROM {index}
+            JOIN {table} {alias} ON {alias}.id = {index}.rowid
+            WHERE {index} MATCH ?{where}
+            ORDER BY {index}.rank LIMIT ?
+        """, [fuzzy_q] + params + [k * FUZZY_POOL]).fetchall()
+    except sqlite3.OperationalError as e:
+        logger.debug(f"Fuzzy search of {index} failed: {e}")
+        return {}
+    matches = fuzzy_filter(query, {row[0]: list(row[1:]) for row in rows})
+    return {row_id: weight * score for row_id, score in matches.items()}
+
+
+def _hydrate_pdfs(conn, hits: List[Dict], word_q: Optional[str], tri_q: Optional[str],
+                  pages_q: Optional[str], pages_per_asset: int):
+    """
+    Attach asset rows, metadata highlights and best pages to PDF hits.
+
+    Also sets each hit's 'match' from which indexes the PDF matches:
+    word_q (metadata), tri_q (name substring) and pages_q (page content),
+    each None when not searched. Whether a PDF made its other index's top
+    K depends on the offset, so the candidate scoring can't tell.
+    """
+    if not hits:
+        return
+    ids = [hit['id'] for hit in hits]
+    rows = {row['id']: dict(row) for row in conn.execute(
+        f"SELECT * FROM assets WHERE id IN ({_placeholders(ids)})", ids
+    ).fetchall()}
+
+    # The highlight queries only return rows that match, which doubles
+    # as the metadata membership check
+    metadata: set = set()
+    if word_q:
+        try:
+            for row in conn.execute(f"""
+                SELECT assets_fts.rowid,
+                       highlight(assets_fts, 0, '{MARK_OPEN}', '{MARK_CLOSE}') AS highlight,
+                       snippet(assets_fts, 0, '{MARK_OPEN}', '{MARK_CLOSE}', '...', 32) AS snippet
+                FROM assets_fts
+                WHERE assets_fts MATCH ? AND assets_fts.rowid IN ({_placeholders(ids)})
+            """, [word_q] + ids).fetchall():
+                metadata.add(row[0])
+                if row[0] in rows:
+                    rows[row[0]].update(highlight=row[1], snippet=row[2])
+        except sqlite3.OperationalError as e:
+            logger.debug(f"Metadata highlight failed: {e}")
+
+    # Substring-only matches: mark the title from the trigram index instead
+    substring: set = set()
+    infix_ids = [row_id for row_id in ids if row_id not in metadata]
+    if tri_q and infix_ids:
+        try:
+            for row in conn.execute(f"""
+                SELECT rowid,
+                       highlight(assets_trigram, 1, '{MARK_OPEN}', '{MARK_CLOSE}') AS highlight,
+                       snippet(assets_trigram, -1, '{MARK_OPEN}', '{MARK_CLOSE}', '...', 32) AS snippet
+                FROM assets_trigram
+                WHERE assets_trigram MATCH ? AND rowid IN ({_placeholders(infix_ids)})
+            """, [tri_q] + infix_ids).fetchall():
+                substring.add(row[0])
+                if row[0] in rows:
+                    rows[row[0]].update(highlight=row[1], snippet=row[2])
+        except sqlite3.OperationalError as e:
+            logger.debug(f"Trigram highlight failed: {e}")
+
+    pages: Dict[int, List[Dict]] = {}
+    content: set = set()
+    if pages_q and pages_per_asset > 0:
+        top_pages = conn.execute(f"""
+            SELECT id, asset_id, page_num, score FROM (
+                SELECT p.id, p.asset_id, p.page_num, pages_fts.rank AS score,
+                       ROW_NUMBER() OVER (PARTITION BY p.asset_id ORDER BY pages_fts.rank) AS rn
+                FROM pages_fts
+                JOIN asset_pages p ON p.id = pages_fts.rowid
+                WHERE pages_fts MATCH ? AND p.asset_id IN ({_placeholders(ids)})
+            ) WHERE rn <= ?
+            ORDER BY asset_id, score
+        """, [pages_q] + ids + [pages_per_asset]).fetchall()
+        page_ids = [row['id'] for row in top_pages]
+        snippets = {}
+        if page_ids:
+            # snippet() only for the handful of pages returned, not every match
+            snippets = dict(conn.execute(f"""
+                SELECT rowid, snippet(pages_fts, 0, '{MARK_OPEN}', '{MARK_CLOSE}', '...', 32)
+                FROM pages_fts WHERE pages_fts MATCH ? AND rowid IN ({_placeholders(page_ids)})
+            """, [pages_q] + page_ids).fetchall())
+        for row in top_pages:
+            content.add(row['asset_id'])
+            pages.setdefault(row['asset_id'], []).append({
+                'id': row['id'],
+                'page_num': row['page_num'],
+                'rank': row['score'],
+                'snippet': snippets.get(row['id'])
+            })
+    elif pages_q:
+        content.update(row[0] for row in conn.execute(f"""
+            SELECT DISTINCT p.asset_id
+            FROM pages_fts
+            JOIN asset_pages p ON p.id = pages_fts.rowid
+            WHERE pages_fts MATCH ? AND p.asset_id IN ({_placeholders(ids)})
+        """, [pages_q] + ids).fetchall())
+
+    for hit in hits:
+        hit.update(rows.get(hit['id'], {}))
+        hit['pages'] = pages.get(hit['id'], [])
+        if hit['id'] in metadata:
+            hit['match'] = 'both' if hit['id'] in content else 'metadata'
+        elif hit['id'] in content:
+            hit['match'] = 'content'
+        elif hit['id'] in substring:
+            hit['match'] = 'substring'
+        # Otherwise (fuzzy matches) keep the candidate's own label
+
+
+def _hydrate_models(conn, hits: List[Dict]):
+    if not hits:
+        return
+    ids = [hit['id'] for hit in hits]
+    rows = {row['id']: dict(row) for row in conn.execute(
+        f"SELECT * FROM models WHERE id IN ({_placeholders(ids)})", ids
+    ).fetchall()}
+    for hit in hits:
+        hit.update(rows.get(hit['id'], {}))
+
+
+def unified_search(
+    conn: sqlite3.Connection,
+    query: str,
+    types: Sequence[str] = RESULT_TYPES,
+    limit: int = 50,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    include_metadata: bool = True,
+    include_pages: bool = True,
+    pages_per_asset: int = PAGES_PER_ASSET,
+    **filters
+) -> Dict[str, Any]:
+    """
+    One relevance-ordered page of results across PDFs, pages and models.
+
+    Args:
+        conn: Database connection (sqlite3.Row rows)
+        query: User search text (terms are prefix-matched, and matched as
+            name substrings where plan_query() allows)
+        types: Result types to include: 'pdf', 'model'
+        limit: Results per page
+        offset: Results to skip (ignored when cursor is given)
+        cursor: next_cursor from the previous page
+        include_metadata: Match PDFs on title/author/publisher/filename/text
+        include_pages: Match PDFs on page content
+        pages_per_asset: Best pages attached to each PDF result
+        **filters: folder, publisher, game_system (PDFs); folder, format,
+            collection, creator (models); include_deleted
+
+    Returns:
+        Dict with 'results' (each with result_type, score, match and the
+        row fields; PDFs also carry 'pages'), 'offset' and 'next_cursor'
+        (None on the last page). match is 'metadata', 'content' or 'both'
+        for word matches and 'substring' for infix-only name matches
+
+    Raises:
+        CursorError: If the cursor is malformed
+    """
+    if cursor:
+        try:
+            offset = int(decode_cursor(cursor, CURSOR_SIGNATURE)[0])
+        except (TypeError, ValueError) as e:
+            raise CursorError(f"Invalid cursor: {e}")
+    offset = max(0, offset)
+    k = offset + limit + 1
+    fts_q = fts_query(query)
+    if not include_pages:
+        pages_per_asset = 0
+
+    plan = plan_query(query) if fts_q and has_trigram_index(conn) else 'prefix'
+    word_q = fts_q if plan != 'trigram' else None
+    tri_q = trigram_query(query) if plan != 'prefix' else None
+    asset_columns, model_columns = ('publisher', 'game_system'), ('format', 'collection', 'creator')
+    search_pdfs = bool(fts_q) and 'pdf' in types
+    search_models = bool(fts_q) and 'model' in types
+    pdf, model = RESULT_TYPES.index('pdf'), RESULT_TYPES.index('model')
+
+    # Word tier: word/prefix matches on metadata and names, and page text
+    scored: List[Tuple[float, int, int, int, str, str]] = []
+    assets, pages, models = {}, {}, {}
+    if search_pdfs:
+        if include_metadata and word_q:
+            assets = _normalised(_asset_candidates(conn, word_q, filters, k), 'asset')
+        if include_pages:
+            pages = _normalised(_page_candidates(conn, fts_q, filters, k), 'page')
+        for asset_id in assets.keys() | pages.keys():
+            a, p = assets.get(asset_id, 0.0), pages.get(asset_id, 0.0)
+            # Final match kind is settled for the returned slice in _hydrate_pdfs
+            match = 'metadata' if a >= p else 'content'
+            scored.append((max(a, p), WORD_TIER, pdf, asset_id, 'pdf', match))
+    if search_models and word_q:
+        models = _normalised(_model_candidates(conn, word_q, filters, k), 'model')
+        for model_id, score in models.items():
+            scored.append((score, WORD_TIER, model, model_id, 'model', 'metadata'))
+
+    # Substring tier. With K word hits it could never reach the page, so the
+    # trigram lookup (the costly part for common substrings) is skipped;
+    # below K every word index returned all of its hits, so "not a word
+    # hit" is exact.
+    if tri_q and len(scored) < k:
+        if search_pdfs and include_metadata:
+            infix = _normalised(_trigram_candidates(conn, 'assets', 'a', tri_q, filters, asset_columns, k),
+                                'asset_trigram')
+            for asset_id, score in infix.items():
+                if asset_id not in assets and asset_id not in pages:
+                    scored.append((score, SUBSTRING_TIER, pdf, asset_id, 'pdf', 'substring'))
+        if search_models:
+            infix = _normalised(_trigram_candidates(conn, 'models', 'm', tri_q, filters, model_columns, k),
+                                'model_trigram')
+            for model_id, score in infix.items():
+                if model_id not in models:
+                    scored.append((score, SUBSTRING_TIER, model, model_id, 'model', 'substring'))
+
+    # Fuzzy pass only when the exact passes found nothing
+    if not scored and plan != 'prefix':
+        if search_pdfs and include_metadata:
+            for asset_id, score in _fuzzy_candidates(conn, 'assets', 'a', query, filters, asset_columns, k,
+                                                     INDEX_WEIGHTS['asset_trigram']).items():
+                scored.append((score, WORD_TIER, pdf, asset_id, 'pdf', 'metadata'))
+        if search_models:
+            for model_id, score in _fuzzy_candidates(conn, 'models', 'm', query, filters, model_columns, k,
+                                                     INDEX_WEIGHTS['model_trigram']).items():
+                scored.append((score, WORD_TIER, model, model_id, 'model', 'metadata'))
+
+    # Word matches first, then best score; ties broken by type then id so pages never overlap
+    top = heapq.nsmallest(k, scored, key=lambda s: (s[1], -s[0], s[2], s[3]))
+    page = top[offset:offset + limit]
+    has_more = len(top) > offset + limit
+
+    results = [
+        {'result_type': result_type, 'id': row_id, 'score': round(score, 6), 'match': match}
+        for score, _, _, row_id, result_type, match in page
+    ]
+    _hydrate_pdfs(conn, [r for r in results if r['result_type'] == 'pdf'],
+                  word_q if include_metadata else None, tri_q if include_metadata else None,
+                  fts_q if include_pages else None, pages_per_asset)
+    _hydrate_models(conn, [r for r in results if r['result_type'] == 'model'])
+
+    return {
+        'results': results,
+        'offset': offset,
+        'next_cursor': encode_cursor(CURSOR_SIGNATURE, [offset + limit]) if has_more else None
+    }
+
+
+def split_results(results: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Per-type views of unified results, in the legacy response shape.
+
+    'assets' holds PDFs that matched on metadata, 'pages' the attached page
+    hits flattened (with the asset's filename/title/folder), 'models' the
+    models. All keep the unified relevance order.
+    """
+    split = {'assets': [], 'pages': [], 'models': []}
+    for result in results:
+        if result['result_type'] == 'model':
+            split['models'].append(result)
+            continue
+        if result['match'] != 'content':
+            split['assets'].append(result)
+        for page in result.get('pages', []):
+            split['pages'].append({
+                'id': page['id'],
+                'asset_id': result['id'],
+                'page_num': page['page_num'],
+                'filename': result.get('filename'),
+                'title': result.get('title'),
+                'folder_path': result.get('folder_path'),
+                'publisher': result.get('publisher'),
+                'snippet': page['snippet'],
+                'rank': page['rank']
+            })
+    return split
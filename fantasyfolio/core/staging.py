@@ -0,0 +1,171 @@
+"""
+Staging of render inputs and outputs on memory-backed storage.
+
+Renderers (f3d, stl-thumb, cairosvg) need real file paths, so archive
+members used to be read into RAM, written to a temp file on disk and read
+back by the renderer, with the PNG taking another trip through disk. On a
+slow or degraded data disk that I/O dominates the render.
+
+Staged files live on tmpfs (/dev/shm) when the payload is under
+RENDER_STAGING_MAX_MB and there is room for it, and fall back to the
+regular temp dir otherwise. Members are streamed from the archive rather
+than read whole. Every staged file is removed when its context exits,
+including when a renderer times out; run_render() kills the renderer's
+whole process group on timeout so nothing (xvfb-run, Xvfb, f3d) is left
+holding or writing a staged file.
+"""
+
+import os
+import shutil
+import signal
+import logging
+import tempfile
+import subprocess
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from fantasyfolio.config import get_config
+
+logger = logging.getLogger(__name__)
+
+# tmpfs mounts tried, in order, for memory-backed staging
+MEMORY_DIRS = ('/dev/shm', '/run/shm')
+
+# Free space left on tmpfs after staging a file (bytes)
+MEMORY_HEADROOM = 64 * 1024 * 1024
+
+STAGE_PREFIX = 'ff-stage-'
+
+_memory_dir: Optional[str] = None
+_memory_dir_checked = False
+
+
+def memory_staging_dir() -> Optional[str]:
+    """First writable tmpfs directory, or None if there is none."""
+    global _memory_dir, _memory_dir_checked
+    if not _memory_dir_checked:
+        _memory_dir_checked = True
+        for candidate in MEMORY_DIRS:
+            if os.path.isdir(candidate) and os.access(candidate, os.W_OK | os.X_OK):
+                _memory_dir = candidate
+                break
+    return _memory_dir
+
+
+def _staging_dir(size: Optional[int]) -> Optional[str]:
+    """tmpfs directory for a payload of `size` bytes, or None for the disk temp dir."""
+    limit = get_config().RENDER_STAGING_MAX_MB * 1024 * 1024
+    if size is None or size > limit:
+        return None
+
+    memory_dir = memory_staging_dir()
+    if memory_dir is None:
+        return None
+    try:
+        if shutil.disk_usage(memory_dir).free < size + MEMORY_HEADROOM:
+            return None
+    except OSError:
+        return None
+    return memory_dir
+
+
+@contextmanager
+def staged_file(suffix: str = '', size: Optional[int] = None) -> Iterator[str]:
+    """
+    Yield the path of an empty staging file, removed on exit.
+
+    Args:
+        suffix: File extension (renderers pick their loader from it)
+        size: Expected payload size; unknown sizes are staged on disk
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix, prefix=STAGE_PREFIX, dir=_staging_dir(size))
+    os.close(fd)
+    try:
+        yield path
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+@contextmanager
+def stage_member(zf: zipfile.ZipFile, member: str, suffix: str = '') -> Iterator[str]:
+    """Stream an archive member into a staging file and yield its path."""
+    size = zf.getinfo(member).file_size
+    with staged_file(suffix, size) as path:
+        with zf.open(member) as src, open(path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        yield path
+
+
+@contextmanager
+def stage_bytes(data: bytes, suffix: str = '') -> Iterator[str]:
+    """Write in-memory data to a staging file and yield its path."""
+    with staged_file(suffix, len(data)) as path:
+        with open(path, 'wb') as f:
+            f.write(data)
+        yield path
+
+
+@contextmanager
+def staged_output(suffix: str = '.png') -> Iterator[str]:
+    """
+    Yield a path for a renderer to write its output to, removed on exit.
+
+    The file does not exist yet, so `os.path.exists()` tells whether the
+    renderer produced anything. Use publish() to move it into place.
+    """
+    with staged_file(suffix, 0) as path:
+        os.unlink(path)
+        yield path
+
+
+def publish(staged_path: str, final_path: Path):
+    """
+    Move a staged output to its final location.
+
+    The file is copied next to the target and renamed over it, so readers
+    never see a partially written thumbnail.
+    """
+    final_path = Path(final_path)
+    tmp_path = final_path.with_name(f".{final_path.name}.tmp")
+    try:
+        shutil.copyfile(staged_path, tmp_path)
+        os.replace(tmp_path, final_path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def run_render(cmd: List[str], timeout: float, env: Optional[dict] = None) -> subprocess.CompletedProcess:
+    """
+    Run a renderer command like subprocess.run(capture_output=True).
+
+    The command runs in its own session; on timeout the whole process
+    group is killed (not just xvfb-run) before TimeoutExpired is raised.
+    """
+    proc = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        env=env, start_new_session=True
+    )
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        proc.communicate()
+        logger.warning(f"Renderer timed out after {timeout}s: {cmd[0]}")
+        raise
+    except BaseException:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        proc.wait()
+        raise
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
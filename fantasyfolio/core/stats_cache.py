@@ -0,0 +1,204 @@
+"""
+Library statistics cache.
+
+The stats endpoints (/api/stats, /api/models/stats, /api/models/index-stats,
+/api/system/state) are polled by the UI and each ran several full-table
+aggregates per call. Results are now cached in-process and keyed on a
+per-table generation counter:
+
+- `data_generations` holds one counter per tracked table
+- SQLite triggers bump the counter on INSERT/DELETE and on UPDATEs of the
+  columns the stats depend on, so every writer (API, indexers, CLI,
+  thumbnail daemon, other workers) invalidates the cache without having
+  to remember to
+- a cached value is reused while its table generations are unchanged and
+  it is younger than STATS_CACHE_TTL (a safety net, and the refresh
+  interval for time-based figures like "last 24h")
+
+Checking a generation is a primary-key lookup, so cached answers are
+constant time and still exact after writes.
+"""
+
+import copy
+import time
+import logging
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fantasyfolio.config import get_config
+
+logger = logging.getLogger(__name__)
+
+# table -> columns whose UPDATEs change the stats (None = inserts/deletes only)
+TRACKED_TABLES = {
+    'assets': ['deleted_at', 'file_size', 'publisher', 'volume_id', 'index_status'],
+    'models': ['deleted_at', 'format', 'collection', 'file_size', 'volume_id',
+               'index_status', 'partial_hash', 'thumb_storage'],
+    'change_journal': None,
+    # Not stats, but used the same way by core/path_index.py
+    'asset_locations': ['path', 'enabled', 'asset_type', 'is_primary', 'name'],
+    'volumes': ['mount_path'],
+}
+
+# Counters over several tables (name -> table -> columns whose UPDATEs bump
+# it), bumped by INSERT/DELETE on the tables and by UPDATEs of those columns.
+# Used by core/search_cache.py: the FTS/trigram-indexed columns, the search
+# filters and deleted_at.
+COMBINED_GENERATIONS = {
+    'search_index': {
+        'assets': ['deleted_at', 'title', 'author', 'publisher', 'filename', 'text_content',
+                   'folder_path', 'game_system'],
+        'models': ['deleted_at', 'filename', 'title', 'collection', 'creator',
+                   'folder_path', 'format'],
+        'asset_pages': ['text_content'],
+    },
+}
+
+
+def _triggers() -> Dict[str, Tuple[str, str, str]]:
+    """Trigger name -> (counter, table, event) for every generation trigger."""
+    triggers = {}
+    for table, columns in TRACKED_TABLES.items():
+        events = [('insert', 'INSERT'), ('delete', 'DELETE')]
+        if columns:
+            events.append(('update', f"UPDATE OF {', '.join(columns)}"))
+        for suffix, event in events:
+            triggers[f"trg_{table}_gen_{suffix}"] = (table, table, event)
+    for name, tables in COMBINED_GENERATIONS.items():
+        for table, columns in tables.items():
+            for suffix, event in (('insert', 'INSERT'), ('update', f"UPDATE OF {', '.join(columns)}"),
+                                  ('delete', 'DELETE')):
+                triggers[f"trg_{table}_{name}_gen_{suffix}"] = (name, table, event)
+    return triggers
+
+
+TRIGGERS = _triggers()
+
+
+def _build_schema_sql() -> str:
+    statements = [
+        "CREATE TABLE IF NOT EXISTS data_generations(\n"
+        "  name TEXT PRIMARY KEY,\n"
+        "  generation INTEGER NOT NULL DEFAULT 0\n"
+        ");"
+    ]
+    for counter in list(TRACKED_TABLES) + list(COMBINED_GENERATIONS):
+        statements.append(f"INSERT OR IGNORE INTO data_generations (name, generation) VALUES ('{counter}', 0);")
+    for trigger, (counter, table, event) in TRIGGERS.items():
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS {trigger} AFTER {event} ON {table}\n"
+            f"BEGIN\n  UPDATE data_generations SET generation = generation + 1 WHERE name = '{counter}';\nEND;"
+        )
+    return '\n\n'.join(statements) + '\n'
+
+
+STATS_CACHE_SQL = _build_schema_sql()
+
+# Database files whose schema has been checked (in-memory databases are always checked)
+_schema_ready = set()
+_lock = threading.Lock()
+_cache: Dict[str, Tuple[Tuple[int, ...], float, Any]] = {}
+
+
+def _database_file(conn: sqlite3.Connection) -> str:
+    """Path of the connection's main database ('' for in-memory/temporary)."""
+    for row in conn.execute("PRAGMA database_list").fetchall():
+        if row[1] == 'main':
+            return row[2] or ''
+    return ''
+
+
+def outdated_triggers(conn: sqlite3.Connection) -> List[str]:
+    """Generation triggers that are missing or fire on a different event than TRIGGERS says."""
+    stored = {row[0]: ' '.join((row[1] or '').split()) for row in conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type='trigger' AND name LIKE 'trg_%_gen_%'"
+    )}
+    return [trigger for trigger, (_, table, event) in TRIGGERS.items()
+            if f" AFTER {event} ON {table} " not in stored.get(trigger, '')]
+
+
+def create_stats_schema(conn: sqlite3.Connection):
+    """
+    Create the generation table and triggers, replacing triggers whose
+    definition changed (e.g. an UPDATE OF column list). Commits.
+    """
+    drops = ''.join(f"DROP TRIGGER IF EXISTS {trigger};\n" for trigger in outdated_triggers(conn))
+    conn.executescript(drops + STATS_CACHE_SQL)
+    conn.commit()
+
+
+def ensure_stats_schema(conn: sqlite3.Connection):
+    """Create or update the generation table and triggers on databases that predate them."""
+    db_file = _database_file(conn)
+    if db_file and db_file in _schema_ready:
+        return
+
+    if outdated_triggers(conn):
+        logger.info("Creating data_generations table and triggers (stats cache)")
+        create_stats_schema(conn)
+    if db_file:
+        _schema_ready.add(db_file)
+
+
+def get_generations(conn: sqlite3.Connection, tables: Sequence[str]) -> Optional[Tuple[int, ...]]:
+    """Current generation of each table, or None if generations aren't available."""
+    try:
+        ensure_stats_schema(conn)
+        placeholders = ','.join('?' * len(tables))
+        rows = dict(conn.execute(
+            f"SELECT name, generation FROM data_generations WHERE name IN ({placeholders})",
+            list(tables)
+        ).fetchall())
+    except sqlite3.Error as e:
+        logger.debug(f"Generation lookup failed: {e}")
+        return None
+    return tuple(rows.get(table, 0) for table in tables)
+
+
+def cached_stats(
+    conn: sqlite3.Connection,
+    key: str,
+    tables: Sequence[str],
+    compute: Callable[[sqlite3.Connection], Any],
+    max_age: Optional[float] = None
+) -> Any:
+    """
+    Return compute(conn), reusing the cached result while `tables` are unchanged.
+
+    Args:
+        key: Cache key (include any arguments that change the result)
+        tables: Tracked tables the result depends on
+        compute: Function running the real queries on `conn`
+        max_age: Seconds before recomputing regardless (default STATS_CACHE_TTL)
+
+    Returns:
+        A copy of the (possibly cached) result
+    """
+    if max_age is None:
+        max_age = get_config().STATS_CACHE_TTL
+
+    generations = get_generations(conn, tables)
+    now = time.monotonic()
+
+    if generations is not None:
+        with _lock:
+            entry = _cache.get(key)
+        if entry and entry[0] == generations and now - entry[1] < max_age:
+            return copy.deepcopy(entry[2])
+
+    value = compute(conn)
+
+    if generations is not None:
+        with _lock:
+            _cache[key] = (generations, now, value)
+    return copy.deepcopy(value)
+
+
+def invalidate_stats(key: Optional[str] = None):
+    """Drop one cached result (or all of them) in this process."""
+    with _lock:
+        if key is None:
+            _cache.clear()
+        else:
+            _cache.pop(key, None)
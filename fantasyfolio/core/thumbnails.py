@@ -10,13 +10,14 @@ Implements sidecar thumbnail storage strategy from Architecture v1.2:
 import os
 import sqlite3
 import subprocess
-import tempfile
 import zipfile
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Tuple
 from enum import Enum
 
+from fantasyfolio.core.staging import stage_member, staged_output, publish, run_render
+
 
 class ThumbStorage(Enum):
     SIDECAR = 'sidecar'
@@ -178,6 +179,44 @@ def _resolve_thumb_path(model: dict, volume: dict, central_dir: Path) -> Optiona
         return Path(thumb_path)
 
 
+def _stored_thumb_path(storage: ThumbStorage, path: Path, volume: dict, central_dir: Path) -> str:
+    """Path as recorded in thumb_path: relative to the central cache or volume mount."""
+    if storage == ThumbStorage.CENTRAL:
+        try:
+            return str(path.relative_to(central_dir))
+        except ValueError:
+            return str(path)
+    if volume and volume.get('mount_path'):
+        try:
+            return str(path.relative_to(volume['mount_path']))
+        except ValueError:
+            pass
+    return str(path)
+
+
+def _candidate_thumb_paths(model: dict, central_dir: Path):
+    """
+    Every place a thumbnail for this model may already exist, in lookup order.
+    
+    Unlike find_thumbnail() this never probes directories for writability,
+    so it is safe to run over a whole library.
+    """
+    if model.get('archive_path'):
+        archive_path = Path(model['archive_path'])
+        thumb_name = _thumb_name_for_member(
+            model.get('archive_member', '') or '',
+            model.get('partial_hash', '') or model.get('id', '')
+        )
+        yield ThumbStorage.ARCHIVE_SIDECAR, archive_path.parent / f".{archive_path.name}.dam" / "thumbs" / thumb_name
+    elif model.get('file_path'):
+        file_path = Path(model['file_path'])
+        yield ThumbStorage.SIDECAR, file_path.parent / f".{file_path.name}.thumb.png"
+    
+    yield _central_path(model, central_dir)
+    # Old-style central cache (by ID)
+    yield ThumbStorage.CENTRAL, central_dir / '3d' / f"{model.get('id', 0)}.png"
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # THUMBNAIL RENDERING
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -206,15 +245,6 @@ def render_thumbnail(
         if existing:
             return None  # Already exists
     
-    # Determine output location
-    storage, output_path = determine_thumb_location(model, volume, central_dir)
-    
-    # Ensure output directory exists
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    # Get source data
-    source_mtime = None
-    
     if model.get('archive_path') and model.get('archive_member'):
         # Archive member - extract to temp file
         archive_path = Path(model['archive_path'])
@@ -224,58 +254,59 @@ def render_thumbnail(
         source_mtime = int(archive_path.stat().st_mtime)
         
         try:
-            with zipfile.ZipFile(archive_path, 'r') as zf:
-                data = zf.read(model['archive_member'])
-            
-            # Write to temp file for rendering
-            with tempfile.NamedTemporaryFile(
-                suffix=f".{model.get('format', 'stl')}",
-                delete=False
-            ) as tmp:
-                tmp.write(data)
-                tmp_path = tmp.name
-            
-            # Route to appropriate renderer based on format
-            file_format = model.get('format', '').lower()
-            if file_format == 'svg':
-                success = _render_svg_thumbnail(tmp_path, str(output_path), size)
-            else:
-                success = _render_3d_thumbnail(tmp_path, str(output_path), size, file_format)
-            os.unlink(tmp_path)
-            
+            with zipfile.ZipFile(archive_path, 'r') as zf, \
+                    stage_member(zf, model['archive_member'], f".{model.get('format') or 'stl'}") as staged:
+                return render_thumbnail_from_source(model, volume, central_dir, staged, source_mtime, size)
         except Exception:
             return None
     
-    else:
-        # Standalone file
-        file_path = Path(model['file_path'])
-        if not file_path.exists():
-            return None
-        
-        source_mtime = int(file_path.stat().st_mtime)
-        
-        # Route to appropriate renderer based on format
-        file_format = model.get('format', '').lower()
-        if file_format == 'svg':
-            success = _render_svg_thumbnail(str(file_path), str(output_path), size)
-        else:
-            success = _render_3d_thumbnail(str(file_path), str(output_path), size, file_format)
+    # Standalone file
+    file_path = Path(model['file_path'])
+    if not file_path.exists():
+        return None
     
-    if success and output_path.exists():
-        # Compute relative path for storage
-        if storage == ThumbStorage.CENTRAL:
-            rel_path = str(output_path.relative_to(central_dir))
-        elif volume and volume.get('mount_path'):
-            try:
-                rel_path = str(output_path.relative_to(volume['mount_path']))
-            except ValueError:
-                rel_path = str(output_path)
+    source_mtime = int(file_path.stat().st_mtime)
+    return render_thumbnail_from_source(model, volume, central_dir, str(file_path), source_mtime, size)
+
+
+def render_thumbnail_from_source(
+    model: dict,
+    volume: dict,
+    central_dir: Path,
+    source_path: str,
+    source_mtime: Optional[int],
+    size: int = 512
+) -> Optional[dict]:
+    """
+    Render a model's thumbnail from an already-available source file.
+    
+    The output location is chosen from the model itself (not source_path),
+    so archive members staged to a temp file still get their archive
+    sidecar. The renderer writes to a staged file that is only moved into
+    place on success. Returns the same dict as render_thumbnail().
+    """
+    # Determine output location
+    storage, output_path = determine_thumb_location(model, volume, central_dir)
+    
+    # Ensure output directory exists
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    # Route to appropriate renderer based on format
+    file_format = (model.get('format') or '').lower()
+    with staged_output('.png') as staged:
+        if file_format == 'svg':
+            success = _render_svg_thumbnail(source_path, staged, size)
         else:
-            rel_path = str(output_path)
+            success = _render_3d_thumbnail(source_path, staged, size, file_format)
         
+        success = success and os.path.exists(staged)
+        if success:
+            publish(staged, output_path)
+    
+    if success:
         return {
             'thumb_storage': storage.value,
-            'thumb_path': rel_path,
+            'thumb_path': _stored_thumb_path(storage, output_path, volume, central_dir),
             'thumb_rendered_at': datetime.now().isoformat(),
             'thumb_source_mtime': source_mtime
         }
@@ -332,12 +363,7 @@ def _render_with_f3d(input_path: str, output_path: str, size: int = 1024, file_f
         if 'DISPLAY' not in env:
             env['DISPLAY'] = ':0'
         
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            timeout=120,
-            env=env
-        )
+        result = run_render(cmd, timeout=120, env=env)
         return result.returncode == 0
     except (subprocess.TimeoutExpired, FileNotFoundError):
         return False
@@ -381,11 +407,7 @@ def _render_with_stl_thumb(input_path: str, output_path: str, size: int = 1024)
         cmd = base_cmd
     
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            timeout=120
-        )
+        result = run_render(cmd, timeout=120)
         return result.returncode == 0
     except (subprocess.TimeoutExpired, FileNotFoundError):
         return False
@@ -606,3 +628,127 @@ def render_pending_thumbnails(
     
     conn.commit()
     return stats
+
+
+# 3D formats the renderers handle (SVG is rendered but not counted as 3D)
+THUMB_3D_FORMATS = ('stl', 'obj', '3mf', 'glb', 'gltf', 'dae', '3ds', 'ply', 'x3d')
+
+
+def get_thumbnail_coverage(conn: sqlite3.Connection) -> dict:
+    """
+    Thumbnail coverage for 3D models, from the indexed thumb_storage column.
+    
+    Kept accurate by reconcile_thumbnails(); no filesystem access here.
+    """
+    placeholders = ','.join('?' * len(THUMB_3D_FORMATS))
+    rows = conn.execute(f"""
+        SELECT thumb_storage, COUNT(*) FROM models
+        WHERE format IN ({placeholders})
+        GROUP BY thumb_storage
+    """, THUMB_3D_FORMATS).fetchall()
+    
+    by_storage = {row[0]: row[1] for row in rows if row[0] is not None}
+    total = sum(row[1] for row in rows)
+    cached = sum(by_storage.values())
+    
+    return {
+        'total': total,
+        'cached': cached,
+        'missing': total - cached,
+        'percent': round((cached / total * 100) if total > 0 else 0, 1),
+        'by_storage': by_storage
+    }
+
+
+def reconcile_thumbnails(
+    conn: sqlite3.Connection,
+    central_dir: Path,
+    after_id: int = 0,
+    limit: int = None,
+    batch_size: int = 500,
+    callback = None
+) -> dict:
+    """
+    Make thumb_storage/thumb_path/has_thumbnail match the thumbnails on disk.
+    
+    - A recorded thumbnail whose file is gone is cleared
+    - A model with no recorded thumbnail but a file in a sidecar, archive
+      sidecar or central (including legacy {id}.png) location gets it recorded
+    
+    Models are walked in id order and committed per batch; pass the
+    returned last_id as after_id to resume.
+    
+    Returns: Stats dict
+    """
+    stats = {
+        'checked': 0,
+        'recorded': 0,
+        'cleared': 0,
+        'unchanged': 0,
+        'last_id': after_id,
+        'done': False
+    }
+    
+    while limit is None or stats['checked'] < limit:
+        size = batch_size if limit is None else min(batch_size, limit - stats['checked'])
+        rows = conn.execute("""
+            SELECT m.id, m.file_path, m.format, m.archive_path, m.archive_member,
+                   m.partial_hash, m.preview_image, m.thumb_storage, m.thumb_path,
+                   v.mount_path
+            FROM models m
+            LEFT JOIN volumes v ON m.volume_id = v.id
+            WHERE m.id > ?
+            ORDER BY m.id
+            LIMIT ?
+        """, (stats['last_id'], size)).fetchall()
+        
+        if not rows:
+            stats['done'] = True
+            break
+        
+        for row in rows:
+            model = dict(row)
+            volume = {'mount_path': model.get('mount_path')}
+            stats['checked'] += 1
+            stats['last_id'] = model['id']
+            
+            if callback:
+                callback(stats['checked'], limit, model.get('file_path', ''))
+            
+            if model.get('thumb_storage'):
+                recorded = _resolve_thumb_path(model, volume, central_dir)
+                if recorded and recorded.exists():
+                    stats['unchanged'] += 1
+                    continue
+                conn.execute("""
+                    UPDATE models SET
+                        thumb_storage = NULL,
+                        thumb_path = NULL,
+                        thumb_rendered_at = NULL,
+                        has_thumbnail = CASE WHEN preview_image IS NOT NULL THEN has_thumbnail ELSE 0 END
+                    WHERE id = ?
+                """, (model['id'],))
+                stats['cleared'] += 1
+                continue
+            
+            found = next(
+                ((storage, path) for storage, path in _candidate_thumb_paths(model, central_dir) if path.exists()),
+                None
+            )
+            if not found:
+                stats['unchanged'] += 1
+                continue
+            
+            storage, path = found
+            conn.execute("""
+                UPDATE models SET
+                    has_thumbnail = 1,
+                    thumb_storage = ?,
+                    thumb_path = ?
+                WHERE id = ?
+            """, (storage.value, _stored_thumb_path(storage, path, volume, central_dir), model['id']))
+            stats['recorded'] += 1
+        
+        conn.commit()
+    
+    return stats
@@ -0,0 +1,179 @@
+"""
+Trigram FTS indexes for substring and fuzzy name matching.
+
+assets_fts/models_fts tokenize on word boundaries, and fts_query() only
+adds a trailing '*', so "dragon" matched "Dragon_Bust.stl" but never
+"Bonedragon_Supported.stl" or "RedDragon". `assets_trigram` and
+`models_trigram` index filenames, titles and (for models) collections
+with FTS5's trigram tokenizer, so any substring of 3+ characters is an
+index lookup instead of a LIKE '%...%' scan.
+
+plan_query() picks the index per query:
+- 'prefix': any term shorter than 3 characters (trigrams can't match it)
+  or FTS syntax in the query (quotes, *, AND/OR/NOT, column filters)
+- 'trigram': a term the word tokenizer would split (e.g. "red_dragon",
+  "v2.1"), matched as a literal substring
+- 'both': otherwise; word/prefix matches rank above infix-only matches
+
+If nothing matches at all, fuzzy_query() asks the index for rows sharing
+at least FUZZY_MIN_SIMILARITY of the query's trigrams, which tolerates a
+typo or two in longer terms. Requiring the combinations in the MATCH
+keeps bm25 from scoring every row that shares a single common trigram.
+
+Both tables are external-content indexes kept in sync by triggers. They
+are created and backfilled by migration 020 or at startup
+(Database.init_db), never during a search; search only checks that they
+exist in the database it is querying. The trigram tokenizer needs SQLite
+3.34+; on older builds the indexes are skipped and every query plans as
+'prefix'.
+"""
+
+import re
+import math
+import logging
+import sqlite3
+import itertools
+from typing import Dict, List, Set
+
+logger = logging.getLogger(__name__)
+
+# entity table -> indexed columns
+TRIGRAM_TABLES = {
+    'assets': ['filename', 'title'],
+    'models': ['filename', 'title', 'collection'],
+}
+
+MIN_TERM_LENGTH = 3
+
+# Share of the query's trigrams a fuzzy match must contain
+FUZZY_MIN_SIMILARITY = 0.5
+
+# Most trigram combinations spelled out in a fuzzy MATCH; longer queries
+# fall back to any-trigram matching (fuzzy_filter still applies the share)
+FUZZY_MAX_CLAUSES = 128
+
+# Characters unicode61 treats as separators, which a literal substring keeps
+_SPLIT_CHARS = re.compile(r'[^\w\s]|_')
+# FTS5 query syntax a user may type on purpose
+_FTS_SYNTAX = re.compile(r'["*:^()]|\b(AND|OR|NOT|NEAR)\b')
+
+
+def _build_schema_sql() -> str:
+    statements = []
+    for table, columns in TRIGRAM_TABLES.items():
+        index = f"{table}_trigram"
+        cols = ', '.join(columns)
+        new = ', '.join(f"new.{c}" for c in columns)
+        old = ', '.join(f"old.{c}" for c in columns)
+        statements.append(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5(\n"
+            f"  {cols},\n  content='{table}',\n  content_rowid='id',\n  tokenize='trigram'\n);"
+        )
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_trigram_insert AFTER INSERT ON {table}\n"
+            f"BEGIN\n  INSERT INTO {index}(rowid, {cols}) VALUES (new.id, {new});\nEND;"
+        )
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_trigram_delete AFTER DELETE ON {table}\n"
+            f"BEGIN\n  INSERT INTO {index}({index}, rowid, {cols}) VALUES ('delete', old.id, {old});\nEND;"
+        )
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_trigram_update AFTER UPDATE OF {cols} ON {table}\n"
+            f"BEGIN\n"
+            f"  INSERT INTO {index}({index}, rowid, {cols}) VALUES ('delete', old.id, {old});\n"
+            f"  INSERT INTO {index}(rowid, {cols}) VALUES (new.id, {new});\n"
+            f"END;"
+        )
+    return '\n\n'.join(statements) + '\n'
+
+
+TRIGRAM_SQL = _build_schema_sql()
+
+
+def has_trigram_index(conn: sqlite3.Connection) -> bool:
+    """Whether this database has the trigram indexes (a schema lookup; never creates them)."""
+    found = {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('assets_trigram', 'models_trigram')"
+    ).fetchall()}
+    return len(found) == len(TRIGRAM_TABLES)
+
+
+def ensure_trigram_index(conn: sqlite3.Connection) -> bool:
+    """
+    Create and backfill the trigram indexes if missing; returns whether they're usable.
+
+    The backfill reads every asset and model, so this runs at startup and
+    from migration 020, not per request.
+    """
+    if has_trigram_index(conn):
+        return True
+    try:
+        logger.info("Creating trigram indexes (substring search)")
+        conn.executescript(TRIGRAM_SQL)
+        rebuild_trigram_index(conn)
+        conn.commit()
+        return True
+    except sqlite3.OperationalError as e:
+        # No trigram tokenizer (SQLite < 3.34): prefix search only
+        logger.warning(f"Trigram search unavailable: {e}")
+        return False
+
+
+def rebuild_trigram_index(conn: sqlite3.Connection):
+    """Re-read every row into the trigram indexes. Does not commit."""
+    for table in TRIGRAM_TABLES:
+        index = f"{table}_trigram"
+        conn.execute(f"INSERT INTO {index}({index}) VALUES ('rebuild')")
+
+
+def plan_query(query: str) -> str:
+    """'prefix', 'trigram' or 'both' (see module docstring)."""
+    terms = query.split()
+    if not terms or _FTS_SYNTAX.search(query):
+        return 'prefix'
+    if any(len(term) < MIN_TERM_LENGTH for term in terms):
+        return 'prefix'
+    if any(_SPLIT_CHARS.search(term) for term in terms):
+        return 'trigram'
+    return 'both'
+
+
+def trigram_query(query: str) -> str:
+    """FTS5 query requiring every term as a substring."""
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+def trigrams(text: str) -> Set[str]:
+    """Lower-cased 3-character substrings of each word in `text`."""
+    grams = set()
+    for word in (text or '').lower().split():
+        grams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return grams
+
+
+def fuzzy_query(query: str) -> str:
+    """FTS5 query matching rows that share FUZZY_MIN_SIMILARITY of the query's trigrams ('' if none)."""
+    grams = ['"' + gram.replace('"', '""') + '"' for gram in sorted(trigrams(query))]
+    needed = math.ceil(len(grams) * FUZZY_MIN_SIMILARITY)
+    if needed <= 1 or math.comb(len(grams), needed) > FUZZY_MAX_CLAUSES:
+        return ' OR '.join(grams)
+    return ' OR '.join('(' + ' AND '.join(combo) + ')' for combo in itertools.combinations(grams, needed))
+
+
+def similarity(query: str, values: List[str]) -> float:
+    """Share of the query's trigrams found in any of `values`."""
+    wanted = trigrams(query)
+    if not wanted:
+        return 0.0
+    have: Set[str] = set()
+    for value in values:
+        if value:
+            lowered = value.lower()
+            have.update(gram for gram in wanted if gram in lowered)
+    return len(have) / len(wanted)
+
+
+def fuzzy_filter(query: str, rows: Dict[int, List[str]]) -> Dict[int, float]:
+    """id -> similarity for rows at or above FUZZY_MIN_SIMILARITY."""
+    scores = {row_id: similarity(query, values) for row_id, values in rows.items()}
+    return {row_id: score for row_id, score in scores.items() if score >= FUZZY_MIN_SIMILARITY}
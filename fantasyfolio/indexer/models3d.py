@@ -12,11 +12,13 @@ import zipfile
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from itertools import islice
+from typing import Optional, Dict, Any, List, Iterable, Iterator
 
 from fantasyfolio.config import get_config
 from fantasyfolio.core.database import get_connection, insert_model
-from fantasyfolio.services.asset_locations import get_location_for_path
+from fantasyfolio.core.folder_tree import refresh_folder_nodes
+from fantasyfolio.core.path_index import lookup_location
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +31,30 @@ PREVIEW_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
 # Skip patterns
 SKIP_PATTERNS = [r'__MACOSX', r'\.DS_Store', r'Thumbs\.db']
 
+# Insert a scanned model, or refresh the existing row for the same file_path
+UPSERT_MODEL_SQL = """
+    INSERT INTO models (
+        file_path, filename, title, format, file_size, file_hash,
+        archive_path, archive_member, folder_path, collection, creator,
+        vertex_count, face_count, has_supports, preview_image,
+        has_thumbnail, created_at, modified_at, volume_id
+    ) VALUES (
+        :file_path, :filename, :title, :format, :file_size, :file_hash,
+        :archive_path, :archive_member, :folder_path, :collection, :creator,
+        :vertex_count, :face_count, :has_supports, :preview_image,
+        :has_thumbnail, :created_at, :modified_at, :volume_id
+    )
+    ON CONFLICT(file_path) DO UPDATE SET
+        filename=excluded.filename, title=excluded.title, format=excluded.format,
+        file_size=excluded.file_size, file_hash=excluded.file_hash,
+        archive_path=excluded.archive_path, archive_member=excluded.archive_member,
+        folder_path=excluded.folder_path, collection=excluded.collection, creator=excluded.creator,
+        vertex_count=excluded.vertex_count, face_count=excluded.face_count,
+        has_supports=excluded.has_supports, preview_image=excluded.preview_image,
+        has_thumbnail=MAX(COALESCE(models.has_thumbnail, 0), excluded.has_thumbnail),
+        modified_at=excluded.modified_at, volume_id=excluded.volume_id
+"""
+
 
 class ModelsIndexer:
     """3D model file indexer."""
@@ -53,9 +79,15 @@ class ModelsIndexer:
         
         logger.info(f"Starting 3D scan of: {self.scan_path} (root: {self.root_path})")
         
-        models = []
+        # Models are streamed from the walk straight into batched upserts,
+        # so memory stays flat however large the tree is
+        self._insert_models(self._iter_models())
         
-        # Walk directory
+        logger.info(f"Scan complete: {self.stats}")
+        return self.stats
+    
+    def _iter_models(self) -> Iterator[Dict[str, Any]]:
+        """Walk the scan path, yielding model dicts as they are found."""
         for root, dirs, files in os.walk(self.scan_path):
             # Skip hidden directories
             dirs[:] = [d for d in dirs if not d.startswith('.')]
@@ -76,33 +108,28 @@ class ModelsIndexer:
                 if ext == '.zip':
                     try:
                         zip_models = self._scan_zip(file_path)
-                        models.extend(zip_models)
                         self.stats['archives_scanned'] += 1
                         logger.debug(f"Archive {filename}: {len(zip_models)} models")
                     except Exception as e:
                         logger.error(f"Error scanning {file_path}: {e}")
                         self.stats['errors'] += 1
+                        continue
+                    for model in zip_models:
+                        self.stats['models_found'] += 1
+                        yield model
                 
                 # Process standalone model files
                 elif ext in MODEL_EXTENSIONS:
                     try:
                         model = self._process_standalone(file_path)
-                        if model:
-                            models.append(model)
-                            self.stats['standalone_files'] += 1
                     except Exception as e:
                         logger.error(f"Error processing {file_path}: {e}")
                         self.stats['errors'] += 1
-        
-        self.stats['models_found'] = len(models)
-        
-        # Insert into database
-        if models:
-            logger.info(f"Saving {len(models)} models to database...")
-            self._insert_models(models)
-        
-        logger.info(f"Scan complete: {self.stats}")
-        return self.stats
+                        continue
+                    if model:
+                        self.stats['standalone_files'] += 1
+                        self.stats['models_found'] += 1
+                        yield model
     
     def _should_skip(self, path: str) -> bool:
         """Check if path should be skipped."""
@@ -252,63 +279,51 @@ class ModelsIndexer:
         with open(path, 'rb') as f:
             return hashlib.md5(f.read(8192)).hexdigest()
     
-    def _insert_models(self, models: List[Dict[str, Any]]):
-        """Insert models into database, preserving has_thumbnail if thumbnail exists."""
-        from fantasyfolio.config import get_config
-        config = get_config()
-        thumb_dir = config.THUMBNAIL_DIR / "3d"
+    def _insert_models(self, models: Iterable[Dict[str, Any]]):
+        """
+        Upsert models in chunks of INDEX_BATCH_SIZE, committing after each chunk.
+        
+        Existing rows (matched on file_path) are updated in place; their
+        has_thumbnail flag is kept unless the new scan found a preview.
+        """
+        batch_size = max(1, self.config.INDEX_BATCH_SIZE)
+        models = iter(models)
         
         with get_connection() as conn:
-            for model in models:
-                try:
+            while True:
+                chunk = list(islice(models, batch_size))
+                if not chunk:
+                    break
+                
+                for model in chunk:
                     # Look up which asset location this file belongs to (for volume_id)
-                    location = get_location_for_path(model['file_path'], asset_type='models')
-                    volume_id = location['id'] if location else None
-                    model['volume_id'] = volume_id
-                    
-                    # Check if model exists and get its ID
-                    existing = conn.execute(
-                        "SELECT id, has_thumbnail FROM models WHERE file_path = ?",
-                        (model['file_path'],)
-                    ).fetchone()
-                    
-                    if existing:
-                        # Update existing - check if thumbnail file exists
-                        thumb_file = thumb_dir / f"{existing['id']}.png"
-                        has_thumb = 1 if thumb_file.exists() else existing['has_thumbnail']
-                        
-                        conn.execute("""
-                            UPDATE models SET
-                                filename=:filename, title=:title, format=:format, 
-                                file_size=:file_size, file_hash=:file_hash,
-                                archive_path=:archive_path, archive_member=:archive_member,
-                                folder_path=:folder_path, collection=:collection, creator=:creator,
-                                vertex_count=:vertex_count, face_count=:face_count,
-                                has_supports=:has_supports, preview_image=:preview_image,
-                                has_thumbnail=:has_thumbnail, modified_at=:modified_at,
-                                volume_id=:volume_id
-                            WHERE file_path=:file_path
-                        """, {**model, 'has_thumbnail': has_thumb})
-                    else:
-                        # Insert new
-                        conn.execute("""
-                            INSERT INTO models (
-                                file_path, filename, title, format, file_size, file_hash,
-                                archive_path, archive_member, folder_path, collection, creator,
-                                vertex_count, face_count, has_supports, preview_image,
-                                has_thumbnail, created_at, modified_at, volume_id
-                            ) VALUES (
-                                :file_path, :filename, :title, :format, :file_size, :file_hash,
-                                :archive_path, :archive_member, :folder_path, :collection, :creator,
-                                :vertex_count, :face_count, :has_supports, :preview_image,
-                                :has_thumbnail, :created_at, :modified_at, :volume_id
-                            )
-                        """, model)
-                    self.stats['models_indexed'] += 1
-                except Exception as e:
-                    logger.error(f"Failed to insert model: {e}")
-                    self.stats['errors'] += 1
-            conn.commit()
+                    location = lookup_location(model['file_path'], 'models', conn)
+                    model['volume_id'] = location['id'] if location else None
+                
+                self._upsert_chunk(conn, chunk)
+                conn.commit()
+                logger.info(f"Indexed {self.stats['models_indexed']} models "
+                            f"({self.stats['models_found']} found, {self.stats['errors']} errors)")
+            
+            refresh_folder_nodes(conn, 'model')
+    
+    def _upsert_chunk(self, conn, chunk: List[Dict[str, Any]]):
+        """Write one chunk; if the batch fails, retry row by row to isolate bad rows."""
+        try:
+            conn.executemany(UPSERT_MODEL_SQL, chunk)
+            self.stats['models_indexed'] += len(chunk)
+            return
+        except Exception as e:
+            conn.rollback()
+            logger.warning(f"Batch upsert failed ({e}), retrying {len(chunk)} models individually")
+        
+        for model in chunk:
+            try:
+                conn.execute(UPSERT_MODEL_SQL, model)
+                self.stats['models_indexed'] += 1
+            except Exception as e:
+                logger.error(f"Failed to insert model: {e}")
+                self.stats['errors'] += 1
 
 
 def main():
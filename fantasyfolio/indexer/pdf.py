@@ -14,6 +14,8 @@ from typing import Optional, Dict, Any, List
 
 from fantasyfolio.config import get_config
 from fantasyfolio.core.database import get_connection, insert_asset
+from fantasyfolio.core.dir_manifest import DirectoryManifest
+from fantasyfolio.core.folder_tree import refresh_folder_nodes
 from fantasyfolio.services.asset_locations import get_location_for_path
 
 logger = logging.getLogger(__name__)
@@ -34,24 +36,77 @@ class PDFIndexer:
             'skipped': 0
         }
     
-    def run(self, extract_text: bool = True, generate_thumbnails: bool = True):
-        """Run the PDF indexer."""
+    def run(self, extract_text: bool = True, generate_thumbnails: bool = True, deep: bool = False):
+        """
+        Run the PDF indexer.
+        
+        Directories unchanged since the last run are skipped via the
+        directory manifest (see core/dir_manifest.py); `deep` lists
+        every directory again.
+        """
         if not self.scan_path.exists():
             logger.error(f"Scan path does not exist: {self.scan_path}")
             return self.stats
         
         logger.info(f"Starting PDF scan of: {self.scan_path} (root: {self.root_path})")
         
-        for pdf_path in self.scan_path.rglob("*.pdf"):
+        location = get_location_for_path(str(self.scan_path), asset_type='documents')
+        self.stats['dirs_unchanged'] = 0
+        
+        with get_connection() as conn:
+            manifest = DirectoryManifest(
+                conn, 'asset', location['id'] if location else '', str(self.scan_path), force=deep
+            )
+            for visit in manifest.walk():
+                # PDFs are written on other connections; don't hold the manifest's write lock
+                conn.commit()
+                if visit.files is None:
+                    self._mark_folder_seen(conn, Path(visit.path))
+                    self.stats['dirs_unchanged'] += 1
+                    continue
+                self._index_files(
+                    [Path(p) for p in visit.files if p.endswith('.pdf')], extract_text, generate_thumbnails
+                )
+            conn.commit()
+            refresh_folder_nodes(conn, 'asset')
+        
+        logger.info(f"PDF scan complete: {self.stats}")
+        return self.stats
+    
+    def index_paths(self, pdf_paths, extract_text: bool = True, generate_thumbnails: bool = True):
+        """
+        Index specific PDF files (e.g. changed paths from the filesystem watcher).
+        
+        Folder paths are still computed relative to root_path.
+        """
+        self._index_files(pdf_paths, extract_text, generate_thumbnails)
+        
+        with get_connection() as conn:
+            refresh_folder_nodes(conn, 'asset')
+        
+        return self.stats
+    
+    def _index_files(self, pdf_paths, extract_text: bool, generate_thumbnails: bool):
+        for pdf_path in pdf_paths:
             try:
-                self._process_pdf(pdf_path, extract_text, generate_thumbnails)
+                self._process_pdf(Path(pdf_path), extract_text, generate_thumbnails)
                 self.stats['scanned'] += 1
             except Exception as e:
                 logger.error(f"Error processing {pdf_path}: {e}")
                 self.stats['errors'] += 1
-        
-        logger.info(f"PDF scan complete: {self.stats}")
-        return self.stats
+    
+    def _mark_folder_seen(self, conn, dir_path: Path):
+        """Bulk last_seen_at update for the PDFs directly in an unchanged directory."""
+        try:
+            folder_path = str(dir_path.relative_to(self.root_path))
+        except ValueError:
+            return
+        if folder_path == '.':
+            folder_path = ''
+        conn.execute("""
+            UPDATE assets SET last_seen_at = ?
+            WHERE folder_path = ? AND file_path LIKE ? AND deleted_at IS NULL
+        """, (datetime.now().isoformat(), folder_path, str(dir_path).rstrip('/') + '/%'))
     
     def _process_pdf(self, pdf_path: Path, extract_text: bool, generate_thumbnails: bool):
         """Process a single PDF file."""
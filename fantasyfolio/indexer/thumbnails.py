@@ -24,17 +24,12 @@ def render_with_stl_thumb(data: bytes, format: str, output_path: str, size: int
     Supports STL, OBJ, and 3MF formats.
     Falls back to PIL if both fail.
     """
-    import subprocess
-    import tempfile
     import shutil
+    from fantasyfolio.core.staging import stage_bytes, run_render
     
-    # Write to temp file with correct extension
+    # Stage model data (tmpfs when small enough) with correct extension
     suffix = f'.{format.lower()}'
-    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
-        f.write(data)
-        model_path = f.name
-    
-    try:
+    with stage_bytes(data, suffix) as model_path:
         # Try f3d first (works headless in containers with xvfb)
         if shutil.which('f3d') and shutil.which('xvfb-run'):
             try:
@@ -53,11 +48,7 @@ def render_with_stl_thumb(data: bytes, format: str, output_path: str, size: int
                 
                 f3d_cmd.append(model_path)
                 
-                result = subprocess.run(
-                    f3d_cmd,
-                    capture_output=True,
-                    timeout=60
-                )
+                result = run_render(f3d_cmd, timeout=60)
                 if result.returncode == 0 and Path(output_path).exists():
                     with open(output_path, 'rb') as f:
                         return f.read()
@@ -66,20 +57,13 @@ def render_with_stl_thumb(data: bytes, format: str, output_path: str, size: int
         
         # Fall back to stl-thumb
         timeout = 60 if format.lower() == '3mf' else 30
-        result = subprocess.run(
-            ['stl-thumb', '-s', str(size), model_path, output_path],
-            capture_output=True,
-            timeout=timeout
-        )
+        result = run_render(['stl-thumb', '-s', str(size), model_path, output_path], timeout=timeout)
         
         if result.returncode == 0 and Path(output_path).exists():
             with open(output_path, 'rb') as f:
                 return f.read()
         else:
             raise RuntimeError(f"stl-thumb failed: {result.stderr.decode()}")
-    finally:
-        # Clean up temp file
-        Path(model_path).unlink(missing_ok=True)
 
 
 def parse_stl(data: bytes) -> np.ndarray:
@@ -368,15 +352,12 @@ def render_3d_thumbnail(data: bytes, format: str, output_path: Optional[str] = N
     
     # Try stl-thumb first (high quality OpenGL rendering)
     try:
-        import tempfile
+        from fantasyfolio.core.staging import staged_output
         if output_path:
             return render_with_stl_thumb(data, format, output_path, size)
         else:
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as f:
-                tmp_path = f.name
-            png_data = render_with_stl_thumb(data, format, tmp_path, size)
-            Path(tmp_path).unlink(missing_ok=True)
-            return png_data
+            with staged_output('.png') as tmp_path:
+                return render_with_stl_thumb(data, format, tmp_path, size)
     except Exception as e:
         logger.warning(f"stl-thumb failed for {format}, falling back to PIL: {e}")
     
@@ -15,6 +15,7 @@ from typing import Optional, List, Dict, Any
 from pathlib import Path
 
 from fantasyfolio.core.database import get_db
+from fantasyfolio.core.path_index import lookup_location, invalidate_path_index
 
 logger = logging.getLogger(__name__)
 
@@ -154,6 +155,7 @@ def create_location(data: Dict[str, Any]) -> Dict[str, Any]:
         
         conn.commit()
     
+    invalidate_path_index()
     return get_location(location_id)
 
 
@@ -208,6 +210,7 @@ def update_location(location_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         conn.execute(query, params)
         conn.commit()
     
+    invalidate_path_index()
     location = get_location(location_id)
     return {'success': True, 'location': location}
 
@@ -229,6 +232,7 @@ def delete_location(location_id: str) -> Dict[str, Any]:
         conn.execute("DELETE FROM volumes WHERE id = ?", (location_id,))
         conn.commit()
     
+    invalidate_path_index()
     return {'success': True, 'message': f"Deleted location '{name}'"}
 
 
@@ -442,22 +446,8 @@ def get_location_for_path(file_path: str, asset_type: Optional[str] = None) -> O
     Returns:
         The matching location dict, or None if no match found.
         The location's 'id' can be used as volume_id for nav tree support.
-    """
-    locations = list_locations(asset_type=asset_type, enabled_only=True)
-    
-    # Normalize the file path
-    file_path = os.path.normpath(file_path)
-    
-    # Find the location whose path is a prefix of the file path
-    # Prefer longer matches (more specific locations)
-    best_match = None
-    best_match_len = 0
     
-    for loc in locations:
-        loc_path = os.path.normpath(loc['path'])
-        if file_path.startswith(loc_path + os.sep) or file_path == loc_path:
-            if len(loc_path) > best_match_len:
-                best_match = loc
-                best_match_len = len(loc_path)
-    
-    return best_match
+    Resolved from an in-memory prefix index (see core/path_index.py), so
+    indexers can call this for every file without querying the locations.
+    """
+    return lookup_location(file_path, asset_type)
@@ -270,6 +270,7 @@ def generate_session_id() -> str:
 # ==================== Database Operations ====================
 
 from fantasyfolio.core.database import get_db
+from fantasyfolio.services.auth_cache import invalidate_user
 
 
 def create_user(
@@ -344,7 +345,8 @@ def update_user(user_id: str, **updates) -> bool:
     with db.connection() as conn:
         cursor = conn.execute(f"UPDATE users SET {set_clause} WHERE id = ?", values)
         conn.commit()
-        return cursor.rowcount > 0
+    invalidate_user(user_id)
+    return cursor.rowcount > 0
 
 
 def update_password(user_id: str, new_password: str) -> bool:
@@ -359,7 +361,8 @@ def update_password(user_id: str, new_password: str) -> bool:
             (password_hash, now, user_id)
         )
         conn.commit()
-        return cursor.rowcount > 0
+    invalidate_user(user_id)
+    return cursor.rowcount > 0
 
 
 # ==================== Session Operations ====================
@@ -427,8 +430,11 @@ def revoke_session(session_id: str):
     now = datetime.utcnow().isoformat()
     
     with db.connection() as conn:
+        row = conn.execute("SELECT user_id FROM user_sessions WHERE id = ?", (session_id,)).fetchone()
         conn.execute("UPDATE user_sessions SET revoked_at = ? WHERE id = ?", (now, session_id))
         conn.commit()
+    if row:
+        invalidate_user(row[0])
 
 
 def revoke_all_user_sessions(user_id: str, except_session: Optional[str] = None):
@@ -448,6 +454,7 @@ def revoke_all_user_sessions(user_id: str, except_session: Optional[str] = None)
                 (now, user_id)
             )
         conn.commit()
+    invalidate_user(user_id)
 
 
 def get_user_sessions(user_id: str) -> list:
@@ -0,0 +1,226 @@
+"""
+In-process cache of authentication and authorization lookups.
+
+Every authenticated request used to verify the JWT and load the user from
+SQLite, and the collection endpoints then looked up ownership and shares
+again. Here the results are kept for AUTH_CACHE_TTL seconds:
+
+- tokens: SHA-256 of the access token -> decoded payload (never past the
+  token's own expiry)
+- principals: user id -> active user row
+- collection access: (collection id, user id) -> owner id and permission
+
+Entries are dropped explicitly when the underlying data changes: user
+updates, role and password changes, deactivation and session revokes
+(invalidate_user), and share or collection changes
+(invalidate_collection). The cache is per process, so with several
+worker processes another worker may serve a stale entry for up to the
+TTL. AUTH_CACHE_TTL=0 disables caching.
+
+Loaders run outside the lock. A load that overlapped an invalidation is
+returned to its caller but not cached, so it can't put back a row the
+invalidation just dropped.
+"""
+
+import time
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from fantasyfolio.config import get_config
+
+# Entries per map before the oldest are evicted
+MAX_ENTRIES = 10000
+
+# Sentinel for "looked up, nothing there" (cached like a hit)
+_MISSING = object()
+
+
+class _TTLMap:
+    """
+    Dict of key -> (value, expires_at) with oldest-first eviction.
+
+    `on_remove(key, value)` is called for every entry that leaves the map
+    (expiry, eviction, replacement or pop), but not on clear().
+    """
+
+    def __init__(self, on_remove: Optional[Callable[[Hashable, Any], None]] = None):
+        self._data: Dict[Hashable, Tuple[Any, float]] = {}
+        self._on_remove = on_remove
+
+    def _remove(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None and self._on_remove:
+            self._on_remove(key, entry[0])
+
+    def get(self, key, now: float):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            self._remove(key)
+            return None
+        return entry
+
+    def set(self, key, value, expires_at: float):
+        self._remove(key)
+        if len(self._data) >= MAX_ENTRIES:
+            # Dicts keep insertion order: drop the oldest tenth
+            for old in list(self._data)[:MAX_ENTRIES // 10]:
+                self._remove(old)
+        self._data[key] = (value, expires_at)
+
+    def pop(self, key):
+        self._remove(key)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class PrincipalCache:
+    """Token, user and collection-access cache (see module docstring)."""
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = get_config().AUTH_CACHE_TTL if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._tokens = _TTLMap(on_remove=self._unindex_token)
+        self._users = _TTLMap()
+        self._access = _TTLMap(on_remove=self._unindex_access)
+        # Reverse indexes for invalidation, pruned as entries leave the maps
+        self._tokens_by_user: Dict[str, Set[str]] = {}
+        self._access_by_user: Dict[str, Set[Tuple[str, str]]] = {}
+        self._access_by_collection: Dict[str, Set[Tuple[str, str]]] = {}
+        # Bumped by every invalidation; loads that straddle one aren't stored
+        self._generation = 0
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    @staticmethod
+    def _discard(index: Dict[str, Set], owner: str, key):
+        keys = index.get(owner)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[owner]
+
+    def _unindex_token(self, key, payload):
+        if payload is not _MISSING:
+            self._discard(self._tokens_by_user, payload['sub'], key)
+
+    def _unindex_access(self, key, _):
+        collection_id, user_id = key
+        self._discard(self._access_by_user, user_id, key)
+        self._discard(self._access_by_collection, collection_id, key)
+
+    def _cached(self, store: _TTLMap, key, load: Callable[[], Any], on_store=None, max_expiry=None):
+        if self.ttl <= 0:
+            return load()
+
+        now = time.time()
+        with self._lock:
+            entry = store.get(key, now)
+            if entry is not None:
+                self.stats['hits'] += 1
+                return None if entry[0] is _MISSING else entry[0]
+            self.stats['misses'] += 1
+            generation = self._generation
+
+        value = load()
+        expires_at = now + self.ttl
+        if max_expiry is not None:
+            expires_at = min(expires_at, max_expiry(value))
+        with self._lock:
+            if generation == self._generation:
+                store.set(key, _MISSING if value is None else value, expires_at)
+                if on_store and value is not None:
+                    on_store(value)
+        return value
+
+    # ── lookups ─────────────────────────────────────────────────────────────
+
+    def resolve_token(self, token: str, verify: Callable[[str], Optional[Dict]]) -> Optional[Dict]:
+        """Decoded access-token payload, verified at most once per TTL."""
+        key = hashlib.sha256(token.encode()).hexdigest()
+
+        def index(payload):
+            self._tokens_by_user.setdefault(payload['sub'], set()).add(key)
+
+        return self._cached(
+            self._tokens, key, lambda: verify(token), on_store=index,
+            max_expiry=lambda payload: float(payload.get('exp', 0)) if payload else time.time() + self.ttl
+        )
+
+    def get_principal(self, user_id: str, load: Callable[[str], Optional[Dict]]) -> Optional[Dict]:
+        """Active user row for an id (a copy; callers may modify it)."""
+        user = self._cached(self._users, user_id, lambda: load(user_id))
+        return dict(user) if user else None
+
+    def collection_access(self, collection_id: str, user_id: str,
+                          load: Callable[[str, str], Optional[Dict]]) -> Optional[Dict]:
+        """Owner/permission of a user on a collection (None if it doesn't exist)."""
+        key = (collection_id, user_id)
+
+        def index(_):
+            self._access_by_user.setdefault(user_id, set()).add(key)
+            self._access_by_collection.setdefault(collection_id, set()).add(key)
+
+        access = self._cached(self._access, key, lambda: load(collection_id, user_id), on_store=index)
+        return dict(access) if access else None
+
+    # ── invalidation ────────────────────────────────────────────────────────
+
+    def invalidate_user(self, user_id: str):
+        """Drop everything cached for a user (tokens, principal, access)."""
+        with self._lock:
+            self.stats['invalidations'] += 1
+            self._generation += 1
+            self._users.pop(user_id)
+            for key in self._tokens_by_user.pop(user_id, ()):
+                self._tokens.pop(key)
+            for key in self._access_by_user.pop(user_id, ()):
+                self._access.pop(key)
+
+    def invalidate_collection(self, collection_id: str):
+        """Drop cached access decisions for a collection (shares or owner changed)."""
+        with self._lock:
+            self.stats['invalidations'] += 1
+            self._generation += 1
+            for key in self._access_by_collection.pop(collection_id, ()):
+                self._access.pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._tokens.clear()
+            self._users.clear()
+            self._access.clear()
+            self._tokens_by_user.clear()
+            self._access_by_user.clear()
+            self._access_by_collection.clear()
+
+    def status(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, ttl=self.ttl, tokens=len(self._tokens),
+                        users=len(self._users), access=len(self._access))
+
+
+_cache: Optional[PrincipalCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_principal_cache() -> PrincipalCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PrincipalCache()
+        return _cache
+
+
+def invalidate_user(user_id: str):
+    get_principal_cache().invalidate_user(user_id)
+
+
+def invalidate_collection(collection_id: str):
+    get_principal_cache().invalidate_collection(collection_id)
@@ -308,6 +308,62 @@ def validate_policy(policy_data: Dict, check_connectivity: bool = False) -> Dict
     return result
 
 
+def _backup_snapshot_file(policy: Dict, source_path: str, result: Dict) -> Optional[Dict]:
+    """Send one database file to the policy's destination; None (with result['error']) if it can't start."""
+    if policy['destination_type'] in (DEST_RESTIC, DEST_RESTIC_REMOTE):
+        # Restic deduplicated backup
+        from fantasyfolio.services.restic_backup import run_backup, prune_snapshots, init_repo
+        
+        repo_path = policy['path']
+        password = policy.get('restic_password', '')
+        
+        if not password:
+            result['error'] = 'Restic repository password not configured'
+            return None
+        
+        # Auto-initialize repo if it doesn't exist
+        init_result = init_repo(repo_path, password)
+        if not init_result.get('success'):
+            result['error'] = f"Failed to initialize repository: {init_result.get('error')}"
+            return None
+        
+        backup_result = run_backup(
+            repo_path,
+            password,
+            source_path,
+            tags=[f"policy:{policy['name']}", 'dam-backup']
+        )
+        
+        # Prune old snapshots according to retention
+        if backup_result.get('success'):
+            keep_count = policy.get('keep_count', 10)
+            prune_snapshots(repo_path, password, keep_count)
+    
+    elif policy['destination_type'] == DEST_LOCAL:
+        from fantasyfolio.services.rsync_wrapper import rsync_local
+        backup_result = rsync_local(
+            source_path,
+            policy['path'],
+            filename_prefix=f"dam_{policy['name'].replace(' ', '_')}",
+            delete_old=policy.get('keep_count', 10)
+        )
+    else:
+        from fantasyfolio.services.rsync_wrapper import rsync_ssh
+        key_path = policy.get('ssh_key_path')
+        if key_path:
+            key_path = os.path.expanduser(key_path)
+        
+        backup_result = rsync_ssh(
+            source_path,
+            policy['ssh_host'],
+            policy['path'],
+            key_path=key_path,
+            filename_prefix=f"dam_{policy['name'].replace(' ', '_')}"
+        )
+    
+    return backup_result
+
+
 def run_policy_backup(policy_id: str) -> Dict:
     """
     Execute a backup for a specific policy.
@@ -337,60 +393,14 @@ def run_policy_backup(policy_id: str) -> Dict:
         result['error'] = 'No snapshots available to backup'
         return result
     
-    source_path = snapshot['path']
-    result['source'] = source_path
+    result['source'] = snapshot['path']
     
     try:
-        if policy['destination_type'] in (DEST_RESTIC, DEST_RESTIC_REMOTE):
-            # Restic deduplicated backup
-            from fantasyfolio.services.restic_backup import run_backup, prune_snapshots, init_repo
-            
-            repo_path = policy['path']
-            password = policy.get('restic_password', '')
-            
-            if not password:
-                result['error'] = 'Restic repository password not configured'
-                return result
-            
-            # Auto-initialize repo if it doesn't exist
-            init_result = init_repo(repo_path, password)
-            if not init_result.get('success'):
-                result['error'] = f"Failed to initialize repository: {init_result.get('error')}"
-                return result
-            
-            backup_result = run_backup(
-                repo_path,
-                password,
-                source_path,
-                tags=[f"policy:{policy['name']}", 'dam-backup']
-            )
-            
-            # Prune old snapshots according to retention
-            if backup_result.get('success'):
-                keep_count = policy.get('keep_count', 10)
-                prune_snapshots(repo_path, password, keep_count)
-        
-        elif policy['destination_type'] == DEST_LOCAL:
-            from fantasyfolio.services.rsync_wrapper import rsync_local
-            backup_result = rsync_local(
-                source_path,
-                policy['path'],
-                filename_prefix=f"dam_{policy['name'].replace(' ', '_')}",
-                delete_old=policy.get('keep_count', 10)
-            )
-        else:
-            from fantasyfolio.services.rsync_wrapper import rsync_ssh
-            key_path = policy.get('ssh_key_path')
-            if key_path:
-                key_path = os.path.expanduser(key_path)
-            
-            backup_result = rsync_ssh(
-                source_path,
-                policy['ssh_host'],
-                policy['path'],
-                key_path=key_path,
-                filename_prefix=f"dam_{policy['name'].replace(' ', '_')}"
-            )
+        from fantasyfolio.services.snapshot import materialized_snapshot
+        with materialized_snapshot(snapshot['filename']) as snapshot_file:
+            backup_result = _backup_snapshot_file(policy, str(snapshot_file), result)
+        if backup_result is None:
+            return result
         
         if backup_result['success']:
             result['success'] = True
@@ -444,6 +454,30 @@ def get_policies_due() -> List[Dict]:
     return due
 
 
+def get_policy_status() -> Dict:
+    """
+    Summarize backup policies for status/monitoring views.
+    
+    Returns:
+        Dict with policy counts, the policies currently due and the most
+        recent backup across all policies
+    """
+    policies = get_all_policies()
+    active = [p for p in policies if p.get('state') == STATE_ACTIVE]
+    ran = [p for p in policies if p.get('last_backup')]
+    last = max(ran, key=lambda p: p['last_backup']) if ran else None
+    
+    return {
+        'total': len(policies),
+        'active': len(active),
+        'due': [p.get('name') for p in get_policies_due()],
+        'failed': [p.get('name') for p in policies if p.get('last_backup_status') == 'failed'],
+        'last_backup': last['last_backup'] if last else None,
+        'last_backup_policy': last.get('name') if last else None,
+        'last_backup_status': last.get('last_backup_status') if last else None
+    }
+
+
 def _calculate_next_run(frequency: str, schedule_time: Optional[str] = None, start_date: Optional[str] = None, last_run: Optional[str] = None) -> str:
     """
     Calculate next scheduled run time.
@@ -3,17 +3,170 @@ Change Journal Service.
 
 Tracks all modifications to assets and models for audit and potential rollback.
 Every create, update, delete, and restore operation is logged.
+
+Entries are buffered in-process and written in batches (one transaction
+per JOURNAL_BATCH_SIZE entries or JOURNAL_FLUSH_INTERVAL seconds,
+whichever comes first, and at the end of every request) instead of one
+connection and commit per entry, so bulk operations don't contend with
+the indexer for the write lock once per row. Each entry keeps the time
+it was logged, not the time it was flushed. log_change(sync=True) (and
+the actions in SYNC_ACTIONS) writes through immediately, after flushing
+anything older. The buffer is flushed at interpreter exit, and readers
+flush before querying so they see their own writes.
+
+Entries are stored in monthly partitions (see core/journal_partitions.py):
+retention drops whole months and compaction collapses repeated updates.
 """
 
 import json
+import atexit
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Any, Tuple
 
+from fantasyfolio.config import get_config
 from fantasyfolio.core.database import get_db, get_connection
+from fantasyfolio.core.stats_cache import cached_stats
+from fantasyfolio.core.journal_partitions import (
+    append_entries, compact_sealed, current_month, drop_before,
+    ensure_journal_partitions, list_partitions
+)
 
 logger = logging.getLogger(__name__)
 
+# Actions always written synchronously (irreversible, audit-critical)
+SYNC_ACTIONS = {'delete'}
+
+class JournalWriter:
+    """
+    Buffer journal entries and write them in batched transactions.
+
+    A background thread flushes when the buffer reaches `batch_size`
+    entries or the oldest entry is `flush_interval` seconds old.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        # Entries kept for retry while the database can't be written
+        self.max_pending = self.batch_size * 50
+        self._pending: List[Tuple] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'written': 0, 'batches': 0, 'dropped': 0, 'last_error': None}
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+            self._thread.start()
+
+    def add(self, entry: Tuple):
+        with self._lock:
+            self._pending.append(entry)
+            full = len(self._pending) >= self.batch_size
+            self._ensure_thread()
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Journal flush failed: {e}")
+
+    def flush(self) -> int:
+        """Write all buffered entries in one transaction; returns how many."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+
+            try:
+                with get_db().connection() as conn:
+                    append_entries(conn, batch)
+                    conn.commit()
+            except Exception as e:
+                with self._lock:
+                    # Keep the entries (oldest first) for the next attempt
+                    self._pending = batch + self._pending
+                    overflow = len(self._pending) - self.max_pending
+                    if overflow > 0:
+                        del self._pending[:overflow]
+                        self.stats['dropped'] += overflow
+                self.stats['last_error'] = str(e)
+                raise
+
+            self.stats['written'] += len(batch)
+            self.stats['batches'] += 1
+            logger.debug(f"Journal: wrote {len(batch)} entries")
+            return len(batch)
+
+    def write_now(self, entry: Tuple) -> int:
+        """Write one entry synchronously (after anything buffered); returns its ID."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            with get_db().connection() as conn:
+                try:
+                    ids = append_entries(conn, batch + [entry])
+                    conn.commit()
+                except Exception:
+                    with self._lock:
+                        self._pending = batch + self._pending
+                    raise
+            self.stats['written'] += len(batch) + 1
+            return ids[-1]
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def close(self):
+        """Stop the background thread and write everything still buffered."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Journal entries lost at shutdown: {e}")
+
+
+_writer: Optional[JournalWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_journal_writer() -> JournalWriter:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            config = get_config()
+            _writer = JournalWriter(config.JOURNAL_BATCH_SIZE, config.JOURNAL_FLUSH_INTERVAL)
+            atexit.register(_writer.close)
+        return _writer
+
+
+def flush_journal() -> int:
+    """Write buffered journal entries now (e.g. at the end of a request)."""
+    if _writer is None:
+        return 0
+    try:
+        return _writer.flush()
+    except Exception as e:
+        logger.error(f"Journal flush failed: {e}")
+        return 0
+
 
 def log_change(
     entity_type: str,
@@ -23,8 +176,9 @@ def log_change(
     old_value: Any = None,
     new_value: Any = None,
     source: str = 'api',
-    user_info: Optional[str] = None
-) -> int:
+    user_info: Optional[str] = None,
+    sync: bool = False
+) -> Optional[int]:
     """
     Log a change to the journal.
     
@@ -37,39 +191,38 @@ def log_change(
         new_value: New value
         source: Origin of change ('indexer', 'api', 'manual', 'cleanup')
         user_info: Optional user context
+        sync: Write (and commit) before returning instead of buffering
     
     Returns:
-        ID of the journal entry
+        ID of the journal entry if written synchronously, else None
     """
-    db = get_db()
-    
     # Serialize complex values to JSON
     if old_value is not None and not isinstance(old_value, str):
         old_value = json.dumps(old_value)
     if new_value is not None and not isinstance(new_value, str):
         new_value = json.dumps(new_value)
     
-    with db.connection() as conn:
-        cursor = conn.execute("""
-            INSERT INTO change_journal (
-                entity_type, entity_id, action, field_name,
-                old_value, new_value, source, user_info
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            entity_type, entity_id, action, field_name,
-            old_value, new_value, source, user_info
-        ))
-        conn.commit()
-        
-        logger.debug(f"Journal: {action} {entity_type}#{entity_id} ({source})")
-        return cursor.lastrowid
+    # Same format as the column default (datetime('now'), UTC)
+    timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    entry = (
+        timestamp, entity_type, entity_id, action, field_name,
+        old_value, new_value, source, user_info
+    )
+    
+    writer = get_journal_writer()
+    logger.debug(f"Journal: {action} {entity_type}#{entity_id} ({source})")
+    if sync or action in SYNC_ACTIONS or writer.batch_size <= 1:
+        return writer.write_now(entry)
+    
+    writer.add(entry)
+    return None
 
 
 def log_asset_change(
     asset_id: int,
     action: str,
     **kwargs
-) -> int:
+) -> Optional[int]:
     """Convenience wrapper for asset changes."""
     return log_change('asset', asset_id, action, **kwargs)
 
@@ -78,11 +231,18 @@ def log_model_change(
     model_id: int,
     action: str,
     **kwargs
-) -> int:
+) -> Optional[int]:
     """Convenience wrapper for model changes."""
     return log_change('model', model_id, action, **kwargs)
 
 
+def _journal_timestamp(value: datetime) -> str:
+    """Format a datetime like stored journal timestamps (UTC, no 'T')."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime('%Y-%m-%d %H:%M:%S')
+
+
 def get_journal_entries(
     entity_type: Optional[str] = None,
     entity_id: Optional[int] = None,
@@ -94,6 +254,9 @@ def get_journal_entries(
     """
     Query journal entries with optional filters.
     
+    Partitions are read newest first, stopping once offset + limit rows
+    have been found, so recent pages don't touch old months.
+    
     Args:
         entity_type: Filter by 'asset' or 'model'
         entity_id: Filter by specific entity
@@ -105,33 +268,43 @@ def get_journal_entries(
     Returns:
         List of journal entries
     """
+    flush_journal()
     db = get_db()
     
-    query = "SELECT * FROM change_journal WHERE 1=1"
+    conditions = []
     params = []
     
     if entity_type:
-        query += " AND entity_type = ?"
+        conditions.append("entity_type = ?")
         params.append(entity_type)
     
     if entity_id:
-        query += " AND entity_id = ?"
+        conditions.append("entity_id = ?")
         params.append(entity_id)
     
     if action:
-        query += " AND action = ?"
+        conditions.append("action = ?")
         params.append(action)
     
-    if since:
-        query += " AND timestamp >= ?"
-        params.append(since.isoformat())
+    since_ts = _journal_timestamp(since) if since else None
+    if since_ts:
+        conditions.append("timestamp >= ?")
+        params.append(since_ts)
     
-    query += " ORDER BY timestamp DESC LIMIT ? OFFSET ?"
-    params.extend([limit, offset])
+    where = " AND ".join(conditions) or "1=1"
+    wanted = offset + limit
+    rows = []
     
     with db.connection() as conn:
-        rows = conn.execute(query, params).fetchall()
-        return [dict(row) for row in rows]
+        ensure_journal_partitions(conn)
+        for month, table in list_partitions(conn, since=since_ts):
+            rows.extend(conn.execute(
+                f"SELECT * FROM {table} WHERE {where} ORDER BY timestamp DESC, id DESC LIMIT ?",
+                params + [wanted - len(rows)]
+            ).fetchall())
+            if len(rows) >= wanted:
+                break
+        return [dict(row) for row in rows[offset:wanted]]
 
 
 def get_entity_history(entity_type: str, entity_id: int) -> List[Dict]:
@@ -140,13 +313,17 @@ def get_entity_history(entity_type: str, entity_id: int) -> List[Dict]:
     
     Returns all journal entries for the entity, oldest first.
     """
+    flush_journal()
     db = get_db()
     with db.connection() as conn:
-        rows = conn.execute("""
-            SELECT * FROM change_journal
-            WHERE entity_type = ? AND entity_id = ?
-            ORDER BY timestamp ASC
-        """, (entity_type, entity_id)).fetchall()
+        ensure_journal_partitions(conn)
+        rows = []
+        for month, table in list_partitions(conn, newest_first=False):
+            rows.extend(conn.execute(f"""
+                SELECT * FROM {table}
+                WHERE entity_type = ? AND entity_id = ?
+                ORDER BY timestamp ASC, id ASC
+            """, (entity_type, entity_id)).fetchall())
         return [dict(row) for row in rows]
 
 
@@ -157,47 +334,75 @@ def get_journal_stats() -> Dict:
     Returns:
         Dict with counts by action, entity type, and time period
     """
-    db = get_db()
+    flush_journal()
     
-    with db.connection() as conn:
-        # Total entries
-        total = conn.execute("SELECT COUNT(*) FROM change_journal").fetchone()[0]
-        
-        # By action
-        by_action = conn.execute("""
-            SELECT action, COUNT(*) as count
-            FROM change_journal
-            GROUP BY action
-        """).fetchall()
-        
-        # By entity type
-        by_type = conn.execute("""
-            SELECT entity_type, COUNT(*) as count
-            FROM change_journal
-            GROUP BY entity_type
-        """).fetchall()
-        
-        # Recent (last 24 hours)
-        recent_count = conn.execute("""
-            SELECT COUNT(*) FROM change_journal
-            WHERE timestamp >= datetime('now', '-1 day')
-        """).fetchone()[0]
-        
-        # Oldest and newest entries
-        oldest = conn.execute(
-            "SELECT MIN(timestamp) FROM change_journal"
-        ).fetchone()[0]
-        newest = conn.execute(
-            "SELECT MAX(timestamp) FROM change_journal"
+    # Time-based figures (recent_24h) drift without writes, so keep a short TTL
+    with get_db().connection() as conn:
+        ensure_journal_partitions(conn)
+        return cached_stats(conn, 'journal', ('change_journal',), _compute_journal_stats, max_age=60)
+
+
+# Per-partition (action, entity_type) counts for sealed months, keyed by
+# table and (entry_count, compacted_at) so trims and compaction invalidate
+_partition_counts: Dict[str, Tuple[Tuple, List[Tuple[str, str, int]]]] = {}
+
+
+def _partition_breakdown(conn, month: str, table: str) -> List[Tuple[str, str, int]]:
+    version = tuple(conn.execute(
+        "SELECT entry_count, compacted_at FROM journal_partitions WHERE month = ?", (month,)
+    ).fetchone() or ())
+    cached = _partition_counts.get(table)
+    if month < current_month() and cached and cached[0] == version:
+        return cached[1]
+    
+    counts = [tuple(row) for row in conn.execute(f"""
+        SELECT action, entity_type, COUNT(*) FROM {table}
+        GROUP BY action, entity_type
+    """).fetchall()]
+    _partition_counts[table] = (version, counts)
+    return counts
+
+
+def _compute_journal_stats(conn) -> Dict:
+    partitions = list_partitions(conn, newest_first=False)
+    
+    # Totals by action and entity type (sealed months come from memory)
+    total = 0
+    by_action: Dict[str, int] = {}
+    by_type: Dict[str, int] = {}
+    for month, table in partitions:
+        for action, entity_type, count in _partition_breakdown(conn, month, table):
+            total += count
+            by_action[action] = by_action.get(action, 0) + count
+            by_type[entity_type] = by_type.get(entity_type, 0) + count
+    
+    # Recent (last 24 hours): at most the last two months
+    day_ago = _journal_timestamp(datetime.now(timezone.utc) - timedelta(days=1))
+    recent_count = 0
+    for month, table in list_partitions(conn, since=day_ago):
+        recent_count += conn.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE timestamp >= ?", (day_ago,)
         ).fetchone()[0]
     
+    # Oldest and newest entries
+    oldest = newest = None
+    for month, table in partitions:
+        oldest = conn.execute(f"SELECT MIN(timestamp) FROM {table}").fetchone()[0]
+        if oldest:
+            break
+    for month, table in reversed(partitions):
+        newest = conn.execute(f"SELECT MAX(timestamp) FROM {table}").fetchone()[0]
+        if newest:
+            break
+    
     return {
         'total_entries': total,
-        'by_action': {row['action']: row['count'] for row in by_action},
-        'by_entity_type': {row['entity_type']: row['count'] for row in by_type},
+        'by_action': by_action,
+        'by_entity_type': by_type,
         'recent_24h': recent_count,
         'oldest_entry': oldest,
-        'newest_entry': newest
+        'newest_entry': newest,
+        'partitions': len(partitions)
     }
 
 
@@ -205,27 +410,38 @@ def cleanup_old_entries(days: int = 90) -> int:
     """
     Remove journal entries older than specified days.
     
+    Whole months past the cutoff are dropped; only the month containing
+    the cutoff has rows deleted (in chunks).
+    
     Args:
         days: Remove entries older than this many days
     
     Returns:
         Count of deleted entries
     """
+    flush_journal()
     db = get_db()
+    cutoff = _journal_timestamp(datetime.now(timezone.utc) - timedelta(days=days))
     
     with db.connection() as conn:
-        cursor = conn.execute("""
-            DELETE FROM change_journal
-            WHERE timestamp < datetime('now', ? || ' days')
-        """, (f'-{days}',))
-        conn.commit()
-        
-        deleted = cursor.rowcount
+        deleted = drop_before(conn, cutoff)
         if deleted > 0:
             logger.info(f"Cleaned up {deleted} journal entries older than {days} days")
         return deleted
 
 
+def compact_journal() -> Dict[str, int]:
+    """
+    Collapse repeated field updates in past months not yet compacted.
+    
+    Returns:
+        Entries removed per month ('YYYY-MM')
+    """
+    flush_journal()
+    with get_db().connection() as conn:
+        return compact_sealed(conn)
+
+
 # CLI interface
 if __name__ == "__main__":
     import argparse
@@ -238,6 +454,7 @@ if __name__ == "__main__":
     parser.add_argument('--entity', help='Filter by entity (asset/model)')
     parser.add_argument('--id', type=int, help='Filter by entity ID')
     parser.add_argument('--cleanup', type=int, help='Remove entries older than N days')
+    parser.add_argument('--compact', action='store_true', help='Collapse repeated updates in past months')
     args = parser.parse_args()
     
     if args.stats:
@@ -267,5 +484,11 @@ if __name__ == "__main__":
         deleted = cleanup_old_entries(args.cleanup)
         print(f"Deleted {deleted} entries older than {args.cleanup} days")
     
+    elif args.compact:
+        removed = compact_journal()
+        for month, count in removed.items():
+            print(f"  {month}: {count} entries collapsed")
+        print(f"Compacted {len(removed)} months")
+    
     else:
         parser.print_help()
@@ -0,0 +1,276 @@
+"""
+Online Database Backup Engine.
+
+Copies the live SQLite database without stalling the web tier. Snapshots,
+/api/backup and the pre-index auto-snapshot all go through here.
+
+Two methods:
+- 'step': the SQLite backup API, BACKUP_PAGES_PER_STEP pages at a time.
+  The source lock is only held during a step, and the engine sleeps
+  BACKUP_STEP_SLEEP seconds between steps so writers and checkpoints get
+  through. Progress comes from the page counts. If another connection
+  writes to the database mid-copy, SQLite restarts the copy. After
+  BACKUP_MAX_RESTARTS restarts the engine falls back to 'vacuum'.
+- 'vacuum': VACUUM INTO. This is one read transaction, which doesn't
+  block writers under WAL. It writes a compacted copy. Progress is
+  estimated from the size of the output file.
+
+The copy is written to `<dest>.partial` and renamed when it is complete,
+so a crash never leaves a truncated backup under its final name. The copy
+is switched to rollback-journal mode so it is one self-contained file.
+Background jobs run one at a time in a worker thread. Their status can be
+polled with get_backup_job().
+"""
+
+import os
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from fantasyfolio.config import get_config
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept for status polling
+MAX_FINISHED_JOBS = 20
+
+
+class BackupRestarted(Exception):
+    """The source changed under a stepwise copy too many times."""
+
+
+class BackupJob:
+    """Status of one backup (also used for synchronous runs)."""
+
+    def __init__(self, dest: Path, kind: str = 'backup', note: Optional[str] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.dest = Path(dest)
+        self.kind = kind
+        self.note = note
+        self.status = 'pending'  # pending, running, completed, failed
+        self.method = None
+        self.pages_total = 0
+        self.pages_done = 0
+        self.restarts = 0
+        self.size_bytes = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self.done = threading.Event()
+
+    @property
+    def progress(self) -> float:
+        if self.status == 'completed':
+            return 1.0
+        if not self.pages_total:
+            return 0.0
+        return min(self.pages_done / self.pages_total, 0.99)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self.done.wait(timeout)
+
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'filename': self.dest.name,
+            'path': str(self.dest),
+            'note': self.note,
+            'status': self.status,
+            'method': self.method,
+            'progress': round(self.progress, 3),
+            'restarts': self.restarts,
+            'size_bytes': self.size_bytes,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error
+        }
+
+
+def _step_copy(source: sqlite3.Connection, dest_path: Path, job: BackupJob,
+               pages: int, sleep: float, max_restarts: int):
+    """Stepwise copy with the backup API, throttled between steps."""
+    job.method = 'step'
+    last_remaining = None
+
+    def progress(status, remaining, total):
+        nonlocal last_remaining
+        if last_remaining is not None and remaining > last_remaining:
+            job.restarts += 1
+            if job.restarts > max_restarts:
+                raise BackupRestarted(f"source changed {job.restarts} times during copy")
+        last_remaining = remaining
+        job.pages_total = total
+        job.pages_done = total - remaining
+        if sleep > 0 and remaining:
+            time.sleep(sleep)
+
+    dest = sqlite3.connect(dest_path)
+    try:
+        source.backup(dest, pages=pages, progress=progress)
+        dest.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        dest.close()
+
+
+def _vacuum_copy(source: sqlite3.Connection, dest_path: Path, job: BackupJob):
+    """VACUUM INTO, with progress estimated from the output size."""
+    job.method = 'vacuum'
+    page_size = source.execute("PRAGMA page_size").fetchone()[0]
+    job.pages_total = source.execute("PRAGMA page_count").fetchone()[0]
+    job.pages_done = 0
+
+    finished = threading.Event()
+
+    def watch():
+        while not finished.wait(0.5):
+            try:
+                job.pages_done = dest_path.stat().st_size // page_size
+            except OSError:
+                pass
+
+    watcher = threading.Thread(target=watch, name="backup-progress", daemon=True)
+    watcher.start()
+    try:
+        source.execute("VACUUM INTO ?", (str(dest_path),))
+    finally:
+        finished.set()
+        watcher.join()
+
+    dest = sqlite3.connect(dest_path)
+    try:
+        dest.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        dest.close()
+
+
+def run_backup(
+    dest: Path,
+    source_path: Optional[Path] = None,
+    method: Optional[str] = None,
+    job: Optional[BackupJob] = None
+) -> BackupJob:
+    """
+    Copy the database to `dest` in the calling thread.
+
+    Args:
+        dest: Destination file
+        source_path: Database to copy (default DATABASE_PATH)
+        method: 'step' or 'vacuum' (default BACKUP_METHOD)
+        job: Job to report progress on (created if not given)
+
+    Returns:
+        The job, with status 'completed' or 'failed'
+    """
+    config = get_config()
+    source_path = Path(source_path or config.DATABASE_PATH)
+    method = method or config.BACKUP_METHOD
+    job = job or BackupJob(dest)
+    dest = Path(dest)
+    partial = dest.with_name(dest.name + '.partial')
+
+    job.status = 'running'
+    job.started_at = datetime.now().isoformat()
+    start = time.time()
+
+    try:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if partial.exists():
+            partial.unlink()
+
+        source = sqlite3.connect(source_path, timeout=config.DATABASE_TIMEOUT)
+        try:
+            if method == 'vacuum':
+                _vacuum_copy(source, partial, job)
+            else:
+                try:
+                    _step_copy(source, partial, job, config.BACKUP_PAGES_PER_STEP,
+                               config.BACKUP_STEP_SLEEP, config.BACKUP_MAX_RESTARTS)
+                except BackupRestarted as e:
+                    logger.info(f"Backup {job.id}: {e}, falling back to VACUUM INTO")
+                    partial.unlink(missing_ok=True)
+                    _vacuum_copy(source, partial, job)
+        finally:
+            source.close()
+
+        os.replace(partial, dest)
+        job.size_bytes = dest.stat().st_size
+        job.pages_done = job.pages_total
+        job.status = 'completed'
+        logger.info(f"Backup {dest.name} completed ({job.method}, "
+                    f"{job.size_bytes / (1024 * 1024):.1f} MB in {time.time() - start:.1f}s)")
+    except Exception as e:
+        job.status = 'failed'
+        job.error = str(e)
+        logger.error(f"Backup to {dest} failed: {e}", exc_info=True)
+        try:
+            partial.unlink(missing_ok=True)
+        except OSError:
+            pass
+    finally:
+        job.finished_at = datetime.now().isoformat()
+        job.done.set()
+
+    return job
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# BACKGROUND JOBS
+# ═══════════════════════════════════════════════════════════════════════════
+
+_jobs: Dict[str, BackupJob] = {}
+_jobs_lock = threading.Lock()
+_run_lock = threading.Lock()  # One copy at a time
+
+
+def submit_backup(
+    dest: Path,
+    kind: str = 'backup',
+    note: Optional[str] = None,
+    on_complete: Optional[Callable[[BackupJob], None]] = None,
+    method: Optional[str] = None
+) -> BackupJob:
+    """
+    Start a backup in a background thread and return its job immediately.
+
+    Jobs queue behind each other. `on_complete` is called with the job
+    (completed or failed) from the worker thread.
+    """
+    job = BackupJob(dest, kind=kind, note=note)
+
+    with _jobs_lock:
+        _jobs[job.id] = job
+        finished = [j for j in _jobs.values() if j.done.is_set()]
+        for old in finished[:-MAX_FINISHED_JOBS]:
+            _jobs.pop(old.id, None)
+
+    def worker():
+        with _run_lock:
+            run_backup(dest, method=method, job=job)
+        if on_complete:
+            try:
+                on_complete(job)
+            except Exception as e:
+                logger.error(f"Backup {job.id} completion handler failed: {e}")
+
+    threading.Thread(target=worker, name=f"backup-{job.id}", daemon=True).start()
+    return job
+
+
+def get_backup_job(job_id: str) -> Optional[BackupJob]:
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def list_backup_jobs() -> List[Dict]:
+    """All known jobs, newest first."""
+    with _jobs_lock:
+        jobs = list(_jobs.values())
+    return [job.to_dict() for job in sorted(jobs, key=lambda j: j.created_at, reverse=True)]
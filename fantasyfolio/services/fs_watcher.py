@@ -0,0 +1,614 @@
+"""
+Live Filesystem Watcher Service.
+
+Feeds changed files into the indexers as they appear, so new drops show
+up in seconds without a full /api/index rescan.
+
+Watched roots are the online registered volumes (3D models, indexed with
+core/scanner.py) and the enabled local document locations (PDFs, indexed
+with PDFIndexer). Local roots are watched with Linux inotify; network
+mounts (SMB/NFS/sshfs - inotify doesn't see changes made by other
+clients) and non-Linux hosts fall back to polling every
+FS_WATCH_POLL_INTERVAL seconds.
+
+Events are debounced: a path is only handed to the indexers once it has
+been quiet for FS_WATCH_DEBOUNCE seconds, so a large archive being copied
+is scanned once, after the copy finishes, and a burst of events for the
+same file collapses into one scan. New directories are scanned as a
+whole (their contents may have arrived before the watch was added).
+Deleted models are marked missing via handle_missing_asset(); nothing is
+ever deleted from the database.
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import logging
+import threading
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from fantasyfolio.config import get_config
+
+logger = logging.getLogger(__name__)
+
+MODEL_EXTENSIONS = {'.stl', '.obj', '.3mf', '.glb', '.gltf', '.svg', '.dae', '.3ds', '.ply', '.x3d'}
+ARCHIVE_EXTENSIONS = {'.zip', '.rar'}
+DOCUMENT_EXTENSIONS = {'.pdf'}
+
+WATCHED_EXTENSIONS = {
+    'models': MODEL_EXTENSIONS | ARCHIVE_EXTENSIONS,
+    'documents': DOCUMENT_EXTENSIONS,
+}
+
+# Filesystems where inotify misses changes made by other machines
+NETWORK_FS_TYPES = {
+    'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'fuse.sshfs', 'fuse.rclone',
+    'afpfs', '9p', 'ceph', 'glusterfs', 'fuse.glusterfs', 'davfs', 'fuse.davfs2',
+}
+
+
+def is_relevant(path: str, kind: str) -> bool:
+    """True if `path` is a file type the indexer for `kind` handles."""
+    name = os.path.basename(path)
+    if name.startswith('.') or '__MACOSX' in path:
+        return False  # Hidden files (incl. rsync/partial-download temp files)
+    return os.path.splitext(name)[1].lower() in WATCHED_EXTENSIONS[kind]
+
+
+def is_network_mount(path: str) -> bool:
+    """True if `path` lives on a network filesystem (per /proc/mounts)."""
+    try:
+        with open('/proc/mounts') as f:
+            mounts = [line.split()[1:3] for line in f if line.strip()]
+    except OSError:
+        return False
+    
+    path = os.path.realpath(path)
+    best, best_type = '', ''
+    for mount_point, fs_type in mounts:
+        mount_point = mount_point.replace('\\040', ' ')
+        if (path == mount_point or path.startswith(mount_point.rstrip('/') + '/')) and len(mount_point) > len(best):
+            best, best_type = mount_point, fs_type
+    return best_type in NETWORK_FS_TYPES
+
+
+@dataclass(frozen=True)
+class WatchRoot:
+    """A directory tree to watch and the indexer its changes go to."""
+    path: str
+    kind: str  # 'models' or 'documents'
+    volume_id: Optional[str] = None
+
+
+def get_watch_roots() -> List[WatchRoot]:
+    """Online volumes (models) and enabled local document locations."""
+    from fantasyfolio.core.database import get_connection
+    
+    roots = []
+    with get_connection() as conn:
+        for row in conn.execute("SELECT id, mount_path FROM volumes WHERE status = 'online'"):
+            roots.append(WatchRoot(row[1], 'models', row[0]))
+        for row in conn.execute("""
+            SELECT path FROM asset_locations
+            WHERE enabled = 1 AND asset_type = 'documents' AND location_type != 'remote_sftp'
+        """):
+            roots.append(WatchRoot(row[0], 'documents'))
+    return [root for root in roots if root.path and os.path.isdir(root.path)]
+
+
+# ==================== Debouncing ====================
+
+class ChangeDebouncer:
+    """
+    Coalesce filesystem events per path.
+    
+    A path is released by ready() once no event has arrived for it for
+    `delay` seconds. The last event wins (created-then-deleted is a delete).
+    """
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._pending: Dict[str, Tuple[float, bool]] = {}  # path -> (last event, deleted)
+        self._lock = threading.Lock()
+    
+    def add(self, path: str, deleted: bool = False, now: Optional[float] = None):
+        with self._lock:
+            self._pending[path] = (time.monotonic() if now is None else now, deleted)
+    
+    def ready(self, now: Optional[float] = None) -> List[Tuple[str, bool]]:
+        """Pop (path, deleted) for every path that has settled."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            settled = [path for path, (last, _) in self._pending.items() if now - last >= self.delay]
+            return [(path, self._pending.pop(path)[1]) for path in settled]
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
+
+
+# ==================== Backends ====================
+
+# inotify constants (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE |
+              IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+class InotifyBackend:
+    """Recursive inotify watches via libc (Linux only, no extra dependency)."""
+    
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._ctypes = ctypes
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, str] = {}  # wd -> directory
+        self._wds: Dict[str, int] = {}  # directory -> wd
+    
+    @staticmethod
+    def available() -> bool:
+        if not sys.platform.startswith('linux'):
+            return False
+        try:
+            import ctypes
+            import ctypes.util
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6')
+            return hasattr(libc, 'inotify_init1')
+        except OSError:
+            return False
+    
+    def _add_watch(self, directory: str) -> bool:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            err = self._ctypes.get_errno()
+            if err == errno.ENOSPC:
+                logger.warning("inotify watch limit reached (raise fs.inotify.max_user_watches)")
+            elif err not in (errno.ENOENT, errno.ENOTDIR):
+                logger.debug(f"Cannot watch {directory}: {os.strerror(err)}")
+            return False
+        self._dirs[wd] = directory
+        self._wds[directory] = wd
+        return True
+    
+    def add_tree(self, root: str) -> int:
+        """Watch `root` and every directory below it; returns the number of watches added."""
+        added = 0
+        for directory, subdirs, _ in os.walk(root):
+            subdirs[:] = [d for d in subdirs if not d.startswith('.')]
+            if directory not in self._wds and self._add_watch(directory):
+                added += 1
+        return added
+    
+    def remove_tree(self, root: str):
+        prefix = root.rstrip('/') + '/'
+        for directory in [d for d in self._wds if d == root or d.startswith(prefix)]:
+            wd = self._wds.pop(directory)
+            self._dirs.pop(wd, None)
+            self._libc.inotify_rm_watch(self.fd, wd)
+    
+    def read(self, timeout: float) -> List[Tuple[str, bool, bool]]:
+        """
+        Wait up to `timeout` seconds for events.
+        
+        Returns (path, deleted, is_dir) per event. A queue overflow is
+        reported as the watched root directories themselves (rescan).
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            
+            if mask & IN_Q_OVERFLOW:
+                logger.warning("inotify queue overflowed; rescanning watched trees")
+                events.extend((d, False, True) for d in self._overflow_roots())
+                continue
+            if mask & IN_IGNORED:
+                directory = self._dirs.pop(wd, None)
+                if directory and self._wds.get(directory) == wd:
+                    del self._wds[directory]
+                continue
+            
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            is_dir = bool(mask & IN_ISDIR)
+            
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                if is_dir:
+                    self.remove_tree(path)  # Moved-away dirs keep their watches otherwise
+                events.append((path, True, is_dir))
+            elif is_dir and mask & (IN_CREATE | IN_MOVED_TO):
+                # New (or moved-in) directory: watch it and scan what's already there
+                self.add_tree(path)
+                events.append((path, False, True))
+            elif not is_dir and mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                events.append((path, False, False))
+        return events
+    
+    def _overflow_roots(self) -> List[str]:
+        dirs = sorted(self._wds)
+        roots = []
+        for directory in dirs:
+            if not roots or not directory.startswith(roots[-1].rstrip('/') + '/'):
+                roots.append(directory)
+        return roots
+    
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingBackend:
+    """Snapshot (mtime, size) of watched files and report differences."""
+    
+    def __init__(self):
+        self._snapshots: Dict[WatchRoot, Dict[str, Tuple[int, int]]] = {}
+    
+    @staticmethod
+    def snapshot(root: WatchRoot) -> Dict[str, Tuple[int, int]]:
+        files = {}
+        for directory, subdirs, names in os.walk(root.path):
+            subdirs[:] = [d for d in subdirs if not d.startswith('.')]
+            for name in names:
+                path = os.path.join(directory, name)
+                if not is_relevant(path, root.kind):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files[path] = (stat.st_mtime_ns, stat.st_size)
+        return files
+    
+    def add_tree(self, root: WatchRoot):
+        self._snapshots[root] = self.snapshot(root)
+    
+    def remove_tree(self, root: WatchRoot):
+        self._snapshots.pop(root, None)
+    
+    def poll(self, root: WatchRoot) -> List[Tuple[str, bool]]:
+        """(path, deleted) for every file added, changed or removed since the last poll."""
+        before = self._snapshots.get(root, {})
+        after = self.snapshot(root)
+        self._snapshots[root] = after
+        
+        changes = [(path, False) for path, sig in after.items() if before.get(path) != sig]
+        changes += [(path, True) for path in before if path not in after]
+        return changes
+    
+    @property
+    def roots(self) -> List[WatchRoot]:
+        return list(self._snapshots)
+
+
+# ==================== Applying Changes ====================
+
+def _root_for(path: str, roots: Iterable[WatchRoot]) -> Optional[WatchRoot]:
+    """Deepest watched root containing `path`."""
+    best = None
+    for root in roots:
+        prefix = root.path.rstrip('/') + '/'
+        if (path == root.path or path.startswith(prefix)) and (best is None or len(root.path) > len(best.path)):
+            best = root
+    return best
+
+
+def _mark_missing(conn, path: str) -> int:
+    """Flag models stored at (or inside) a deleted path as missing."""
+    from fantasyfolio.core.scanner import handle_missing_asset
+    
+    prefix = path.rstrip('/') + '/%'
+    rows = conn.execute("""
+        SELECT m.*, v.status AS volume_status FROM models m
+        LEFT JOIN volumes v ON v.id = m.volume_id
+        WHERE (m.file_path = ? OR m.archive_path = ? OR m.file_path LIKE ? OR m.archive_path LIKE ?)
+          AND m.index_status != 'missing'
+    """, (path, path, prefix, prefix)).fetchall()
+    
+    marked = 0
+    for row in rows:
+        model = dict(row)
+        volume = {'status': model.pop('volume_status')}
+        if os.path.exists(model.get('archive_path') or model.get('file_path') or ''):
+            continue  # Replaced (e.g. saved via rename) rather than deleted
+        handle_missing_asset(conn, model, volume)
+        marked += 1
+    return marked
+
+
+def apply_model_changes(changes: List[Tuple[str, bool]], volume_id: str) -> Dict[str, int]:
+    """Scan changed files/archives/directories on one volume and store the results."""
+    from fantasyfolio.core.database import get_connection
+    from fantasyfolio.core.folder_tree import refresh_folder_nodes
+    from fantasyfolio.core.hashing import ensure_hash_columns
+    from fantasyfolio.core.scanner import (
+        scan_file, scan_archive, scan_directory, apply_scan_result
+    )
+    
+    stats = {'scanned': 0, 'written': 0, 'missing': 0, 'errors': 0}
+    
+    with get_connection() as conn:
+        row = conn.execute("SELECT * FROM volumes WHERE id = ?", (volume_id,)).fetchone()
+        if row is None:
+            return stats
+        volume = dict(row)
+        ensure_hash_columns(conn, 'models')
+        
+        for path, deleted in changes:
+            try:
+                if deleted:
+                    stats['missing'] += _mark_missing(conn, path)
+                    continue
+                
+                file_path = Path(path)
+                if file_path.is_dir():
+                    results = scan_directory(conn, file_path, volume)
+                elif file_path.suffix.lower() in ARCHIVE_EXTENSIONS:
+                    results = scan_archive(conn, file_path, volume)
+                elif file_path.is_file():
+                    results = [scan_file(conn, file_path, volume)]
+                else:
+                    continue
+                
+                for result in results:
+                    stats['scanned'] += 1
+                    if apply_scan_result(conn, result):
+                        stats['written'] += 1
+            except Exception as e:
+                stats['errors'] += 1
+                logger.error(f"Watcher could not index {path}: {e}")
+        
+        conn.commit()
+        if stats['written'] or stats['missing']:
+            refresh_folder_nodes(conn, 'model', volume_id)
+    
+    return stats
+
+
+def apply_document_changes(changes: List[Tuple[str, bool]], root: WatchRoot) -> Dict[str, int]:
+    """Index changed PDFs (files, or every PDF in a new directory)."""
+    from fantasyfolio.indexer.pdf import PDFIndexer
+    
+    paths = []
+    for path, deleted in changes:
+        if deleted:
+            continue  # The PDF indexer has no missing state; cleanup stays manual
+        if os.path.isdir(path):
+            paths.extend(p for p in Path(path).rglob('*.pdf') if is_relevant(str(p), 'documents'))
+        elif os.path.isfile(path):
+            paths.append(Path(path))
+    
+    if not paths:
+        return {'scanned': 0, 'indexed': 0, 'updated': 0, 'errors': 0}
+    
+    indexer = PDFIndexer(root_path=get_config().PDF_ROOT or root.path)
+    stats = indexer.index_paths(paths, extract_text=True, generate_thumbnails=False)
+    return {key: stats[key] for key in ('scanned', 'indexed', 'updated', 'errors')}
+
+
+def apply_changes(changes: List[Tuple[str, bool]], roots: Iterable[WatchRoot]) -> Dict[str, int]:
+    """Route settled changes to the indexer of the root they belong to."""
+    by_root: Dict[WatchRoot, List[Tuple[str, bool]]] = {}
+    for path, deleted in changes:
+        root = _root_for(path, roots)
+        if root is not None:
+            by_root.setdefault(root, []).append((path, deleted))
+    
+    totals: Dict[str, int] = {}
+    for root, root_changes in by_root.items():
+        if root.kind == 'models':
+            stats = apply_model_changes(root_changes, root.volume_id)
+        else:
+            stats = apply_document_changes(root_changes, root)
+        for key, value in stats.items():
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+# ==================== Watcher ====================
+
+class FilesystemWatcher:
+    """
+    Watch all roots and apply debounced changes.
+    
+    `apply` is called from the watcher thread with (changes, roots);
+    defaults to apply_changes().
+    """
+    
+    def __init__(
+        self,
+        debounce: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        apply: Optional[Callable] = None,
+        roots: Optional[Callable[[], List[WatchRoot]]] = None,
+        use_inotify: Optional[bool] = None
+    ):
+        config = get_config()
+        self.debounce = config.FS_WATCH_DEBOUNCE if debounce is None else debounce
+        self.poll_interval = config.FS_WATCH_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.apply = apply or apply_changes
+        self.get_roots = roots or get_watch_roots
+        if use_inotify is None:
+            use_inotify = InotifyBackend.available()
+        
+        self.inotify = InotifyBackend() if use_inotify else None
+        self.polling = PollingBackend()
+        self.debouncer = ChangeDebouncer(self.debounce)
+        self.roots: Set[WatchRoot] = set()
+        self.stats = {'events': 0, 'batches': 0, 'last_batch_at': None, 'last_error': None}
+        self._last_poll = 0.0
+        self._last_refresh = 0.0
+    
+    def _uses_polling(self, root: WatchRoot) -> bool:
+        return self.inotify is None or is_network_mount(root.path)
+    
+    def refresh_roots(self):
+        """Start/stop watching roots as volumes and locations change."""
+        try:
+            current = set(self.get_roots())
+        except Exception as e:
+            logger.warning(f"Could not read watch roots: {e}")
+            return
+        
+        for root in self.roots - current:
+            if root in self.polling.roots:
+                self.polling.remove_tree(root)
+            elif self.inotify:
+                self.inotify.remove_tree(root.path)
+            logger.info(f"Stopped watching {root.path}")
+        
+        for root in current - self.roots:
+            if self._uses_polling(root):
+                self.polling.add_tree(root)
+                logger.info(f"Watching {root.path} ({root.kind}, polling every {self.poll_interval}s)")
+            else:
+                watches = self.inotify.add_tree(root.path)
+                logger.info(f"Watching {root.path} ({root.kind}, inotify, {watches} directories)")
+        
+        self.roots = current
+        self._last_refresh = time.monotonic()
+    
+    def _queue(self, path: str, deleted: bool, is_dir: bool = False):
+        root = _root_for(path, self.roots)
+        if root is None:
+            return
+        if is_dir or is_relevant(path, root.kind):
+            self.debouncer.add(path, deleted)
+            self.stats['events'] += 1
+    
+    def step(self, timeout: float = 0.5) -> Optional[Dict[str, int]]:
+        """Collect events for up to `timeout` seconds and apply whatever has settled."""
+        now = time.monotonic()
+        if now - self._last_refresh >= max(self.poll_interval, 5):
+            self.refresh_roots()
+        
+        if self.inotify:
+            for path, deleted, is_dir in self.inotify.read(timeout):
+                self._queue(path, deleted, is_dir)
+        else:
+            time.sleep(timeout)
+        
+        if self.polling.roots and time.monotonic() - self._last_poll >= self.poll_interval:
+            self._last_poll = time.monotonic()
+            for root in self.polling.roots:
+                for path, deleted in self.polling.poll(root):
+                    self._queue(path, deleted)
+        
+        changes = self.debouncer.ready()
+        if not changes:
+            return None
+        
+        logger.info(f"Watcher applying {len(changes)} changed path(s)")
+        try:
+            result = self.apply(changes, list(self.roots))
+            self.stats['batches'] += 1
+            self.stats['last_batch_at'] = time.time()
+            return result
+        except Exception as e:
+            self.stats['last_error'] = str(e)
+            logger.error(f"Watcher failed to apply changes: {e}", exc_info=True)
+            return None
+    
+    def run(self, stop: threading.Event):
+        self.refresh_roots()
+        self._last_poll = time.monotonic()
+        while not stop.is_set():
+            self.step()
+    
+    def status(self) -> Dict:
+        return {
+            'backend': 'inotify' if self.inotify else 'polling',
+            'roots': [
+                {'path': r.path, 'kind': r.kind, 'mode': 'polling' if r in self.polling.roots else 'inotify'}
+                for r in sorted(self.roots, key=lambda r: r.path)
+            ],
+            'pending': len(self.debouncer),
+            **self.stats
+        }
+    
+    def close(self):
+        if self.inotify:
+            self.inotify.close()
+
+
+_watcher: Optional[FilesystemWatcher] = None
+_watcher_thread: Optional[threading.Thread] = None
+_watcher_stop = threading.Event()
+
+
+def _watch_loop(watcher: FilesystemWatcher):
+    try:
+        watcher.run(_watcher_stop)
+    except Exception as e:
+        logger.error(f"Filesystem watcher stopped: {e}", exc_info=True)
+    finally:
+        watcher.close()
+
+
+def start_fs_watcher() -> bool:
+    """Start the background watcher thread (no-op if running or disabled)."""
+    global _watcher, _watcher_thread
+    if not get_config().FS_WATCH_ENABLED:
+        return False
+    if _watcher_thread and _watcher_thread.is_alive():
+        return True
+    
+    _watcher_stop.clear()
+    _watcher = FilesystemWatcher()
+    _watcher_thread = threading.Thread(
+        target=_watch_loop, args=(_watcher,), name="fs-watcher", daemon=True
+    )
+    _watcher_thread.start()
+    logger.info(f"Filesystem watcher started ({_watcher.status()['backend']})")
+    return True
+
+
+def stop_fs_watcher():
+    """Stop the background watcher thread."""
+    global _watcher_thread
+    _watcher_stop.set()
+    if _watcher_thread:
+        _watcher_thread.join(timeout=5)
+        _watcher_thread = None
+
+
+def get_watcher_status() -> Dict:
+    """Status of the background watcher (roots, backend, pending paths)."""
+    if _watcher is None or not (_watcher_thread and _watcher_thread.is_alive()):
+        return {'running': False}
+    return {'running': True, **_watcher.status()}
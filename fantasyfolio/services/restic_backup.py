@@ -159,6 +159,28 @@ def run_backup(repo_path: str, password: str, source_path: str, tags: List[str]
     return result
 
 
+def backup_latest_snapshot(repo_path: str, password: str, tags: List[str] = None) -> Dict:
+    """
+    Back up the most recent database snapshot to the Restic repository.
+    
+    Chunked snapshots are a manifest, not a database, so the snapshot is
+    reassembled into a plain SQLite file for the duration of the backup.
+    
+    Returns:
+        run_backup() result, plus the snapshot filename
+    """
+    from fantasyfolio.services.snapshot import get_latest_snapshot, materialized_snapshot
+    
+    snapshot = get_latest_snapshot()
+    if not snapshot:
+        return {'success': False, 'error': 'No snapshots available. Create a snapshot first.'}
+    
+    with materialized_snapshot(snapshot['filename']) as db_path:
+        result = run_backup(repo_path, password, str(db_path), tags)
+    result['snapshot'] = snapshot['filename']
+    return result
+
+
 def list_snapshots(repo_path: str, password: str) -> Dict:
     """
     List all snapshots in the repository.
@@ -379,8 +401,8 @@ def restore_database(repo_path: str, password: str, snapshot_id: str, db_path: s
     
     # Step 1: Safety backup of current database
     logger.info("Creating safety backup before restore...")
-    safety_backup = create_snapshot(reason='pre_restore_safety')
-    if not safety_backup.get('success'):
+    safety_backup = create_snapshot(note='pre_restore_safety')
+    if safety_backup.get('status') != 'completed':
         result['error'] = f"Failed to create safety backup: {safety_backup.get('error')}"
         return result
     
@@ -1,17 +1,20 @@
 """
 Database Snapshot Service.
 
-Creates point-in-time snapshots of the SQLite database using the backup API.
+Creates point-in-time snapshots of the SQLite database using the online
+backup engine (services/db_backup.py), stored as deduplicated compressed
+chunks (services/snapshot_store.py) or, for SNAPSHOT_FORMAT 'full', as
+plain copies.
 Supports listing, creating, restoring, and cleaning up snapshots.
 """
 
 import os
-import sqlite3
 import logging
 import shutil
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
 from fantasyfolio.config import get_config
 
@@ -26,26 +29,68 @@ def get_snapshot_dir() -> Path:
     return snapshot_dir
 
 
-def create_snapshot(note: Optional[str] = None) -> Dict:
+def get_snapshot_store():
+    """Chunk store for deduplicated snapshots (services/snapshot_store.py)."""
+    from fantasyfolio.services.snapshot_store import SnapshotStore
+    return SnapshotStore(get_snapshot_dir())
+
+
+def _scratch_path(snapshot_dir: Path, name: str) -> Path:
+    """
+    Where the temporary database copy for a chunked snapshot goes.
+    
+    tmpfs when the database fits there (the copy then never touches the
+    disk; only new chunks do), otherwise the snapshot directory.
+    """
+    from fantasyfolio.core.staging import MEMORY_HEADROOM, memory_staging_dir
+    
+    memory_dir = memory_staging_dir()
+    if memory_dir:
+        try:
+            size = get_config().DATABASE_PATH.stat().st_size
+            if shutil.disk_usage(memory_dir).free > size * 1.1 + MEMORY_HEADROOM:
+                return Path(memory_dir) / f".ff-{name}.scratch"
+        except OSError:
+            pass
+    return snapshot_dir / f".{name}.scratch"
+
+
+def create_snapshot(note: Optional[str] = None, background: bool = False) -> Dict:
     """
     Create a snapshot of the current database.
     
-    Uses SQLite's backup API for a consistent snapshot even during writes.
+    Uses the online backup engine (services/db_backup.py): a throttled,
+    stepwise copy that doesn't hold the database for the whole run. With
+    SNAPSHOT_FORMAT 'chunked' (default) the copy is then split into
+    compressed, content-addressed chunks and only chunks no other snapshot
+    has are stored; 'full' keeps a plain .db copy.
     
     Args:
         note: Optional description for the snapshot
+        background: Return immediately with status 'running' and a job_id
+            (poll get_backup_job); metadata is written when the copy finishes
     
     Returns:
         Dict with snapshot details
     """
+    from fantasyfolio.services.db_backup import run_backup, submit_backup
+    
     config = get_config()
     db_path = config.DATABASE_PATH
     snapshot_dir = get_snapshot_dir()
+    chunked = config.SNAPSHOT_FORMAT == 'chunked'
     
     # Generate snapshot filename
     timestamp = datetime.now()
-    filename = f"snapshot_{timestamp.strftime('%Y%m%d_%H%M%S')}.db"
+    stem = f"snapshot_{timestamp.strftime('%Y%m%d_%H%M%S')}"
+    suffix = '.snap' if chunked else '.db'
+    for n in range(1, 100):
+        if not (snapshot_dir / (stem + suffix)).exists():
+            break
+        stem = f"snapshot_{timestamp.strftime('%Y%m%d_%H%M%S')}_{n}"
+    filename = stem + suffix
     snapshot_path = snapshot_dir / filename
+    copy_path = _scratch_path(snapshot_dir, stem) if chunked else snapshot_path
     
     result = {
         'timestamp': timestamp.isoformat(),
@@ -53,33 +98,59 @@ def create_snapshot(note: Optional[str] = None) -> Dict:
         'path': str(snapshot_path),
         'source_db': str(db_path),
         'note': note,
+        'format': 'chunked' if chunked else 'full',
         'status': 'pending'
     }
     
+    if background:
+        job = submit_backup(
+            copy_path, kind='snapshot', note=note,
+            on_complete=lambda job: _finish_snapshot(snapshot_path, copy_path, result, job)
+        )
+        result['status'] = 'running'
+        result['job_id'] = job.id
+        return result
+    
+    return _finish_snapshot(snapshot_path, copy_path, result, run_backup(copy_path))
+
+
+def _finish_snapshot(snapshot_path: Path, copy_path: Path, result: Dict, job) -> Dict:
+    """Record the outcome of a snapshot copy, chunking it if needed, plus its metadata file."""
+    result['job_id'] = job.id
+    result['method'] = job.method
+    
+    if job.status != 'completed':
+        result['status'] = 'failed'
+        result['error'] = job.error
+        logger.error(f"Snapshot creation failed: {job.error}")
+        return result
+    
     try:
-        # Use SQLite backup API for consistent snapshot
-        source = sqlite3.connect(db_path)
-        dest = sqlite3.connect(snapshot_path)
-        
-        source.backup(dest)
+        if copy_path != snapshot_path:
+            stats = get_snapshot_store().ingest(copy_path, snapshot_path, metadata={'note': result['note']})
+            result['stored_bytes'] = stats['stored_bytes']
+            result['stored_human'] = _format_size(stats['stored_bytes'])
+            result['new_chunks'] = stats['new_chunks']
+            result['chunks'] = stats['chunks']
         
-        source.close()
-        dest.close()
-        
-        # Get snapshot size
-        result['size_bytes'] = snapshot_path.stat().st_size
-        result['size_human'] = _format_size(result['size_bytes'])
+        result['size_bytes'] = job.size_bytes
+        result['size_human'] = _format_size(job.size_bytes)
         result['status'] = 'completed'
         
-        logger.info(f"Created snapshot: {filename} ({result['size_human']})")
+        logger.info(f"Created snapshot: {result['filename']} ({result['size_human']})")
         
         # Write metadata file
         _write_snapshot_metadata(snapshot_path, result)
-        
     except Exception as e:
         result['status'] = 'failed'
         result['error'] = str(e)
         logger.error(f"Snapshot creation failed: {e}", exc_info=True)
+    finally:
+        if copy_path != snapshot_path:
+            try:
+                copy_path.unlink()
+            except OSError:
+                pass
     
     return result
 
@@ -115,7 +186,8 @@ def list_snapshots() -> List[Dict]:
     snapshot_dir = get_snapshot_dir()
     snapshots = []
     
-    for path in sorted(snapshot_dir.glob("snapshot_*.db"), reverse=True):
+    paths = list(snapshot_dir.glob("snapshot_*.db")) + list(snapshot_dir.glob("snapshot_*.snap"))
+    for path in sorted(paths, key=lambda p: p.stem, reverse=True):
         metadata = _read_snapshot_metadata(path)
         
         if metadata:
@@ -141,12 +213,13 @@ def get_latest_snapshot() -> Optional[Dict]:
     return snapshots[0] if snapshots else None
 
 
-def delete_snapshot(filename: str) -> bool:
+def delete_snapshot(filename: str, gc: bool = True) -> bool:
     """
     Delete a snapshot file.
     
     Args:
-        filename: Snapshot filename (e.g., 'snapshot_20260207_143000.db')
+        filename: Snapshot filename (e.g., 'snapshot_20260207_143000.snap')
+        gc: For chunked snapshots, sweep chunks no longer referenced
     
     Returns:
         True if deleted, False if not found
@@ -163,12 +236,40 @@ def delete_snapshot(filename: str) -> bool:
         if meta_path.exists():
             meta_path.unlink()
         logger.info(f"Deleted snapshot: {filename}")
+        if gc and snapshot_path.suffix == '.snap':
+            get_snapshot_store().gc()
         return True
     except Exception as e:
         logger.error(f"Failed to delete snapshot {filename}: {e}")
         return False
 
 
+@contextmanager
+def materialized_snapshot(filename: str) -> Iterator[Path]:
+    """
+    Yield a plain database file for a snapshot (e.g. to hand to rsync/restic).
+    
+    Full snapshots are yielded as-is; chunked ones are reassembled into a
+    temporary file that is removed on exit.
+    """
+    snapshot_path = get_snapshot_dir() / filename
+    if snapshot_path.suffix != '.snap':
+        yield snapshot_path
+        return
+    
+    export_dir = get_snapshot_dir() / "export"
+    export_dir.mkdir(exist_ok=True)
+    export_path = export_dir / f"{snapshot_path.stem}.db"
+    get_snapshot_store().restore(snapshot_path, export_path)
+    try:
+        yield export_path
+    finally:
+        try:
+            export_path.unlink()
+        except OSError:
+            pass
+
+
 def restore_snapshot(filename: str, backup_current: bool = True) -> Dict:
     """
     Restore the database from a snapshot.
@@ -200,16 +301,24 @@ def restore_snapshot(filename: str, backup_current: bool = True) -> Dict:
         return result
     
     try:
-        # Backup current database first
+        # Backup current database first (online copy, safe under WAL)
         if backup_current:
+            from fantasyfolio.services.db_backup import run_backup
+            
             backup_name = f"pre_restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
             backup_path = snapshot_dir / backup_name
-            shutil.copy2(db_path, backup_path)
+            job = run_backup(backup_path)
+            if job.status != 'completed':
+                raise RuntimeError(f"Pre-restore backup failed: {job.error}")
             result['backup_created'] = backup_name
             logger.info(f"Created pre-restore backup: {backup_name}")
         
         # Restore by copying snapshot over current database
-        shutil.copy2(snapshot_path, db_path)
+        with materialized_snapshot(filename) as source_path:
+            shutil.copy2(source_path, db_path)
+        
+        from fantasyfolio.core.database import reset_database_caches
+        reset_database_caches()
         
         result['status'] = 'completed'
         result['message'] = f"Database restored from {filename}"
@@ -254,13 +363,16 @@ def cleanup_old_snapshots(keep_count: int = 10, keep_days: int = 30) -> Dict:
             kept_count += 1
             continue
         
-        # Delete old snapshot
-        if delete_snapshot(snapshot['filename']):
+        # Delete old snapshot (chunks are swept once, below)
+        if delete_snapshot(snapshot['filename'], gc=False):
             result['deleted'].append(snapshot['filename'])
     
     result['kept'] = kept_count
     result['deleted_count'] = len(result['deleted'])
     
+    if any(name.endswith('.snap') for name in result['deleted']):
+        result['gc'] = get_snapshot_store().gc()
+    
     if result['deleted']:
         logger.info(f"Cleaned up {result['deleted_count']} old snapshots")
     
@@ -297,6 +409,8 @@ if __name__ == "__main__":
         if result['status'] == 'completed':
             print(f"  File: {result['filename']}")
             print(f"  Size: {result['size_human']}")
+            if 'stored_human' in result:
+                print(f"  Stored: {result['stored_human']} ({result['new_chunks']}/{result['chunks']} new chunks)")
     
     elif args.list:
         snapshots = list_snapshots()
@@ -0,0 +1,263 @@
+"""
+Content-Addressed Snapshot Store.
+
+Full-copy snapshots cost the whole database every time, although two
+snapshots are mostly identical. Here a snapshot is a manifest
+(`snapshot_*.snap`, JSON) listing the SHA-256 of each fixed-size chunk of
+the database file. Chunks are stored once under `chunks/ab/<sha256>`,
+compressed with zstd when the `zstandard` package is installed and with
+zlib otherwise. A new snapshot only writes the chunks that changed since
+any snapshot still on disk.
+
+Restoring reassembles the file from its chunks, verifying each hash.
+Deleting a snapshot removes only its manifest; gc() then sweeps the
+chunks no manifest references.
+"""
+
+import os
+import json
+import zlib
+import hashlib
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from fantasyfolio.config import get_config
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FORMAT = 1
+MANIFEST_SUFFIX = '.snap'
+
+# Chunks hashed/compressed concurrently per batch (zlib and zstd release the GIL)
+BATCH_CHUNKS = 32
+
+# Ingest and GC never overlap: GC could otherwise sweep a chunk that an
+# ingest has just found and is about to reference
+_store_lock = threading.Lock()
+
+
+class ChunkCodec:
+    """A compression format for stored chunks."""
+
+    def __init__(self, name: str, extension: str, compress, decompress):
+        self.name = name
+        self.extension = extension
+        self.compress = compress
+        self.decompress = decompress
+
+
+CODECS: Dict[str, ChunkCodec] = {
+    'zlib': ChunkCodec('zlib', '.zz', lambda data: zlib.compress(data, 6), zlib.decompress),
+}
+
+try:
+    import zstandard
+
+    CODECS['zstd'] = ChunkCodec(
+        'zstd', '.zst',
+        lambda data: zstandard.ZstdCompressor(level=3).compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data)
+    )
+except ImportError:
+    pass
+
+
+def get_codec(name: Optional[str] = None) -> ChunkCodec:
+    """Codec by name; 'auto' (default) prefers zstd when available."""
+    name = (name or get_config().SNAPSHOT_COMPRESSION).lower()
+    if name == 'auto':
+        return CODECS.get('zstd', CODECS['zlib'])
+    if name not in CODECS:
+        raise ValueError(f"Unknown or unavailable snapshot compression: {name}")
+    return CODECS[name]
+
+
+class SnapshotStore:
+    """Chunk store and manifests under one snapshot directory."""
+
+    def __init__(self, root: Path, chunk_size: Optional[int] = None, codec: Optional[str] = None):
+        self.root = Path(root)
+        self.chunk_dir = self.root / 'chunks'
+        self.chunk_size = chunk_size or get_config().SNAPSHOT_CHUNK_KB * 1024
+        self.codec = get_codec(codec)
+
+    # ── chunks ──────────────────────────────────────────────────────────────
+
+    def _chunk_base(self, digest: str) -> Path:
+        return self.chunk_dir / digest[:2] / digest
+
+    def find_chunk(self, digest: str) -> Optional[Tuple[Path, ChunkCodec]]:
+        """Stored file and codec for a chunk, in whichever format it was written."""
+        base = self._chunk_base(digest)
+        for codec in CODECS.values():
+            path = base.with_suffix(codec.extension)
+            if path.exists():
+                return path, codec
+        return None
+
+    def _store_chunk(self, data: bytes) -> Tuple[str, int]:
+        """Hash a chunk and write it if new; returns (digest, bytes written)."""
+        digest = hashlib.sha256(data).hexdigest()
+        if self.find_chunk(digest):
+            return digest, 0
+
+        path = self._chunk_base(digest).with_suffix(self.codec.extension)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = self.codec.compress(data)
+        # Write then rename, so a crash never leaves a truncated chunk
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        return digest, len(payload)
+
+    def read_chunk(self, digest: str) -> bytes:
+        found = self.find_chunk(digest)
+        if not found:
+            raise FileNotFoundError(f"Snapshot chunk missing: {digest}")
+        path, codec = found
+        data = codec.decompress(path.read_bytes())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Snapshot chunk corrupt: {digest}")
+        return data
+
+    # ── manifests ───────────────────────────────────────────────────────────
+
+    def _read_chunks(self, source: Path) -> Iterator[List[bytes]]:
+        with open(source, 'rb') as f:
+            while True:
+                batch = []
+                for _ in range(BATCH_CHUNKS):
+                    data = f.read(self.chunk_size)
+                    if not data:
+                        break
+                    batch.append(data)
+                if not batch:
+                    return
+                yield batch
+
+    def ingest(self, source: Path, manifest_path: Path, metadata: Optional[Dict] = None) -> Dict:
+        """
+        Store `source` (a consistent database copy) as a snapshot manifest.
+
+        Returns:
+            Dict with size, chunk counts and bytes written for new chunks
+        """
+        size = source.stat().st_size
+        digests: List[str] = []
+        new_chunks = 0
+        written = 0
+
+        workers = max(1, get_config().HASH_WORKERS)
+        with _store_lock, ThreadPoolExecutor(max_workers=workers) as pool:
+            for batch in self._read_chunks(source):
+                for digest, nbytes in pool.map(self._store_chunk, batch):
+                    digests.append(digest)
+                    if nbytes:
+                        new_chunks += 1
+                        written += nbytes
+
+            manifest = {
+                'format': MANIFEST_FORMAT,
+                'chunk_size': self.chunk_size,
+                'codec': self.codec.name,
+                'size': size,
+                'chunks': digests,
+                'metadata': metadata or {}
+            }
+            tmp = manifest_path.with_name(manifest_path.name + '.partial')
+            with open(tmp, 'w') as f:
+                json.dump(manifest, f)
+            os.replace(tmp, manifest_path)
+
+        stats = {
+            'size_bytes': size,
+            'chunks': len(digests),
+            'new_chunks': new_chunks,
+            'stored_bytes': written
+        }
+        logger.info(f"Snapshot {manifest_path.name}: {new_chunks}/{len(digests)} new chunks, "
+                    f"{written / (1024 * 1024):.1f} MB written for {size / (1024 * 1024):.1f} MB")
+        return stats
+
+    def load_manifest(self, manifest_path: Path) -> Dict:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get('format') != MANIFEST_FORMAT:
+            raise ValueError(f"Unsupported snapshot manifest format: {manifest.get('format')}")
+        return manifest
+
+    def restore(self, manifest_path: Path, dest: Path):
+        """Reassemble a snapshot into `dest` (written via a temp file, then renamed)."""
+        manifest = self.load_manifest(manifest_path)
+
+        # Fail before writing anything if a chunk is gone
+        missing = [d for d in set(manifest['chunks']) if not self.find_chunk(d)]
+        if missing:
+            raise FileNotFoundError(f"{len(missing)} chunks missing for {manifest_path.name}")
+
+        dest = Path(dest)
+        fd, tmp = tempfile.mkstemp(dir=dest.parent, prefix=f'.{dest.name}.')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for digest in manifest['chunks']:
+                    f.write(self.read_chunk(digest))
+            if os.path.getsize(tmp) != manifest['size']:
+                raise ValueError(f"Restored size mismatch for {manifest_path.name}")
+            os.replace(tmp, dest)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def manifests(self) -> List[Path]:
+        return sorted(self.root.glob(f"snapshot_*{MANIFEST_SUFFIX}"))
+
+    def stored_bytes(self) -> int:
+        """Disk used by all chunks."""
+        if not self.chunk_dir.exists():
+            return 0
+        return sum(p.stat().st_size for p in self.chunk_dir.glob('*/*') if p.is_file())
+
+    def gc(self) -> Dict:
+        """Delete chunks no manifest references; returns counts and bytes freed."""
+        with _store_lock:
+            return self._sweep()
+
+    def _sweep(self) -> Dict:
+        referenced: Set[str] = set()
+        for manifest_path in self.manifests():
+            try:
+                referenced.update(self.load_manifest(manifest_path)['chunks'])
+            except Exception as e:
+                # Never sweep on a partial view of what is referenced
+                logger.error(f"Snapshot GC skipped, unreadable manifest {manifest_path.name}: {e}")
+                return {'deleted_chunks': 0, 'freed_bytes': 0, 'error': str(e)}
+
+        deleted = 0
+        freed = 0
+        if self.chunk_dir.exists():
+            for path in self.chunk_dir.glob('*/*'):
+                digest = path.name.split('.')[0]
+                if digest in referenced or path.name.startswith('.tmp-'):
+                    continue
+                freed += path.stat().st_size
+                path.unlink()
+                deleted += 1
+
+        if deleted:
+            logger.info(f"Snapshot GC: removed {deleted} chunks ({freed / (1024 * 1024):.1f} MB)")
+        return {'deleted_chunks': deleted, 'freed_bytes': freed}
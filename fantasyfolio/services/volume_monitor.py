@@ -3,13 +3,29 @@ Volume Availability Monitor Service.
 
 Checks if configured asset volumes (PDFs, 3D Models) are mounted and accessible.
 Prevents indexing operations when storage is unavailable.
+
+Filesystem probes against a hung SMB/NFS mount can block forever, so
+request handlers never probe directly. A background monitor thread
+probes every known volume on an interval (VOLUME_CHECK_INTERVAL), each
+probe running in its own daemon thread with a hard timeout
+(VOLUME_CHECK_TIMEOUT). Results are published to an in-memory cache,
+and availability changes are written to the volumes/asset_locations
+tables. Handlers read the cached status via get_cached_volume_status().
+
+A volume is only recorded offline after VOLUME_OFFLINE_AFTER consecutive
+failed probes, so one slow response from a network mount doesn't hide
+its models.
 """
 
 import os
+import time
 import logging
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
+
+from fantasyfolio.config import get_config
 
 logger = logging.getLogger(__name__)
 
@@ -141,6 +157,248 @@ def check_volume_available(volume_path: str) -> Dict:
     return result
 
 
+# ==================== Cached Status / Background Monitor ====================
+
+_lock = threading.Lock()
+_status_cache: Dict[str, Tuple[float, Dict]] = {}  # volume path -> (monotonic time, status)
+_resolved_paths: Dict[str, str] = {}  # volume path -> resolved path (filled by probes)
+_in_flight: Dict[str, Tuple[threading.Thread, Dict]] = {}  # volume path -> running probe
+_failures: Dict[str, int] = {}  # volume path -> consecutive failed monitor probes
+_monitor_thread: Optional[threading.Thread] = None
+_monitor_stop = threading.Event()
+
+
+def _run_probe(volume_path: str, holder: Dict):
+    holder['status'] = check_volume_available(volume_path)
+    if holder['status']['available']:
+        try:
+            resolved = str(Path(volume_path).resolve())
+            with _lock:
+                _resolved_paths[volume_path] = resolved
+        except OSError:
+            pass
+
+
+def _start_probe(volume_path: str) -> Tuple[threading.Thread, Dict]:
+    """Start a probe thread, or return the one still running for this path."""
+    with _lock:
+        probe = _in_flight.get(volume_path)
+        if probe and probe[0].is_alive():
+            return probe
+        holder = {}
+        thread = threading.Thread(
+            target=_run_probe, args=(volume_path, holder),
+            name=f"volume-probe:{volume_path}", daemon=True
+        )
+        _in_flight[volume_path] = (thread, holder)
+        thread.start()
+    return thread, holder
+
+
+def _finish_probe(volume_path: str, probe: Tuple[threading.Thread, Dict], timeout: float) -> Dict:
+    thread, holder = probe
+    thread.join(timeout)
+    if thread.is_alive():
+        # Leave the hung probe running; later probes of this path wait on it
+        # instead of piling up more blocked threads.
+        status = {
+            'path': volume_path,
+            'available': False,
+            'reason': "Volume not responding (check timed out)",
+            'last_checked': datetime.now().isoformat()
+        }
+        logger.warning(f"Volume check timed out for {volume_path}")
+    else:
+        status = holder.get('status') or {
+            'path': volume_path,
+            'available': False,
+            'reason': "Volume check failed",
+            'last_checked': datetime.now().isoformat()
+        }
+
+    with _lock:
+        _status_cache[volume_path] = (time.monotonic(), status)
+    return dict(status)
+
+
+def probe_volume(volume_path: str, timeout: Optional[float] = None) -> Dict:
+    """
+    Check a volume now, giving up after `timeout` seconds.
+    
+    Same result as check_volume_available(), but a hung mount is reported
+    as unavailable instead of blocking the caller. The result is cached.
+    """
+    if timeout is None:
+        timeout = get_config().VOLUME_CHECK_TIMEOUT
+    return _finish_probe(volume_path, _start_probe(volume_path), timeout)
+
+
+def get_cached_volume_status(volume_path: str) -> Dict:
+    """
+    Get the last known status of a volume without touching the filesystem.
+    
+    Volumes the monitor hasn't seen yet (or whose status is older than two
+    check intervals) are probed once with the normal timeout.
+    """
+    max_age = get_config().VOLUME_CHECK_INTERVAL * 2
+    with _lock:
+        entry = _status_cache.get(volume_path)
+    if entry and time.monotonic() - entry[0] < max_age:
+        return dict(entry[1])
+    return probe_volume(volume_path)
+
+
+def record_volume_status(conn, volume_id: str, is_online: bool) -> Tuple[bool, int]:
+    """
+    Store a volume's online state and update its models on transitions.
+    
+    Going offline marks indexed models 'offline'; coming back online
+    returns those models to 'indexed' ('missing' ones still need a verify).
+    
+    Returns:
+        (was_online, affected model count). Caller commits.
+    """
+    row = conn.execute("SELECT status FROM volumes WHERE id = ?", (volume_id,)).fetchone()
+    if row is None:
+        return False, 0
+    was_online = row[0] == 'online'
+    
+    conn.execute("""
+        UPDATE volumes SET 
+            status = ?,
+            last_seen_at = CASE WHEN ? THEN ? ELSE last_seen_at END
+        WHERE id = ?
+    """, (
+        'online' if is_online else 'offline',
+        is_online,
+        datetime.now().isoformat(),
+        volume_id
+    ))
+    
+    if was_online and not is_online:
+        affected = conn.execute("""
+            UPDATE models SET index_status = 'offline'
+            WHERE volume_id = ? AND index_status = 'indexed'
+        """, (volume_id,)).rowcount
+    elif not was_online and is_online:
+        # 'offline' is only ever set because the volume was unreachable
+        affected = conn.execute("""
+            UPDATE models SET index_status = 'indexed'
+            WHERE volume_id = ? AND index_status = 'offline'
+        """, (volume_id,)).rowcount
+    else:
+        affected = 0
+    
+    return was_online, affected
+
+
+def _should_publish(volume_path: str, available: bool) -> bool:
+    """Whether a probe result should be stored: always when available, else after VOLUME_OFFLINE_AFTER failures in a row."""
+    with _lock:
+        if available:
+            _failures.pop(volume_path, None)
+            return True
+        _failures[volume_path] = _failures.get(volume_path, 0) + 1
+        return _failures[volume_path] >= max(1, get_config().VOLUME_OFFLINE_AFTER)
+
+
+def _publish_status(results: Dict[str, Dict]):
+    """Write availability changes to volumes and asset_locations."""
+    from fantasyfolio.core.database import get_connection
+    
+    with get_connection() as conn:
+        for volume_path, status in results.items():
+            is_online = status['available']
+            if not _should_publish(volume_path, is_online):
+                logger.info(f"Volume {volume_path} check failed ({status['reason']}), not marking offline yet")
+                continue
+            volume_status = 'online' if is_online else 'offline'
+            
+            rows = conn.execute(
+                "SELECT id FROM volumes WHERE mount_path = ? AND status IS NOT ?",
+                (volume_path, volume_status)
+            ).fetchall()
+            for row in rows:
+                _, affected = record_volume_status(conn, row[0], is_online)
+                logger.info(f"Volume {volume_path} is now {volume_status} ({affected} models affected)")
+            
+            conn.execute("""
+                UPDATE asset_locations
+                SET last_status = ?, last_status_message = ?, updated_at = ?
+                WHERE path = ? AND enabled = 1
+                  AND (last_status IS NOT ? OR last_status_message IS NOT ?)
+            """, (volume_status, status['reason'], datetime.now().isoformat(),
+                  volume_path, volume_status, status['reason']))
+        conn.commit()
+
+
+def _monitored_paths() -> List[str]:
+    paths = set(get_configured_volumes().values())
+    try:
+        from fantasyfolio.core.database import get_connection
+        with get_connection() as conn:
+            paths.update(row[0] for row in conn.execute("SELECT mount_path FROM volumes"))
+    except Exception as e:
+        logger.debug(f"Could not read volumes table: {e}")
+    with _lock:
+        paths.update(_status_cache)
+    return sorted(p for p in paths if p)
+
+
+def refresh_volume_status() -> Dict[str, Dict]:
+    """Probe every known volume concurrently and publish the results."""
+    timeout = get_config().VOLUME_CHECK_TIMEOUT
+    probes = {path: _start_probe(path) for path in _monitored_paths()}
+    
+    deadline = time.monotonic() + timeout
+    results = {
+        path: _finish_probe(path, probe, max(0.0, deadline - time.monotonic()))
+        for path, probe in probes.items()
+    }
+    
+    try:
+        _publish_status(results)
+    except Exception as e:
+        logger.warning(f"Could not store volume status: {e}")
+    return results
+
+
+def _monitor_loop(interval: float):
+    while not _monitor_stop.is_set():
+        try:
+            refresh_volume_status()
+        except Exception as e:
+            logger.error(f"Volume monitor error: {e}", exc_info=True)
+        _monitor_stop.wait(interval)
+
+
+def start_volume_monitor() -> bool:
+    """Start the background monitor thread (no-op if running or disabled)."""
+    global _monitor_thread
+    interval = get_config().VOLUME_CHECK_INTERVAL
+    if interval <= 0:
+        return False
+    if _monitor_thread and _monitor_thread.is_alive():
+        return True
+    
+    _monitor_stop.clear()
+    _monitor_thread = threading.Thread(
+        target=_monitor_loop, args=(interval,), name="volume-monitor", daemon=True
+    )
+    _monitor_thread.start()
+    logger.info(f"Volume monitor started (every {interval}s)")
+    return True
+
+
+def stop_volume_monitor():
+    """Stop the background monitor thread."""
+    global _monitor_thread
+    _monitor_stop.set()
+    if _monitor_thread:
+        _monitor_thread.join(timeout=get_config().VOLUME_CHECK_TIMEOUT + 1)
+        _monitor_thread = None
+
+
 def get_all_volume_status() -> Dict:
     """
     Check availability of all configured volumes.
@@ -162,7 +420,7 @@ def get_all_volume_status() -> Dict:
     }
     
     for name, path in volumes.items():
-        status = check_volume_available(path)
+        status = get_cached_volume_status(path)
         result['volumes'][name] = status
         
         if not status['available']:
@@ -191,11 +449,16 @@ def get_volume_for_path(file_path: str) -> Optional[str]:
     volumes = get_configured_volumes()
     
     for name, volume_path in volumes.items():
-        # Normalize paths for comparison
-        volume_path = str(Path(volume_path).resolve())
+        # Normalize paths for comparison (resolving symlinks would touch the
+        # filesystem, so use the resolved path recorded by the last probe)
+        with _lock:
+            resolved = _resolved_paths.get(volume_path)
+        candidates = {os.path.normpath(volume_path)}
+        if resolved:
+            candidates.add(resolved)
         
         # Check if file_path starts with volume_path
-        if file_path.startswith(volume_path):
+        if any(file_path.startswith(candidate) for candidate in candidates):
             return name
     
     # Check if it's under any /Volumes/ path (SMB mount)
@@ -250,8 +513,8 @@ def check_volume_for_path(file_path: str) -> Dict:
     
     result['volume_path'] = volume_path
     
-    # Check volume availability
-    status = check_volume_available(volume_path)
+    # Check volume availability (cached by the background monitor)
+    status = get_cached_volume_status(volume_path)
     result['available'] = status['available']
     result['reason'] = status['reason']
     
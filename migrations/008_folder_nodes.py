@@ -0,0 +1,58 @@
+"""
+Migration 008: Add materialized folder tree
+
+Adds the folder_nodes table (per-folder direct and subtree counts for
+models and assets) and backfills it from the existing rows, so the
+sidebar folder tree no longer needs a GROUP BY over every row.
+
+Run with: python -m migrations.008_folder_nodes
+"""
+
+import sqlite3
+import logging
+from pathlib import Path
+
+from fantasyfolio.core.folder_tree import FOLDER_NODES_SQL, ENTITY_TABLES, rebuild_folder_nodes
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_SQL = FOLDER_NODES_SQL
+
+
+def run_migration(db_path: Path) -> bool:
+    """Run the folder_nodes migration."""
+    logger.info(f"Running folder_nodes migration on {db_path}")
+
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+
+        # Create table (idempotent) and backfill from current data
+        conn.executescript(MIGRATION_SQL)
+        for entity_type in ENTITY_TABLES:
+            count = rebuild_folder_nodes(conn, entity_type)
+            logger.info(f"  {entity_type}: {count} folder nodes")
+        conn.commit()
+
+        logger.info("✅ folder_nodes migration completed successfully")
+        conn.close()
+        return True
+
+    except Exception as e:
+        logger.error(f"Migration failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+
+    # Default to test database
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("data/fantasyfolio.db")
+
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        sys.exit(1)
+
+    success = run_migration(db_path)
+    sys.exit(0 if success else 1)
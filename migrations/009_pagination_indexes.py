@@ -0,0 +1,77 @@
+"""
+Migration 009: Add composite indexes for keyset pagination
+
+Listings now page with a cursor on (sort column, id) instead of
+LIMIT/OFFSET. These indexes let each supported sort seek straight to
+the cursor position:
+- assets(deleted_at, <sort>) for the default (non-trashed) asset listing
+- assets/models(volume_id, <sort>) for volume-root listings
+- models(<sort>) for model sorts that had no index
+
+Run with: python -m migrations.009_pagination_indexes
+"""
+
+import sqlite3
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_SQL = """
+CREATE INDEX IF NOT EXISTS idx_assets_live_filename ON assets(deleted_at, filename);
+CREATE INDEX IF NOT EXISTS idx_assets_live_title ON assets(deleted_at, title);
+CREATE INDEX IF NOT EXISTS idx_assets_live_file_size ON assets(deleted_at, file_size);
+CREATE INDEX IF NOT EXISTS idx_assets_live_page_count ON assets(deleted_at, page_count);
+CREATE INDEX IF NOT EXISTS idx_assets_live_publisher ON assets(deleted_at, publisher);
+CREATE INDEX IF NOT EXISTS idx_assets_live_created_at ON assets(deleted_at, created_at);
+CREATE INDEX IF NOT EXISTS idx_assets_live_modified_at ON assets(deleted_at, modified_at);
+CREATE INDEX IF NOT EXISTS idx_assets_volume_filename ON assets(volume_id, filename);
+CREATE INDEX IF NOT EXISTS idx_assets_volume_title ON assets(volume_id, title);
+CREATE INDEX IF NOT EXISTS idx_assets_volume_file_size ON assets(volume_id, file_size);
+CREATE INDEX IF NOT EXISTS idx_assets_volume_created_at ON assets(volume_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_models_title ON models(title);
+CREATE INDEX IF NOT EXISTS idx_models_file_size ON models(file_size);
+CREATE INDEX IF NOT EXISTS idx_models_created_at ON models(created_at);
+CREATE INDEX IF NOT EXISTS idx_models_volume_filename ON models(volume_id, filename);
+CREATE INDEX IF NOT EXISTS idx_models_volume_title ON models(volume_id, title);
+CREATE INDEX IF NOT EXISTS idx_models_volume_file_size ON models(volume_id, file_size);
+CREATE INDEX IF NOT EXISTS idx_models_volume_format ON models(volume_id, format);
+CREATE INDEX IF NOT EXISTS idx_models_volume_collection ON models(volume_id, collection);
+CREATE INDEX IF NOT EXISTS idx_models_volume_created_at ON models(volume_id, created_at);"""
+
+
+def run_migration(db_path: Path) -> bool:
+    """Run the pagination indexes migration."""
+    logger.info(f"Running pagination indexes migration on {db_path}")
+    
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        
+        # Indexes are created with IF NOT EXISTS, so re-running is safe
+        conn.executescript(MIGRATION_SQL)
+        conn.execute("ANALYZE")
+        conn.commit()
+        
+        logger.info("✅ Pagination indexes migration completed successfully")
+        conn.close()
+        return True
+            
+    except Exception as e:
+        logger.error(f"Migration failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    
+    # Default to test database
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("data/fantasyfolio.db")
+    
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        sys.exit(1)
+    
+    success = run_migration(db_path)
+    sys.exit(0 if success else 1)
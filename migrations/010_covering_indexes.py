@@ -0,0 +1,78 @@
+"""
+Migration 010: Add composite and covering indexes for hot queries
+
+Designed from the query shapes in api/models.py, api/search.py and
+core/scanner.py:
+- archive member lookups:      archive_path = ? AND archive_member = ?
+- moved-file detection:        partial_hash = ? ORDER BY last_seen_at DESC
+- volume verification:         volume_id = ? AND index_status IN (...)
+- folder listings:             deleted_at IS NULL AND folder_path range
+- model stats (covering):      format / file_size / collection of live rows
+- default model listing:       ORDER BY filename (had no index at all)
+
+The single-column archive_path and partial_hash indexes are left-prefixes
+of the new composites and are dropped.
+
+tests/test_query_plans.py checks these queries never fall back to a
+full table scan.
+
+Run with: python -m migrations.010_covering_indexes
+"""
+
+import sqlite3
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_SQL = """
+CREATE INDEX IF NOT EXISTS idx_assets_live_folder ON assets(deleted_at, folder_path);
+CREATE INDEX IF NOT EXISTS idx_models_filename ON models(filename);
+CREATE INDEX IF NOT EXISTS idx_models_archive_member ON models(archive_path, archive_member);
+CREATE INDEX IF NOT EXISTS idx_models_hash_seen ON models(partial_hash, last_seen_at);
+CREATE INDEX IF NOT EXISTS idx_models_live_collection ON models(deleted_at, collection);
+CREATE INDEX IF NOT EXISTS idx_models_live_file_size ON models(deleted_at, file_size);
+CREATE INDEX IF NOT EXISTS idx_models_live_format ON models(deleted_at, format);
+CREATE INDEX IF NOT EXISTS idx_models_volume_status ON models(volume_id, index_status);
+
+-- Superseded by the composites above
+DROP INDEX IF EXISTS idx_models_archive;
+DROP INDEX IF EXISTS idx_models_partial_hash;
+"""
+
+
+def run_migration(db_path: Path) -> bool:
+    """Run the covering indexes migration."""
+    logger.info(f"Running covering indexes migration on {db_path}")
+    
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        
+        # Indexes use IF [NOT] EXISTS, so re-running is safe
+        conn.executescript(MIGRATION_SQL)
+        conn.execute("ANALYZE")
+        conn.commit()
+        
+        logger.info("✅ Covering indexes migration completed successfully")
+        conn.close()
+        return True
+            
+    except Exception as e:
+        logger.error(f"Migration failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    
+    # Default to test database
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("data/fantasyfolio.db")
+    
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        sys.exit(1)
+    
+    success = run_migration(db_path)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,56 @@
+"""
+Migration 011: Add generation counters for the statistics cache
+
+Adds the data_generations table and the triggers that bump a per-table
+counter whenever assets, models or change_journal rows change in a way
+that affects the library statistics. core/stats_cache.py keys its cached
+results on these counters.
+
+Run with: python -m migrations.011_stats_generations
+"""
+
+import sqlite3
+import logging
+from pathlib import Path
+
+from fantasyfolio.core.stats_cache import STATS_CACHE_SQL
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_SQL = STATS_CACHE_SQL
+
+
+def run_migration(db_path: Path) -> bool:
+    """Run the stats generations migration."""
+    logger.info(f"Running stats generations migration on {db_path}")
+    
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        
+        # Table, seed rows and triggers all use IF NOT EXISTS / OR IGNORE
+        conn.executescript(MIGRATION_SQL)
+        conn.commit()
+        
+        logger.info("✅ Stats generations migration completed successfully")
+        conn.close()
+        return True
+            
+    except Exception as e:
+        logger.error(f"Migration failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    
+    # Default to test database
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("data/fantasyfolio.db")
+    
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        sys.exit(1)
+    
+    success = run_migration(db_path)
+    sys.exit(0 if success else 1)
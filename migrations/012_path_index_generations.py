@@ -0,0 +1,56 @@
+"""
+Migration 012: Track asset location and volume changes for the path index
+
+Adds data_generations counters and triggers for asset_locations and
+volumes. core/path_index.py uses them to notice locations added, removed
+or moved by another process and rebuild its in-memory prefix index.
+
+Run with: python -m migrations.012_path_index_generations
+"""
+
+import sqlite3
+import logging
+from pathlib import Path
+
+from fantasyfolio.core.stats_cache import STATS_CACHE_SQL
+
+logger = logging.getLogger(__name__)
+
+# Same idempotent script as migration 011; it now includes the new tables
+MIGRATION_SQL = STATS_CACHE_SQL
+
+
+def run_migration(db_path: Path) -> bool:
+    """Run the path index generations migration."""
+    logger.info(f"Running path index generations migration on {db_path}")
+    
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        
+        # Table, seed rows and triggers all use IF NOT EXISTS / OR IGNORE
+        conn.executescript(MIGRATION_SQL)
+        conn.commit()
+        
+        logger.info("✅ Path index generations migration completed successfully")
+        conn.close()
+        return True
+            
+    except Exception as e:
+        logger.error(f"Migration failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    
+    # Default to test database
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("data/fantasyfolio.db")
+    
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        sys.exit(1)
+    
+    success = run_migration(db_path)
+    sys.exit(0 if success else 1)
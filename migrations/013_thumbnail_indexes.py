@@ -0,0 +1,83 @@
+"""
+Migration 013: Index thumbnail coverage columns
+
+Thumbnail coverage is now answered from models.thumb_storage instead of
+globbing the thumbnail directory:
+- coverage stats (covering):   format IN (...) GROUP BY thumb_storage
+- render queue:                thumb_storage IS NULL ORDER BY id
+
+The single-column format index is a left-prefix of the new composite and
+is dropped.
+
+Databases that predate thumb_storage have it NULL for every model, which
+would queue every already-rendered model for a re-render. The migration
+therefore reconciles the columns with the thumbnails on disk (sidecar,
+archive sidecar and central, including legacy {id}.png files).
+
+Run with: python -m migrations.013_thumbnail_indexes [DB_PATH] [THUMBNAIL_DIR]
+"""
+
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Optional
+
+from fantasyfolio.config import get_config
+from fantasyfolio.core.thumbnails import reconcile_thumbnails
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_SQL = """
+CREATE INDEX IF NOT EXISTS idx_models_format_thumb ON models(format, thumb_storage);
+CREATE INDEX IF NOT EXISTS idx_models_thumb_storage ON models(thumb_storage);
+
+-- Superseded by idx_models_format_thumb
+DROP INDEX IF EXISTS idx_models_format;
+"""
+
+
+def run_migration(db_path: Path, central_dir: Optional[Path] = None) -> bool:
+    """Run the thumbnail indexes migration and backfill thumb_storage."""
+    logger.info(f"Running thumbnail indexes migration on {db_path}")
+    
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        
+        # Indexes use IF [NOT] EXISTS, so re-running is safe
+        conn.executescript(MIGRATION_SQL)
+        conn.commit()
+        
+        # Record existing thumbnails (commits per batch; safe to re-run)
+        central_dir = Path(central_dir or get_config().THUMBNAIL_DIR)
+        stats = reconcile_thumbnails(conn, central_dir)
+        logger.info(f"  Thumbnails: {stats['recorded']} recorded, {stats['cleared']} cleared, "
+                    f"{stats['checked']} models checked")
+        
+        conn.execute("ANALYZE")
+        conn.commit()
+        
+        logger.info("✅ Thumbnail indexes migration completed successfully")
+        conn.close()
+        return True
+            
+    except Exception as e:
+        logger.error(f"Migration failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    
+    # Default to test database
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("data/fantasyfolio.db")
+    
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        sys.exit(1)
+    
+    central_dir = Path(sys.argv[2]) if len(sys.argv) > 2 else None
+    success = run_migration(db_path, central_dir)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,71 @@
+"""
+Migration 014: Record what each full hash was computed from
+
+Duplicate verification now persists full_hash for every file it reads,
+together with the source mtime/size. Later runs reuse the stored hash
+while those still match instead of re-reading the file.
+
+Adds to models and assets:
+- full_hash_mtime: source mtime (archive mtime for ZIP members)
+- full_hash_size: source size in bytes
+
+Run with: python -m migrations.014_full_hash_keys
+"""
+
+import sqlite3
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = (
+    ('full_hash_mtime', 'INTEGER'),
+    ('full_hash_size', 'INTEGER'),
+)
+
+
+def column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    """Check if a column exists in a table."""
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+
+def run_migration(db_path: Path) -> bool:
+    """Run the full hash keys migration."""
+    logger.info(f"Running full hash keys migration on {db_path}")
+    
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        
+        for table in ('models', 'assets'):
+            for column, col_type in COLUMNS:
+                if column_exists(conn, table, column):
+                    logger.info(f"  {table}.{column} already exists, skipping")
+                    continue
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
+                logger.info(f"  Added {table}.{column}")
+        
+        conn.commit()
+        
+        logger.info("✅ Full hash keys migration completed successfully")
+        conn.close()
+        return True
+            
+    except Exception as e:
+        logger.error(f"Migration failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    
+    # Default to test database
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("data/fantasyfolio.db")
+    
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        sys.exit(1)
+    
+    success = run_migration(db_path)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,74 @@
+"""
+Migration 015: Tag stored hashes with the algorithm that produced them
+
+Hash algorithms are now pluggable (PARTIAL_HASH_ALGORITHM /
+FULL_HASH_ALGORITHM, see core/hashing.py). Each hash records its
+algorithm as "name:version"; existing NULL tags are read as md5:1.
+
+Adds to models and assets:
+- partial_hash_algo
+- full_hash_algo
+
+No data is rewritten here. After switching algorithms, rows are rehashed
+lazily by `compute-hashes` (optionally with --throttle).
+
+Run with: python -m migrations.015_hash_algorithm_tags
+"""
+
+import sqlite3
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = (
+    ('partial_hash_algo', 'TEXT'),
+    ('full_hash_algo', 'TEXT'),
+)
+
+
+def column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    """Check if a column exists in a table."""
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+
+def run_migration(db_path: Path) -> bool:
+    """Run the hash algorithm tags migration."""
+    logger.info(f"Running hash algorithm tags migration on {db_path}")
+    
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        
+        for table in ('models', 'assets'):
+            for column, col_type in COLUMNS:
+                if column_exists(conn, table, column):
+                    logger.info(f"  {table}.{column} already exists, skipping")
+                    continue
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
+                logger.info(f"  Added {table}.{column}")
+        
+        conn.commit()
+        
+        logger.info("✅ Hash algorithm tags migration completed successfully")
+        conn.close()
+        return True
+            
+    except Exception as e:
+        logger.error(f"Migration failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    
+    # Default to test database
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("data/fantasyfolio.db")
+    
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        sys.exit(1)
+    
+    success = run_migration(db_path)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,57 @@
+"""
+Migration 016: Add directory manifest for incremental rescans
+
+Adds the directory_manifest table (per scanned directory: mtime, entry
+count, last full listing). Rescans skip directories whose mtime is
+unchanged instead of visiting every file; see core/dir_manifest.py.
+
+The table starts empty, so the first scan after this migration lists
+everything as before.
+
+Run with: python -m migrations.016_directory_manifest
+"""
+
+import sqlite3
+import logging
+from pathlib import Path
+
+from fantasyfolio.core.dir_manifest import DIR_MANIFEST_SQL
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_SQL = DIR_MANIFEST_SQL
+
+
+def run_migration(db_path: Path) -> bool:
+    """Run the directory manifest migration."""
+    logger.info(f"Running directory manifest migration on {db_path}")
+
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+
+        conn.executescript(MIGRATION_SQL)
+        conn.commit()
+
+        logger.info("✅ Directory manifest migration completed successfully")
+        conn.close()
+        return True
+
+    except Exception as e:
+        logger.error(f"Migration failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+
+    # Default to test database
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("data/fantasyfolio.db")
+
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        sys.exit(1)
+
+    success = run_migration(db_path)
+    sys.exit(0 if success else 1)
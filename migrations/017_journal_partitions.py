@@ -0,0 +1,64 @@
+"""
+Migration 017: Partition the change journal by month
+
+Adds the journal_partitions registry and the journal_sequence ID
+allocator, then moves existing change_journal rows into monthly
+change_journal_YYYY_MM tables (keeping their IDs). Retention drops whole
+months and compaction collapses repeated updates; see
+core/journal_partitions.py.
+
+The move runs one month at a time, committing after each, so an
+interrupted migration can simply be run again.
+
+Run with: python -m migrations.017_journal_partitions
+"""
+
+import sqlite3
+import logging
+from pathlib import Path
+
+from fantasyfolio.core.journal_partitions import JOURNAL_PARTITIONS_SQL, ensure_journal_partitions
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_SQL = JOURNAL_PARTITIONS_SQL
+
+
+def run_migration(db_path: Path) -> bool:
+    """Run the journal partitioning migration."""
+    logger.info(f"Running journal partitioning migration on {db_path}")
+
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+
+        conn.executescript(MIGRATION_SQL)
+        conn.commit()
+
+        legacy = conn.execute("SELECT COUNT(*) FROM change_journal").fetchone()[0]
+        logger.info(f"Moving {legacy} journal entries into monthly partitions")
+        ensure_journal_partitions(conn)
+
+        partitions = conn.execute("SELECT COUNT(*) FROM journal_partitions").fetchone()[0]
+        logger.info(f"✅ Journal partitioning migration completed ({partitions} partitions)")
+        conn.close()
+        return True
+
+    except Exception as e:
+        logger.error(f"Migration failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+
+    # Default to test database
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("data/fantasyfolio.db")
+
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        sys.exit(1)
+
+    success = run_migration(db_path)
+    sys.exit(0 if success else 1)
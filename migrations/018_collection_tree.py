@@ -0,0 +1,59 @@
+"""
+Migration 018: Add the closure table for nested collections
+
+Adds collection_tree (one row per ancestor/descendant pair) and the
+triggers on user_collections that keep it current, then fills it from
+parent_collection_id. Subtree listings, breadcrumbs and rolled-up item
+counts and sizes are then single queries; see core/collection_tree.py.
+
+Requires the auth schema and migration 007 (nested collections).
+
+Run with: python -m migrations.018_collection_tree
+"""
+
+import sqlite3
+import logging
+from pathlib import Path
+
+from fantasyfolio.core.collection_tree import COLLECTION_TREE_SQL, rebuild_collection_tree
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_SQL = COLLECTION_TREE_SQL
+
+
+def run_migration(db_path: Path) -> bool:
+    """Run the collection tree migration."""
+    logger.info(f"Running collection tree migration on {db_path}")
+    
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        
+        # Table, index and triggers all use IF NOT EXISTS; the rebuild is idempotent
+        conn.executescript(MIGRATION_SQL)
+        rows = rebuild_collection_tree(conn)
+        conn.commit()
+        
+        logger.info(f"✅ Collection tree migration completed ({rows} closure rows)")
+        conn.close()
+        return True
+            
+    except Exception as e:
+        logger.error(f"Migration failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    
+    # Default to test database
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("data/fantasyfolio.db")
+    
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        sys.exit(1)
+    
+    success = run_migration(db_path)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,57 @@
+"""
+Migration 019: Track search index changes for the search result cache
+
+Adds the search_index data_generations counter and the triggers that
+bump it on INSERT or DELETE of assets, models or asset_pages, and on
+UPDATEs of their indexed and filtered columns (see COMBINED_GENERATIONS
+in core/stats_cache.py). core/search_cache.py serves cached search
+results only while this counter is unchanged.
+
+Triggers left by an earlier run, which fired on every UPDATE, are
+dropped and recreated.
+
+Run with: python -m migrations.019_search_generation
+"""
+
+import sqlite3
+import logging
+from pathlib import Path
+
+from fantasyfolio.core.stats_cache import create_stats_schema
+
+logger = logging.getLogger(__name__)
+
+
+def run_migration(db_path: Path) -> bool:
+    """Run the search generation migration."""
+    logger.info(f"Running search generation migration on {db_path}")
+    
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        
+        # Idempotent: IF NOT EXISTS / OR IGNORE, and only outdated triggers are replaced
+        create_stats_schema(conn)
+        
+        logger.info("✅ Search generation migration completed successfully")
+        conn.close()
+        return True
+            
+    except Exception as e:
+        logger.error(f"Migration failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    
+    # Default to test database
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("data/fantasyfolio.db")
+    
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        sys.exit(1)
+    
+    success = run_migration(db_path)
+    sys.exit(0 if success else 1)
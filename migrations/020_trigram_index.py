@@ -0,0 +1,62 @@
+"""
+Migration 020: Trigram indexes for substring name search
+
+Adds the assets_trigram and models_trigram FTS5 indexes (tokenize =
+'trigram') over asset filenames/titles and model filenames, titles and
+collections, with the triggers that keep them in sync, and backfills
+them. core/search_engine.py uses them so that "dragon" also finds
+"Bonedragon_Supported.stl" and "RedDragon". Requires SQLite 3.34+.
+
+Run with: python -m migrations.020_trigram_index
+"""
+
+import sqlite3
+import logging
+from pathlib import Path
+
+from fantasyfolio.core.trigram_index import TRIGRAM_SQL, rebuild_trigram_index
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_SQL = TRIGRAM_SQL
+
+
+def run_migration(db_path: Path) -> bool:
+    """Run the trigram index migration."""
+    logger.info(f"Running trigram index migration on {db_path}")
+    
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        
+        # Tables and triggers use IF NOT EXISTS; the rebuild re-reads every row
+        conn.executescript(MIGRATION_SQL)
+        rebuild_trigram_index(conn)
+        conn.commit()
+        
+        for table in ('assets', 'models'):
+            count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            logger.info(f"  Indexed {count} {table}")
+        
+        logger.info("✅ Trigram index migration completed successfully")
+        conn.close()
+        return True
+            
+    except Exception as e:
+        logger.error(f"Migration failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    
+    # Default to test database
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("data/fantasyfolio.db")
+    
+    if not db_path.exists():
+        print(f"Database not found: {db_path}")
+        sys.exit(1)
+    
+    success = run_migration(db_path)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark content-hash algorithms on large files.
+
+Measures throughput (MB/s) of every registered algorithm (see
+core/hashing.py) for full hashes and partial hashes. Pass real files to
+benchmark them, otherwise a large binary STL and a PDF-sized file are
+generated in a temp dir.
+
+Usage:
+    python scripts/benchmark_hashes.py [FILE ...] [--size-mb 256] [--repeat 3]
+"""
+
+import os
+import sys
+import time
+import struct
+import argparse
+import tempfile
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fantasyfolio.core.hashing import (
+    FULL_HASH_READ_SIZE, available_algorithms, get_algorithm, compute_full_hash, compute_partial_hash
+)
+
+READ_SIZE = 1024 * 1024
+
+
+def make_stl(path: Path, size_mb: int):
+    """Write a binary STL of roughly size_mb with random triangles."""
+    triangles = (size_mb * 1024 * 1024 - 84) // 50
+    with open(path, 'wb') as f:
+        f.write(b'benchmark'.ljust(80, b' '))
+        f.write(struct.pack('<I', triangles))
+        # 50 bytes/triangle: normal + 3 vertices (12 floats) + attribute count
+        block = 20000
+        for start in range(0, triangles, block):
+            count = min(block, triangles - start)
+            f.write(os.urandom(50 * count))
+
+
+def make_pdf(path: Path, size_mb: int):
+    """Write a PDF-sized file (header + mostly compressed-looking streams)."""
+    with open(path, 'wb') as f:
+        f.write(b'%PDF-1.7\n')
+        remaining = size_mb * 1024 * 1024
+        while remaining > 0:
+            chunk = os.urandom(min(READ_SIZE, remaining))
+            f.write(chunk)
+            remaining -= len(chunk)
+        f.write(b'\n%%EOF\n')
+
+
+def best_time(func, repeat: int) -> float:
+    """Fastest of `repeat` runs (first run also warms the page cache)."""
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def benchmark(files, repeat: int):
+    algorithms = available_algorithms()
+    print(f"Algorithms: {', '.join(algorithms)}")
+    print()
+
+    for path in files:
+        size = path.stat().st_size
+        size_mb = size / (1024 * 1024)
+        print(f"{path.name} ({size_mb:.1f} MB)")
+        print(f"  {'algorithm':<10} {'full MB/s':>10} {'partial ms':>11}")
+
+        for name in algorithms:
+            algorithm = get_algorithm(name)
+            full = best_time(lambda: compute_full_hash(path, FULL_HASH_READ_SIZE, algorithm), repeat)
+            partial = best_time(lambda: compute_partial_hash(path, algorithm), repeat)
+            print(f"  {algorithm.tag:<10} {size_mb / full:>10.0f} {partial * 1000:>11.2f}")
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark content-hash algorithms")
+    parser.add_argument('files', nargs='*', type=Path, help="Files to hash (default: generated STL + PDF)")
+    parser.add_argument('--size-mb', type=int, default=256, help="Size of generated files")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per measurement")
+    args = parser.parse_args()
+
+    if args.files:
+        benchmark(args.files, args.repeat)
+        return
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        stl = Path(tmpdir) / 'benchmark.stl'
+        pdf = Path(tmpdir) / 'benchmark.pdf'
+        print(f"Generating {args.size_mb} MB test files in {tmpdir}...")
+        make_stl(stl, args.size_mb)
+        make_pdf(pdf, args.size_mb)
+        benchmark([stl, pdf], args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark substring (infix) name search.
+
+Builds a temporary database from data/schema.sql with generated model
+rows (filenames like "Bonedragon_Supported_0412.stl"), then times each
+query three ways:
+
+- LIKE '%term%' scan over filename/title/collection (the old fallback)
+- trigram index MATCH (models_trigram)
+- word/prefix FTS (models_fts), which misses infix matches
+
+These three only COUNT(*) the matches. "search ms" is the end-to-end
+unified_search() call (candidate queries, ranking, fuzzy fallback and
+hydration of 50 results), reporting the plan it chose; compare that
+column, not the index columns, with LIKE.
+
+Usage:
+    python scripts/benchmark_search.py [--rows 100000] [--repeat 5] [QUERY ...]
+"""
+
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fantasyfolio.core.search_engine import fts_query, unified_search
+from fantasyfolio.core.trigram_index import ensure_trigram_index, plan_query, trigram_query
+
+SCHEMA_PATH = Path(__file__).parent.parent / 'data' / 'schema.sql'
+
+DEFAULT_QUERIES = ['dragon', 'goblin', 'support', 'dragon_sup', 'bonedrag', 'dragn']
+
+PREFIXES = ['', 'Bone', 'Red', 'Elder', 'Shadow', 'Frost', 'Iron', 'Swamp']
+CREATURES = ['dragon', 'goblin', 'knight', 'wizard', 'troll', 'lich', 'golem', 'wyvern',
+             'kobold', 'beholder', 'owlbear', 'mimic']
+SUFFIXES = ['Supported', 'Unsupported', 'Base', 'Bust', 'Presupported', 'Hollow']
+COLLECTIONS = ['Heroes of the North', 'Dungeon Denizens', 'Draconic Lords', 'Swamp Terrors']
+
+
+def make_db(path: Path, rows: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA_PATH.read_text())
+    rng = random.Random(42)
+
+    def generate():
+        for i in range(rows):
+            creature = rng.choice(CREATURES)
+            prefix = rng.choice(PREFIXES)
+            name = f"{prefix}{creature if not prefix else creature.capitalize()}"
+            filename = f"{name}_{rng.choice(SUFFIXES)}_{i:06d}.stl"
+            yield (f"/models/{i // 1000}/{filename}", filename, name, 'stl',
+                   rng.choice(COLLECTIONS), f"/models/{i // 1000}")
+
+    conn.executemany(
+        "INSERT INTO models (file_path, filename, title, format, collection, folder_path) "
+        "VALUES (?, ?, ?, ?, ?, ?)", generate()
+    )
+    conn.execute("INSERT INTO models_fts(models_fts) VALUES ('rebuild')")
+    conn.commit()
+    return conn
+
+
+def best_time(func, repeat: int):
+    """Fastest of `repeat` runs and the result of the last one."""
+    result = func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def count(conn, sql: str, params) -> int:
+    return conn.execute(sql, params).fetchone()[0]
+
+
+def benchmark(conn: sqlite3.Connection, queries, repeat: int):
+    print(f"  {'query':<12} {'plan':<8} {'LIKE ms':>9} {'hits':>7} {'trigram ms':>11} {'hits':>7} "
+          f"{'prefix ms':>10} {'hits':>7} {'search ms':>10}")
+    for query in queries:
+        pattern = f"%{query}%"
+        like_t, like_n = best_time(lambda: count(conn, """
+            SELECT COUNT(*) FROM models
+            WHERE filename LIKE ? OR title LIKE ? OR collection LIKE ?
+        """, (pattern, pattern, pattern)), repeat)
+        tri_t, tri_n = best_time(lambda: count(
+            conn, "SELECT COUNT(*) FROM models_trigram WHERE models_trigram MATCH ?", (trigram_query(query),)
+        ), repeat)
+        prefix_t, prefix_n = best_time(lambda: count(
+            conn, "SELECT COUNT(*) FROM models_fts WHERE models_fts MATCH ?", (fts_query(query),)
+        ), repeat)
+        search_t, _ = best_time(lambda: unified_search(conn, query, types=('model',), limit=50), repeat)
+        print(f"  {query:<12} {plan_query(query):<8} {like_t * 1000:>9.2f} {like_n:>7} {tri_t * 1000:>11.2f} "
+              f"{tri_n:>7} {prefix_t * 1000:>10.2f} {prefix_n:>7} {search_t * 1000:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark substring name search")
+    parser.add_argument('queries', nargs='*', help="Search terms (default: a built-in set)")
+    parser.add_argument('--rows', type=int, default=100_000, help="Generated model rows")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        print(f"Generating {args.rows} models in {tmpdir}...")
+        start = time.perf_counter()
+        conn = make_db(Path(tmpdir) / 'benchmark.db', args.rows)
+        print(f"  built in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        if not ensure_trigram_index(conn):
+            print("Trigram tokenizer not available (SQLite 3.34+ required)")
+            return
+        print(f"  trigram index built in {time.perf_counter() - start:.1f}s")
+        print()
+        benchmark(conn, args.queries or DEFAULT_QUERIES, args.repeat)
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
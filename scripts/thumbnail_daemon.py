@@ -67,8 +67,9 @@ def signal_handler(sig, frame):
 
 def render_one(model_id: int, timeout_sec: int = 120) -> bool:
     """Render a single model's thumbnail."""
-    import tempfile
     import zipfile
+    from contextlib import ExitStack
+    from fantasyfolio.core.staging import stage_member, staged_output, publish, run_render
     
     try:
         config = get_config()
@@ -93,108 +94,101 @@ def render_one(model_id: int, timeout_sec: int = 120) -> bool:
         if fmt not in ('stl', 'obj', '3mf', 'svg', 'glb', 'gltf'):
             return True
         
-        # Prepare model file for rendering
-        model_file = None
-        temp_file = None
-        
-        if model.get('archive_path') and model.get('archive_member'):
-            # Extract from ZIP to temp file
-            archive_path = Path(model['archive_path'])
-            if not archive_path.exists():
-                return False
+        # Staged files (archive member, rendered PNG) are removed when the
+        # stack closes, including after a renderer timeout
+        with ExitStack() as stack:
+            # Prepare model file for rendering
+            model_file = None
             
-            try:
-                with tempfile.NamedTemporaryFile(suffix=f'.{fmt}', delete=False) as tf:
-                    temp_file = tf.name
-                    with zipfile.ZipFile(archive_path, 'r') as zf:
-                        data = zf.read(model['archive_member'])
-                        tf.write(data)
-                model_file = temp_file
-            except Exception:
-                return False
-        
-        elif model.get('file_path'):
-            file_path = Path(model['file_path'])
-            if file_path.exists():
-                model_file = str(file_path)
-            else:
+            if model.get('archive_path') and model.get('archive_member'):
+                # Stream from ZIP to a staging file (tmpfs when small enough)
+                archive_path = Path(model['archive_path'])
+                if not archive_path.exists():
+                    return False
+                
+                try:
+                    zf = stack.enter_context(zipfile.ZipFile(archive_path, 'r'))
+                    model_file = stack.enter_context(stage_member(zf, model['archive_member'], f'.{fmt}'))
+                except Exception:
+                    return False
+            
+            elif model.get('file_path'):
+                file_path = Path(model['file_path'])
+                if file_path.exists():
+                    model_file = str(file_path)
+                else:
+                    return False
+            
+            if not model_file:
                 return False
-        
-        if not model_file:
-            return False
-        
-        # Render thumbnail
-        try:
-            cached.parent.mkdir(parents=True, exist_ok=True)
             
-            if fmt == 'svg':
-                # Use cairosvg for SVG files
-                import cairosvg
-                from PIL import Image
-                import io
-                
-                with open(model_file, 'rb') as f:
-                    svg_data = f.read()
+            # Render thumbnail to a staged output, moved into the cache on success
+            try:
+                cached.parent.mkdir(parents=True, exist_ok=True)
+                output = stack.enter_context(staged_output('.png'))
                 
-                png_data = cairosvg.svg2png(bytestring=svg_data, output_width=512, output_height=512)
+                if fmt == 'svg':
+                    # Use cairosvg for SVG files
+                    import cairosvg
+                    from PIL import Image
+                    import io
+                    
+                    with open(model_file, 'rb') as f:
+                        svg_data = f.read()
+                    
+                    png_data = cairosvg.svg2png(bytestring=svg_data, output_width=512, output_height=512)
+                    
+                    # Add white background
+                    img = Image.open(io.BytesIO(png_data))
+                    bg = Image.new('RGB', (512, 512), (255, 255, 255))
+                    x = (512 - img.width) // 2
+                    y = (512 - img.height) // 2
+                    if img.mode == 'RGBA':
+                        bg.paste(img, (x, y), img)
+                    else:
+                        bg.paste(img, (x, y))
+                    bg.save(output, 'PNG')
+                    render_success = True
+                elif fmt in ('glb', 'gltf'):
+                    # Use f3d for GLB/GLTF (supports textures)
+                    result = run_render(
+                        ['xvfb-run', '-a', 'f3d',
+                         '--output', output,
+                         '--resolution', '512,512',
+                         '--up', '+Z',
+                         '--camera-direction=0,-1,-0.3',
+                         model_file],
+                        timeout=timeout_sec
+                    )
+                    render_success = result.returncode == 0
+                else:
+                    # Use stl-thumb for STL/OBJ/3MF
+                    stl_cmd = ['stl-thumb', '-s', '512', model_file, output]
+                    result = run_render(stl_cmd, timeout=timeout_sec)
+                    render_success = result.returncode == 0
                 
-                # Add white background
-                img = Image.open(io.BytesIO(png_data))
-                bg = Image.new('RGB', (512, 512), (255, 255, 255))
-                x = (512 - img.width) // 2
-                y = (512 - img.height) // 2
-                if img.mode == 'RGBA':
-                    bg.paste(img, (x, y), img)
+                if render_success and os.path.exists(output):
+                    publish(output, cached)
+                    
+                    # Update database
+                    try:
+                        with get_connection() as conn:
+                            conn.execute(
+                                "UPDATE models SET has_thumbnail = 1 WHERE id = ?",
+                                (model_id,)
+                            )
+                            conn.commit()
+                    except Exception as e:
+                        logger.error(f"DB update failed for {model_id}: {e}")
+                    return True
                 else:
-                    bg.paste(img, (x, y))
-                bg.save(str(cached), 'PNG')
-                render_success = True
-            elif fmt in ('glb', 'gltf'):
-                # Use f3d for GLB/GLTF (supports textures)
-                result = subprocess.run(
-                    ['xvfb-run', '-a', 'f3d',
-                     '--output', str(cached),
-                     '--resolution', '512,512',
-                     '--up', '+Z',
-                     '--camera-direction=0,-1,-0.3',
-                     model_file],
-                    capture_output=True,
-                    timeout=timeout_sec
-                )
-                render_success = result.returncode == 0
-            else:
-                # Use stl-thumb for STL/OBJ/3MF
-                stl_cmd = ['stl-thumb', '-s', '512', model_file, str(cached)]
-                result = subprocess.run(
-                    stl_cmd,
-                    capture_output=True,
-                    timeout=timeout_sec
-                )
-                render_success = result.returncode == 0
-            
-            if render_success:
-                # Update database
-                try:
-                    with get_connection() as conn:
-                        conn.execute(
-                            "UPDATE models SET has_thumbnail = 1 WHERE id = ?",
-                            (model_id,)
-                        )
-                        conn.commit()
-                except Exception as e:
-                    logger.error(f"DB update failed for {model_id}: {e}")
-                return True
-            else:
+                    return False
+            except subprocess.TimeoutExpired:
+                logger.warning(f"✗ {model_id}: timeout after {timeout_sec}s")
+                return False
+            except FileNotFoundError:
+                logger.error("stl-thumb not installed")
                 return False
-        except subprocess.TimeoutExpired:
-            logger.warning(f"✗ {model_id}: timeout after {timeout_sec}s")
-            return False
-        except FileNotFoundError:
-            logger.error("stl-thumb not installed")
-            return False
-        finally:
-            if temp_file:
-                Path(temp_file).unlink(missing_ok=True)
     
     except Exception as e:
         logger.error(f"Model {model_id}: {e}")
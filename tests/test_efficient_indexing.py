@@ -9,6 +9,8 @@ Or directly: python tests/test_efficient_indexing.py
 import os
 import sys
 import json
+import time
+import sqlite3
 import tempfile
 from pathlib import Path
 
@@ -20,6 +22,16 @@ try:
 except ImportError:
     pytest = None
 
+SCHEMA_PATH = Path(__file__).parent.parent / 'data' / 'schema.sql'
+
+
+def _schema_db(path=':memory:', **connect_args):
+    """Open a database (in memory by default) with data/schema.sql applied."""
+    conn = sqlite3.connect(path, **connect_args)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA_PATH.read_text())
+    return conn
+
 
 class TestHashing:
     """Test partial hash computation."""
@@ -106,6 +118,66 @@ class TestThumbnails:
         storage, path = determine_thumb_location(model, volume, central)
         assert storage in (ThumbStorage.ARCHIVE_SIDECAR, ThumbStorage.CENTRAL)
 
+    def test_reconcile_thumbnails(self):
+        """Reconciler records thumbnails found on disk and clears missing ones."""
+        from fantasyfolio.core.thumbnails import reconcile_thumbnails, get_thumbnail_coverage
+        
+        conn = _schema_db()
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            central_dir = tmp / 'thumbnails'
+            (central_dir / '3d').mkdir(parents=True)
+            
+            for i in range(1, 4):
+                conn.execute(
+                    "INSERT INTO models (id, file_path, filename, format) VALUES (?, ?, ?, 'stl')",
+                    (i, str(tmp / f'm{i}.stl'), f'm{i}.stl')
+                )
+            # 1: legacy central thumbnail, 2: sidecar, 3: recorded but file gone
+            (central_dir / '3d' / '1.png').write_bytes(b'png')
+            (tmp / '.m2.stl.thumb.png').write_bytes(b'png')
+            conn.execute("UPDATE models SET thumb_storage = 'central', thumb_path = '3d/3.png' WHERE id = 3")
+            
+            stats = reconcile_thumbnails(conn, central_dir, batch_size=2)
+            assert (stats['recorded'], stats['cleared'], stats['done']) == (2, 1, True)
+            
+            rows = {r['id']: dict(r) for r in conn.execute("SELECT * FROM models")}
+            assert rows[1]['thumb_storage'] == 'central' and rows[1]['thumb_path'] == '3d/1.png'
+            assert rows[2]['thumb_storage'] == 'sidecar'
+            assert rows[3]['thumb_storage'] is None
+            
+            coverage = get_thumbnail_coverage(conn)
+            assert (coverage['total'], coverage['cached'], coverage['missing']) == (3, 2, 1)
+        conn.close()
+
+    def test_migration_backfills_thumb_storage(self):
+        """Migration 013 records existing thumbnails so they aren't queued for re-render."""
+        import importlib.util
+        
+        root = Path(__file__).parent.parent
+        spec = importlib.util.spec_from_file_location('m013', root / 'migrations' / '013_thumbnail_indexes.py')
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            db_path, central_dir = tmp / 'test.db', tmp / 'thumbnails'
+            (central_dir / '3d').mkdir(parents=True)
+            conn = _schema_db(db_path)
+            for i in (1, 2):
+                conn.execute(
+                    "INSERT INTO models (id, file_path, filename, format) VALUES (?, ?, ?, 'stl')",
+                    (i, str(tmp / f'm{i}.stl'), f'm{i}.stl')
+                )
+            conn.commit()
+            (central_dir / '3d' / '1.png').write_bytes(b'png')
+            
+            assert migration.run_migration(db_path, central_dir)
+            queued = [r[0] for r in conn.execute("SELECT id FROM models WHERE thumb_storage IS NULL")]
+            assert queued == [2]
+            conn.close()
+
 
 class TestScanner:
     """Test scan logic."""
@@ -113,7 +185,6 @@ class TestScanner:
     def test_find_existing_asset_new(self):
         """New file should return 'new' match type."""
         from fantasyfolio.core.scanner import find_existing_asset
-        import sqlite3
         
         # Create in-memory database
         conn = sqlite3.connect(':memory:')
@@ -144,7 +215,6 @@ class TestScanner:
     def test_find_existing_asset_unchanged(self):
         """File with same path/mtime/size should be unchanged."""
         from fantasyfolio.core.scanner import find_existing_asset
-        import sqlite3
         
         conn = sqlite3.connect(':memory:')
         conn.row_factory = sqlite3.Row
@@ -174,6 +244,1838 @@ class TestScanner:
         assert match_type == 'unchanged'
         assert existing is not None
         conn.close()
+    
+    def test_hashes_compared_under_stored_algorithm(self):
+        """After the partial hash algorithm changes, touched and moved files still match."""
+        from unittest.mock import patch
+        from fantasyfolio.config import Config
+        from fantasyfolio.core.hashing import compute_partial_hash
+        from fantasyfolio.core.scanner import scan_file, ScanAction
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            (tmp / 'a.stl').write_bytes(b'solid a' * 1000)
+            (tmp / 'b.stl').write_bytes(b'solid b' * 1000)
+            conn = _schema_db()
+            volume = {'id': 'v1', 'mount_path': str(tmp)}
+            # Indexed with md5 (legacy NULL tag); b.stl was at an old path since
+            for row_id, name, stored_path in ((1, 'a.stl', 'a.stl'), (2, 'b.stl', 'old/b.stl')):
+                conn.execute(
+                    "INSERT INTO models (id, file_path, filename, format, volume_id, file_mtime, "
+                    "file_size_bytes, partial_hash) VALUES (?, ?, ?, 'stl', 'v1', 0, ?, ?)",
+                    (row_id, str(tmp / stored_path), name, (tmp / name).stat().st_size,
+                     compute_partial_hash(tmp / name, 'md5'))
+                )
+            
+            with patch.object(Config, 'PARTIAL_HASH_ALGORITHM', 'sha256'):
+                touched = scan_file(conn, tmp / 'a.stl', volume)
+                moved = scan_file(conn, tmp / 'b.stl', volume)
+            
+            assert touched.action == ScanAction.UPDATE and touched.reason == 'touched (content unchanged)'
+            assert not touched.model.get('force_rerender')
+            assert touched.model['partial_hash_algo'] == 'sha256:1'
+            assert touched.model['partial_hash'] == compute_partial_hash(tmp / 'a.stl', 'sha256')
+            assert moved.action == ScanAction.MOVED and moved.model['id'] == 2
+            conn.close()
+
+
+class TestFolderTree:
+    """Test the materialized folder tree (folder_nodes)."""
+    
+    def _make_db(self):
+        conn = _schema_db()
+        conn.execute("INSERT INTO volumes (id, label, mount_path) VALUES ('v1', 'Vol', '/mnt/v1')")
+        rows = [
+            ('/mnt/v1/a/b/x.stl', 'a/b', 'stl'),
+            ('/mnt/v1/a/b/y.stl', 'a/b', 'stl'),
+            ('/mnt/v1/a/z.stl', 'a', 'stl'),
+            ('/mnt/v1/c/n.txt', 'c', 'unsupported'),
+        ]
+        for file_path, folder, fmt in rows:
+            conn.execute(
+                "INSERT INTO models (file_path, filename, format, folder_path, volume_id) VALUES (?, ?, ?, ?, 'v1')",
+                (file_path, Path(file_path).name, fmt, folder)
+            )
+        return conn
+    
+    def test_rebuild_and_build_tree(self):
+        """Rebuilt nodes roll counts up to ancestors and skip unsupported files."""
+        from fantasyfolio.core.folder_tree import rebuild_folder_nodes, build_folder_tree
+        
+        conn = self._make_db()
+        rebuild_folder_nodes(conn, 'model')
+        result = build_folder_tree(conn, 'model')
+        
+        flat = {entry['path']: entry for entry in result['flat']}
+        assert flat['Vol']['count'] == 3
+        assert flat['Vol/a']['count'] == 3
+        assert flat['Vol/a']['hasChildren'] is True
+        assert flat['Vol/a/b']['count'] == 2
+        assert flat['Vol/a/b']['hasChildren'] is False
+        assert 'Vol/c' not in flat
+        assert result['tree']['Vol']['_children']['a']['_children']['b']['_count'] == 2
+        conn.close()
+    
+    def test_incremental_adjust_matches_rebuild(self):
+        """Single-row adjustments keep the same counts a full rebuild produces."""
+        from fantasyfolio.core.folder_tree import rebuild_folder_nodes, adjust_folder_counts
+        
+        conn = self._make_db()
+        rebuild_folder_nodes(conn, 'model')
+        
+        conn.execute("UPDATE models SET deleted_at = 'now' WHERE folder_path = 'a/b'")
+        adjust_folder_counts(conn, 'model', 'v1', 'a/b', -2)
+        incremental = conn.execute(
+            "SELECT folder_path, direct_count, total_count FROM folder_nodes ORDER BY folder_path"
+        ).fetchall()
+        
+        rebuild_folder_nodes(conn, 'model')
+        rebuilt = conn.execute(
+            "SELECT folder_path, direct_count, total_count FROM folder_nodes ORDER BY folder_path"
+        ).fetchall()
+        
+        assert [tuple(r) for r in incremental] == [tuple(r) for r in rebuilt]
+        assert [r['folder_path'] for r in rebuilt] == ['', 'a']
+        conn.close()
+    
+    def test_lazy_children(self):
+        """Children of a single folder can be listed without the whole tree."""
+        from fantasyfolio.core.folder_tree import rebuild_folder_nodes, list_folder_children
+        
+        conn = self._make_db()
+        rebuild_folder_nodes(conn, 'model')
+        
+        top = list_folder_children(conn, 'model', 'v1', '')
+        assert [(c['name'], c['count'], c['hasChildren']) for c in top] == [('a', 3, True)]
+        
+        nested = list_folder_children(conn, 'model', 'v1', 'a')
+        assert [(c['folder_path'], c['count']) for c in nested] == [('a/b', 2)]
+        conn.close()
+    
+    def test_ensure_keeps_caller_transaction(self, tmp_path):
+        """Creating folder_nodes neither commits the caller's writes nor skips a second database."""
+        from fantasyfolio.core.folder_tree import ensure_folder_nodes
+        
+        for name in ('one.db', 'two.db'):
+            conn = _schema_db(tmp_path / name)
+            conn.execute("DROP TABLE folder_nodes")
+            conn.commit()
+            
+            conn.execute("INSERT INTO models (file_path, filename, format) VALUES ('/x.stl', 'x.stl', 'stl')")
+            ensure_folder_nodes(conn)
+            assert conn.in_transaction
+            assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'folder_nodes'").fetchone()
+            conn.rollback()
+            assert conn.execute("SELECT COUNT(*) FROM models").fetchone()[0] == 0
+            conn.close()
+
+
+class TestPagination:
+    """Test keyset (cursor) pagination."""
+    
+    def _make_db(self):
+        conn = sqlite3.connect(':memory:')
+        conn.row_factory = sqlite3.Row
+        conn.execute("CREATE TABLE models (id INTEGER PRIMARY KEY, title TEXT, file_size INTEGER)")
+        titles = ['b', None, 'a', 'c', None, 'b', 'a', None, 'd', 'b']
+        for i, title in enumerate(titles):
+            conn.execute("INSERT INTO models (title, file_size) VALUES (?, ?)", (title, i % 3))
+        return conn
+    
+    def _walk(self, conn, columns, descending, limit):
+        from fantasyfolio.core.pagination import fetch_page
+        
+        ids, cursor = [], None
+        while True:
+            rows, cursor = fetch_page(
+                conn, "SELECT * FROM models WHERE 1=1", [], columns,
+                descending=descending, limit=limit, cursor=cursor
+            )
+            ids.extend(row['id'] for row in rows)
+            if not cursor:
+                return ids
+    
+    def test_cursor_walk_matches_full_sort(self):
+        """Walking every page yields exactly the fully sorted result, NULLs included."""
+        conn = self._make_db()
+        for descending in (False, True):
+            direction = 'DESC' if descending else 'ASC'
+            for columns in ([('title', 'title'), ('id', 'id')],
+                            [('file_size', 'file_size'), ('title', 'title'), ('id', 'id')]):
+                order = ', '.join(f"{expr} {direction}" for expr, _ in columns)
+                expected = [r['id'] for r in conn.execute(f"SELECT id FROM models ORDER BY {order}")]
+                for limit in (1, 3, 4, 100):
+                    assert self._walk(conn, columns, descending, limit) == expected
+        conn.close()
+    
+    def test_cursor_rejected_for_other_sort(self):
+        """A cursor issued for one sort can't be replayed against another."""
+        from fantasyfolio.core.pagination import fetch_page, CursorError
+        
+        conn = self._make_db()
+        _, cursor = fetch_page(conn, "SELECT * FROM models WHERE 1=1", [],
+                               [('title', 'title'), ('id', 'id')], limit=2)
+        assert cursor
+        
+        try:
+            fetch_page(conn, "SELECT * FROM models WHERE 1=1", [],
+                       [('file_size', 'file_size'), ('id', 'id')], limit=2, cursor=cursor)
+            assert False, "Expected CursorError"
+        except CursorError:
+            pass
+        conn.close()
+
+
+class TestStatsCache:
+    """Test generation-keyed stats caching."""
+    
+    def _make_db(self):
+        from fantasyfolio.core import stats_cache
+        
+        conn = _schema_db()
+        stats_cache.invalidate_stats()
+        return conn
+    
+    def test_triggers_bump_generation(self):
+        """Inserts and tracked-column updates bump the table generation; others don't."""
+        from fantasyfolio.core.stats_cache import get_generations
+        
+        conn = self._make_db()
+        (start,) = get_generations(conn, ['models'])
+        conn.execute("INSERT INTO models (file_path, filename, format) VALUES ('/a.stl', 'a.stl', 'stl')")
+        (after_insert,) = get_generations(conn, ['models'])
+        assert after_insert == start + 1
+        
+        conn.execute("UPDATE models SET last_seen_at = CURRENT_TIMESTAMP")
+        assert get_generations(conn, ['models']) == (after_insert,)
+        
+        conn.execute("UPDATE models SET deleted_at = CURRENT_TIMESTAMP")
+        assert get_generations(conn, ['models']) == (after_insert + 1,)
+        conn.close()
+    
+    def test_cached_until_write(self):
+        """Cached results are reused until the tracked table changes."""
+        from fantasyfolio.core.stats_cache import cached_stats
+        
+        conn = self._make_db()
+        calls = []
+        
+        def compute(c):
+            calls.append(1)
+            return {'total': c.execute("SELECT COUNT(*) FROM models").fetchone()[0]}
+        
+        assert cached_stats(conn, 'test', ('models',), compute, max_age=3600) == {'total': 0}
+        assert cached_stats(conn, 'test', ('models',), compute, max_age=3600) == {'total': 0}
+        assert len(calls) == 1
+        
+        conn.execute("INSERT INTO models (file_path, filename, format) VALUES ('/a.stl', 'a.stl', 'stl')")
+        assert cached_stats(conn, 'test', ('models',), compute, max_age=3600) == {'total': 1}
+        assert len(calls) == 2
+        conn.close()
+    
+    def test_search_generation_ignores_unindexed_columns(self):
+        """Old catch-all search_index triggers are replaced; thumbnail updates don't bump it."""
+        import importlib.util
+        from fantasyfolio.core import stats_cache
+        
+        root = Path(__file__).parent.parent
+        spec = importlib.util.spec_from_file_location('m019', root / 'migrations' / '019_search_generation.py')
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / 'test.db'
+            conn = _schema_db(db_path)
+            # As created by the first version of migration 019
+            conn.executescript("""
+                DROP TRIGGER trg_models_search_index_gen_update;
+                CREATE TRIGGER trg_models_search_index_gen_update AFTER UPDATE ON models
+                BEGIN
+                  UPDATE data_generations SET generation = generation + 1 WHERE name = 'search_index';
+                END;
+            """)
+            assert stats_cache.outdated_triggers(conn) == ['trg_models_search_index_gen_update']
+            conn.close()
+            
+            assert migration.run_migration(db_path)
+            conn = sqlite3.connect(db_path)
+            assert stats_cache.outdated_triggers(conn) == []
+            
+            def generation():
+                return stats_cache.get_generations(conn, ['search_index'])[0]
+            
+            conn.execute("INSERT INTO models (file_path, filename, format) VALUES ('/a.stl', 'a.stl', 'stl')")
+            start = generation()
+            conn.execute("UPDATE models SET thumb_storage = 'central', last_seen_at = CURRENT_TIMESTAMP")
+            assert generation() == start
+            conn.execute("UPDATE models SET title = 'Red Dragon'")
+            assert generation() == start + 1
+            conn.close()
+    
+    def test_system_state_endpoint(self):
+        """/api/system/state answers from cache but reflects new writes."""
+        from unittest.mock import patch
+        from fantasyfolio.config import Config
+        from fantasyfolio.core import database, stats_cache
+        from fantasyfolio.app import create_app
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            with patch.object(Config, 'DATA_DIR', tmp), \
+                 patch.object(Config, 'DATABASE_PATH', tmp / 'test.db'), \
+                 patch.object(Config, 'LOG_DIR', tmp / 'logs'), \
+                 patch.object(Config, 'THUMBNAIL_DIR', tmp / 'thumbnails'), \
+                 patch.object(Config, 'TESTING', True):
+                database._db = None
+                stats_cache.invalidate_stats()
+                try:
+                    client = create_app().test_client()
+                    
+                    first = client.get('/api/system/state')
+                    assert first.status_code == 200
+                    assert first.get_json()['database']['models'] == 0
+                    assert first.get_json()['backups']['total'] == 0
+                    assert client.get('/api/system/state').status_code == 200
+                    
+                    with database.get_connection() as conn:
+                        conn.execute("INSERT INTO models (file_path, filename, format) VALUES ('/a.stl', 'a.stl', 'stl')")
+                        conn.commit()
+                    
+                    after = client.get('/api/system/state')
+                    assert after.status_code == 200
+                    assert after.get_json()['database']['models'] == 1
+                finally:
+                    database._db = None
+                    stats_cache.invalidate_stats()
+
+
+class TestVolumeMonitor:
+    """Test timeout-protected, cached volume checks."""
+    
+    def test_hung_probe_times_out(self):
+        """A probe that never returns is reported unavailable after the timeout."""
+        import time
+        import threading
+        from fantasyfolio.services import volume_monitor
+        
+        release = threading.Event()
+        original = volume_monitor.check_volume_available
+        volume_monitor.check_volume_available = lambda path: release.wait() and original(path)
+        try:
+            start = time.monotonic()
+            status = volume_monitor.probe_volume('/hung/mount', timeout=0.2)
+            assert time.monotonic() - start < 2
+            assert status['available'] is False
+            assert 'not responding' in status['reason']
+            
+            # A second probe waits on the hung one instead of starting another
+            hung_thread = volume_monitor._in_flight['/hung/mount'][0]
+            volume_monitor.probe_volume('/hung/mount', timeout=0.1)
+            assert volume_monitor._in_flight['/hung/mount'][0] is hung_thread
+        finally:
+            release.set()
+            volume_monitor.check_volume_available = original
+    
+    def test_cached_status_skips_filesystem(self):
+        """Cached status is served without probing again."""
+        from fantasyfolio.services import volume_monitor
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            assert volume_monitor.probe_volume(tmpdir, timeout=5)['available'] is True
+            
+            calls = []
+            original = volume_monitor.check_volume_available
+            volume_monitor.check_volume_available = lambda path: calls.append(path) or original(path)
+            try:
+                assert volume_monitor.get_cached_volume_status(tmpdir)['available'] is True
+                assert calls == []
+            finally:
+                volume_monitor.check_volume_available = original
+    
+    def test_offline_needs_consecutive_failures(self):
+        """One failed check leaves models alone; recovery restores them to indexed."""
+        from unittest.mock import patch
+        from fantasyfolio.config import Config
+        from fantasyfolio.services import volume_monitor
+        
+        conn = _schema_db()
+        # schema.sql's asset_locations loses this column to a wrapped comment
+        conn.execute("ALTER TABLE asset_locations ADD COLUMN last_status_message TEXT")
+        conn.execute("INSERT INTO volumes (id, label, mount_path, status) VALUES ('v1', 'NAS', '/mnt/nas', 'online')")
+        conn.execute(
+            "INSERT INTO models (file_path, filename, format, volume_id, index_status) "
+            "VALUES ('/mnt/nas/a.stl', 'a.stl', 'stl', 'v1', 'indexed')"
+        )
+        conn.commit()
+        down = {'/mnt/nas': {'available': False, 'reason': 'Volume not responding (check timed out)'}}
+        up = {'/mnt/nas': {'available': True, 'reason': None}}
+        
+        def model_status():
+            return conn.execute("SELECT index_status FROM models").fetchone()[0]
+        
+        volume_monitor._failures.clear()
+        with patch.object(Config, 'VOLUME_OFFLINE_AFTER', 2), \
+                patch('fantasyfolio.core.database.get_connection', lambda: conn):
+            volume_monitor._publish_status(down)
+            assert model_status() == 'indexed'
+            volume_monitor._publish_status(up)
+            volume_monitor._publish_status(down)
+            assert model_status() == 'indexed'  # Counter reset by the good check
+            
+            volume_monitor._publish_status(down)
+            assert model_status() == 'offline'
+            volume_monitor._publish_status(up)
+            assert model_status() == 'indexed'
+        conn.close()
+
+
+class TestPathIndex:
+    """Test the path-prefix index used for location/volume resolution."""
+    
+    def test_longest_prefix(self):
+        """The deepest registered parent wins; sibling names aren't prefixes."""
+        from fantasyfolio.core.path_index import PathPrefixIndex
+        
+        index = PathPrefixIndex()
+        index.add('/mnt/nas', 'nas')
+        index.add('/mnt/nas/models/', 'models')
+        
+        assert index.longest_prefix('/mnt/nas/models/Creator/a.stl') == 'models'
+        assert index.longest_prefix('/mnt/nas/pdfs/a.pdf') == 'nas'
+        assert index.longest_prefix('/mnt/nas/models') == 'models'
+        assert index.longest_prefix('/mnt/nas2/a.stl') is None
+        assert index.longest_prefix('/other/a.stl') is None
+    
+    def test_volume_lookup_follows_changes(self):
+        """Volumes added by another writer are picked up via generation counters."""
+        from fantasyfolio.core import path_index
+        
+        conn = _schema_db()
+        path_index.invalidate_path_index()
+        
+        conn.execute("INSERT INTO volumes (id, label, mount_path) VALUES ('v1', 'NAS', '/mnt/nas')")
+        assert path_index.lookup_volume(conn, '/mnt/nas/x/a.stl')['id'] == 'v1'
+        assert path_index.lookup_volume(conn, '/mnt/nas2/a.stl') is None
+        
+        conn.execute("INSERT INTO volumes (id, label, mount_path) VALUES ('v2', 'Models', '/mnt/nas/x')")
+        path_index._checked_at = 0.0  # Skip the recheck interval
+        assert path_index.lookup_volume(conn, '/mnt/nas/x/a.stl')['id'] == 'v2'
+        conn.close()
+        path_index.invalidate_path_index()
+
+
+class TestModelsIndexerUpsert:
+    """Test the legacy ModelsIndexer batched upsert."""
+    
+    def test_upsert_chunk_updates_in_place(self):
+        """Re-indexing updates rows by file_path and keeps thumbnail flags."""
+        from fantasyfolio.indexer.models3d import ModelsIndexer
+        
+        conn = _schema_db()
+        
+        def model(i, title):
+            return {
+                'file_path': f'/lib/m{i}.stl', 'filename': f'm{i}.stl', 'title': title,
+                'format': 'stl', 'file_size': i, 'file_hash': None, 'archive_path': None,
+                'archive_member': None, 'folder_path': '', 'collection': None, 'creator': None,
+                'vertex_count': None, 'face_count': None, 'has_supports': 0, 'preview_image': None,
+                'has_thumbnail': 0, 'created_at': None, 'modified_at': None, 'volume_id': None
+            }
+        
+        indexer = ModelsIndexer(root_path='/lib')
+        indexer._upsert_chunk(conn, [model(i, 'old') for i in range(5)])
+        conn.execute("UPDATE models SET has_thumbnail = 1 WHERE file_path = '/lib/m0.stl'")
+        ids = [row['id'] for row in conn.execute("SELECT id FROM models ORDER BY id")]
+        
+        indexer._upsert_chunk(conn, [model(i, 'new') for i in range(5)])
+        rows = conn.execute("SELECT id, title, has_thumbnail FROM models ORDER BY id").fetchall()
+        assert [row['id'] for row in rows] == ids
+        assert all(row['title'] == 'new' for row in rows)
+        assert rows[0]['has_thumbnail'] == 1
+        assert indexer.stats['models_indexed'] == 10
+        conn.close()
+
+
+class TestBulkRender:
+    """Test the bulk thumbnail render engine helpers."""
+    
+    def test_group_render_jobs(self):
+        """Members of one archive stay together; large archives are split."""
+        from fantasyfolio.core.bulk_render import group_render_jobs
+        
+        models = [{'id': i, 'archive_path': '/lib/a.zip'} for i in range(5)]
+        models += [{'id': 10 + i, 'archive_path': None} for i in range(3)]
+        models.append({'id': 20, 'archive_path': '/lib/b.zip'})
+        
+        groups = group_render_jobs(models, group_size=2)
+        by_archive = {}
+        for group in groups:
+            assert len(group) <= 2
+            archives = {m['archive_path'] for m in group}
+            assert len(archives) == 1
+            by_archive.setdefault(archives.pop(), []).extend(m['id'] for m in group)
+        
+        assert by_archive['/lib/a.zip'] == [0, 1, 2, 3, 4]
+        assert by_archive[None] == [10, 11, 12]
+        assert by_archive['/lib/b.zip'] == [20]
+    
+    def test_render_group_bad_archive(self):
+        """An unreadable archive fails every job in the group without raising."""
+        from fantasyfolio.core.bulk_render import render_group
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            bad = Path(tmpdir) / 'bad.zip'
+            bad.write_bytes(b'not a zip')
+            jobs = [{'id': i, 'format': 'stl', 'file_path': f'{bad}:m{i}.stl',
+                     'archive_path': str(bad), 'archive_member': f'm{i}.stl'} for i in range(3)]
+            
+            results = render_group(jobs, tmpdir)
+            assert [r[0] for r in results] == [0, 1, 2]
+            assert all(r[1] is None and r[2] for r in results)
+    
+    def test_render_group_without_volume_is_readonly(self):
+        """Models with no volume row never get sidecar thumbnails."""
+        from unittest.mock import patch
+        from fantasyfolio.core.bulk_render import render_group
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = Path(tmpdir) / 'm.stl'
+            source.write_bytes(b'solid m')
+            jobs = [{'id': 1, 'format': 'stl', 'file_path': str(source),
+                     'volume_id': None, 'mount_path': None, 'is_readonly': None}]
+            volumes = []
+            
+            def render(model, volume, *args):
+                volumes.append(volume)
+                return {'thumb_storage': 'central'}
+            
+            with patch('fantasyfolio.core.thumbnails.render_thumbnail_from_source', render):
+                render_group(jobs, tmpdir)
+            assert volumes[0]['is_readonly'] == 1
+    
+    def test_failed_groups_counted_and_results_flushed(self):
+        """A crashed worker or broken pool counts as errors; finished renders are still saved."""
+        from contextlib import contextmanager
+        from concurrent.futures import Future
+        from concurrent.futures.process import BrokenProcessPool
+        from unittest.mock import patch
+        from fantasyfolio.core import bulk_render
+        
+        conn = _schema_db(check_same_thread=False)
+        models = [{'id': i, 'archive_path': f'/lib/{i}.zip'} for i in range(1, 5)]
+        for model in models:
+            conn.execute("INSERT INTO models (id, file_path, filename, format) VALUES (?, ?, 'm.stl', 'stl')",
+                         (model['id'], f"{model['archive_path']}:m.stl"))
+        
+        class FakePool:
+            """Renders group 1, crashes on group 2, then breaks."""
+            def __init__(self, *args, **kwargs):
+                self.submitted = 0
+            
+            def __enter__(self):
+                return self
+            
+            def __exit__(self, *exc):
+                return False
+            
+            def submit(self, fn, group, *args):
+                self.submitted += 1
+                if self.submitted > 2:
+                    raise BrokenProcessPool('worker died')
+                future = Future()
+                if self.submitted == 1:
+                    future.set_result([(group[0]['id'], {
+                        'thumb_storage': 'central', 'thumb_path': '1.png',
+                        'thumb_rendered_at': 'now', 'thumb_source_mtime': 1
+                    }, None)])
+                else:
+                    future.set_exception(RuntimeError('segfault'))
+                return future
+        
+        @contextmanager
+        def connection():
+            yield conn
+        
+        engine = bulk_render.BulkRenderEngine(Path('/tmp/thumbs'), workers=1)
+        with patch.object(bulk_render, 'ProcessPoolExecutor', FakePool), \
+                patch.object(bulk_render, 'get_connection', connection):
+            assert engine.start(models)
+            engine.wait(10)
+        
+        status = engine.status()
+        assert (status['completed'], status['total'], status['rendered'], status['errors']) == (4, 4, 1, 3)
+        assert [row['id'] for row in conn.execute("SELECT id FROM models WHERE has_thumbnail = 1")] == [1]
+
+
+class TestStaging:
+    """Test render staging of archive members and outputs."""
+    
+    def test_stage_member_cleanup(self):
+        """Staged members match the archive and are removed even on error."""
+        import zipfile
+        from fantasyfolio.core.staging import stage_member
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = Path(tmpdir) / 'a.zip'
+            with zipfile.ZipFile(archive, 'w') as zf:
+                zf.writestr('m.stl', b'solid test' * 1000)
+            
+            with zipfile.ZipFile(archive) as zf:
+                with stage_member(zf, 'm.stl', '.stl') as staged:
+                    assert staged.endswith('.stl')
+                    assert Path(staged).read_bytes() == b'solid test' * 1000
+                assert not os.path.exists(staged)
+                
+                try:
+                    with stage_member(zf, 'm.stl', '.stl') as staged:
+                        raise RuntimeError("renderer crashed")
+                except RuntimeError:
+                    pass
+                assert not os.path.exists(staged)
+    
+    def test_run_render_timeout_kills_group(self):
+        """A timed-out renderer's children are killed too."""
+        import subprocess
+        import time
+        from fantasyfolio.core.staging import run_render
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            marker = Path(tmpdir) / 'late'
+            start = time.monotonic()
+            try:
+                run_render(['sh', '-c', f'(sleep 1; touch {marker}) & wait'], timeout=0.2)
+                assert False, "expected timeout"
+            except subprocess.TimeoutExpired:
+                pass
+            assert time.monotonic() - start < 1
+            time.sleep(1.2)
+            assert not marker.exists()
+
+
+class TestDeduplication:
+    """Test group-based duplicate verification."""
+    
+    def test_group_verification_reuses_full_hashes(self):
+        """Each file is hashed once per run and unchanged files aren't re-read."""
+        import zipfile
+        from fantasyfolio.core.deduplication import process_duplicates
+        from fantasyfolio.core.hashing import compute_partial_hash
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            head, tail = b'H' * 70000, b'T' * 70000
+            same = head + b'same middle' + tail
+            other = head + b'diff middle' + tail  # Same partial hash, different content
+            
+            files = []
+            for name, data in (('a.stl', same), ('b.stl', same), ('c.stl', other)):
+                (tmp / name).write_bytes(data)
+                files.append((str(tmp / name), name, None, None))
+            with zipfile.ZipFile(tmp / 'pack.zip', 'w') as zf:
+                zf.writestr('d.stl', same)
+            files.append((str(tmp / 'pack.zip') + ':d.stl', 'd.stl', str(tmp / 'pack.zip'), 'd.stl'))
+            
+            partial = compute_partial_hash(tmp / 'a.stl')
+            assert partial == compute_partial_hash(tmp / 'c.stl')
+            
+            db_path = str(tmp / 'test.db')
+            conn = _schema_db(db_path)
+            conn.executemany(
+                "INSERT INTO models (file_path, filename, archive_path, archive_member, partial_hash) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [f + (partial,) for f in files]
+            )
+            conn.commit()
+            
+            results = process_duplicates(db_path, 'models', workers=2)
+            assert results['groups_found'] == 1
+            assert results['full_hashes_computed'] == 4
+            marked = {(d['duplicate_id'], d['primary_id']) for d in results['duplicates']}
+            assert marked == {(2, 1), (4, 1)}
+            
+            rows = conn.execute(
+                "SELECT id, is_duplicate, duplicate_of_id, full_hash, full_hash_size FROM models ORDER BY id"
+            ).fetchall()
+            assert all(row[3] and row[4] == len(same) for row in rows)
+            assert [row[1] for row in rows] == [0, 1, 0, 1]
+            conn.close()
+            
+            again = process_duplicates(db_path, 'models', workers=2)
+            assert again['full_hashes_computed'] == 0
+            assert again['full_hashes_reused'] == 4
+            assert again['duplicates_found'] == 2
+
+
+class TestFullHashEngine:
+    """Test concurrent full hashing with per-volume throughput."""
+    
+    def test_engine_matches_hashlib(self):
+        """Files and archive members hash like hashlib; stats are kept per volume."""
+        import hashlib
+        import zipfile
+        from fantasyfolio.core.hashing import FullHashEngine, HashJob, UNASSIGNED_VOLUME
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            payloads = {f'f{i}.stl': os.urandom(100 + i * 300000) for i in range(3)}
+            jobs = []
+            for name, data in payloads.items():
+                (tmp / name).write_bytes(data)
+                jobs.append(HashJob(key=name, file_path=str(tmp / name), volume_id='v1'))
+            with zipfile.ZipFile(tmp / 'pack.zip', 'w', zipfile.ZIP_DEFLATED) as zf:
+                for name, data in payloads.items():
+                    zf.writestr(name, data)
+                    jobs.append(HashJob(key=f'zip:{name}', archive_path=str(tmp / 'pack.zip'), archive_member=name))
+            jobs.append(HashJob(key='missing', file_path=str(tmp / 'missing.stl'), volume_id='v1'))
+            
+            engine = FullHashEngine(workers=3, algorithm='sha256', read_size=64 * 1024)
+            outcomes = {job.key: (digest, error) for job, digest, error in engine.run(jobs)}
+            
+            for name, data in payloads.items():
+                expected = hashlib.sha256(data).hexdigest()
+                assert outcomes[name] == (expected, None)
+                assert outcomes[f'zip:{name}'] == (expected, None)
+            assert outcomes['missing'][0] is None and outcomes['missing'][1]
+            
+            total = sum(len(data) for data in payloads.values())
+            stats = engine.volume_stats()
+            assert stats['v1']['files'] == 3 and stats['v1']['bytes'] == total
+            assert stats[UNASSIGNED_VOLUME]['bytes'] == total
+
+
+class TestBatchHashing:
+    """Test keyset-paged parallel partial hashing."""
+    
+    def test_batch_compute_hashes(self):
+        """Every row is hashed across small batches; archive hashes match byte hashes."""
+        import zipfile
+        from fantasyfolio.core.hashing import batch_compute_hashes, compute_partial_hash_from_bytes
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            payloads = {f'm{i}.stl': os.urandom(1000 + i * 70000) for i in range(4)}
+            rows = []
+            for name, data in payloads.items():
+                (tmp / name).write_bytes(data)
+                rows.append((str(tmp / name), name, None, None))
+            with zipfile.ZipFile(tmp / 'pack.zip', 'w', zipfile.ZIP_DEFLATED) as zf:
+                for name, data in payloads.items():
+                    zf.writestr(f'inner/{name}', data)
+                    rows.append((f'{tmp}/pack.zip:inner/{name}', name, str(tmp / 'pack.zip'), f'inner/{name}'))
+            rows.append((str(tmp / 'missing.stl'), 'missing.stl', None, None))
+            
+            db_path = str(tmp / 'test.db')
+            conn = _schema_db(db_path)
+            conn.execute("INSERT INTO volumes (id, label, mount_path) VALUES ('v1', 'Test', ?)", (tmpdir,))
+            conn.executemany(
+                "INSERT INTO models (file_path, filename, archive_path, archive_member, volume_id) "
+                "VALUES (?, ?, ?, ?, 'v1')", rows
+            )
+            conn.commit()
+            
+            results = batch_compute_hashes(db_path, 'models', batch_size=3, workers=3)
+            assert results['processed'] == 8
+            assert results['skipped'] == 1
+            assert results['last_id'] == 9
+            
+            for filename, partial, size in conn.execute(
+                "SELECT filename, partial_hash, file_size_bytes FROM models WHERE partial_hash IS NOT NULL"
+            ):
+                assert partial == compute_partial_hash_from_bytes(payloads[filename])
+                assert size == len(payloads[filename])
+            conn.close()
+            
+            resumed = batch_compute_hashes(db_path, 'models', workers=1, after_id=results['last_id'])
+            assert resumed['processed'] == 0 and resumed['skipped'] == 0
+    
+    def test_algorithm_registry(self):
+        """Algorithms resolve by name or tag; unknown names are rejected."""
+        import hashlib
+        from fantasyfolio.core.hashing import get_algorithm, compute_full_hash_from_bytes
+        
+        assert get_algorithm('md5').tag == 'md5:1'
+        assert get_algorithm('blake2b:1').name == 'blake2b'
+        assert compute_full_hash_from_bytes(b'abc', 'md5') == hashlib.md5(b'abc').hexdigest()
+        try:
+            get_algorithm('nope')
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+    
+    def test_rehash_on_algorithm_change(self):
+        """Rows tagged with another algorithm (or legacy NULL) are rehashed."""
+        from fantasyfolio.core.hashing import batch_compute_hashes, compute_partial_hash
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            (tmp / 'a.stl').write_bytes(os.urandom(5000))
+            
+            db_path = str(tmp / 'test.db')
+            conn = _schema_db(db_path)
+            conn.execute("INSERT INTO volumes (id, label, mount_path) VALUES ('v1', 'Test', ?)", (tmpdir,))
+            conn.execute(
+                "INSERT INTO models (file_path, filename, volume_id, partial_hash) VALUES (?, 'a.stl', 'v1', ?)",
+                (str(tmp / 'a.stl'), compute_partial_hash(tmp / 'a.stl', 'md5'))
+            )
+            conn.commit()
+            
+            assert batch_compute_hashes(db_path, 'models', algorithm='md5')['processed'] == 0
+            
+            results = batch_compute_hashes(db_path, 'models', algorithm='blake2b')
+            assert results['processed'] == 1
+            partial, tag = conn.execute("SELECT partial_hash, partial_hash_algo FROM models").fetchone()
+            assert tag == 'blake2b:1'
+            assert partial == compute_partial_hash(tmp / 'a.stl', 'blake2b')
+            conn.close()
+
+
+class TestDirectoryManifest:
+    """Test mtime-based pruning of unchanged directories on rescans."""
+    
+    def test_rescan_prunes_unchanged_directories(self):
+        """Only directories whose mtime changed are listed again."""
+        from fantasyfolio.core.scanner import scan_directory, apply_scan_result, UNCHANGED_DIRECTORY
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir) / 'vol'
+            for sub in ('a', 'a/deep', 'b'):
+                (root / sub).mkdir(parents=True)
+                (root / sub / 'model.stl').write_bytes(b'solid ' + sub.encode())
+            
+            # Old mtimes, so the manifest trusts them
+            old = time.time() - 60
+            for directory in (root, root / 'a', root / 'a' / 'deep', root / 'b'):
+                os.utime(directory, (old, old))
+            
+            conn = _schema_db()
+            conn.execute("INSERT INTO volumes (id, label, mount_path) VALUES ('v1', 'Vol', ?)", (str(root),))
+            volume = dict(conn.execute("SELECT * FROM volumes").fetchone())
+            
+            def scan(**kwargs):
+                results = list(scan_directory(conn, root, volume, **kwargs))
+                for result in results:
+                    apply_scan_result(conn, result)
+                conn.commit()
+                pruned = sorted(r.model['folder_path'] for r in results if r.reason == UNCHANGED_DIRECTORY)
+                return [r for r in results if r.reason != UNCHANGED_DIRECTORY], pruned
+            
+            first, pruned = scan()
+            assert len(first) == 3 and pruned == []
+            
+            second, pruned = scan()
+            assert second == [] and pruned == ['', 'a', 'a/deep', 'b']
+            
+            # A new file changes only its directory's mtime
+            (root / 'a' / 'deep' / 'new.stl').write_bytes(b'solid new')
+            os.utime(root / 'a' / 'deep', (old + 1, old + 1))
+            third, pruned = scan()
+            assert [r.model['filename'] for r in third if r.action.value == 'new'] == ['new.stl']
+            assert pruned == ['', 'a', 'b']
+            
+            deep, pruned = scan(deep=True)
+            assert len(deep) == 4 and pruned == []
+            
+            seen = conn.execute("SELECT COUNT(*) FROM models WHERE last_seen_at IS NOT NULL").fetchone()[0]
+            assert seen == 4
+            
+            # Directories modified during the listing are not trusted
+            (root / 'b' / 'fresh.stl').write_bytes(b'solid fresh')
+            scan()
+            row = conn.execute(
+                "SELECT dir_mtime_ns FROM directory_manifest WHERE dir_path = ?", (str(root / 'b'),)
+            ).fetchone()
+            assert row[0] is None
+            conn.close()
+
+
+class TestFilesystemWatcher:
+    """Test debounced change detection for incremental indexing."""
+    
+    def test_debouncer_coalesces(self):
+        """Repeated events for a path are released once, after it goes quiet."""
+        from fantasyfolio.services.fs_watcher import ChangeDebouncer
+        
+        debouncer = ChangeDebouncer(2.0)
+        debouncer.add('/v/a.stl', now=0.0)
+        debouncer.add('/v/a.stl', now=1.5)
+        debouncer.add('/v/b.zip', now=1.0)
+        debouncer.add('/v/b.zip', deleted=True, now=1.2)
+        
+        assert debouncer.ready(now=3.0) == []
+        assert sorted(debouncer.ready(now=3.3)) == [('/v/b.zip', True)]
+        assert debouncer.ready(now=3.6) == [('/v/a.stl', False)]
+        assert len(debouncer) == 0
+    
+    def test_polling_backend(self):
+        """Polling reports new, changed and removed model files only."""
+        from fantasyfolio.services.fs_watcher import PollingBackend, WatchRoot
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = WatchRoot(tmpdir, 'models', 'v1')
+            (Path(tmpdir) / 'old.stl').write_bytes(b'solid')
+            backend = PollingBackend()
+            backend.add_tree(root)
+            
+            (Path(tmpdir) / 'sub').mkdir()
+            (Path(tmpdir) / 'sub' / 'new.zip').write_bytes(b'PK')
+            (Path(tmpdir) / 'notes.txt').write_text('ignored')
+            (Path(tmpdir) / 'old.stl').unlink()
+            
+            changes = sorted(backend.poll(root))
+            assert changes == [
+                (str(Path(tmpdir) / 'old.stl'), True),
+                (str(Path(tmpdir) / 'sub' / 'new.zip'), False),
+            ]
+            assert backend.poll(root) == []
+    
+    def test_inotify_watcher(self):
+        """Files written under a watched tree (incl. new subdirs) are applied once."""
+        from fantasyfolio.services.fs_watcher import FilesystemWatcher, InotifyBackend, WatchRoot
+        
+        if not InotifyBackend.available():
+            pytest.skip("inotify not available")
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            batches = []
+            watcher = FilesystemWatcher(
+                debounce=0.2, poll_interval=3600,
+                apply=lambda changes, roots: batches.append(sorted(changes)),
+                roots=lambda: [WatchRoot(tmpdir, 'models', 'v1')],
+                use_inotify=True
+            )
+            try:
+                watcher.refresh_roots()
+                target = Path(tmpdir) / 'drop.stl'
+                for _ in range(3):
+                    target.write_bytes(b'solid drop')
+                (Path(tmpdir) / 'pack').mkdir()
+                (Path(tmpdir) / 'readme.txt').write_text('ignored')
+                
+                deadline = time.time() + 5
+                while not batches and time.time() < deadline:
+                    watcher.step(timeout=0.1)
+                
+                assert batches == [[(str(Path(tmpdir) / 'drop.stl'), False),
+                                    (str(Path(tmpdir) / 'pack'), False)]]
+                
+                # The new directory is watched too
+                (Path(tmpdir) / 'pack' / 'inner.zip').write_bytes(b'PK')
+                deadline = time.time() + 5
+                while len(batches) < 2 and time.time() < deadline:
+                    watcher.step(timeout=0.1)
+                assert batches[1] == [(str(Path(tmpdir) / 'pack' / 'inner.zip'), False)]
+            finally:
+                watcher.close()
+
+
+class TestChangeJournalBuffer:
+    """Test batched change-journal writes."""
+    
+    def _use_temp_db(self, tmp):
+        from fantasyfolio.core import database
+        
+        db_path = Path(tmp) / 'journal.db'
+        conn = _schema_db(db_path)
+        conn.close()
+        previous = database._db
+        database._db = database.Database(db_path)
+        return previous
+    
+    def _count(self):
+        from fantasyfolio.core.database import get_db
+        return get_db().fetchone("SELECT COALESCE(SUM(entry_count), 0) AS n FROM journal_partitions")['n']
+    
+    def test_batches_and_flushes(self):
+        """Entries are buffered, written in one batch, and keep their log time."""
+        from fantasyfolio.core import database
+        from fantasyfolio.services import change_journal
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            previous = self._use_temp_db(tmp)
+            writer = change_journal.JournalWriter(batch_size=100, flush_interval=60)
+            saved, change_journal._writer = change_journal._writer, writer
+            try:
+                for i in range(5):
+                    assert change_journal.log_model_change(i, 'trash', source='test') is None
+                assert writer.pending() == 5
+                assert self._count() == 0
+                
+                assert change_journal.flush_journal() == 5
+                assert writer.stats['batches'] == 1
+                rows = change_journal.get_journal_entries()
+                assert all(len(r['timestamp']) == 19 for r in rows)
+                
+                # Readers see buffered entries
+                change_journal.log_model_change(9, 'restore', source='test')
+                assert len(change_journal.get_entity_history('model', 9)) == 1
+            finally:
+                writer.close()
+                change_journal._writer = saved
+                database._db = previous
+    
+    def test_sync_writes_through_in_order(self):
+        """sync=True commits immediately, after anything already buffered."""
+        from fantasyfolio.core import database
+        from fantasyfolio.services import change_journal
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            previous = self._use_temp_db(tmp)
+            writer = change_journal.JournalWriter(batch_size=100, flush_interval=60)
+            saved, change_journal._writer = change_journal._writer, writer
+            try:
+                change_journal.log_asset_change(1, 'trash', source='test')
+                entry_id = change_journal.log_asset_change(1, 'restore', source='test', sync=True)
+                assert entry_id
+                assert writer.pending() == 0
+                
+                history = change_journal.get_entity_history('asset', 1)
+                assert [r['action'] for r in history] == ['trash', 'restore']
+                assert history[-1]['id'] == entry_id
+            finally:
+                writer.close()
+                change_journal._writer = saved
+                database._db = previous
+    
+    def test_close_flushes_and_size_threshold(self):
+        """A full batch is written by the background thread; close() writes the rest."""
+        from fantasyfolio.core import database
+        from fantasyfolio.services import change_journal
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            previous = self._use_temp_db(tmp)
+            writer = change_journal.JournalWriter(batch_size=3, flush_interval=60)
+            saved, change_journal._writer = change_journal._writer, writer
+            try:
+                for i in range(4):
+                    change_journal.log_model_change(i, 'trash', source='test')
+                deadline = time.time() + 5
+                while writer.stats['written'] < 3 and time.time() < deadline:
+                    time.sleep(0.02)
+                assert writer.stats['written'] >= 3
+                
+                writer.close()
+                assert self._count() == 4
+            finally:
+                change_journal._writer = saved
+                database._db = previous
+
+
+class TestJournalPartitions:
+    """Test monthly journal partitions, retention and compaction."""
+    
+    def _make_db(self):
+        return _schema_db()
+    
+    def _entry(self, timestamp, entity_id=1, action='update', field=None, old=None, new=None):
+        return (timestamp, 'model', entity_id, action, field, old, new, 'test', None)
+    
+    def test_entries_routed_by_month(self):
+        """Entries land in their month's table with globally increasing IDs."""
+        from fantasyfolio.core.journal_partitions import append_entries, list_partitions
+        
+        conn = self._make_db()
+        ids = append_entries(conn, [
+            self._entry('2026-08-31 23:59:59'),
+            self._entry('2026-09-01 00:00:00'),
+            self._entry('2026-09-15 12:00:00'),
+        ])
+        conn.commit()
+        assert ids == [1, 2, 3]
+        assert append_entries(conn, [self._entry('2026-09-16 00:00:00')]) == [4]
+        conn.commit()
+        
+        assert [m for m, _ in list_partitions(conn)] == ['2026-09', '2026-08']
+        assert conn.execute("SELECT COUNT(*) FROM change_journal_2026_09").fetchone()[0] == 3
+        assert conn.execute("SELECT entry_count FROM journal_partitions WHERE month = '2026-08'").fetchone()[0] == 1
+        conn.close()
+    
+    def test_legacy_rows_moved(self):
+        """Rows in the old single table move into partitions, keeping IDs."""
+        from fantasyfolio.core.journal_partitions import append_entries, ensure_journal_partitions
+        
+        conn = self._make_db()
+        conn.execute("""
+            INSERT INTO change_journal (id, timestamp, entity_type, entity_id, action)
+            VALUES (7, '2025-01-02 03:04:05', 'asset', 5, 'trash')
+        """)
+        conn.commit()
+        ensure_journal_partitions(conn)
+        
+        assert conn.execute("SELECT COUNT(*) FROM change_journal").fetchone()[0] == 0
+        assert conn.execute("SELECT id FROM change_journal_2025_01").fetchone()[0] == 7
+        assert append_entries(conn, [self._entry('2026-10-01 00:00:00')]) == [8]
+        conn.close()
+    
+    def test_retention_drops_whole_months(self):
+        """Months before the cutoff are dropped; the cutoff month is trimmed."""
+        from fantasyfolio.core.journal_partitions import append_entries, drop_before, list_partitions
+        
+        conn = self._make_db()
+        append_entries(conn, [
+            self._entry('2026-07-10 00:00:00'),
+            self._entry('2026-07-20 00:00:00'),
+            self._entry('2026-08-05 00:00:00'),
+            self._entry('2026-08-25 00:00:00'),
+            self._entry('2026-09-01 00:00:00'),
+        ])
+        conn.commit()
+        
+        assert drop_before(conn, '2026-08-10 00:00:00') == 3
+        assert [m for m, _ in list_partitions(conn, newest_first=False)] == ['2026-08', '2026-09']
+        assert conn.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'change_journal_2026_07'"
+        ).fetchone() is None
+        assert conn.execute("SELECT timestamp FROM change_journal_2026_08").fetchall()[0][0] == '2026-08-25 00:00:00'
+        conn.close()
+    
+    def test_compaction_collapses_repeated_updates(self):
+        """Repeated updates of one field become one first-old to last-new entry."""
+        from fantasyfolio.core.journal_partitions import append_entries, compact_sealed
+        
+        conn = self._make_db()
+        append_entries(conn, [
+            self._entry('2026-05-01 00:00:00', field='title', old='a', new='b'),
+            self._entry('2026-05-02 00:00:00', field='title', old='b', new='c'),
+            self._entry('2026-05-03 00:00:00', action='trash'),
+            self._entry('2026-05-04 00:00:00', field='title', old='c', new='d'),
+            self._entry('2026-05-05 00:00:00', field='tags', old='x', new='y'),
+            self._entry('2026-05-06 00:00:00', entity_id=2, field='title', old='p', new='q'),
+        ])
+        conn.commit()
+        
+        assert compact_sealed(conn) == {'2026-05': 2}
+        rows = conn.execute("""
+            SELECT entity_id, action, field_name, old_value, new_value
+            FROM change_journal_2026_05 ORDER BY id
+        """).fetchall()
+        assert [tuple(r) for r in rows] == [
+            (1, 'trash', None, None, None),
+            (1, 'update', 'title', 'a', 'd'),
+            (1, 'update', 'tags', 'x', 'y'),
+            (2, 'update', 'title', 'p', 'q'),
+        ]
+        # Already compacted months are skipped
+        assert compact_sealed(conn) == {}
+        conn.close()
+    
+    def test_restored_database_rechecked(self, tmp_path):
+        """An older database copied over the live one gets the partition tables again."""
+        import shutil
+        from fantasyfolio.core.database import reset_database_caches
+        from fantasyfolio.core.journal_partitions import append_entries
+        
+        old_path, live_path = tmp_path / 'old.db', tmp_path / 'live.db'
+        conn = _schema_db(old_path)
+        conn.executescript("DROP TABLE journal_partitions; DROP TABLE journal_sequence;")
+        conn.close()
+        conn = _schema_db(live_path)
+        append_entries(conn, [self._entry('2026-08-01 00:00:00')])
+        conn.commit()
+        conn.close()
+        
+        shutil.copy2(old_path, live_path)
+        reset_database_caches()
+        conn = sqlite3.connect(live_path)
+        assert append_entries(conn, [self._entry('2026-08-02 00:00:00')]) == [1]
+        conn.close()
+
+
+class TestOnlineBackup:
+    """Test the online backup engine."""
+    
+    def _make_source(self, tmp, rows=2000):
+        db_path = Path(tmp) / 'source.db'
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, payload TEXT)")
+        conn.executemany("INSERT INTO items (payload) VALUES (?)", [('x' * 200,)] * rows)
+        conn.commit()
+        conn.close()
+        return db_path
+    
+    def _count(self, path):
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0], \
+                conn.execute("PRAGMA journal_mode").fetchone()[0]
+        finally:
+            conn.close()
+    
+    def test_step_and_vacuum_copies(self):
+        """Both methods produce a complete, self-contained copy via a .partial file."""
+        from fantasyfolio.services.db_backup import run_backup
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            source = self._make_source(tmp)
+            for method in ('step', 'vacuum'):
+                dest = Path(tmp) / f'{method}.db'
+                job = run_backup(dest, source_path=source, method=method)
+                assert job.status == 'completed', job.error
+                assert job.method == method
+                assert job.progress == 1.0
+                assert self._count(dest) == (2000, 'delete')
+                assert not dest.with_name(dest.name + '.partial').exists()
+    
+    def test_falls_back_to_vacuum_when_source_keeps_changing(self):
+        """Writes between steps restart the copy; past the limit VACUUM INTO takes over."""
+        from fantasyfolio.config import Config
+        from fantasyfolio.services import db_backup
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            source = self._make_source(tmp)
+            writer = sqlite3.connect(source)
+            
+            class WriteBetweenSteps:
+                @staticmethod
+                def sleep(seconds):
+                    writer.execute("INSERT INTO items (payload) VALUES ('y')")
+                    writer.commit()
+                time = staticmethod(time.time)
+            
+            saved = (db_backup.time, Config.BACKUP_PAGES_PER_STEP, Config.BACKUP_MAX_RESTARTS)
+            db_backup.time = WriteBetweenSteps
+            Config.BACKUP_PAGES_PER_STEP, Config.BACKUP_MAX_RESTARTS = 2, 1
+            try:
+                job = db_backup.run_backup(Path(tmp) / 'copy.db', source_path=source, method='step')
+            finally:
+                db_backup.time, Config.BACKUP_PAGES_PER_STEP, Config.BACKUP_MAX_RESTARTS = saved
+                writer.close()
+            
+            assert job.status == 'completed', job.error
+            assert job.method == 'vacuum'
+            assert job.restarts == 2
+            assert self._count(Path(tmp) / 'copy.db')[0] >= 2000
+    
+    def test_background_job(self):
+        """submit_backup returns at once; the job is pollable and runs its callback."""
+        from fantasyfolio.services.db_backup import get_backup_job, submit_backup
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            source = self._make_source(tmp)
+            from fantasyfolio.config import Config
+            saved, Config.DATABASE_PATH = Config.DATABASE_PATH, source
+            finished = []
+            try:
+                job = submit_backup(Path(tmp) / 'bg.db', on_complete=finished.append)
+                assert get_backup_job(job.id) is job
+                assert job.wait(10)
+            finally:
+                Config.DATABASE_PATH = saved
+            
+            deadline = time.time() + 5
+            while not finished and time.time() < deadline:
+                time.sleep(0.01)
+            assert finished == [job]
+            assert job.to_dict()['status'] == 'completed'
+
+
+class TestSnapshotStore:
+    """Test the deduplicated snapshot chunk store."""
+    
+    def _make_db(self, path, rows):
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY, payload TEXT)")
+        conn.executemany("INSERT INTO items (payload) VALUES (?)",
+                         [(f'row {i} ' * 20,) for i in range(rows)])
+        conn.commit()
+        conn.close()
+    
+    def test_second_snapshot_stores_only_changes(self):
+        """Unchanged chunks are shared; a restore is byte-identical."""
+        from fantasyfolio.services.snapshot_store import SnapshotStore
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SnapshotStore(Path(tmp) / 'snaps', chunk_size=4096, codec='zlib')
+            store.root.mkdir()
+            db = Path(tmp) / 'live.db'
+            self._make_db(db, 3000)
+            
+            first = store.ingest(db, store.root / 'snapshot_1.snap')
+            assert first['new_chunks'] > 0
+            assert first['stored_bytes'] < first['size_bytes']  # Compressed
+            
+            self._make_db(db, 10)
+            second = store.ingest(db, store.root / 'snapshot_2.snap')
+            assert second['new_chunks'] < second['chunks'] / 4
+            
+            restored = Path(tmp) / 'restored.db'
+            store.restore(store.root / 'snapshot_2.snap', restored)
+            assert restored.read_bytes() == db.read_bytes()
+    
+    def test_gc_keeps_shared_chunks(self):
+        """Deleting a manifest frees only chunks no other snapshot uses."""
+        from fantasyfolio.services.snapshot_store import SnapshotStore
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SnapshotStore(Path(tmp) / 'snaps', chunk_size=4096, codec='zlib')
+            store.root.mkdir()
+            db = Path(tmp) / 'live.db'
+            self._make_db(db, 1000)
+            first = Path(tmp) / 'first.db'
+            first.write_bytes(db.read_bytes())
+            store.ingest(db, store.root / 'snapshot_1.snap')
+            self._make_db(db, 500)
+            store.ingest(db, store.root / 'snapshot_2.snap')
+            
+            (store.root / 'snapshot_2.snap').unlink()
+            freed = store.gc()
+            assert freed['deleted_chunks'] > 0
+            
+            restored = Path(tmp) / 'restored.db'
+            store.restore(store.root / 'snapshot_1.snap', restored)
+            assert restored.read_bytes() == first.read_bytes()
+    
+    def test_corrupt_chunk_fails_restore(self):
+        """A damaged chunk is detected and the destination is left untouched."""
+        from fantasyfolio.services.snapshot_store import SnapshotStore
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SnapshotStore(Path(tmp) / 'snaps', chunk_size=4096, codec='zlib')
+            store.root.mkdir()
+            db = Path(tmp) / 'live.db'
+            self._make_db(db, 200)
+            store.ingest(db, store.root / 'snapshot_1.snap')
+            
+            import zlib
+            chunk = next(store.chunk_dir.glob('*/*'))
+            chunk.write_bytes(zlib.compress(b'garbage'))
+            
+            dest = Path(tmp) / 'dest.db'
+            dest.write_bytes(b'original')
+            if pytest:
+                with pytest.raises(ValueError):
+                    store.restore(store.root / 'snapshot_1.snap', dest)
+            assert dest.read_bytes() == b'original'
+
+
+class TestResticBackup:
+    """Test Restic backups of database snapshots."""
+    
+    def test_latest_chunked_snapshot_sent_as_database(self):
+        """Restic gets a plain SQLite file, not the .snap manifest."""
+        import subprocess
+        from unittest.mock import patch
+        from fantasyfolio.config import Config
+        from fantasyfolio.services.restic_backup import backup_latest_snapshot
+        from fantasyfolio.services.snapshot import create_snapshot
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Path(tmp) / 'live.db'
+            conn = sqlite3.connect(db)
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, payload TEXT)")
+            conn.execute("INSERT INTO items (payload) VALUES ('kept')")
+            conn.commit()
+            conn.close()
+            
+            sent = {}
+            
+            def fake_run(cmd, **kwargs):
+                source = Path(cmd[cmd.index('--json') + 1])
+                sent['path'] = source
+                sent['header'] = source.read_bytes()[:16]
+                return subprocess.CompletedProcess(cmd, 0, stdout='', stderr='')
+            
+            with patch.object(Config, 'DATA_DIR', Path(tmp)), \
+                    patch.object(Config, 'DATABASE_PATH', db), \
+                    patch.object(Config, 'SNAPSHOT_FORMAT', 'chunked'):
+                snapshot = create_snapshot(note='restic')
+                assert snapshot['filename'].endswith('.snap')
+                
+                with patch('fantasyfolio.services.restic_backup.subprocess.run', fake_run):
+                    result = backup_latest_snapshot('/repo', 'secret')
+            
+            assert result['success']
+            assert result['snapshot'] == snapshot['filename']
+            assert sent['path'].suffix == '.db'
+            assert sent['header'] == b'SQLite format 3\x00'
+            assert not sent['path'].exists()  # Temporary copy removed afterwards
+
+
+class TestAuthCache:
+    """Test the cached token/user/collection-access resolution."""
+    
+    def test_token_and_user_cached_until_invalidated(self):
+        """Lookups hit the loaders once; invalidate_user forces a reload."""
+        from fantasyfolio.services.auth_cache import PrincipalCache
+        
+        cache = PrincipalCache(ttl=60)
+        calls = {'verify': 0, 'user': 0}
+        role = {'value': 'viewer'}
+        
+        def verify(token):
+            calls['verify'] += 1
+            return {'sub': 'u1', 'type': 'access', 'exp': time.time() + 600}
+        
+        def load_user(user_id):
+            calls['user'] += 1
+            return {'id': user_id, 'role': role['value']}
+        
+        for _ in range(5):
+            payload = cache.resolve_token('tok', verify)
+            user = cache.get_principal(payload['sub'], load_user)
+        assert calls == {'verify': 1, 'user': 1}
+        assert user['role'] == 'viewer'
+        
+        user['role'] = 'admin'  # Callers get copies
+        assert cache.get_principal('u1', load_user)['role'] == 'viewer'
+        
+        role['value'] = 'editor'
+        cache.invalidate_user('u1')
+        cache.resolve_token('tok', verify)
+        assert cache.get_principal('u1', load_user)['role'] == 'editor'
+        assert calls == {'verify': 2, 'user': 2}
+    
+    def test_entries_expire(self):
+        """Entries never outlive the TTL or the token's own expiry."""
+        from fantasyfolio.services.auth_cache import PrincipalCache
+        
+        cache = PrincipalCache(ttl=60)
+        calls = []
+        
+        def verify(token):
+            calls.append(token)
+            return {'sub': 'u1', 'exp': time.time() + 0.05}
+        
+        cache.resolve_token('short', verify)
+        cache.resolve_token('short', verify)
+        time.sleep(0.1)
+        cache.resolve_token('short', verify)
+        assert len(calls) == 2
+        
+        disabled = PrincipalCache(ttl=0)
+        disabled.resolve_token('short', verify)
+        disabled.resolve_token('short', verify)
+        assert len(calls) == 4
+    
+    def test_collection_access_invalidated_by_share_change(self):
+        """Denied access is cached, and re-checked once shares change."""
+        from fantasyfolio.services.auth_cache import PrincipalCache
+        
+        cache = PrincipalCache(ttl=60)
+        shares = {}
+        calls = []
+        
+        def load(collection_id, user_id):
+            calls.append((collection_id, user_id))
+            return {'owner_id': 'owner', 'permission': shares.get(user_id)}
+        
+        assert cache.collection_access('c1', 'u2', load)['permission'] is None
+        assert cache.collection_access('c1', 'u2', load)['permission'] is None
+        assert len(calls) == 1
+        
+        shares['u2'] = 'edit'
+        cache.invalidate_collection('c1')
+        assert cache.collection_access('c1', 'u2', load)['permission'] == 'edit'
+        
+        cache.invalidate_user('u2')
+        cache.collection_access('c1', 'u2', load)
+        assert len(calls) == 3
+    
+    def test_load_racing_invalidation_not_cached(self):
+        """A row loaded before an invalidation isn't stored over it."""
+        from fantasyfolio.services.auth_cache import PrincipalCache
+        
+        cache = PrincipalCache(ttl=60)
+        role = {'value': 'admin'}
+        
+        def stale_load(user_id):
+            row = {'id': user_id, 'role': role['value']}
+            # Demoted (and invalidated) while this row was being read
+            role['value'] = 'viewer'
+            cache.invalidate_user(user_id)
+            return row
+        
+        assert cache.get_principal('u1', stale_load)['role'] == 'admin'
+        assert cache.get_principal('u1', lambda user_id: {'id': user_id, 'role': role['value']})['role'] == 'viewer'
+    
+    def test_reverse_indexes_pruned(self):
+        """Expired, evicted and invalidated entries leave no invalidation keys behind."""
+        from unittest.mock import patch
+        from fantasyfolio.services import auth_cache
+        
+        cache = auth_cache.PrincipalCache(ttl=60)
+        
+        def load(collection_id, user_id):
+            return {'owner_id': 'owner', 'permission': 'view'}
+        
+        # Expiry
+        cache.resolve_token('short', lambda token: {'sub': 'u1', 'exp': time.time() + 0.05})
+        time.sleep(0.1)
+        cache.resolve_token('short', lambda token: None)
+        assert cache._tokens_by_user == {}
+        
+        # Invalidating a collection drops its keys from the per-user index too
+        cache.collection_access('c1', 'u1', load)
+        cache.collection_access('c2', 'u1', load)
+        cache.invalidate_collection('c1')
+        assert cache._access_by_user == {'u1': {('c2', 'u1')}}
+        cache.invalidate_user('u1')
+        assert cache._access_by_collection == {}
+        
+        # Eviction
+        with patch.object(auth_cache, 'MAX_ENTRIES', 10):
+            for i in range(25):
+                cache.collection_access(f'c{i}', f'u{i}', load)
+        assert len(cache._access_by_user) == len(cache._access)
+        assert len(cache._access_by_collection) == len(cache._access)
+
+
+class TestCollectionTree:
+    """Test the closure-table index for nested collections."""
+    
+    def _make_db(self):
+        import importlib.util
+        
+        root = Path(__file__).parent.parent
+        conn = _schema_db()
+        for name in ('auth_schema', '007_nested_collections'):
+            spec = importlib.util.spec_from_file_location(name, root / 'migrations' / f'{name}.py')
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            conn.executescript(getattr(module, 'SCHEMA_ADDITIONS', None) or module.MIGRATION_SQL)
+        conn.execute("INSERT INTO users (id, email) VALUES ('u1', 'u1@example.com')")
+        return conn
+    
+    def _add(self, conn, collection_id, parent=None):
+        conn.execute(
+            "INSERT INTO user_collections (id, owner_id, name, parent_collection_id) VALUES (?, 'u1', ?, ?)",
+            (collection_id, collection_id, parent)
+        )
+    
+    def _closure(self, conn):
+        return set(tuple(row) for row in conn.execute(
+            "SELECT ancestor_id, descendant_id, depth FROM collection_tree"
+        ).fetchall())
+    
+    def test_backfill_and_triggers_match_rebuild(self):
+        """Existing trees are backfilled; inserts and moves keep the closure exact."""
+        from fantasyfolio.core.collection_tree import (
+            ensure_collection_tree, rebuild_collection_tree, ancestors, is_descendant
+        )
+        
+        conn = self._make_db()
+        self._add(conn, 'a')
+        self._add(conn, 'b', 'a')
+        ensure_collection_tree(conn)  # Backfills a, b
+        self._add(conn, 'c', 'b')     # Trigger
+        self._add(conn, 'd')
+        
+        assert [row['id'] for row in ancestors(conn, 'c')] == ['a', 'b']
+        assert is_descendant(conn, 'c', 'a')
+        
+        # Move b (with c) under d
+        conn.execute("UPDATE user_collections SET parent_collection_id = 'd' WHERE id = 'b'")
+        assert [row['id'] for row in ancestors(conn, 'c')] == ['d', 'b']
+        assert not is_descendant(conn, 'c', 'a')
+        
+        live = self._closure(conn)
+        rebuild_collection_tree(conn)
+        assert self._closure(conn) == live
+        assert ('d', 'c', 2) in live
+    
+    def test_subtree_rollups(self):
+        """One query returns the subtree with direct and rolled-up totals."""
+        from fantasyfolio.core.collection_tree import ensure_collection_tree, subtree_rows, build_tree
+        
+        conn = self._make_db()
+        ensure_collection_tree(conn)
+        self._add(conn, 'root')
+        self._add(conn, 'child', 'root')
+        self._add(conn, 'leaf', 'child')
+        conn.execute("INSERT INTO models (id, filename, file_path, file_size) VALUES (1, 'a.stl', '/a.stl', 100)")
+        conn.execute("INSERT INTO models (id, filename, file_path, file_size) VALUES (2, 'b.stl', '/b.stl', 50)")
+        for item_id, collection_id, asset_id in [('i1', 'root', 1), ('i2', 'leaf', 1), ('i3', 'leaf', 2)]:
+            conn.execute(
+                "INSERT INTO collection_items (id, collection_id, asset_type, asset_id) VALUES (?, ?, 'model', ?)",
+                (item_id, collection_id, asset_id)
+            )
+        
+        rows = {row['id']: row for row in subtree_rows(conn, 'root')}
+        assert rows['root']['direct_items'] == 1
+        assert rows['root']['total_items'] == 3
+        assert rows['root']['total_bytes'] == 250
+        assert rows['child']['depth'] == 1 and rows['child']['total_items'] == 2
+        
+        tree = build_tree(list(rows.values()), root_id='root')
+        assert tree[0]['children'][0]['children'][0]['id'] == 'leaf'
+        
+        # Depth-limited listing still rolls up the whole subtree
+        shallow = subtree_rows(conn, 'root', max_depth=0)
+        assert len(shallow) == 1 and shallow[0]['total_items'] == 3
+    
+    def test_delete_removes_closure_rows(self):
+        """Deleting collections removes every pair that mentions them."""
+        from fantasyfolio.core.collection_tree import ensure_collection_tree, subtree_ids
+        
+        conn = self._make_db()
+        ensure_collection_tree(conn)
+        self._add(conn, 'a')
+        self._add(conn, 'b', 'a')
+        self._add(conn, 'c', 'b')
+        
+        ids = subtree_ids(conn, 'b')
+        assert ids == ['c', 'b']
+        for collection_id in ids:
+            conn.execute("DELETE FROM user_collections WHERE id = ?", (collection_id,))
+        assert self._closure(conn) == {('a', 'a', 0)}
+
+
+class TestUnifiedSearch:
+    """Test merged, normalised ranking across the FTS indexes."""
+    
+    def _make_db(self):
+        conn = _schema_db()
+        # assets_fts indexes a text_content column that the base schema lacks
+        conn.execute("ALTER TABLE assets ADD COLUMN text_content TEXT")
+        
+        for i in range(1, 6):
+            conn.execute(
+                "INSERT INTO assets (id, file_path, filename, title) VALUES (?, ?, ?, ?)",
+                (i, f'/pdfs/book{i}.pdf', f'book{i}.pdf', f'Dragon Tome {i}' if i <= 2 else f'Manual {i}')
+            )
+            for page in range(1, 4):
+                text = 'dragon lair dragon hoard' if i == 3 and page == 2 else 'goblins and kobolds'
+                conn.execute(
+                    "INSERT INTO asset_pages (asset_id, page_num, text_content) VALUES (?, ?, ?)",
+                    (i, page, text)
+                )
+        for i in range(1, 4):
+            conn.execute(
+                "INSERT INTO models (id, file_path, filename, format) VALUES (?, ?, ?, 'stl')",
+                (i, f'/models/dragon_{i}.stl', f'dragon_{i}.stl')
+            )
+        for table in ('assets_fts', 'pages_fts', 'models_fts'):
+            conn.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+        return conn
+    
+    def test_single_ranked_list(self):
+        """PDFs, page hits and models come back in one score order."""
+        from fantasyfolio.core.search_engine import unified_search, split_results
+        
+        conn = self._make_db()
+        found = unified_search(conn, 'dragon', limit=20)
+        results = found['results']
+        
+        assert {r['result_type'] for r in results} == {'pdf', 'model'}
+        scores = [r['score'] for r in results]
+        assert scores == sorted(scores, reverse=True)
+        assert found['next_cursor'] is None
+        
+        # Book 3 only matches on page content and carries its best page
+        content = [r for r in results if r['match'] == 'content']
+        assert [r['id'] for r in content] == [3]
+        assert content[0]['pages'][0]['page_num'] == 2
+        assert '<mark>' in content[0]['pages'][0]['snippet']
+        
+        split = split_results(results)
+        assert sorted(r['id'] for r in split['assets']) == [1, 2]
+        assert len(split['models']) == 3
+        assert split['pages'][0]['asset_id'] == 3
+    
+    def test_pagination_is_consistent(self):
+        """Pages of the merged list neither overlap nor skip results."""
+        from fantasyfolio.core.search_engine import unified_search
+        
+        conn = self._make_db()
+        everything = [(r['result_type'], r['id']) for r in unified_search(conn, 'dragon', limit=50)['results']]
+        
+        paged, cursor = [], None
+        while True:
+            found = unified_search(conn, 'dragon', limit=2, cursor=cursor)
+            paged.extend((r['result_type'], r['id']) for r in found['results'])
+            cursor = found['next_cursor']
+            if not cursor:
+                break
+        assert paged == everything
+        assert len(paged) == 6
+    
+    def test_type_filter_and_bad_query(self):
+        """Type restriction applies; FTS syntax errors give no results."""
+        from fantasyfolio.core.search_engine import unified_search
+        
+        conn = self._make_db()
+        models = unified_search(conn, 'dragon', types=('model',))['results']
+        assert {r['result_type'] for r in models} == {'model'}
+        assert models[0]['filename'].startswith('dragon_')
+        assert unified_search(conn, '"unbalanced')['results'] == []
+    
+    def test_match_kind_independent_of_page_size(self):
+        """A PDF matching title and pages is 'both' even if its page hit isn't in the top K."""
+        from fantasyfolio.core.search_engine import unified_search
+        
+        conn = self._make_db()
+        conn.execute("INSERT INTO asset_pages (asset_id, page_num, text_content) VALUES (1, 4, ?)",
+                      ('goblins and kobolds ' * 20 + 'and one dragon',))
+        for i in (6, 7):
+            conn.execute("INSERT INTO assets (id, file_path, filename, title) VALUES (?, ?, ?, ?)",
+                         (i, f'/pdfs/book{i}.pdf', f'book{i}.pdf', f'Manual {i}'))
+            conn.execute("INSERT INTO asset_pages (asset_id, page_num, text_content) VALUES (?, 1, ?)",
+                         (i, 'dragon lair dragon hoard'))
+        for table in ('assets_fts', 'pages_fts'):
+            conn.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+        
+        first = unified_search(conn, 'dragon', types=('pdf',), limit=1)['results'][0]
+        assert (first['id'], first['match']) == (1, 'both')
+        assert first['pages'][0]['page_num'] == 4
+        
+        matches = {r['id']: r['match'] for r in unified_search(conn, 'dragon', types=('pdf',))['results']}
+        assert matches == {1: 'both', 2: 'metadata', 3: 'content', 6: 'content', 7: 'content'}
+
+
+class TestTrigramSearch:
+    """Test substring name matching through the trigram indexes."""
+    
+    def _make_db(self, names=('Bonedragon_Supported.stl', 'RedDragon.stl', 'Dragon_Bust.stl', 'goblin_king.stl')):
+        from fantasyfolio.core.trigram_index import ensure_trigram_index
+        
+        conn = _schema_db()
+        for i, name in enumerate(names, 1):
+            conn.execute(
+                "INSERT INTO models (id, file_path, filename, format) VALUES (?, ?, ?, 'stl')",
+                (i, f'/models/{name}', name)
+            )
+        conn.execute("INSERT INTO models_fts(models_fts) VALUES ('rebuild')")
+        assert ensure_trigram_index(conn)
+        return conn
+    
+    def test_infix_matches(self):
+        """'dragon' finds names containing it mid-word; word matches rank first."""
+        from fantasyfolio.core.search_engine import unified_search
+        
+        conn = self._make_db()
+        results = unified_search(conn, 'dragon', types=('model',))['results']
+        assert [r['filename'] for r in results][0] == 'Dragon_Bust.stl'
+        assert {r['id'] for r in results} == {1, 2, 3}
+        
+        # Separator in the term: literal substring only
+        results = unified_search(conn, 'dragon_sup', types=('model',))['results']
+        assert [r['id'] for r in results] == [1]
+        
+        # Typo: nothing matches exactly, the fuzzy pass still finds it
+        results = unified_search(conn, 'gobiln king', types=('model',))['results']
+        assert [r['id'] for r in results] == [4]
+        results = unified_search(conn, 'dragn', types=('model',))['results']
+        assert {r['id'] for r in results} == {1, 2, 3}
+    
+    def test_word_matches_rank_before_infix_matches(self):
+        """A weak word match (long name) still sorts above a short infix-only match."""
+        from fantasyfolio.core.search_engine import unified_search
+        
+        knight = 'Knight_Templar_Mounted_Warhorse_Lance_Dragon_Crest_Heraldry_Banner_Shield_Cloak_Helm_Pose_B_Supported_32mm.stl'
+        conn = self._make_db(['Dragon.stl', knight, 'RedDragon.stl'])
+        results = unified_search(conn, 'dragon', types=('model',))['results']
+        assert [(r['id'], r['match']) for r in results] == [(1, 'metadata'), (2, 'metadata'), (3, 'substring')]
+        
+        # The same order page by page
+        paged = [unified_search(conn, 'dragon', types=('model',), limit=1, offset=i)['results'][0]['id']
+                 for i in range(3)]
+        assert paged == [1, 2, 3]
+    
+    def test_plan_query(self):
+        """Short terms and FTS syntax stay on the word index."""
+        from fantasyfolio.core.trigram_index import fuzzy_query, plan_query
+        
+        assert plan_query('dragon') == 'both'
+        assert plan_query('red_dragon') == 'trigram'
+        assert plan_query('v2.1') == 'trigram'
+        assert plan_query('orc ax') == 'prefix'
+        assert plan_query('"red dragon"') == 'prefix'
+        assert plan_query('dragon OR wyrm') == 'prefix'
+        # Fuzzy candidates must share half the trigrams, not just one
+        assert fuzzy_query('dragn') == '("agn" AND "dra") OR ("agn" AND "rag") OR ("dra" AND "rag")'
+    
+    def test_search_never_creates_index(self):
+        """Search checks each database for the index; without it, it stays on the word index."""
+        from fantasyfolio.core.search_engine import unified_search
+        from fantasyfolio.core.trigram_index import has_trigram_index
+        
+        indexed = self._make_db()
+        plain = _schema_db()
+        plain.execute("INSERT INTO models (id, file_path, filename, format) VALUES (1, '/m/RedDragon.stl', 'RedDragon.stl', 'stl')")
+        plain.execute("INSERT INTO models_fts(models_fts) VALUES ('rebuild')")
+        
+        assert unified_search(plain, 'dragon', types=('model',))['results'] == []
+        assert not has_trigram_index(plain)
+        assert {r['id'] for r in unified_search(indexed, 'dragon', types=('model',))['results']} == {1, 2, 3}
+    
+    def test_triggers_keep_index_in_sync(self):
+        """Inserts, renames and deletes are reflected without a rebuild."""
+        conn = self._make_db()
+        
+        def matches(term):
+            return sorted(row[0] for row in conn.execute(
+                "SELECT rowid FROM models_trigram WHERE models_trigram MATCH ?", (f'"{term}"',)
+            ))
+        
+        conn.execute("INSERT INTO models (id, file_path, filename, format) VALUES (5, '/m/x', 'Wyvernling.stl', 'stl')")
+        assert matches('vernl') == [5]
+        conn.execute("UPDATE models SET filename = 'Dragonling.stl' WHERE id = 5")
+        assert matches('vernl') == []
+        assert matches('ragonl') == [5]
+        conn.execute("DELETE FROM models WHERE id = 2")
+        assert matches('dragon') == [1, 3, 5]
+
+
+class TestSearchCache:
+    """Test the generation-invalidated search result cache."""
+    
+    def _make_db(self):
+        return _schema_db()
+    
+    def test_hits_until_indexed_data_changes(self):
+        """Writes to indexed data in assets, models or pages make cached results stale."""
+        from fantasyfolio.core.search_cache import (
+            cache_key, cached_search, clear_search_cache, search_cache_stats
+        )
+        
+        conn = self._make_db()
+        clear_search_cache()
+        calls = []
+        
+        def compute(c):
+            calls.append(1)
+            return {'results': [len(calls)]}
+        
+        key = cache_key('search', 'Dragon  Lair', limit=10, folder=None)
+        assert cached_search(conn, key, compute) == {'results': [1]}
+        # Case and spacing don't matter
+        same = cache_key('search', 'dragon lair', limit=10)
+        assert cached_search(conn, same, compute) == {'results': [1]}
+        assert len(calls) == 1
+        
+        conn.execute("INSERT INTO asset_pages (asset_id, page_num, text_content) VALUES (1, 1, 'x')")
+        assert cached_search(conn, key, compute) == {'results': [2]}
+        conn.execute("UPDATE asset_pages SET text_content = 'y'")
+        assert cached_search(conn, key, compute) == {'results': [3]}
+        
+        stats = search_cache_stats()
+        assert stats['hits'] == 1 and stats['misses'] == 1 and stats['stale'] == 2
+        assert stats['hit_rate'] == 0.25
+    
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted at SEARCH_CACHE_SIZE."""
+        from unittest.mock import patch
+        from fantasyfolio.config import Config
+        from fantasyfolio.core.search_cache import (
+            cache_key, cached_search, clear_search_cache, search_cache_stats
+        )
+        
+        conn = self._make_db()
+        clear_search_cache()
+        calls = []
+        
+        def compute(c):
+            calls.append(1)
+            return len(calls)
+        
+        with patch.object(Config, 'SEARCH_CACHE_SIZE', 2):
+            cached_search(conn, cache_key('search', 'a'), compute)
+            cached_search(conn, cache_key('search', 'b'), compute)
+            cached_search(conn, cache_key('search', 'a'), compute)  # a is now most recent
+            cached_search(conn, cache_key('search', 'c'), compute)  # evicts b
+            assert cached_search(conn, cache_key('search', 'a'), compute) == 1
+            assert cached_search(conn, cache_key('search', 'b'), compute) == 4
+        assert search_cache_stats()['evictions'] == 2
 
 
 class TestAPIEndpoints:
@@ -267,7 +2169,6 @@ def run_basic_tests():
     print("\n[Test 4] Scanner Identity Resolution...")
     try:
         from fantasyfolio.core.scanner import find_existing_asset
-        import sqlite3
         conn = sqlite3.connect(':memory:')
         conn.row_factory = sqlite3.Row
         conn.execute("CREATE TABLE models (id INTEGER PRIMARY KEY, file_path TEXT, archive_path TEXT, archive_member TEXT, partial_hash TEXT, file_mtime INTEGER, file_size_bytes INTEGER)")
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Query plan regression suite for hot listing/lookup queries.
+
+Runs EXPLAIN QUERY PLAN for the query shapes used by the API, scanner
+and stats code against data/schema.sql, and fails if any of them falls
+back to a full table scan.
+
+Run with: python -m pytest tests/test_query_plans.py -v
+"""
+
+import re
+import sys
+import sqlite3
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+SCHEMA_PATH = Path(__file__).parent.parent / 'data' / 'schema.sql'
+
+ASSET_SORTS = ['filename', 'title', 'file_size', 'page_count', 'publisher', 'created_at', 'modified_at']
+ASSET_VOLUME_SORTS = ['filename', 'title', 'file_size', 'created_at']
+MODEL_SORTS = ['filename', 'title', 'file_size', 'format', 'collection', 'created_at']
+
+# A plan step reading every row of a table without any index
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+
+def _make_db():
+    conn = sqlite3.connect(':memory:')
+    conn.executescript(SCHEMA_PATH.read_text())
+    return conn
+
+
+def _plan(conn, sql, params):
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+
+
+def _assert_no_full_scan(conn, sql, params):
+    plan = _plan(conn, sql, params)
+    scans = [step for step in plan if FULL_SCAN.match(step.strip())]
+    assert not scans, f"Full table scan in plan {plan} for query:\n{sql}"
+    return plan
+
+
+def _assert_seeks(plan, column):
+    """The cursor bound on the leading sort column must be an index range, not a row filter."""
+    assert any(re.search(rf'\b{column}[<>]', step) for step in plan), \
+        f"No range seek on {column} in plan {plan}"
+
+
+def _page_query(base, params, columns, descending, with_cursor):
+    """Reproduce the SQL core.pagination.fetch_page() issues."""
+    from fantasyfolio.core.pagination import keyset_condition, order_clause
+
+    sql, params = base, list(params)
+    if with_cursor:
+        condition, condition_params = keyset_condition(columns, descending, ['m'] * (len(columns) - 1) + [100])
+        sql += f" AND {condition}"
+        params += condition_params
+    sql += f" ORDER BY {order_clause(columns, descending)} LIMIT ?"
+    return sql, params + [101]
+
+
+class TestListingPlans:
+    """Paged listings must be served from an index."""
+
+    def test_asset_listing_sorts(self):
+        conn = _make_db()
+        for sort in ASSET_SORTS:
+            for descending in (False, True):
+                for with_cursor in (False, True):
+                    sql, params = _page_query(
+                        "SELECT * FROM assets WHERE deleted_at IS NULL", [],
+                        [(sort, sort), ('id', 'id')], descending, with_cursor
+                    )
+                    plan = _assert_no_full_scan(conn, sql, params)
+                    assert not any('TEMP B-TREE' in step for step in plan), \
+                        f"Sort on {sort} not backed by an index: {plan}"
+                    if with_cursor:
+                        _assert_seeks(plan, sort)
+        conn.close()
+
+    def test_asset_folder_listing(self):
+        from fantasyfolio.core.database import folder_prefix_filter
+
+        conn = _make_db()
+        folder_sql, folder_params = folder_prefix_filter('folder_path', 'Publisher/Line')
+        sql, params = _page_query(
+            f"SELECT * FROM assets WHERE deleted_at IS NULL AND {folder_sql}", folder_params,
+            [('filename', 'filename'), ('id', 'id')], False, True
+        )
+        plan = _assert_no_full_scan(conn, sql, params)
+        assert any(step.startswith('SEARCH assets') for step in plan), plan
+        conn.close()
+
+    def test_asset_volume_listing(self):
+        conn = _make_db()
+        for sort in ASSET_VOLUME_SORTS:
+            sql, params = _page_query(
+                "SELECT * FROM assets WHERE volume_id = ?", ['vol'],
+                [(sort, sort), ('id', 'id')], False, True
+            )
+            plan = _assert_no_full_scan(conn, sql, params)
+            assert any(f'idx_assets_volume_{sort}' in step for step in plan), plan
+        conn.close()
+
+    def test_model_listing_sorts(self):
+        conn = _make_db()
+        for sort in MODEL_SORTS:
+            for volume in (False, True):
+                base = "SELECT * FROM models WHERE format != 'unsupported'"
+                params = []
+                if volume:
+                    base += " AND volume_id = ?"
+                    params.append('vol')
+                sql, params = _page_query(base, params, [(sort, sort), ('id', 'id')], True, True)
+                plan = _assert_no_full_scan(conn, sql, params)
+                if volume:
+                    assert any(f'idx_models_volume_{sort}' in step for step in plan), plan
+                _assert_seeks(plan, sort)
+        conn.close()
+
+    def test_model_folder_listing(self):
+        from fantasyfolio.core.database import folder_prefix_filter
+
+        conn = _make_db()
+        folder_sql, folder_params = folder_prefix_filter('folder_path', 'Creator/Set 1')
+        sql, params = _page_query(
+            f"SELECT * FROM models WHERE format != 'unsupported' AND {folder_sql}", folder_params,
+            [('filename', 'filename'), ('id', 'id')], False, False
+        )
+        _assert_no_full_scan(conn, sql, params)
+        conn.close()
+
+    def test_trash_listing(self):
+        conn = _make_db()
+        for table in ('assets', 'models'):
+            sql, params = _page_query(
+                f"SELECT * FROM {table} WHERE deleted_at IS NOT NULL", [],
+                [('deleted_at', 'deleted_at'), ('id', 'id')], True, True
+            )
+            plan = _assert_no_full_scan(conn, sql, params)
+            _assert_seeks(plan, 'deleted_at')
+        conn.close()
+
+
+class TestScannerPlans:
+    """Per-file scanner lookups must be index searches."""
+
+    QUERIES = [
+        ("SELECT * FROM models WHERE archive_path = ? AND archive_member = ?",
+         ['/a.zip', 'm.stl'], 'idx_models_archive_member'),
+        ("SELECT * FROM models WHERE file_path = ?", ['/m.stl'], None),
+        ("SELECT * FROM models WHERE partial_hash = ? AND COALESCE(partial_hash_algo, 'md5:1') = ?",
+         ['abc', 'md5:1'], 'idx_models_hash_seen'),
+        ("SELECT * FROM models WHERE partial_hash = ? AND COALESCE(partial_hash_algo, 'md5:1') = ? "
+         "AND file_path != ? ORDER BY last_seen_at DESC LIMIT 1",
+         ['abc', 'md5:1', '/m.stl'], 'idx_models_hash_seen'),
+        ("SELECT * FROM models WHERE partial_hash = ? AND COALESCE(partial_hash_algo, 'md5:1') = ? "
+         "AND NOT (archive_path = ? AND archive_member = ?) ORDER BY last_seen_at DESC LIMIT 1",
+         ['abc', 'md5:1', '/a.zip', 'm.stl'], 'idx_models_hash_seen'),
+        ("SELECT * FROM models WHERE volume_id = ? AND index_status IN ('offline', 'missing')",
+         ['vol'], 'idx_models_volume_status'),
+        ("SELECT COUNT(*) FROM models WHERE volume_id = ? AND index_status = 'missing'",
+         ['vol'], 'idx_models_volume_status'),
+        ("SELECT * FROM assets WHERE file_path = ?", ['/a.pdf'], None),
+        ("SELECT id, format FROM models WHERE thumb_storage IS NULL ORDER BY id",
+         [], 'idx_models_thumb_storage'),
+    ]
+
+    def test_lookups_use_index(self):
+        conn = _make_db()
+        for sql, params, index in self.QUERIES:
+            plan = _assert_no_full_scan(conn, sql, params)
+            assert any(step.startswith('SEARCH') for step in plan), f"{sql}: {plan}"
+            if index:
+                assert any(index in step for step in plan), f"{sql}: expected {index}, got {plan}"
+            # Lookups should never need a sort step
+            assert not any('TEMP B-TREE' in step for step in plan), f"{sql}: {plan}"
+        conn.close()
+
+
+class TestStatsPlans:
+    """Stats aggregates over live rows should read only a covering index."""
+
+    QUERIES = [
+        "SELECT COUNT(*) FROM models WHERE deleted_at IS NULL",
+        "SELECT format, COUNT(*) as count FROM models WHERE deleted_at IS NULL GROUP BY format",
+        "SELECT COUNT(DISTINCT collection) FROM models WHERE deleted_at IS NULL",
+        "SELECT SUM(file_size) FROM models WHERE deleted_at IS NULL",
+        "SELECT COUNT(*) FROM models WHERE deleted_at IS NOT NULL",
+        "SELECT COUNT(*) FROM assets WHERE deleted_at IS NULL",
+        "SELECT SUM(file_size) FROM assets WHERE deleted_at IS NULL",
+        "SELECT COUNT(DISTINCT publisher) FROM assets WHERE deleted_at IS NULL",
+        "SELECT thumb_storage, COUNT(*) FROM models WHERE format IN ('stl', 'obj', '3mf') GROUP BY thumb_storage",
+    ]
+
+    def test_stats_use_covering_index(self):
+        conn = _make_db()
+        for sql in self.QUERIES:
+            plan = _assert_no_full_scan(conn, sql, [])
+            assert any('COVERING INDEX' in step for step in plan), f"{sql}: {plan}"
+        conn.close()
+
+
+class TestFolderTreePlans:
+    """Folder tree reads must use the folder_nodes keys."""
+
+    def test_children_lookup(self):
+        conn = _make_db()
+        plan = _assert_no_full_scan(conn, """
+            SELECT * FROM folder_nodes
+            WHERE entity_type = ? AND volume_id = ? AND parent_path = ? AND total_count > 0
+            ORDER BY folder_path
+        """, ['model', 'vol', ''])
+        assert any(step.startswith('SEARCH folder_nodes') for step in plan), plan
+        conn.close()